@@ -0,0 +1,23 @@
+{
+    'name': 'Partner Balance Ledger',
+    'version': '19.0.1.0.0',
+    'summary': 'Stored invoiced / credited / paid / due totals per commercial partner',
+    'description': """
+        Keeps one row per commercial partner, company, currency and partner
+        type (customer / supplier) with the posted invoiced, credited (credit
+        notes) and paid amounts and the resulting balance due.
+        Rows are refreshed when an invoice or payment journal entry changes
+        state and when payments are posted, reset or cancelled; modules read them in
+        bulk through get_balances() instead of searching every document of
+        the partner.
+    """,
+    'author': 'Custom',
+    'category': 'Accounting/Accounting',
+    'depends': ['account'],
+    'data': [
+        'security/ir.model.access.csv',
+    ],
+    'installable': True,
+    'auto_install': False,
+    'license': 'LGPL-3',
+}
@@ -0,0 +1,4 @@
+from . import account_partner_balance
+from . import account_move
+from . import account_payment
+from . import res_partner
@@ -0,0 +1,16 @@
+from odoo import models
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def write(self, vals):
+        if 'state' not in vals:
+            return super().write(vals)
+        # Post, reset and cancel all go through the state, including the
+        # entries of payments reset or cancelled from the journal entry
+        partner_ids = set(self.commercial_partner_id.ids)
+        res = super().write(vals)
+        partner_ids.update(self.commercial_partner_id.ids)
+        self.env['account.partner.balance']._refresh(partner_ids)
+        return res
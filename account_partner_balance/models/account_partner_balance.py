@@ -0,0 +1,175 @@
+from odoo import api, models, fields
+
+CUSTOMER_MOVE_TYPES = ('out_invoice', 'out_refund')
+SUPPLIER_MOVE_TYPES = ('in_invoice', 'in_refund')
+# Odoo 19 payments are 'in_process' once posted and 'paid' once reconciled
+POSTED_PAYMENT_STATES = ('in_process', 'paid')
+
+
+class AccountPartnerBalance(models.Model):
+    """
+    Stored partner balance ledger, one row per commercial partner, company,
+    currency and partner type.
+
+    ``invoiced`` sums the posted invoices (customer) or bills (supplier),
+    ``credited`` their credit notes and ``paid`` the posted inbound customer
+    (outbound supplier) payments, all in the document currency;
+    ``due = invoiced - credited - paid``.
+
+    Kept in sync by account.move state changes, account.payment
+    post / reset / cancel and commercial partner changes; callers read it
+    in bulk with ``get_balances()``.
+    """
+    _name = 'account.partner.balance'
+    _description = 'Partner Balance Ledger'
+    _log_access = False
+    _rec_name = 'commercial_partner_id'
+
+    commercial_partner_id = fields.Many2one(
+        'res.partner', string='Partner', required=True, readonly=True,
+        index=True, ondelete='cascade')
+    company_id = fields.Many2one(
+        'res.company', string='Company', required=True, readonly=True, ondelete='cascade')
+    currency_id = fields.Many2one(
+        'res.currency', string='Currency', required=True, readonly=True)
+    partner_type = fields.Selection(
+        [('customer', 'Customer'), ('supplier', 'Vendor')],
+        string='Partner Type', required=True, readonly=True)
+    invoiced = fields.Monetary(string='Invoiced', readonly=True)
+    credited = fields.Monetary(string='Credit Notes', readonly=True)
+    paid = fields.Monetary(string='Paid', readonly=True)
+    due = fields.Monetary(string='Due Amount', readonly=True)
+
+    _balance_uniq = models.Constraint(
+        'UNIQUE(commercial_partner_id, company_id, currency_id, partner_type)',
+        'A partner has a single balance per company, currency and type.')
+
+    def init(self):
+        # Only fill the table on install, module updates keep the rows the
+        # document hooks maintain
+        self.env.cr.execute(f"SELECT 1 FROM {self._table} LIMIT 1")
+        if not self.env.cr.rowcount:
+            self._refresh()
+
+    @api.model
+    def _refresh(self, commercial_partner_ids=None):
+        """
+        Recompute the rows of ``commercial_partner_ids``, or of every partner
+        when ``commercial_partner_ids`` is None.
+
+        Rows are upserted in key order and only the rows left without any
+        document are deleted, so concurrent refreshes of the same partner
+        wait on each other instead of failing on the unique constraint.
+        """
+        self.env['account.move'].flush_model(
+            ['commercial_partner_id', 'company_id', 'currency_id', 'move_type', 'state', 'amount_total'])
+        self.env['account.payment'].flush_model(
+            ['partner_id', 'company_id', 'currency_id', 'partner_type', 'payment_type', 'state', 'amount'])
+        self.env['res.partner'].flush_model(['commercial_partner_id'])
+        cr = self.env.cr
+        if commercial_partner_ids is None:
+            move_where = pay_where = delete_where = ""
+            params = {}
+        else:
+            partner_ids = list(set(commercial_partner_ids) - {False, None})
+            if not partner_ids:
+                return
+            move_where = "AND m.commercial_partner_id = ANY(%(partner_ids)s)"
+            pay_where = "AND p.commercial_partner_id = ANY(%(partner_ids)s)"
+            delete_where = "AND commercial_partner_id = ANY(%(partner_ids)s)"
+            params = {'partner_ids': partner_ids}
+        params.update({
+            'customer_types': list(CUSTOMER_MOVE_TYPES),
+            'move_types': list(CUSTOMER_MOVE_TYPES + SUPPLIER_MOVE_TYPES),
+            'payment_states': list(POSTED_PAYMENT_STATES),
+        })
+        cr.execute(f"""
+            WITH fresh AS (
+            SELECT partner_id, company_id, currency_id, partner_type,
+                   SUM(invoiced) AS invoiced, SUM(credited) AS credited,
+                   SUM(paid) AS paid, SUM(invoiced - credited - paid) AS due
+            FROM (
+                SELECT m.commercial_partner_id AS partner_id, m.company_id, m.currency_id,
+                       CASE WHEN m.move_type = ANY(%(customer_types)s)
+                            THEN 'customer' ELSE 'supplier' END AS partner_type,
+                       CASE WHEN m.move_type IN ('out_invoice', 'in_invoice')
+                            THEN m.amount_total ELSE 0 END AS invoiced,
+                       CASE WHEN m.move_type IN ('out_refund', 'in_refund')
+                            THEN m.amount_total ELSE 0 END AS credited,
+                       0 AS paid
+                FROM account_move m
+                WHERE m.state = 'posted'
+                  AND m.move_type = ANY(%(move_types)s)
+                  AND m.commercial_partner_id IS NOT NULL
+                  {move_where}
+                UNION ALL
+                SELECT p.commercial_partner_id, pay.company_id, pay.currency_id,
+                       pay.partner_type, 0, 0, pay.amount
+                FROM account_payment pay
+                JOIN res_partner p ON p.id = pay.partner_id
+                WHERE pay.state = ANY(%(payment_states)s)
+                  AND ((pay.partner_type = 'customer' AND pay.payment_type = 'inbound')
+                       OR (pay.partner_type = 'supplier' AND pay.payment_type = 'outbound'))
+                  {pay_where}
+            ) src
+            GROUP BY partner_id, company_id, currency_id, partner_type
+            ), upserted AS (
+                INSERT INTO {self._table}
+                    (commercial_partner_id, company_id, currency_id, partner_type,
+                     invoiced, credited, paid, due)
+                SELECT partner_id, company_id, currency_id, partner_type,
+                       invoiced, credited, paid, due
+                FROM fresh
+                ORDER BY partner_id, company_id, currency_id, partner_type
+                ON CONFLICT (commercial_partner_id, company_id, currency_id, partner_type)
+                DO UPDATE SET invoiced = EXCLUDED.invoiced,
+                              credited = EXCLUDED.credited,
+                              paid = EXCLUDED.paid,
+                              due = EXCLUDED.due
+                RETURNING id
+            )
+            DELETE FROM {self._table}
+            WHERE id NOT IN (SELECT id FROM upserted)
+              {delete_where}
+        """, params)
+        self.invalidate_model()
+
+    @api.model
+    def get_balances(self, partners, partner_type, currency=None, companies=None, date=None):
+        """
+        Bulk lookup.
+
+        :param partners: res.partner recordset, contacts are folded into
+            their commercial partner
+        :param partner_type: 'customer' or 'supplier'
+        :param currency: currency of the returned amounts, the company
+            currency by default
+        :param companies: companies to sum, the allowed companies by default
+        :param date: conversion date, today by default
+        :returns: {commercial_partner_id: {'invoiced', 'credited', 'paid', 'due'}}
+        """
+        commercial_ids = list(set(partners.commercial_partner_id.ids))
+        empty = dict.fromkeys(('invoiced', 'credited', 'paid', 'due'), 0.0)
+        result = {partner_id: dict(empty) for partner_id in commercial_ids}
+        if not commercial_ids:
+            return result
+        companies = companies or self.env.companies
+        currency = currency or self.env.company.currency_id
+        date = date or fields.Date.context_today(self)
+        self.env.cr.execute(f"""
+            SELECT commercial_partner_id, company_id, currency_id,
+                   invoiced, credited, paid, due
+            FROM {self._table}
+            WHERE commercial_partner_id = ANY(%s)
+              AND partner_type = %s
+              AND company_id = ANY(%s)
+        """, (commercial_ids, partner_type, companies.ids))
+        for partner_id, company_id, currency_id, *amounts in self.env.cr.fetchall():
+            row_currency = self.env['res.currency'].browse(currency_id)
+            company = self.env['res.company'].browse(company_id)
+            totals = result[partner_id]
+            for key, amount in zip(('invoiced', 'credited', 'paid', 'due'), amounts):
+                if row_currency != currency:
+                    amount = row_currency._convert(amount, currency, company, date)
+                totals[key] += amount
+        return result
@@ -0,0 +1,22 @@
+from odoo import models
+
+
+class AccountPayment(models.Model):
+    _inherit = 'account.payment'
+
+    def action_post(self):
+        res = super().action_post()
+        self.env['account.partner.balance']._refresh(self.partner_id.commercial_partner_id.ids)
+        return res
+
+    def action_draft(self):
+        partner_ids = self.partner_id.commercial_partner_id.ids
+        res = super().action_draft()
+        self.env['account.partner.balance']._refresh(partner_ids)
+        return res
+
+    def action_cancel(self):
+        partner_ids = self.partner_id.commercial_partner_id.ids
+        res = super().action_cancel()
+        self.env['account.partner.balance']._refresh(partner_ids)
+        return res
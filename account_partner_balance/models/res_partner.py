@@ -0,0 +1,15 @@
+from odoo import models
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    def write(self, vals):
+        if not {'parent_id', 'is_company'} & set(vals):
+            return super().write(vals)
+        # Documents of the contacts move to their new commercial partner
+        partner_ids = set(self.commercial_partner_id.ids)
+        res = super().write(vals)
+        partner_ids.update(self.commercial_partner_id.ids)
+        self.env['account.partner.balance']._refresh(partner_ids)
+        return res
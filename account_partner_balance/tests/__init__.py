@@ -0,0 +1 @@
+from . import test_account_partner_balance
@@ -0,0 +1,93 @@
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestAccountPartnerBalance(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.other_currency = cls.setup_other_currency('EUR', rates=[('2016-01-01', 2.0)])
+        cls.company = cls.company_data['company']
+        cls.Balance = cls.env['account.partner.balance']
+
+    def _rows(self, partner, partner_type='customer'):
+        return self.Balance.search([
+            ('commercial_partner_id', '=', partner.id),
+            ('partner_type', '=', partner_type),
+        ])
+
+    def _amounts(self, row):
+        return (row.invoiced, row.credited, row.paid, row.due)
+
+    def _pay(self, partner, amount):
+        payment = self.env['account.payment'].create({
+            'amount': amount,
+            'payment_type': 'inbound',
+            'partner_type': 'customer',
+            'partner_id': partner.id,
+        })
+        payment.action_post()
+        return payment
+
+    def test_invoice_and_credit_note(self):
+        self.init_invoice('out_invoice', partner=self.partner_a, amounts=[100.0], post=True)
+        self.init_invoice('out_refund', partner=self.partner_a, amounts=[30.0], post=True)
+        row = self._rows(self.partner_a)
+        self.assertEqual(len(row), 1)
+        self.assertEqual(self._amounts(row), (100.0, 30.0, 0.0, 70.0))
+        self.assertFalse(self._rows(self.partner_a, 'supplier'))
+
+    def test_invoice_reset_and_cancel(self):
+        invoice = self.init_invoice('out_invoice', partner=self.partner_a, amounts=[100.0], post=True)
+        self.init_invoice('out_invoice', partner=self.partner_a, amounts=[50.0], post=True)
+        invoice.button_draft()
+        self.assertEqual(self._amounts(self._rows(self.partner_a)), (50.0, 0.0, 0.0, 50.0))
+        invoice.action_post()
+        self.assertEqual(self._amounts(self._rows(self.partner_a)), (150.0, 0.0, 0.0, 150.0))
+        invoice.button_cancel()
+        self.assertEqual(self._amounts(self._rows(self.partner_a)), (50.0, 0.0, 0.0, 50.0))
+
+    def test_last_document_reset_removes_row(self):
+        invoice = self.init_invoice('out_invoice', partner=self.partner_a, amounts=[100.0], post=True)
+        self.assertTrue(self._rows(self.partner_a))
+        invoice.button_draft()
+        self.assertFalse(self._rows(self.partner_a))
+
+    def test_payment(self):
+        self.init_invoice('out_invoice', partner=self.partner_a, amounts=[100.0], post=True)
+        payment = self._pay(self.partner_a, 40.0)
+        self.assertEqual(self._amounts(self._rows(self.partner_a)), (100.0, 0.0, 40.0, 60.0))
+        payment.action_draft()
+        self.assertEqual(self._amounts(self._rows(self.partner_a)), (100.0, 0.0, 0.0, 100.0))
+
+    def test_payment_reset_from_journal_entry(self):
+        self.init_invoice('out_invoice', partner=self.partner_a, amounts=[100.0], post=True)
+        payment = self._pay(self.partner_a, 40.0)
+        self.assertTrue(payment.move_id)
+        payment.move_id.button_draft()
+        self.assertEqual(self._amounts(self._rows(self.partner_a)), (100.0, 0.0, 0.0, 100.0))
+
+    def test_currency_grouping(self):
+        self.init_invoice('out_invoice', partner=self.partner_a, amounts=[100.0], post=True)
+        self.init_invoice(
+            'out_invoice', partner=self.partner_a, amounts=[200.0], post=True,
+            currency=self.other_currency)
+        rows = self._rows(self.partner_a)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(
+            sorted((row.currency_id.id, row.due) for row in rows),
+            sorted([(self.company.currency_id.id, 100.0), (self.other_currency.id, 200.0)]))
+        balances = self.Balance.get_balances(
+            self.partner_a, 'customer', companies=self.company, date='2017-01-01')
+        # 100 in company currency plus 200 EUR at 2 EUR per unit
+        self.assertAlmostEqual(balances[self.partner_a.id]['due'], 200.0)
+
+    def test_full_refresh_matches_incremental(self):
+        self.init_invoice('out_invoice', partner=self.partner_a, amounts=[100.0], post=True)
+        self._pay(self.partner_a, 25.0)
+        before = self._amounts(self._rows(self.partner_a))
+        self.Balance._refresh()
+        self.assertEqual(self._amounts(self._rows(self.partner_a)), before)
@@ -12,6 +12,7 @@
     "depends": ["account"],
     "excludes": ["account_accountant"],
     "data": [
+        "security/ir.model.access.csv",
         "views/account_reconcile_model_views.xml",
     ],
     "demo": [],
@@ -1,2 +1,4 @@
 from . import account_reconcile_model
 from . import account_bank_statement_line
+from . import account_move_line_match_token
+from . import account_move
@@ -1,114 +1,235 @@
 # Copyright 2023 Dixmit
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import re
+from collections import defaultdict
+
 from odoo import models
-from odoo.tools import SQL, html2plaintext
+from odoo.tools import groupby, html2plaintext
 
 from odoo.addons.base.models.res_bank import sanitize_account_number
 
+# Words of at least 3 characters, like the chunks of the partner name regexes
+WORD_RE = re.compile(r"\w{3,}")
+
 
 class AccountBankStatementLine(models.Model):
     _inherit = "account.bank.statement.line"
 
     def _retrieve_partner(self):
         self.ensure_one()
+        return self._retrieve_partners()[self.id]
+
+    def _retrieve_partners(self):
+        """Find the partner of every statement line of ``self``.
+
+        Each step only looks at the lines not resolved by the previous ones:
+        the partner set on the line, the bank account number, the partner
+        name, the partner mapping of the reconciliation models and finally
+        the partners having all the words of their name in the line texts.
+        Every step is a single query for the whole recordset.
+
+        :return: {statement line id: res.partner (possibly empty)}
+        """
+        Partner = self.env["res.partner"]
+        partners = {st_line.id: st_line.partner_id for st_line in self}
+        for step in (
+            "_retrieve_partners_from_account_number",
+            "_retrieve_partners_from_partner_name",
+            "_retrieve_partners_from_mapping",
+            "_retrieve_partners_from_text",
+        ):
+            remaining = self.filtered(lambda st_line: not partners[st_line.id])
+            if not remaining:
+                break
+            partners.update(getattr(remaining, step)())
+        return {
+            st_line_id: partner or Partner
+            for st_line_id, partner in partners.items()
+        }
+
+    def _retrieve_partners_from_account_number(self):
+        numbers = {
+            st_line.id: sanitize_account_number(st_line.account_number)
+            for st_line in self
+            if st_line.account_number
+        }
+        numbers = {key: number for key, number in numbers.items() if number}
+        if not numbers:
+            return {}
+        self.env["res.partner.bank"].flush_model(
+            ["sanitized_acc_number", "company_id", "partner_id", "active"]
+        )
+        self._cr.execute(
+            """
+            SELECT num.number, bank.company_id, ARRAY_AGG(DISTINCT bank.partner_id)
+            FROM unnest(%s::varchar[]) AS num(number)
+            JOIN res_partner_bank bank
+                ON bank.sanitized_acc_number ILIKE '%%' || num.number || '%%'
+            WHERE bank.active
+            GROUP BY num.number, bank.company_id
+            """,
+            [list(set(numbers.values()))],
+        )
+        by_company = defaultdict(set)
+        by_number = defaultdict(set)
+        for number, company_id, partner_ids in self._cr.fetchall():
+            by_company[number, company_id].update(partner_ids)
+            by_number[number].update(partner_ids)
+
+        res = {}
+        for st_line in self.filtered(lambda st_line: st_line.id in numbers):
+            number = numbers[st_line.id]
+            for partner_ids in (
+                by_company[number, st_line.company_id.id],
+                by_number[number],
+            ):
+                if len(partner_ids) == 1:
+                    res[st_line.id] = self.env["res.partner"].browse(partner_ids)
+                    break
+        return res
 
-        # Retrieve the partner from the statement line.
-        if self.partner_id:
-            return self.partner_id
-
-        # Retrieve the partner from the bank account.
-        if self.account_number:
-            account_number_nums = sanitize_account_number(self.account_number)
-            if account_number_nums:
-                domain = [("sanitized_acc_number", "ilike", account_number_nums)]
-                for extra_domain in ([("company_id", "=", self.company_id.id)], []):
-                    bank_accounts = self.env["res.partner.bank"].search(
-                        extra_domain + domain
+    def _retrieve_partners_from_partner_name(self):
+        lines = self.filtered("partner_name")
+        if not lines:
+            return {}
+
+        def ilike_pattern(value):
+            for char in ("\\", "%", "_"):
+                value = value.replace(char, "\\" + char)
+            return f"%{value}%"
+
+        keys = list({(line.partner_name, line.company_id.id) for line in lines})
+        self.env["res.partner"].flush_model(
+            ["name", "complete_name", "parent_id", "company_id", "active"]
+        )
+        self._cr.execute(
+            """
+            SELECT
+                key.name,
+                key.company_id,
+                COALESCE(
+                    (
+                        SELECT partner.id
+                        FROM res_partner partner
+                        WHERE partner.parent_id IS NULL
+                            AND partner.active
+                            AND partner.name ILIKE key.pattern
+                            AND partner.company_id = key.company_id
+                        ORDER BY partner.complete_name, partner.id DESC
+                        LIMIT 1
+                    ),
+                    (
+                        SELECT partner.id
+                        FROM res_partner partner
+                        WHERE partner.parent_id IS NULL
+                            AND partner.active
+                            AND partner.name ILIKE key.pattern
+                        ORDER BY partner.complete_name, partner.id DESC
+                        LIMIT 1
                     )
-                    if len(bank_accounts.partner_id) == 1:
-                        return bank_accounts.partner_id
-
-        # Retrieve the partner from the partner name.
-        if self.partner_name:
-            domain = [
-                ("parent_id", "=", False),
-                ("name", "ilike", self.partner_name),
-            ]
-            for extra_domain in ([("company_id", "=", self.company_id.id)], []):
-                partner = self.env["res.partner"].search(extra_domain + domain, limit=1)
-                if partner:
-                    return partner
-
-        # Retrieve the partner from the 'reconcile models'.
-        rec_models = self.env["account.reconcile.model"].search(
+                )
+            FROM unnest(%s::varchar[], %s::varchar[], %s::int[])
+                AS key(name, pattern, company_id)
+            """,
             [
-                ("trigger", "!=", "writeoff_button"),
-                ("company_id", "=", self.company_id.id),
-            ]
+                [name for name, _company_id in keys],
+                [ilike_pattern(name) for name, _company_id in keys],
+                [company_id for _name, company_id in keys],
+            ],
         )
-        for rec_model in rec_models:
-            partner = rec_model._get_partner_from_mapping(self)
-            if partner and rec_model._is_applicable_for(self, partner):
-                return partner
+        partner_ids = {
+            (name, company_id): partner_id
+            for name, company_id, partner_id in self._cr.fetchall()
+            if partner_id
+        }
+        res = {}
+        for line in lines:
+            partner_id = partner_ids.get((line.partner_name, line.company_id.id))
+            if partner_id:
+                res[line.id] = self.env["res.partner"].browse(partner_id)
+        return res
 
-        # Retrieve the partner from statement line text values.
-        st_line_text_values = self._get_st_line_strings_for_matching()
-        unaccent = self.env.registry.unaccent
-        sub_queries = []
-        params = []
-        for text_value in st_line_text_values:
-            if not text_value:
+    def _retrieve_partners_from_mapping(self):
+        res = {}
+        for journal, lines in groupby(self, key=lambda line: line.journal_id):
+            rec_models = self.env["account.reconcile.model"]._get_rule_models(
+                journal, ["invoice_matching", "writeoff_suggestion"]
+            )
+            if not rec_models.partner_mapping_line_ids:
                 continue
+            for line in lines:
+                for rec_model in rec_models:
+                    partner = rec_model._get_partner_from_mapping(line)
+                    if partner and rec_model._is_applicable_for(line, partner):
+                        res[line.id] = partner
+                        break
+        return res
 
-            # Find a partner having a name contained inside the statement line values.
-            # Take care a partner could contain some special characters in its name that
-            # needs to be escaped.
-            sub_queries.append(
-                SQL(
-                    rf"""
-                    {unaccent("%s")} ~* ('^' || (
+    def _retrieve_partners_from_text(self):
+        line_ids = []
+        texts = []
+        company_ids = []
+        words = set()
+        for line in self:
+            for text_value in line._get_st_line_strings_for_matching():
+                if text_value:
+                    line_ids.append(line.id)
+                    texts.append(text_value)
+                    company_ids.append(line.company_id.id)
+                    words.update(word.lower() for word in WORD_RE.findall(text_value))
+        if not words:
+            return {}
+
+        # Find the partners having all the words of their name inside one of
+        # the statement line values, and some journal items in its company.
+        # Only the partners whose name contains one of the words of the texts
+        # can match, so the name regexes are built for those candidates only.
+        word_patterns = ["%" + word.replace("_", "\\_") + "%" for word in words]
+        unaccent = self.env.registry.unaccent
+        self.env["res.partner"].flush_model(["company_id", "name", "active"])
+        self.env["account.move.line"].flush_model(["partner_id", "company_id"])
+        self._cr.execute(
+            rf"""
+            WITH st_text AS (
+                SELECT *
+                FROM unnest(%s::int[], %s::varchar[], %s::int[])
+                    AS st_text(line_id, text, company_id)
+            ),
+            partner_regex AS MATERIALIZED (
+                SELECT
+                    partner.id,
+                    '^' || (
                         SELECT STRING_AGG(CONCAT('(?=.*\m', chunk[1], '\M)'), '')
-                        FROM regexp_matches({unaccent('partner.name')}, '\w{{3,}}', 'g')
+                        FROM regexp_matches({unaccent("partner.name")}, '\w{{3,}}', 'g')
                         AS chunk
-                    ))
-                    """,
-                    text_value,
-                )
+                    ) AS regex
+                FROM res_partner partner
+                WHERE partner.name IS NOT NULL
+                    AND partner.active
+                    AND {unaccent("partner.name")} ILIKE ANY (
+                        SELECT {unaccent("pattern")}
+                        FROM unnest(%s::varchar[]) AS pattern
+                    )
             )
-            params.append(text_value)
-
-        if sub_queries:
-            self.env["res.partner"].flush_model(["company_id", "name"])
-            self.env["account.move.line"].flush_model(["partner_id", "company_id"])
-            query = SQL("""
-                SELECT aml.partner_id
+            SELECT DISTINCT ON (st_text.line_id) st_text.line_id, partner_regex.id
+            FROM st_text
+            JOIN partner_regex
+                ON {unaccent("st_text.text")} ~* partner_regex.regex
+            WHERE EXISTS (
+                SELECT 1
                 FROM account_move_line aml
-                JOIN res_partner partner ON
-                    aml.partner_id = partner.id
-                    AND partner.name IS NOT NULL
-                    AND partner.active
-                    AND ((
-            """)
-            query_parts = SQL(") OR (").join(sub_queries)
-            final_query = SQL(
-                """
-                %s
-                    %s
-                ))
-                WHERE aml.company_id = %s
-                LIMIT 1
-            """,
-                query,
-                query_parts,
-                self.company_id.id,
+                WHERE aml.partner_id = partner_regex.id
+                    AND aml.company_id = st_text.company_id
             )
-            self._cr.execute(final_query)
-            row = self._cr.fetchone()
-            if row:
-                return self.env["res.partner"].browse(row[0])
-
-        return self.env["res.partner"]
+            ORDER BY st_text.line_id
+            """,  # noqa: E501
+            [line_ids, texts, company_ids, word_patterns],
+        )
+        return {
+            line_id: self.env["res.partner"].browse(partner_id)
+            for line_id, partner_id in self._cr.fetchall()
+        }
 
     def _get_st_line_strings_for_matching(self, allowed_fields=None):
         """Collect the strings that could be used on the statement line to perform some
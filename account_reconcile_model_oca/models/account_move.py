@@ -0,0 +1,50 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class AccountMove(models.Model):
+    _inherit = "account.move"
+
+    def write(self, vals):
+        res = super().write(vals)
+        # Posting, reset to draft and cancel all go through write("state").
+        if {"state", "name", "ref"} & set(vals):
+            self.env["account.move.line.match.token"]._sync_lines(self.line_ids.ids)
+        return res
+
+
+class AccountMoveLine(models.Model):
+    _inherit = "account.move.line"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        posted = lines.filtered(lambda line: line.parent_state == "posted")
+        if posted:
+            self.env["account.move.line.match.token"]._sync_lines(posted.ids)
+        return lines
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"name", "account_id"} & set(vals):
+            self.env["account.move.line.match.token"]._sync_lines(self.ids)
+        return res
+
+
+class AccountPartialReconcile(models.Model):
+    _inherit = "account.partial.reconcile"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super().create(vals_list)
+        self.env["account.move.line.match.token"]._sync_lines(
+            (partials.debit_move_id | partials.credit_move_id).ids
+        )
+        return partials
+
+    def unlink(self):
+        lines = self.debit_move_id | self.credit_move_id
+        res = super().unlink()
+        self.env["account.move.line.match.token"]._sync_lines(lines.exists().ids)
+        return res
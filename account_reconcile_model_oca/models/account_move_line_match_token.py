@@ -0,0 +1,96 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+
+class AccountMoveLineMatchToken(models.Model):
+    """Inverted token index over open reconcilable journal items.
+
+    One row per (line, text field, token kind, token), with the same tokens the
+    invoice matching rule extracts on the fly: the numeric tokens (digits and
+    whitespace kept, split on whitespace) and the exact value of the line label,
+    the move name and the move reference. Candidate lookup for a statement line
+    is then an equality join on ``token`` instead of tokenizing every open item.
+
+    Rows are kept for posted, not yet reconciled lines of reconcilable accounts
+    only; they are resynchronized on posting, reset to draft / cancel, label and
+    reference changes and on reconciliation / unreconciliation.
+    """
+
+    _name = "account.move.line.match.token"
+    _description = "Journal Item Matching Token"
+    _log_access = False
+
+    line_id = fields.Many2one(
+        "account.move.line", required=True, index=True, ondelete="cascade"
+    )
+    field = fields.Selection(
+        [("name", "Label"), ("move_name", "Move Name"), ("ref", "Reference")],
+        required=True,
+    )
+    kind = fields.Selection(
+        [("numeric", "Numeric"), ("exact", "Exact")], required=True
+    )
+    token = fields.Char(required=True, index=True)
+
+    def init(self):
+        self.env.cr.execute(f"SELECT 1 FROM {self._table} LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._sync_lines()
+
+    @api.model
+    def _sync_lines(self, line_ids=None):
+        """Rebuild the tokens of ``line_ids`` (or of every line when None)."""
+        if line_ids is not None:
+            line_ids = list(line_ids)
+            if not line_ids:
+                return
+        self.env["account.move"].flush_model(["name", "ref", "state"])
+        self.env["account.move.line"].flush_model(
+            ["name", "move_id", "parent_state", "reconciled", "account_id"]
+        )
+        cr = self.env.cr
+        if line_ids is None:
+            cr.execute(f"TRUNCATE {self._table}")
+            line_filter = ""
+        else:
+            cr.execute(
+                f"DELETE FROM {self._table} WHERE line_id = ANY(%s)", (line_ids,)
+            )
+            line_filter = "AND aml.id = ANY(%(line_ids)s)"
+        cr.execute(
+            rf"""
+            WITH src AS (
+                SELECT aml.id AS line_id, v.field, v.value
+                FROM account_move_line aml
+                JOIN account_move am ON am.id = aml.move_id
+                JOIN account_account acc ON acc.id = aml.account_id AND acc.reconcile
+                CROSS JOIN LATERAL (
+                    VALUES ('name', aml.name), ('move_name', am.name), ('ref', am.ref)
+                ) AS v(field, value)
+                WHERE aml.parent_state = 'posted'
+                  AND NOT COALESCE(aml.reconciled, FALSE)
+                  AND COALESCE(v.value, '') != ''
+                  {line_filter}
+            )
+            INSERT INTO {self._table} (line_id, field, kind, token)
+            SELECT src.line_id, src.field, 'numeric', tok.token
+            FROM src
+            CROSS JOIN LATERAL UNNEST(
+                REGEXP_SPLIT_TO_ARRAY(
+                    SUBSTRING(
+                        REGEXP_REPLACE(src.value, '[^0-9\s]', '', 'g'),
+                        '\S(?:.*\S)*'
+                    ),
+                    '\s+'
+                )
+            ) AS tok(token)
+            UNION ALL
+            SELECT src.line_id, src.field, 'exact', src.value
+            FROM src
+            -- Keep btree entries bounded; longer labels are never a single
+            -- statement token anyway.
+            WHERE LENGTH(src.value) <= 512
+            """,
+            {"line_ids": line_ids},
+        )
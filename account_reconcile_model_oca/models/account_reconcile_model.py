@@ -4,6 +4,9 @@ from collections import defaultdict
 from dateutil.relativedelta import relativedelta
 
 from odoo import Command, api, fields, models, tools
+from odoo.tools import groupby
+
+TOKEN_CLEANUP_RE = re.compile(r"[^0-9a-zA-Z\s]")
 
 
 class AccountReconcileModel(models.Model):
@@ -20,6 +23,85 @@ class AccountReconcileModel(models.Model):
         if self.trigger != "invoice_matching":
             self.unique_matching = False
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return res
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    ####################################################
+    # RULE PLAN
+    ####################################################
+
+    @api.model
+    @tools.ormcache("company_id", "journal_id", "triggers")
+    def _get_rule_plan(self, company_id, journal_id, triggers):
+        """Ids of the models of ``triggers`` usable on the statement lines of
+        ``journal_id``, in application order. Cached in the registry until a
+        reconciliation model is created, written or deleted."""
+        models = self.sudo().with_context(active_test=True).search(
+            [
+                ("trigger", "in", list(triggers)),
+                ("company_id", "=", company_id),
+                "|",
+                ("match_journal_ids", "=", False),
+                ("match_journal_ids", "in", journal_id),
+            ]
+        )
+        return tuple(models.sorted().ids)
+
+    @api.model
+    def _get_rule_models(self, journal, triggers):
+        return self.browse(
+            self._get_rule_plan(journal.company_id.id, journal.id, tuple(triggers))
+        )
+
+    @tools.ormcache("self.id")
+    def _get_compiled_rule(self):
+        """Plain values of the applicability criteria of the model, with the
+        label/note/transaction type terms lowered and their regex compiled,
+        as used by ``_is_applicable_for``."""
+        self.ensure_one()
+        text_criteria = []
+        for rule_field, record_field in [
+            ("label", "payment_ref"),
+            ("note", "narration"),
+            ("transaction_type", "transaction_type"),
+        ]:
+            operator = self["match_" + rule_field]
+            if not operator:
+                continue
+            rule_term = (self["match_" + rule_field + "_param"] or "").lower()
+            text_criteria.append(
+                (
+                    record_field,
+                    operator,
+                    rule_term,
+                    re.compile(rule_term) if operator == "match_regex" else None,
+                )
+            )
+        return {
+            "journal_ids": frozenset(self.match_journal_ids.ids),
+            "match_nature": self.match_nature,
+            "match_amount": self.match_amount,
+            "match_amount_min": self.match_amount_min,
+            "match_amount_max": self.match_amount_max,
+            "match_partner": self.match_partner,
+            "partner_ids": frozenset(self.match_partner_ids.ids),
+            "partner_category_ids": frozenset(self.match_partner_category_ids.ids),
+            "text_criteria": tuple(text_criteria),
+        }
+
     ####################################################
     # RECONCILIATION PROCESS
     ####################################################
@@ -204,70 +286,127 @@ class AccountReconcileModel(models.Model):
                 return {
                     "model": rec_model,
                     "status": "write_off",
-                    "auto_reconcile": rec_model.trigger == "auto_reconcile",
+                    "auto_reconcile": rec_model.auto_reconcile,
                 }
         return {}
 
+    def _apply_rules_batch(self, st_lines, partners):
+        """Same as ``_apply_rules`` for a set of statement lines.
+
+        The invoice matching candidates of every line a rule applies to are
+        fetched together, and a journal item kept for one line is not
+        proposed to another line of the same batch.
+
+        :param st_lines: account.bank.statement.line recordset.
+        :param partners: {st_line id: res.partner} as returned by
+            ``_retrieve_partner``.
+        :return: {st_line id: result of ``_apply_rules``}, lines without a
+            result are left out.
+        """
+        results = {}
+        allocated_aml_ids = set()
+        remaining = st_lines
+        available_models = self.filtered(
+            lambda m: m.trigger != "manual"
+        ).sorted()
+
+        for rec_model in available_models:
+            applicable = remaining.filtered(
+                lambda st_line, rec_model=rec_model: rec_model._is_applicable_for(
+                    st_line, partners[st_line.id]
+                )
+            )
+            if not applicable:
+                continue
+
+            if rec_model.trigger == "invoice_matching":
+                candidates = rec_model._get_invoice_matching_candidates_batch(
+                    applicable, partners
+                )
+                for st_line in applicable:
+                    partner = partners[st_line.id]
+                    for candidate_vals in candidates.get(st_line.id, []):
+                        if not candidate_vals.get("amls"):
+                            results[st_line.id] = {
+                                **candidate_vals,
+                                "model": rec_model,
+                            }
+                            break
+                        amls = candidate_vals["amls"].filtered(
+                            lambda aml: aml.id not in allocated_aml_ids
+                        )
+                        if not amls:
+                            continue
+                        res = rec_model._get_invoice_matching_amls_result(
+                            st_line, partner, {**candidate_vals, "amls": amls}
+                        )
+                        if res:
+                            allocated_aml_ids.update(res["amls"].ids)
+                            results[st_line.id] = {
+                                **res,
+                                "model": rec_model,
+                            }
+                            break
+
+            elif rec_model.trigger == "writeoff_suggestion":
+                for st_line in applicable:
+                    results[st_line.id] = {
+                        "model": rec_model,
+                        "status": "write_off",
+                        "auto_reconcile": rec_model.auto_reconcile,
+                    }
+
+            remaining = remaining.filtered(lambda st_line: st_line.id not in results)
+            if not remaining:
+                break
+        return results
+
     def _is_applicable_for(self, st_line, partner):
         self.ensure_one()
+        rule = self._get_compiled_rule()
+        amount = abs(st_line.amount)
 
         if (
             (
-                self.match_journal_ids
-                and st_line.move_id.journal_id not in self.match_journal_ids
+                rule["journal_ids"]
+                and st_line.move_id.journal_id.id not in rule["journal_ids"]
             )
-            or (self.match_nature == "amount_received" and st_line.amount < 0)
-            or (self.match_nature == "amount_paid" and st_line.amount > 0)
+            or (rule["match_nature"] == "amount_received" and st_line.amount < 0)
+            or (rule["match_nature"] == "amount_paid" and st_line.amount > 0)
+            or (rule["match_amount"] == "lower" and amount >= rule["match_amount_max"])
             or (
-                self.match_amount == "lower"
-                and abs(st_line.amount) >= self.match_amount_max
+                rule["match_amount"] == "greater"
+                and amount <= rule["match_amount_min"]
             )
             or (
-                self.match_amount == "greater"
-                and abs(st_line.amount) <= self.match_amount_min
-            )
-            or (
-                self.match_amount == "between"
+                rule["match_amount"] == "between"
                 and (
-                    abs(st_line.amount) > self.match_amount_max
-                    or abs(st_line.amount) < self.match_amount_min
+                    amount > rule["match_amount_max"]
+                    or amount < rule["match_amount_min"]
                 )
             )
-            or (self.match_partner and not partner)
+            or (rule["match_partner"] and not partner)
             or (
-                self.match_partner
-                and self.match_partner_ids
-                and partner not in self.match_partner_ids
+                rule["match_partner"]
+                and rule["partner_ids"]
+                and partner.id not in rule["partner_ids"]
             )
             or (
-                self.match_partner
-                and self.match_partner_category_ids
-                and not (partner.category_id & self.match_partner_category_ids)
+                rule["match_partner"]
+                and rule["partner_category_ids"]
+                and rule["partner_category_ids"].isdisjoint(partner.category_id.ids)
             )
         ):
             return False
 
-        for record, rule_field, record_field in [
-            (st_line, "label", "payment_ref"),
-            (st_line.move_id, "note", "narration"),
-            (st_line, "transaction_type", "transaction_type"),
-        ]:
-            rule_term = (self["match_" + rule_field + "_param"] or "").lower()
+        for record_field, operator, rule_term, regex in rule["text_criteria"]:
+            record = st_line.move_id if record_field == "narration" else st_line
             record_term = (record[record_field] or "").lower()
 
             if (
-                (
-                    self["match_" + rule_field] == "contains"
-                    and rule_term not in record_term
-                )
-                or (
-                    self["match_" + rule_field] == "not_contains"
-                    and rule_term in record_term
-                )
-                or (
-                    self["match_" + rule_field] == "match_regex"
-                    and not re.match(rule_term, record_term)
-                )
+                (operator == "contains" and rule_term not in record_term)
+                or (operator == "not_contains" and rule_term in record_term)
+                or (operator == "match_regex" and not regex.match(record_term))
             ):
                 return False
 
@@ -315,7 +454,7 @@ class AccountReconcileModel(models.Model):
         text_tokens = []
         for text_value in st_line_text_values:
             tokens = [
-                "".join(x for x in token if re.match(r"[0-9a-zA-Z\s]", x))
+                TOKEN_CLEANUP_RE.sub("", token)
                 for token in (text_value or "").split()
             ]
 
@@ -354,97 +493,55 @@ class AccountReconcileModel(models.Model):
         from_clause = from_string
         where_clause = where_string
 
-        sub_queries = []
-        all_params = []
-        aml_cte = ""
         (
             numerical_tokens,
             exact_tokens,
             _text_tokens,
         ) = self._get_invoice_matching_st_line_tokens(st_line)
-        if numerical_tokens or exact_tokens:
-            aml_cte = rf"""
-                WITH aml_cte AS (
-                    SELECT
-                        account_move_line.id as account_move_line_id,
-                        account_move_line.date as account_move_line_date,
-                        account_move_line.date_maturity as account_move_line_date_maturity,
-                        account_move_line.name as account_move_line_name,
-                        account_move_line__move_id.name as account_move_line__move_id_name,
-                        account_move_line__move_id.ref as account_move_line__move_id_ref
-                    FROM {from_clause}
-                    JOIN account_move account_move_line__move_id
-                        ON account_move_line__move_id.id = account_move_line.move_id
-                    WHERE {where_clause}
-                )
-            """  # noqa: E501
-            all_params += where_params
 
-        enabled_matches = []
+        enabled_fields = []
         if self.match_text_location_label:
-            enabled_matches.append(("account_move_line", "name"))
+            enabled_fields.append("name")
         if self.match_text_location_note:
-            enabled_matches.append(("account_move_line__move_id", "name"))
+            enabled_fields.append("move_name")
         if self.match_text_location_reference:
-            enabled_matches.append(("account_move_line__move_id", "ref"))
+            enabled_fields.append("ref")
 
+        enabled_kinds = []
         if numerical_tokens:
-            for table_alias, field in enabled_matches:
-                sub_queries.append(
-                    rf"""
-                    SELECT
-                        account_move_line_id as id,
-                        account_move_line_date as date,
-                        account_move_line_date_maturity as date_maturity,
-                        UNNEST(
-                            REGEXP_SPLIT_TO_ARRAY(
-                                SUBSTRING(
-                                    REGEXP_REPLACE(
-                                        {table_alias}_{field}, '[^0-9\s]', '', 'g'
-                                    ),
-                                    '\S(?:.*\S)*'
-                                ),
-                                '\s+'
-                            )
-                        ) AS token
-                    FROM aml_cte
-                    WHERE {table_alias}_{field} IS NOT NULL
-                """
-                )
-
+            enabled_kinds.append("numeric")
         if exact_tokens:
-            for table_alias, field in enabled_matches:
-                sub_queries.append(
-                    rf"""
-                    SELECT
-                        account_move_line_id as id,
-                        account_move_line_date as date,
-                        account_move_line_date_maturity as date_maturity,
-                        {table_alias}_{field} AS token
-                    FROM aml_cte
-                    WHERE COALESCE({table_alias}_{field}, '') != ''
-                """
-                )
+            enabled_kinds.append("exact")
 
-        if sub_queries:
-            order_by = get_order_by_clause(alias="sub")
+        if enabled_fields and enabled_kinds:
+            # Indexed equality join on the token index instead of tokenizing
+            # every open journal item (see account.move.line.match.token).
+            order_by = get_order_by_clause(alias="account_move_line")
+            token_table = self.env["account.move.line.match.token"]._table
             self._cr.execute(
-                aml_cte
-                + """
+                f"""
                     SELECT
-                        sub.id,
+                        account_move_line.id,
                         COUNT(*) AS nb_match
-                    FROM ("""
-                + " UNION ALL ".join(sub_queries)
-                + """) AS sub
-                    WHERE sub.token IN %s
-                    GROUP BY sub.date_maturity, sub.date, sub.id
-                    HAVING COUNT(*) > 0
-                    ORDER BY nb_match DESC, """
-                + order_by
-                + """
-                """,
-                all_params + [tuple(numerical_tokens + exact_tokens)],
+                    FROM {from_clause}
+                    JOIN {token_table} match_token
+                        ON match_token.line_id = account_move_line.id
+                    WHERE {where_clause}
+                        AND match_token.token IN %s
+                        AND match_token.field IN %s
+                        AND match_token.kind IN %s
+                    GROUP BY
+                        account_move_line.date_maturity,
+                        account_move_line.date,
+                        account_move_line.id
+                    ORDER BY nb_match DESC, {order_by}
+                """,  # noqa: E501
+                where_params
+                + [
+                    tuple(numerical_tokens + exact_tokens),
+                    tuple(enabled_fields),
+                    tuple(enabled_kinds),
+                ],
             )
             candidate_ids = [r[0] for r in self._cr.fetchall()]
             if candidate_ids and (
@@ -507,6 +604,256 @@ class AccountReconcileModel(models.Model):
                 "amls": amls,
             }
 
+    def _get_invoice_matching_candidates_batch(self, st_lines, partners):
+        """Run the invoice matching rules map on a set of statement lines.
+
+        The default candidates method is evaluated with
+        ``_get_invoice_matching_amls_candidates_batch``, other methods
+        registered in the map are called line by line.
+
+        :return: {st_line id: [candidate values in rules map order]}
+        """
+        self.ensure_one()
+        candidates = defaultdict(list)
+        rules_map = self._get_invoice_matching_rules_map()
+        for rule_index in sorted(rules_map.keys()):
+            for rule_method in rules_map[rule_index]:
+                if rule_method == self._get_invoice_matching_amls_candidates:
+                    values_by_line = self._get_invoice_matching_amls_candidates_batch(
+                        st_lines, partners
+                    )
+                else:
+                    values_by_line = {
+                        st_line.id: rule_method(st_line, partners[st_line.id])
+                        for st_line in st_lines
+                    }
+                for st_line_id, candidate_vals in values_by_line.items():
+                    if candidate_vals:
+                        candidates[st_line_id].append(candidate_vals)
+        return candidates
+
+    def _get_invoice_matching_amls_batch_domain(self, st_line):
+        """Part of ``_get_invoice_matching_amls_domain`` that is the same for
+        every statement line of the company of ``st_line``. The conditions
+        depending on the line itself (sign, currency, partner, own entry) are
+        applied in SQL by ``_get_invoice_matching_amls_candidates_batch``.
+        """
+        aml_domain = [
+            leaf
+            for leaf in st_line._get_default_amls_matching_domain()
+            if not (isinstance(leaf, list | tuple) and leaf[0] == "statement_line_id")
+        ]
+        if self.past_months_limit:
+            date_limit = fields.Date.context_today(self) - relativedelta(
+                months=self.past_months_limit
+            )
+            aml_domain.append(("date", ">=", fields.Date.to_string(date_limit)))
+        return aml_domain
+
+    def _get_invoice_matching_amls_candidates_batch(self, st_lines, partners):
+        """Same as ``_get_invoice_matching_amls_candidates`` for a set of
+        statement lines: one token query and one amount/partner query per
+        company instead of one or two queries per line.
+
+        :return: {st_line id: candidate values or None}
+        """
+
+        def get_order_by_clause(alias):
+            return (
+                f"{alias}.date_maturity DESC, {alias}.date DESC, {alias}.id DESC"
+            )
+
+        assert self.trigger == "invoice_matching"
+        self.env["account.move"].flush_model()
+        self.env["account.move.line"].flush_model()
+
+        enabled_fields = []
+        if self.match_text_location_label:
+            enabled_fields.append("name")
+        if self.match_text_location_note:
+            enabled_fields.append("move_name")
+        if self.match_text_location_reference:
+            enabled_fields.append("ref")
+
+        candidate_ids = defaultdict(list)
+        token_line_ids = set()
+        token_table = self.env["account.move.line.match.token"]._table
+        order_by = get_order_by_clause("account_move_line")
+        for company, company_lines in groupby(st_lines, key=lambda r: r.company_id):
+            aml_domain = self._get_invoice_matching_amls_batch_domain(company_lines[0])
+            query = self.env["account.move.line"]._where_calc(aml_domain)
+            from_clause, _from_params = query.from_clause
+            where_clause, where_params = query.where_clause
+
+            token_rows = []
+            tokens = []
+            amount_rows = []
+            for st_line in company_lines:
+                partner = partners[st_line.id]
+                currency = st_line.foreign_currency_id or st_line.currency_id
+                line_row = [
+                    st_line.id,
+                    partner.id or None,
+                    1 if st_line.amount > 0.0 else -1,
+                    currency.id if self.match_same_currency else None,
+                ]
+                (
+                    numerical_tokens,
+                    exact_tokens,
+                    _text_tokens,
+                ) = self._get_invoice_matching_st_line_tokens(st_line)
+                if enabled_fields and (numerical_tokens or exact_tokens):
+                    token_line_ids.add(st_line.id)
+                    token_rows.append(
+                        line_row + [bool(numerical_tokens), bool(exact_tokens)]
+                    )
+                    tokens += [
+                        (st_line.id, token)
+                        for token in numerical_tokens + exact_tokens
+                    ]
+                    continue
+
+                st_line_currency = (
+                    st_line.foreign_currency_id
+                    or st_line.journal_id.currency_id
+                    or st_line.company_currency_id
+                )
+                amount_rows.append(
+                    line_row
+                    + [
+                        st_line_currency.id,
+                        st_line_currency == self.company_id.currency_id,
+                        st_line_currency.decimal_places,
+                        -st_line.amount_residual,
+                    ]
+                )
+
+            if token_rows:
+                self._cr.execute(
+                    f"""
+                        WITH st_line AS (
+                            SELECT *
+                            FROM unnest(
+                                %s::int[], %s::int[], %s::int[], %s::int[],
+                                %s::bool[], %s::bool[]
+                            ) AS st_line(
+                                id, partner_id, sign, currency_id,
+                                has_numeric, has_exact
+                            )
+                        ),
+                        st_token AS (
+                            SELECT DISTINCT *
+                            FROM unnest(%s::int[], %s::varchar[])
+                                AS st_token(st_line_id, token)
+                        )
+                        SELECT
+                            st_line.id,
+                            account_move_line.id,
+                            COUNT(*) AS nb_match
+                        FROM {from_clause}
+                        JOIN {token_table} match_token
+                            ON match_token.line_id = account_move_line.id
+                        JOIN st_token
+                            ON st_token.token = match_token.token
+                        JOIN st_line
+                            ON st_line.id = st_token.st_line_id
+                        WHERE {where_clause}
+                            AND match_token.field IN %s
+                            AND (
+                                (match_token.kind = 'numeric' AND st_line.has_numeric)
+                                OR (match_token.kind = 'exact' AND st_line.has_exact)
+                            )
+                            AND SIGN(account_move_line.balance) = st_line.sign
+                            AND (
+                                st_line.currency_id IS NULL
+                                OR account_move_line.currency_id = st_line.currency_id
+                            )
+                            AND (
+                                st_line.partner_id IS NULL
+                                OR account_move_line.partner_id = st_line.partner_id
+                            )
+                            AND account_move_line.statement_line_id
+                                IS DISTINCT FROM st_line.id
+                        GROUP BY
+                            st_line.id,
+                            account_move_line.date_maturity,
+                            account_move_line.date,
+                            account_move_line.id
+                        ORDER BY st_line.id, nb_match DESC, {order_by}
+                    """,  # noqa: E501
+                    [list(column) for column in zip(*token_rows, strict=True)]
+                    + [list(column) for column in zip(*tokens, strict=True)]
+                    + where_params
+                    + [tuple(enabled_fields)],
+                )
+                for st_line_id, aml_id, _nb_match in self._cr.fetchall():
+                    candidate_ids[st_line_id].append(aml_id)
+
+            if amount_rows:
+                self._cr.execute(
+                    f"""
+                        WITH st_line AS (
+                            SELECT *
+                            FROM unnest(
+                                %s::int[], %s::int[], %s::int[], %s::int[],
+                                %s::int[], %s::bool[], %s::int[], %s::numeric[]
+                            ) AS st_line(
+                                id, partner_id, sign, currency_id,
+                                amount_currency_id, company_amount,
+                                decimal_places, amount
+                            )
+                        )
+                        SELECT st_line.id, account_move_line.id
+                        FROM {from_clause}
+                        JOIN st_line
+                            ON SIGN(account_move_line.balance) = st_line.sign
+                        WHERE {where_clause}
+                            AND (
+                                st_line.currency_id IS NULL
+                                OR account_move_line.currency_id = st_line.currency_id
+                            )
+                            AND account_move_line.statement_line_id
+                                IS DISTINCT FROM st_line.id
+                            AND (
+                                account_move_line.partner_id = st_line.partner_id
+                                OR (
+                                    st_line.partner_id IS NULL
+                                    AND account_move_line.currency_id
+                                        = st_line.amount_currency_id
+                                    AND ROUND(
+                                        CASE WHEN st_line.company_amount
+                                            THEN account_move_line.amount_residual
+                                            ELSE account_move_line.amount_residual_currency
+                                        END,
+                                        st_line.decimal_places
+                                    ) = ROUND(st_line.amount, st_line.decimal_places)
+                                )
+                            )
+                        ORDER BY st_line.id, {order_by}
+                    """,  # noqa: E501
+                    [list(column) for column in zip(*amount_rows, strict=True)]
+                    + where_params,
+                )
+                for st_line_id, aml_id in self._cr.fetchall():
+                    candidate_ids[st_line_id].append(aml_id)
+
+        # Browse every candidate in one prefetch set, the results are read
+        # line by line by _get_invoice_matching_amls_result.
+        all_aml_ids = [aml_id for ids in candidate_ids.values() for aml_id in ids]
+        results = {}
+        for st_line in st_lines:
+            aml_ids = candidate_ids.get(st_line.id)
+            if not aml_ids or (self.unique_matching and len(aml_ids) != 1):
+                results[st_line.id] = None
+                continue
+            results[st_line.id] = {
+                "allow_auto_reconcile": st_line.id in token_line_ids,
+                "amls": self.env["account.move.line"]
+                .browse(aml_ids)
+                .with_prefetch(all_aml_ids),
+            }
+        return results
+
     def _get_invoice_matching_rules_map(self):
         rules_map = defaultdict(list)
         rules_map[10].append(self._get_invoice_matching_amls_candidates)
@@ -552,7 +899,7 @@ class AccountReconcileModel(models.Model):
             if (
                 "allow_auto_reconcile" in status
                 and candidate_vals["allow_auto_reconcile"]
-                and self.trigger == "auto_reconcile"
+                and self.auto_reconcile
             ):
                 result["auto_reconcile"] = True
 
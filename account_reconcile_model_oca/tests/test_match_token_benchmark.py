@@ -0,0 +1,134 @@
+import logging
+import time
+
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+_logger = logging.getLogger(__name__)
+
+NB_OPEN_ITEMS = 100000
+NB_STATEMENT_LINES = 5000
+
+
+@tagged("post_install", "-at_install", "-standard", "benchmark")
+class TestMatchTokenBenchmark(AccountTestInvoicingCommon):
+    """Time the token-index candidate lookup of 5k statement lines against
+    100k open items. Not part of the standard run: use
+    ``--test-tags benchmark``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.bank_journal = cls.company_data["default_journal_bank"]
+        cls.rule = cls.env["account.reconcile.model"].create(
+            {
+                "name": "Benchmark matching",
+                "trigger": "invoice_matching",
+                "match_partner": False,
+                "match_same_currency": False,
+                "match_text_location_label": True,
+                "match_text_location_note": True,
+                "match_text_location_reference": True,
+                "company_id": cls.company_data["company"].id,
+            }
+        )
+        invoice = cls.init_invoice("out_invoice", amounts=[100.0], post=True)
+        term_line = invoice.line_ids.filtered(
+            lambda line: line.display_type == "payment_term"
+        )
+        cls.env.flush_all()
+        cls._clone_open_items(invoice.id, term_line.id, NB_OPEN_ITEMS)
+
+    @classmethod
+    def _clone_columns(cls, table):
+        cls.env.cr.execute(
+            """
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = 'public' AND table_name = %s AND column_name != 'id'
+            """,
+            (table,),
+        )
+        return [r[0] for r in cls.env.cr.fetchall()]
+
+    @classmethod
+    def _clone_open_items(cls, move_id, line_id, count):
+        """Clone the invoice and its receivable line ``count`` times in SQL,
+        naming them BENCH/000001..., then rebuild the token index."""
+        cr = cls.env.cr
+        move_cols = cls._clone_columns("account_move")
+        move_select = [
+            "'BENCH/' || LPAD(g::text, 6, '0')"
+            if col == "name"
+            else "'BREF' || LPAD(g::text, 6, '0')"
+            if col == "ref"
+            else col
+            for col in move_cols
+        ]
+        cr.execute(
+            f"""
+            INSERT INTO account_move ({", ".join(move_cols)})
+            SELECT {", ".join(move_select)}
+            FROM account_move, generate_series(1, %s) AS g
+            WHERE id = %s
+            """,
+            (count, move_id),
+        )
+        line_cols = cls._clone_columns("account_move_line")
+        line_select = [
+            "m.id"
+            if col == "move_id"
+            else "'BENCH ' || SUBSTRING(m.name FROM 7)"
+            if col == "name"
+            else f"l.{col}"
+            for col in line_cols
+        ]
+        cr.execute(
+            f"""
+            INSERT INTO account_move_line ({", ".join(line_cols)})
+            SELECT {", ".join(line_select)}
+            FROM account_move_line l
+            JOIN account_move m ON m.name LIKE 'BENCH/%%'
+            WHERE l.id = %s
+            """,
+            (line_id,),
+        )
+        start = time.time()
+        cls.env["account.move.line.match.token"]._sync_lines()
+        _logger.info(
+            "Token index built for %s open items in %.2fs", count, time.time() - start
+        )
+
+    def test_benchmark_candidates(self):
+        step = NB_OPEN_ITEMS // NB_STATEMENT_LINES
+        st_lines = self.env["account.bank.statement.line"].create(
+            [
+                {
+                    "journal_id": self.bank_journal.id,
+                    "amount": 100.0,
+                    "payment_ref": f"BENCH/{i:06d}",
+                }
+                for i in range(1, NB_OPEN_ITEMS + 1, step)
+            ]
+        )
+        self.env.flush_all()
+
+        start = time.time()
+        matched = 0
+        for st_line in st_lines:
+            res = self.rule._get_invoice_matching_amls_candidates(st_line, None)
+            if res and res["amls"][:1].move_id.name == st_line.payment_ref:
+                matched += 1
+        elapsed = time.time() - start
+
+        _logger.info(
+            "Matched %s/%s statement lines against %s open items in %.2fs "
+            "(%.2fms per line)",
+            matched,
+            len(st_lines),
+            NB_OPEN_ITEMS,
+            elapsed,
+            elapsed * 1000 / len(st_lines),
+        )
+        self.assertEqual(matched, len(st_lines))
@@ -1172,6 +1172,39 @@ class TestReconciliationMatchingRules(AccountTestInvoicingCommon):
         # Matching is back thanks to "coincoin".
         self.assertEqual(st_line._retrieve_partner(), self.partner_1)
 
+    def test_retrieve_partners(self):
+        self._create_reconcile_model(
+            partner_mapping_line_ids=[
+                {
+                    "partner_id": self.partner_1.id,
+                    "payment_ref_regex": "toto.*",
+                }
+            ],
+        )
+        self.env["res.partner.bank"].create(
+            {"acc_number": "BE68 5390 0754 7034", "partner_id": self.partner_2.id}
+        )
+        st_line_set = self._create_st_line(partner_id=self.partner_3.id)
+        st_line_mapping = self._create_st_line(partner_id=None, payment_ref="toto42")
+        st_line_bank = self._create_st_line(
+            partner_id=None, account_number="BE68539007547034"
+        )
+        st_line_name = self._create_st_line(partner_id=None, partner_name="partner_3")
+        st_line_none = self._create_st_line(partner_id=None, payment_ref="nothing")
+        st_lines = (
+            st_line_set + st_line_mapping + st_line_bank + st_line_name + st_line_none
+        )
+        self.assertDictEqual(
+            st_lines._retrieve_partners(),
+            {
+                st_line_set.id: self.partner_3,
+                st_line_mapping.id: self.partner_1,
+                st_line_bank.id: self.partner_2,
+                st_line_name.id: self.partner_3,
+                st_line_none.id: self.env["res.partner"],
+            },
+        )
+
     def test_match_multi_currencies(self):
         """Ensure the matching of candidates is made using the right statement line
         currency. In this test, the value of the statement line is 100 USD = 300
@@ -1671,6 +1704,44 @@ class TestReconciliationMatchingRules(AccountTestInvoicingCommon):
                 },
             )
 
+    @freeze_time("2020-01-01")
+    def test_apply_rules_batch(self):
+        """Statement lines evaluated together do not share counterparts."""
+        self.rule_1.match_text_location_label = False
+        st_lines = self.bank_line_1 + self.bank_line_2 + self.cash_line_1
+        partners = {st_line.id: st_line._retrieve_partner() for st_line in st_lines}
+        self.assertDictEqual(
+            self.rule_1._apply_rules_batch(st_lines, partners),
+            {
+                self.bank_line_1.id: {
+                    "amls": self.invoice_line_1,
+                    "model": self.rule_1,
+                },
+                self.bank_line_2.id: {
+                    "amls": self.invoice_line_2 + self.invoice_line_3,
+                    "model": self.rule_1,
+                },
+                self.cash_line_1.id: {
+                    "amls": self.invoice_line_4,
+                    "model": self.rule_1,
+                },
+            },
+        )
+
+    def test_rule_plan_invalidation(self):
+        triggers = ["invoice_matching", "writeoff_suggestion"]
+        Model = self.env["account.reconcile.model"]
+        models = Model._get_rule_models(self.bank_journal, triggers)
+        self.assertIn(self.rule_1, models)
+        self.rule_1.match_journal_ids = self.cash_journal
+        models = Model._get_rule_models(self.bank_journal, triggers)
+        self.assertNotIn(self.rule_1, models)
+        models = Model._get_rule_models(self.cash_journal, triggers)
+        self.assertIn(self.rule_1, models)
+        self.assertFalse(
+            self.rule_1._is_applicable_for(self.bank_line_1, self.partner_1)
+        )
+
     def test_regex_matching_simple(self):
         lines = self.rule_3._get_write_off_move_lines_dict(
             90.0,
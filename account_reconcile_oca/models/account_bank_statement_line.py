@@ -1438,6 +1438,7 @@ from dateutil.relativedelta import relativedelta
 # Copyright 2025 Jacques-Etienne Baudoux (BCIM) <je@bcim.be>
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import logging
 from collections import defaultdict
 
 from dateutil import rrule
@@ -1449,12 +1450,19 @@ from odoo.exceptions import UserError
 from odoo.tools import LazyTranslate, float_compare, float_is_zero, groupby
 
 _lt = LazyTranslate(__name__, default_lang="en_US")
+_logger = logging.getLogger(__name__)
 
 
 class AccountBankStatementLine(models.Model):
     _name = "account.bank.statement.line"
     _inherit = ["account.bank.statement.line", "account.reconcile.abstract"]
 
+    auto_reconcile_pending = fields.Boolean(
+        index=True,
+        copy=False,
+        readonly=True,
+        help="Waiting for the auto reconciliation cron.",
+    )
     reconcile_data_info = fields.Json(inverse="_inverse_reconcile_data_info")
     reconcile_mode = fields.Selection(
         selection=lambda self: self.env["account.journal"]
@@ -2285,15 +2293,8 @@ class AccountBankStatementLine(models.Model):
         if not from_unreconcile:
             res = (
                 self.env["account.reconcile.model"]
-                .search(
-                    [
-                        (
-                            "trigger",
-                            "in",
-                            ["invoice_matching", "writeoff_suggestion"],
-                        ),
-                        ("company_id", "=", self.company_id.id),
-                    ]
+                ._get_rule_models(
+                    self.journal_id, ["invoice_matching", "writeoff_suggestion"]
                 )
                 ._apply_rules(self, self._retrieve_partner())
             )
@@ -2429,7 +2430,7 @@ class AccountBankStatementLine(models.Model):
         self.reconcile_data = False
         return result
 
-    def _reconcile_bank_line_edit(self, data):
+    def _reconcile_bank_line_edit(self, data, batch=None):
         _liquidity_lines, suspense_lines, other_lines = self._seek_for_lines()
         lines_to_remove = [
             Command.delete(line.id) for line in suspense_lines + other_lines
@@ -2525,6 +2526,9 @@ class AccountBankStatementLine(models.Model):
                     pending_base = line_vals
             _flush_pending()
 
+        if batch is not None:
+            batch["plan"] += to_reconcile
+            return
         for reconcile_items in to_reconcile:
             reconcile_items.reconcile()
 
@@ -2533,7 +2537,7 @@ class AccountBankStatementLine(models.Model):
             "journal_id": self.journal_id.id,
         }
 
-    def _reconcile_bank_line_keep(self, data):
+    def _reconcile_bank_line_keep(self, data, batch=None):
         move = (
             self.env["account.move"]
             .with_context(skip_invoice_sync=True)
@@ -2592,6 +2596,10 @@ class AccountBankStatementLine(models.Model):
                             | line
                     )
             move.invalidate_recordset()
+        if batch is not None:
+            batch["moves"] |= move
+            batch["plan"] += list(to_reconcile.values())
+            return
         move._post()
         for _account, lines in to_reconcile.items():
             lines.reconcile()
@@ -2664,40 +2672,107 @@ class AccountBankStatementLine(models.Model):
                 "_test_account_reconcile_oca"
         ):
             return result
-        result._auto_reconcile()
+        sync_limit = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("account_reconcile_oca.auto_reconcile_sync_limit", 200)
+        )
+        if len(result) > sync_limit:
+            # Large imports are reconciled by the cron, in chunks
+            result._enqueue_auto_reconcile()
+        else:
+            result._auto_reconcile()
         return result
 
+    def _enqueue_auto_reconcile(self):
+        self.with_context(skip_account_move_synchronization=True).write(
+            {"auto_reconcile_pending": True}
+        )
+        self.env.ref("account_reconcile_oca.ir_cron_auto_reconcile")._trigger()
+
+    @api.model
+    def _cron_auto_reconcile(self):
+        """Auto reconcile the statement lines queued by ``create``, by chunks
+        of ``account_reconcile_oca.auto_reconcile_batch_size`` lines. Each
+        chunk is committed and reported as cron progress."""
+        batch_size = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("account_reconcile_oca.auto_reconcile_batch_size", 500)
+        )
+        domain = [("auto_reconcile_pending", "=", True)]
+        remaining = self.search_count(domain)
+        while lines := self.search(domain, limit=batch_size, order="id"):
+            try:
+                with self.env.cr.savepoint():
+                    lines._auto_reconcile()
+            except Exception:
+                # Leave the chunk to manual reconciliation rather than
+                # retrying it forever
+                _logger.exception(
+                    "Auto reconciliation failed for statement lines %s", lines.ids
+                )
+            lines.with_context(skip_account_move_synchronization=True).write(
+                {"auto_reconcile_pending": False}
+            )
+            # other transactions may have reconciled or deleted pending lines
+            remaining = max(remaining - len(lines), 0)
+            _logger.info(
+                "Auto reconciled %s statement lines, %s remaining",
+                len(lines),
+                remaining,
+            )
+            if not self.env["ir.cron"]._commit_progress(
+                len(lines), remaining=remaining
+            ):
+                break
+
     def _auto_reconcile(self):
         """Try to auto reconcile records that are not yet reconciled"""
         non_reconciled = self.filtered(lambda rec: not rec.is_reconciled)
         lines_by_journal = groupby(non_reconciled, key=lambda r: r.journal_id)
         for journal, ilines in lines_by_journal:
-            models = self.env["account.reconcile.model"].search(
-                [
-                    (
-                        "trigger",
-                        "in",
-                        ["invoice_matching", "writeoff_suggestion"],
-                    ),
-                    ("company_id", "in", journal.company_id.ids),
-                    ("trigger", "=", "auto_reconcile"),
-                    "|",
-                    ("match_journal_ids", "=", False),
-                    ("match_journal_ids", "in", journal.id),
-                ]
+            models = (
+                self.env["account.reconcile.model"]
+                ._get_rule_models(journal, ["invoice_matching", "writeoff_suggestion"])
+                .filtered("auto_reconcile")
             )
-            for record in ilines:
-                record._do_auto_reconcile(models)
+            self.browse([line.id for line in ilines])._do_auto_reconcile_batch(models)
 
     def _do_auto_reconcile(self, models):
         self.ensure_one()
-        if self.is_reconciled:
-            # In case the method is run asynchronously, the record could have
-            # been already reconciled
-            return
-        res = models._apply_rules(self, self._retrieve_partner())
-        if not res:
+        self._do_auto_reconcile_batch(models)
+
+    def _do_auto_reconcile_batch(self, models):
+        """Auto reconcile the lines of ``self`` with ``models``.
+
+        The rules are applied to all the lines at once (see
+        ``account.reconcile.model._apply_rules_batch``), then the entries of
+        the keep mode are posted and the counterparts reconciled in one go
+        once every line has been processed.
+        """
+        # In case the method is run asynchronously, some records could have
+        # been already reconciled
+        st_lines = self.filtered(lambda rec: not rec.is_reconciled)
+        if not st_lines or not models:
             return
+        partners = st_lines._retrieve_partners()
+        results = models._apply_rules_batch(st_lines, partners)
+        batch = {"moves": self.env["account.move"], "plan": []}
+        for st_line in st_lines:
+            res = results.get(st_line.id)
+            if not res:
+                continue
+            data = st_line._get_auto_reconcile_data(res)
+            if not data.get("can_reconcile"):
+                continue
+            getattr(
+                st_line, f"_reconcile_bank_line_{st_line.journal_id.reconcile_mode}"
+            )(st_line._prepare_reconcile_line_data(data["data"]), batch=batch)
+        self._reconcile_bank_line_batch_done(batch)
+
+    def _get_auto_reconcile_data(self, res):
+        self.ensure_one()
         liquidity_lines, suspense_lines, other_lines = self._seek_for_lines()
         data = []
         for line in liquidity_lines:
@@ -2709,7 +2784,7 @@ class AccountBankStatementLine(models.Model):
             data += lines
         reconcile_auxiliary_id = 1
         if res.get("status", "") == "write_off":
-            data = self._recompute_suspense_line(
+            return self._recompute_suspense_line(
                 *self._reconcile_data_by_model(
                     data, res["model"], reconcile_auxiliary_id
                 ),
@@ -2723,16 +2798,20 @@ class AccountBankStatementLine(models.Model):
                 )
                 amount -= sum(line_data.get("amount") for line_data in line_datas)
                 data += line_datas
-            data = self._recompute_suspense_line(
+            return self._recompute_suspense_line(
                 data,
                 reconcile_auxiliary_id,
                 self.manual_reference,
             )
-        if not data.get("can_reconcile"):
-            return
-        getattr(self, f"_reconcile_bank_line_{self.journal_id.reconcile_mode}")(
-            self._prepare_reconcile_line_data(data["data"])
-        )
+        return {}
+
+    @api.model
+    def _reconcile_bank_line_batch_done(self, batch):
+        """Post the entries and reconcile the journal items collected by the
+        ``_reconcile_bank_line_*`` methods called with ``batch``."""
+        batch["moves"]._post()
+        if batch["plan"]:
+            self.env["account.move.line"]._reconcile_plan(batch["plan"])
 
     def _synchronize_to_moves(self, changed_fields):
         """We want to avoid to change stuff (mainly amounts ) in accounting entries
@@ -3054,4 +3133,9 @@ class AccountBankStatementLine(models.Model):
             # With large databases, we already have the information, moreover,
             # the data might be preloaded, so it has no sense to import it again
             return self.partner_id
-        return super()._retrieve_partner()
\ No newline at end of file
+        return super()._retrieve_partner()
+
+    def _retrieve_partners(self):
+        if self.env.context.get("skip_retrieve_partner"):
+            return {st_line.id: st_line.partner_id for st_line in self}
+        return super()._retrieve_partners()
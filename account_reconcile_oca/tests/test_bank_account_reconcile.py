@@ -641,6 +641,56 @@ class TestReconciliationWidget(TestAccountReconciliationCommon):
         )
         self.assertTrue(bank_stmt_line.is_reconciled)
 
+    @mute_logger("odoo.models.unlink")
+    def test_reconcile_invoice_matching_auto_reconcile_on_import(self):
+        """
+        Statement lines imported together are reconciled with their invoices
+        by an invoice matching model flagged auto_reconcile
+        """
+        self.env["account.reconcile.model"].create(
+            {
+                "name": "auto invoice matching",
+                "trigger": "invoice_matching",
+                "auto_reconcile": True,
+                "match_partner": True,
+                "match_text_location_label": True,
+                "payment_tolerance_param": 0.0,
+            }
+        )
+        invoices = self.env["account.move"]
+        for amount in (100, 200, 300):
+            partner = self.env["res.partner"].create(
+                {"name": f"Auto reconcile partner {amount}"}
+            )
+            invoices |= self.create_invoice_partner(
+                currency_id=self.currency_euro_id,
+                invoice_amount=amount,
+                partner_id=partner.id,
+            )
+        bank_stmt = self.acc_bank_stmt_model.create(
+            {
+                "journal_id": self.bank_journal_euro.id,
+                "date": time.strftime("%Y-07-15"),
+                "name": "test",
+            }
+        )
+        bank_stmt_lines = self.acc_bank_stmt_line_model.create(
+            [
+                {
+                    "name": invoice.name,
+                    "payment_ref": invoice.name,
+                    "partner_id": invoice.partner_id.id,
+                    "journal_id": self.bank_journal_euro.id,
+                    "statement_id": bank_stmt.id,
+                    "amount": invoice.amount_total,
+                    "date": time.strftime("%Y-07-15"),
+                }
+                for invoice in invoices
+            ]
+        )
+        self.assertTrue(all(bank_stmt_lines.mapped("is_reconciled")))
+        self.assertFalse(any(invoices.mapped("amount_residual")))
+
     @mute_logger("odoo.models.unlink")
     def test_reconcile_invoice_keep(self):
         """
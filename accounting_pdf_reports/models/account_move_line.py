@@ -2,10 +2,132 @@ import ast
 from odoo.osv import expression
 from odoo import api, models, fields
 
+# Groupings accepted by _read_analytic_balances
+ANALYTIC_BALANCE_GROUPBY = {
+    'account_id': 'account_move_line.account_id',
+    'partner_id': 'account_move_line.partner_id',
+    'journal_id': 'account_move_line.journal_id',
+    'period': "date_trunc('month', account_move_line.date)::date",
+}
+
 
 class AccountMoveLine(models.Model):
     _inherit = "account.move.line"
 
+    def init(self):
+        super().init()
+        # Analytic account ids of a distribution, keys of several plans
+        # ("1,2") included, as an immutable function so it can be indexed.
+        self.env.cr.execute("""
+            CREATE OR REPLACE FUNCTION analytic_distribution_ids(jsonb)
+            RETURNS int[] LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+                SELECT ARRAY(
+                    SELECT DISTINCT unnest(string_to_array(dist.key, ','))::int
+                    FROM jsonb_object_keys(
+                        CASE WHEN jsonb_typeof($1) = 'object' THEN $1 ELSE '{}' END
+                    ) AS dist(key)
+                )
+            $$
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS account_move_line_analytic_ids_gin_index
+                ON account_move_line USING gin (analytic_distribution_ids(analytic_distribution))
+        """)
+
+    @api.model
+    def _get_analytic_ids(self, analytic_ids=None):
+        """ Analytic account ids given as a recordset, a list of ids, or taken
+        from ``analytic_account_ids`` in the context when None. """
+        if analytic_ids is None:
+            analytic_ids = self.env.context.get('analytic_account_ids')
+        if not analytic_ids:
+            return []
+        return [int(analytic_id) for analytic_id in getattr(analytic_ids, 'ids', analytic_ids)]
+
+    @api.model
+    def _analytic_filter_sql(self, analytic_ids, alias='account_move_line', include_unassigned=False):
+        """ WHERE condition keeping the lines distributed on one of
+        ``analytic_ids``, served by the GIN index on analytic_distribution_ids.
+
+        :returns: (sql, params)
+        """
+        condition = 'analytic_distribution_ids("%s"."analytic_distribution") && %%s::int[]' % alias
+        if include_unassigned:
+            condition = '(%s OR "%s"."analytic_distribution" IS NULL)' % (condition, alias)
+        return condition, [self._get_analytic_ids(analytic_ids)]
+
+    @api.model
+    def _analytic_weight_sql(self, analytic_ids, alias='account_move_line', include_unassigned=False):
+        """ Lateral join exposing ``analytic_weight.weight``, the share of a
+        line attributed to ``analytic_ids``: the sum of their percentages in
+        analytic_distribution, capped at 100%. Lines without distribution
+        weigh 1 with ``include_unassigned``, 0 otherwise. Every line weighs 1
+        when no analytic account is given.
+
+        :returns: (sql, params)
+        """
+        analytic_ids = self._get_analytic_ids(analytic_ids)
+        if not analytic_ids:
+            return "CROSS JOIN LATERAL (SELECT 1.0 AS weight) AS analytic_weight", []
+        weight = "LEAST(COALESCE(SUM(dist.value::numeric), 0), 100) / 100"
+        if include_unassigned:
+            weight = 'CASE WHEN "%s"."analytic_distribution" IS NULL THEN 1.0 ELSE %s END' % (alias, weight)
+        return """
+            CROSS JOIN LATERAL (
+                SELECT %s AS weight
+                FROM jsonb_each_text("%s"."analytic_distribution") AS dist
+                WHERE string_to_array(dist.key, ',')::int[] && %%s::int[]
+            ) AS analytic_weight
+        """ % (weight, alias), [analytic_ids]
+
+    @api.model
+    def _read_analytic_balances(self, groupby=('account_id',), domain=None):
+        """ Debit, credit and balance of the lines selected by ``_query_get``
+        (same context keys), weighted by the share of the context's
+        ``analytic_account_ids`` in their analytic_distribution.
+
+        :param groupby: keys of ANALYTIC_BALANCE_GROUPBY
+        :returns: list of dicts with the groupby keys, debit, credit and balance
+        """
+        self.flush_model()
+        tables, from_params, where_clause, where_params = self._query_get_clauses(domain)
+        weight_join, weight_params = self._analytic_weight_sql(None)
+        groupby_sql = ", ".join(ANALYTIC_BALANCE_GROUPBY[key] for key in groupby)
+        select_sql = ", ".join(
+            "%s AS %s" % (ANALYTIC_BALANCE_GROUPBY[key], key) for key in groupby)
+        query = """
+            SELECT %s,
+                   COALESCE(SUM("account_move_line"."debit" * analytic_weight.weight), 0) AS debit,
+                   COALESCE(SUM("account_move_line"."credit" * analytic_weight.weight), 0) AS credit,
+                   COALESCE(SUM(("account_move_line"."debit" - "account_move_line"."credit")
+                                * analytic_weight.weight), 0) AS balance
+            FROM %s %s
+            WHERE %s
+            GROUP BY %s
+        """ % (select_sql, tables or '"account_move_line"', weight_join,
+               where_clause.strip() or 'TRUE', groupby_sql)
+        # parameters in the order of their placeholders: FROM, weight join, WHERE
+        self.env.cr.execute(query, from_params + weight_params + where_params)
+        return self.env.cr.dictfetchall()
+
+    def _get_analytic_weights(self, analytic_ids, include_unassigned=False):
+        """ Share of each line of ``self`` attributed to ``analytic_ids``.
+
+        :returns: {line_id: weight} of the lines with a non-zero weight
+        """
+        if not self:
+            return {}
+        self.flush_model(['analytic_distribution'])
+        weight_join, weight_params = self._analytic_weight_sql(
+            analytic_ids, include_unassigned=include_unassigned)
+        self.env.cr.execute("""
+            SELECT "account_move_line"."id", analytic_weight.weight
+            FROM account_move_line %s
+            WHERE "account_move_line"."id" = ANY(%%s)
+              AND analytic_weight.weight != 0
+        """ % weight_join, weight_params + [self.ids])
+        return dict(self.env.cr.fetchall())
+
     @api.model
     def _where_calc(self, domain, active_test=True):
         """Computes the WHERE clause needed to implement an OpenERP domain.
@@ -47,6 +169,16 @@ class AccountMoveLine(models.Model):
 
     @api.model
     def _query_get(self, domain=None):
+        tables, from_params, where_clause, where_params = self._query_get_clauses(domain)
+        return tables, where_clause, from_params + where_params
+
+    @api.model
+    def _query_get_clauses(self, domain=None):
+        """ Same as ``_query_get``, with the parameters of the FROM and WHERE
+        clauses kept apart, for queries adding joins of their own.
+
+        :returns: (tables, from_params, where_clause, where_params)
+        """
         self.check_access('read')
 
         context = dict(self.env.context or {})
@@ -93,9 +225,6 @@ class AccountMoveLine(models.Model):
         if context.get('analytic_tag_ids'):
             domain += [('analytic_tag_ids', 'in', context['analytic_tag_ids'].ids)]
 
-        if context.get('analytic_account_ids'):
-            domain += [('analytic_distribution', 'in', context['analytic_account_ids'])]
-
         if context.get('partner_ids'):
             domain += [('partner_id', 'in', context['partner_ids'].ids)]
 
@@ -104,6 +233,7 @@ class AccountMoveLine(models.Model):
 
         where_clause = ""
         where_clause_params = []
+        from_clause_params = []
         tables = ''
         if domain:
             domain.append(('display_type', 'not in', ('line_section', 'line_note')))
@@ -113,5 +243,10 @@ class AccountMoveLine(models.Model):
             self._apply_ir_rules(query)
             from_string, from_params = query.from_clause
             where_string, where_params = query.where_clause
-            tables, where_clause, where_clause_params = from_string, where_string, from_params + where_params
-        return tables, where_clause, where_clause_params
+            tables, where_clause = from_string, where_string
+            from_clause_params, where_clause_params = list(from_params), list(where_params)
+            if context.get('analytic_account_ids'):
+                analytic_where, analytic_params = self._analytic_filter_sql(context['analytic_account_ids'])
+                where_clause = "(%s) AND %s" % (where_clause, analytic_where)
+                where_clause_params += analytic_params
+        return tables, from_clause_params, where_clause, where_clause_params
@@ -1,3 +1,4 @@
+from . import report_ledger_mixin
 from . import report_partner_ledger
 from . import report_general_ledger
 from . import report_trial_balance
@@ -10,12 +10,8 @@ class ReportAgedPartnerBalance(models.AbstractModel):
     _name = 'report.accounting_pdf_reports.report_agedpartnerbalance'
     _description = 'Aged Partner Balance Report'
 
-    def _get_partner_move_lines(self, account_type, partner_ids,
-                                date_from, target_move, period_length):
-        # This method can receive the context key 'include_nullified_amount' {Boolean}
-        # Do an invoice and a payment and unreconcile. The amount will be nullified
-        # By default, the partner wouldn't appear in this report.
-        # The context key allow it to appear
+    @api.model
+    def _get_aged_periods(self, date_from, period_length):
         # In case of a period_length of 30 days as of 2019-02-08, we want the following periods:
         # Name       Stop         Start
         # 1 - 30   : 2019-02-07 - 2019-01-09
@@ -25,7 +21,6 @@ class ReportAgedPartnerBalance(models.AbstractModel):
         # +120     : 2018-10-10
         periods = {}
         start = datetime.strptime(str(date_from), "%Y-%m-%d")
-        date_from = datetime.strptime(str(date_from), "%Y-%m-%d").date()
         for i in range(5)[::-1]:
             stop = start - relativedelta(days=period_length)
             period_name = str((5-(i+1)) * period_length + 1) + '-' + str((5-i) * period_length)
@@ -38,195 +33,168 @@ class ReportAgedPartnerBalance(models.AbstractModel):
                 'start': (i!=0 and stop.strftime('%Y-%m-%d') or False),
             }
             start = stop
+        return periods
 
-        res = []
-        total = []
-        cr = self.env.cr
-        user_company = self.env.user.company_id
-        user_currency = user_company.currency_id
-        company_ids = self.env.context.get('company_ids') or [user_company.id]
-        move_state = ['draft', 'posted']
-        date = self.env.context.get('date') or fields.Date.today()
+    @api.model
+    def _get_aged_partner_balance(self, account_type, partner_ids, date_from,
+                                  target_move, period_length, journal_ids=None,
+                                  payable_sign=1):
+        """
+        Aged balance per partner, in one query.
+
+        The residual of each line as of ``date_from`` is its balance plus the
+        partials reconciled up to that date, converted from the company
+        currency to the currency of the user's company with the rates of
+        ``res_currency_rate`` at the context ``date`` (today by default).
+        Lines are put in the 'direction' (not due) bucket or one of the five
+        periods of ``_get_aged_periods`` with their maturity date, then summed
+        per partner.
+
+        :param payable_sign: -1 to report payables as positive amounts
+        :returns: list of {'partner_id', 'name', 'direction', '0'..'4',
+            'open_items'} ordered by partner name; ``partner_id`` is False
+            for the lines without partner
+        """
+        periods = self._get_aged_periods(date_from, period_length)
+        date_from = datetime.strptime(str(date_from), "%Y-%m-%d").date()
+        user_currency = self.env.user.company_id.currency_id
         company = self.env['res.company'].browse(self.env.context.get('company_id')) or self.env.company
+        params = {
+            'account_types': list(account_type),
+            'move_states': ['posted'] if target_move == 'posted' else ['draft', 'posted'],
+            'date_from': date_from,
+            'company_ids': list(self.env.context.get('company_ids') or [self.env.user.company_id.id]),
+            'rate_date': self.env.context.get('date') or fields.Date.today(),
+            'rate_company_id': company.root_id.id,
+            'user_currency_id': user_currency.id,
+            'decimal_places': user_currency.decimal_places,
+            'payable_sign': payable_sign,
+        }
+        for i in range(1, 5):
+            params['start_%s' % i] = periods[str(i)]['start']
+        filters = ''
+        if partner_ids:
+            filters += ' AND (l.partner_id = ANY(%(partner_ids)s) OR l.partner_id IS NULL)'
+            params['partner_ids'] = list(partner_ids)
+        if journal_ids:
+            filters += ' AND l.journal_id = ANY(%(journal_ids)s)'
+            params['journal_ids'] = list(journal_ids)
+
+        self.env['account.move.line'].flush_model()
+        self.env['account.partial.reconcile'].flush_model()
+        self.env['res.currency.rate'].flush_model()
+        self.env.cr.execute('''
+            WITH currency_rate AS (
+                SELECT c.id AS currency_id,
+                       COALESCE((SELECT r.rate FROM res_currency_rate r
+                                 WHERE r.currency_id = c.id
+                                   AND r.name <= %(rate_date)s
+                                   AND (r.company_id IS NULL OR r.company_id = %(rate_company_id)s)
+                                 ORDER BY r.company_id, r.name DESC
+                                 LIMIT 1), 1.0) AS rate
+                FROM res_currency c
+            ),
+            aged AS (
+                SELECT l.partner_id,
+                       CASE WHEN COALESCE(l.date_maturity, l.date) >= %(date_from)s THEN 'direction'
+                            WHEN COALESCE(l.date_maturity, l.date) >= %(start_4)s THEN '4'
+                            WHEN COALESCE(l.date_maturity, l.date) >= %(start_3)s THEN '3'
+                            WHEN COALESCE(l.date_maturity, l.date) >= %(start_2)s THEN '2'
+                            WHEN COALESCE(l.date_maturity, l.date) >= %(start_1)s THEN '1'
+                            ELSE '0'
+                       END AS period,
+                       ROUND(((l.balance + COALESCE(matched_debit.amount, 0) - COALESCE(matched_credit.amount, 0))
+                              * CASE WHEN a.account_type = 'liability_payable' THEN %(payable_sign)s ELSE 1 END
+                              * user_rate.rate / company_rate.rate)::numeric, %(decimal_places)s) AS amount
+                FROM account_move_line l
+                JOIN account_move am ON am.id = l.move_id
+                JOIN account_account a ON a.id = l.account_id
+                JOIN res_company co ON co.id = l.company_id
+                JOIN currency_rate company_rate ON company_rate.currency_id = co.currency_id
+                JOIN currency_rate user_rate ON user_rate.currency_id = %(user_currency_id)s
+                LEFT JOIN LATERAL (
+                    SELECT SUM(p.amount) AS amount
+                    FROM account_partial_reconcile p
+                    WHERE p.credit_move_id = l.id AND p.max_date <= %(date_from)s
+                ) matched_debit ON TRUE
+                LEFT JOIN LATERAL (
+                    SELECT SUM(p.amount) AS amount
+                    FROM account_partial_reconcile p
+                    WHERE p.debit_move_id = l.id AND p.max_date <= %(date_from)s
+                ) matched_credit ON TRUE
+                WHERE am.state = ANY(%(move_states)s)
+                  AND a.account_type = ANY(%(account_types)s)
+                  AND l.date <= %(date_from)s
+                  AND l.company_id = ANY(%(company_ids)s)
+                  AND (l.reconciled IS NOT TRUE
+                       OR EXISTS (SELECT 1 FROM account_partial_reconcile p
+                                  WHERE p.debit_move_id = l.id AND p.max_date > %(date_from)s)
+                       OR EXISTS (SELECT 1 FROM account_partial_reconcile p
+                                  WHERE p.credit_move_id = l.id AND p.max_date > %(date_from)s))
+                  ''' + filters + '''
+            )
+            SELECT aged.partner_id,
+                   rp.name,
+                   COALESCE(SUM(aged.amount) FILTER (WHERE aged.period = 'direction'), 0)::float8 AS direction,
+                   COALESCE(SUM(aged.amount) FILTER (WHERE aged.period = '0'), 0)::float8 AS "0",
+                   COALESCE(SUM(aged.amount) FILTER (WHERE aged.period = '1'), 0)::float8 AS "1",
+                   COALESCE(SUM(aged.amount) FILTER (WHERE aged.period = '2'), 0)::float8 AS "2",
+                   COALESCE(SUM(aged.amount) FILTER (WHERE aged.period = '3'), 0)::float8 AS "3",
+                   COALESCE(SUM(aged.amount) FILTER (WHERE aged.period = '4'), 0)::float8 AS "4",
+                   COUNT(*) FILTER (WHERE aged.amount != 0) AS open_items
+            FROM aged
+            LEFT JOIN res_partner rp ON rp.id = aged.partner_id
+            GROUP BY aged.partner_id, rp.name
+            ORDER BY UPPER(rp.name)
+        ''', params)
+        rows = self.env.cr.dictfetchall()
+        for row in rows:
+            row['partner_id'] = row['partner_id'] or False
+        return rows
 
-        if target_move == 'posted':
-            move_state = ['posted']
-        arg_list = (tuple(move_state), tuple(account_type))
-
-        reconciliation_clause = '(l.reconciled IS FALSE)'
-        cr.execute('SELECT debit_move_id, credit_move_id FROM account_partial_reconcile where max_date > %s', (date_from,))
-        reconciled_after_date = []
-        for row in cr.fetchall():
-            reconciled_after_date += [row[0], row[1]]
-        if reconciled_after_date:
-            reconciliation_clause = '(l.reconciled IS FALSE OR l.id IN %s)'
-            arg_list += (tuple(reconciled_after_date),)
-        arg_list += (date_from, tuple(company_ids))
-        query = '''
-            SELECT DISTINCT l.partner_id, UPPER(res_partner.name)
-            FROM account_move_line AS l left join res_partner on l.partner_id = res_partner.id, account_account, account_move am
-            WHERE (l.account_id = account_account.id)
-                AND (l.move_id = am.id)
-                AND (am.state IN %s)
-                AND (account_account.account_type IN %s)
-                AND ''' + reconciliation_clause + '''
-                AND (l.date <= %s)
-                AND l.company_id IN %s
-            ORDER BY UPPER(res_partner.name)'''
-        cr.execute(query, arg_list)
-        partners = cr.dictfetchall()
-        # put a total of 0
-        for i in range(7):
-            total.append(0)
-
-        # Build a string like (1,2,3) for easy use in SQL query
-        if not partner_ids:
-            partner_ids = [partner['partner_id'] for partner in partners if partner['partner_id']]
-        lines = dict((partner['partner_id'] or False, []) for partner in partners)
-        if not partner_ids:
+    def _get_partner_move_lines(self, account_type, partner_ids,
+                                date_from, target_move, period_length):
+        # This method can receive the context key 'include_nullified_amount' {Boolean}
+        # Do an invoice and a payment and unreconcile. The amount will be nullified
+        # By default, the partner wouldn't appear in this report.
+        # The context key allow it to appear
+        # The third value maps each partner to its number of open items.
+        rows = self._get_aged_partner_balance(
+            account_type, partner_ids, date_from, target_move, period_length)
+        if not rows:
             return [], [], {}
 
-        # This dictionary will store the not due amount of all partners
-        undue_amounts = {}
-        query = '''SELECT l.id
-                FROM account_move_line AS l, account_account, account_move am
-                WHERE (l.account_id = account_account.id) AND (l.move_id = am.id)
-                    AND (am.state IN %s)
-                    AND (account_account.account_type IN %s)
-                    AND (COALESCE(l.date_maturity,l.date) >= %s)\
-                    AND ((l.partner_id IN %s) OR (l.partner_id IS NULL))
-                AND (l.date <= %s)
-                AND l.company_id IN %s'''
-        cr.execute(query, (tuple(move_state), tuple(account_type), date_from,
-                           tuple(partner_ids), date_from, tuple(company_ids)))
-        aml_ids = cr.fetchall()
-        aml_ids = aml_ids and [x[0] for x in aml_ids] or []
-        for line in self.env['account.move.line'].browse(aml_ids):
-            partner_id = line.partner_id.id or False
-            if partner_id not in undue_amounts:
-                undue_amounts[partner_id] = 0.0
-            line_amount = line.company_id.currency_id._convert(line.balance,
-                                                               user_currency,
-                                                               company, date)
-            if user_currency.is_zero(line_amount):
-                continue
-            for partial_line in line.matched_debit_ids:
-                if partial_line.max_date <= date_from:
-                    line_currency = partial_line.company_id.currency_id
-                    line_amount += line_currency._convert(partial_line.amount,
-                                                          user_currency,
-                                                          company, date)
-            for partial_line in line.matched_credit_ids:
-                if partial_line.max_date <= date_from:
-                    line_currency = partial_line.company_id.currency_id
-                    line_amount -= line_currency._convert(partial_line.amount,
-                                                          user_currency,
-                                                          company, date)
-            if not self.env.user.company_id.currency_id.is_zero(line_amount):
-                undue_amounts[partner_id] += line_amount
-                lines[partner_id].append({
-                    'line': line,
-                    'amount': line_amount,
-                    'period': 6,
-                })
-
-        # Use one query per period and store results in history (a list variable)
-        # Each history will contain: history[1] = {'<partner_id>': <partner_debit-credit>}
-        history = []
-        for i in range(5):
-            args_list = (tuple(move_state), tuple(account_type), tuple(partner_ids),)
-            dates_query = '(COALESCE(l.date_maturity,l.date)'
-
-            if periods[str(i)]['start'] and periods[str(i)]['stop']:
-                dates_query += ' BETWEEN %s AND %s)'
-                args_list += (periods[str(i)]['start'], periods[str(i)]['stop'])
-            elif periods[str(i)]['start']:
-                dates_query += ' >= %s)'
-                args_list += (periods[str(i)]['start'],)
-            else:
-                dates_query += ' <= %s)'
-                args_list += (periods[str(i)]['stop'],)
-            args_list += (date_from, tuple(company_ids))
-
-            query = '''SELECT l.id
-                    FROM account_move_line AS l, account_account, account_move am
-                    WHERE (l.account_id = account_account.id) AND (l.move_id = am.id)
-                        AND (am.state IN %s)
-                        AND (account_account.account_type IN %s)
-                        AND ((l.partner_id IN %s) OR (l.partner_id IS NULL))
-                        AND ''' + dates_query + '''
-                    AND (l.date <= %s)
-                    AND l.company_id IN %s'''
-            cr.execute(query, args_list)
-            partners_amount = {}
-            aml_ids = cr.fetchall()
-            aml_ids = aml_ids and [x[0] for x in aml_ids] or []
-            for line in self.env['account.move.line'].browse(aml_ids):
-                partner_id = line.partner_id.id or False
-                if partner_id not in partners_amount:
-                    partners_amount[partner_id] = 0.0
-                line_currency_id = line.company_id.currency_id
-                line_amount = line_currency_id._convert(line.balance, user_currency, company, date)
-                if user_currency.is_zero(line_amount):
-                    continue
-                for partial_line in line.matched_debit_ids:
-                    if partial_line.max_date <= date_from:
-                        line_currency_id = partial_line.company_id.currency_id
-                        line_amount += line_currency_id._convert(
-                            partial_line.amount, user_currency, company, date)
-                for partial_line in line.matched_credit_ids:
-                    if partial_line.max_date <= date_from:
-                        line_currency_id = partial_line.company_id.currency_id
-                        line_amount -= line_currency_id._convert(
-                            partial_line.amount, user_currency, company, date)
-                if not self.env.user.company_id.currency_id.is_zero(line_amount):
-                    partners_amount[partner_id] += line_amount
-                    lines[partner_id].append({
-                        'line': line,
-                        'amount': line_amount,
-                        'period': i + 1,
-                        })
-            history.append(partners_amount)
-
-        for partner in partners:
-            if partner['partner_id'] is None:
-                partner['partner_id'] = False
-            at_least_one_amount = False
-            values = {}
-            undue_amt = 0.0
-            if partner['partner_id'] in undue_amounts:  # Making sure this partner actually was found by the query
-                undue_amt = undue_amounts[partner['partner_id']]
-
-            total[6] = total[6] + undue_amt
-            values['direction'] = undue_amt
-            if not float_is_zero(values['direction'], precision_rounding=self.env.user.company_id.currency_id.rounding):
-                at_least_one_amount = True
-
+        res = []
+        # put a total of 0
+        total = [0] * 7
+        lines = {}
+        rounding = self.env.user.company_id.currency_id.rounding
+        partners = self.env['res.partner'].browse(
+            [row['partner_id'] for row in rows if row['partner_id']])
+        trusts = {partner.id: partner.trust for partner in partners}
+        for row in rows:
+            partner_id = row['partner_id']
+            lines[partner_id] = row['open_items']
+            values = {'direction': row['direction']}
+            total[6] += row['direction']
             for i in range(5):
-                during = False
-                if partner['partner_id'] in history[i]:
-                    during = [history[i][partner['partner_id']]]
-                # Adding counter
-                total[(i)] = total[(i)] + (during and during[0] or 0)
-                values[str(i)] = during and during[0] or 0.0
-                if not float_is_zero(values[str(i)],
-                                     precision_rounding=self.env.user.company_id.currency_id.rounding):
-                    at_least_one_amount = True
+                values[str(i)] = row[str(i)]
+                total[i] += row[str(i)]
+            at_least_one_amount = any(
+                not float_is_zero(values[key], precision_rounding=rounding) for key in values)
             values['total'] = sum([values['direction']] + [values[str(i)] for i in range(5)])
             ## Add for total
-            total[(i + 1)] += values['total']
-            values['partner_id'] = partner['partner_id']
-            if partner['partner_id']:
-                browsed_partner = self.env['res.partner'].browse(partner['partner_id'])
-                values['name'] = browsed_partner.name and len(
-                    browsed_partner.name) >= 45 and browsed_partner.name[
-                                                    0:40] + '...' or browsed_partner.name
-                values['trust'] = browsed_partner.trust
+            total[5] += values['total']
+            values['partner_id'] = partner_id
+            if partner_id:
+                name = row['name']
+                values['name'] = name and len(name) >= 45 and name[0:40] + '...' or name
+                values['trust'] = trusts.get(partner_id)
             else:
                 values['name'] = _('Unknown Partner')
                 values['trust'] = False
 
-            if at_least_one_amount or (self.env.context.get('include_nullified_amount') and lines[partner['partner_id']]):
+            if at_least_one_amount or (self.env.context.get('include_nullified_amount') and lines[partner_id]):
                 res.append(values)
 
         return res, total, lines
@@ -10,73 +10,91 @@ class ReportFinancial(models.AbstractModel):
     def _compute_account_balance(self, accounts):
         """ compute the balance, debit and credit for the provided accounts
         """
-        mapping = {
-            'balance': "COALESCE(SUM(debit),0) - COALESCE(SUM(credit), 0) as balance",
-            'debit': "COALESCE(SUM(debit), 0) as debit",
-            'credit': "COALESCE(SUM(credit), 0) as credit",
-        }
-
         res = {}
         for account in accounts:
-            res[account.id] = dict.fromkeys(mapping, 0.0)
+            res[account.id] = dict.fromkeys(['balance', 'debit', 'credit'], 0.0)
         if accounts:
-            tables, where_clause, where_params = self.env['account.move.line']._query_get()
-            tables = tables.replace('"', '') if tables else "account_move_line"
-            wheres = [""]
-            if where_clause.strip():
-                wheres.append(where_clause.strip())
-            filters = " AND ".join(wheres)
-            request = "SELECT account_id as id, " + ', '.join(mapping.values()) + \
-                       " FROM " + tables + \
-                       " WHERE account_id IN %s " \
-                            + filters + \
-                       " GROUP BY account_id"
-            params = (tuple(accounts._ids),) + tuple(where_params)
-            self.env.cr.execute(request, params)
-            for row in self.env.cr.dictfetchall():
-                res[row['id']] = row
+            rows = self.env['account.move.line']._read_analytic_balances(
+                domain=[('account_id', 'in', accounts.ids)])
+            for row in rows:
+                res[row.pop('account_id')] = row
         return res
 
-    def _compute_report_balance(self, reports):
-        '''returns a dictionary with key=the ID of a record and value=the credit, debit and balance amount
-           computed for this record. If the record is of type :
-               'accounts' : it's the sum of the linked accounts
-               'account_type' : it's the sum of leaf accoutns with such an account_type
-               'account_report' : it's the amount of the related report
-               'sum' : it's the sum of the children of this record (aka a 'view' record)'''
+    def _get_report_accounts(self, reports):
+        """ Accounts of the 'accounts' and 'account_type' nodes of ``reports``
+        and of the reports below them, as {report_id: account.account}; the
+        accounts of every 'account_type' node come from a single search.
+        """
         res = {}
-        fields = ['credit', 'debit', 'balance']
-        for report in reports:
-            if report.id in res:
+        report_types = {}
+        todo = list(reports)
+        seen = set()
+        while todo:
+            report = todo.pop()
+            if report.id in seen:
                 continue
-            res[report.id] = dict((fn, 0.0) for fn in fields)
+            seen.add(report.id)
             if report.type == 'accounts':
-                # it's the sum of the linked accounts
-                res[report.id]['account'] = self._compute_account_balance(report.account_ids)
-                for value in res[report.id]['account'].values():
-                    for field in fields:
-                        res[report.id][field] += value.get(field)
+                res[report.id] = report.account_ids
             elif report.type == 'account_type':
-                # it's the sum the leaf accounts with such an account type
-                accounts = self.env['account.account'].search(
-                    [('account_type', 'in', report.account_type_ids.mapped('type'))])
-
-                res[report.id]['account'] = self._compute_account_balance(accounts)
-                for value in res[report.id]['account'].values():
-                    for field in fields:
-                        res[report.id][field] += value.get(field)
+                report_types[report.id] = set(report.account_type_ids.mapped('type'))
             elif report.type == 'account_report' and report.account_report_id:
-                # it's the amount of the linked report
-                res2 = self._compute_report_balance(report.account_report_id)
-                for key, value in res2.items():
-                    for field in fields:
-                        res[report.id][field] += value[field]
+                todo.append(report.account_report_id)
             elif report.type == 'sum':
-                # it's the sum of the children of this account.report
-                res2 = self._compute_report_balance(report.children_ids)
-                for key, value in res2.items():
-                    for field in fields:
-                        res[report.id][field] += value[field]
+                todo.extend(report.children_ids)
+        if report_types:
+            accounts = self.env['account.account'].search(
+                [('account_type', 'in', list(set().union(*report_types.values())))])
+            for report_id, types in report_types.items():
+                res[report_id] = accounts.filtered(lambda account: account.account_type in types)
+        return res
+
+    def _compute_report_balance(self, reports, report_accounts=None):
+        '''returns a dictionary with key=the ID of a record and value=the credit, debit and balance amount
+           computed for this record. If the record is of type :
+               'accounts' : it's the sum of the linked accounts
+               'account_type' : it's the sum of leaf accoutns with such an account_type
+               'account_report' : it's the amount of the related report
+               'sum' : it's the sum of the children of this record (aka a 'view' record)
+
+           The balances of all the accounts of the tree are read with one
+           grouped query, then the tree is evaluated bottom-up, each report
+           once.'''
+        if report_accounts is None:
+            report_accounts = self._get_report_accounts(reports)
+        balances = self._compute_account_balance(
+            self.env['account.account'].union(*report_accounts.values()))
+        memo = {}
+        for report in reports:
+            self._compute_report_node(report, report_accounts, balances, memo)
+        return {report.id: memo[report.id] for report in reports}
+
+    def _compute_report_node(self, report, report_accounts, balances, memo):
+        if report.id in memo:
+            return memo[report.id]
+        fields = ['credit', 'debit', 'balance']
+        res = memo[report.id] = dict((fn, 0.0) for fn in fields)
+        values = []
+        if report.type in ('accounts', 'account_type'):
+            # it's the sum of the linked accounts, or of the accounts with such an account type
+            res['account'] = {
+                account.id: dict(balances[account.id])
+                for account in report_accounts.get(report.id, [])
+            }
+            values = res['account'].values()
+        elif report.type == 'account_report' and report.account_report_id:
+            # it's the amount of the linked report
+            values = [self._compute_report_node(
+                report.account_report_id, report_accounts, balances, memo)]
+        elif report.type == 'sum':
+            # it's the sum of the children of this account.report
+            values = [
+                self._compute_report_node(child, report_accounts, balances, memo)
+                for child in report.children_ids
+            ]
+        for value in values:
+            for field in fields:
+                res[field] += value[field]
         return res
 
     def get_account_lines(self, data):
@@ -84,11 +102,13 @@ class ReportFinancial(models.AbstractModel):
         account_report = self.env['account.financial.report'].search(
             [('id', '=', data['account_report_id'][0])])
         child_reports = account_report._get_children_by_order()
-        res = self.with_context(data.get('used_context'))._compute_report_balance(child_reports)
+        report_accounts = self._get_report_accounts(child_reports)
+        res = self.with_context(data.get('used_context'))._compute_report_balance(
+            child_reports, report_accounts)
         if data['enable_filter']:
             comparison_res = self.with_context(
                 data.get('comparison_context'))._compute_report_balance(
-                child_reports)
+                child_reports, report_accounts)
             for report_id, value in comparison_res.items():
                 res[report_id]['comp_bal'] = value['balance']
                 report_acc = res[report_id].get('account')
@@ -0,0 +1,304 @@
+import itertools
+import tempfile
+from operator import itemgetter
+
+from odoo import models, _
+
+try:
+    from odoo.tools.misc import xlsxwriter
+except ImportError:
+    import xlsxwriter
+
+# rows fetched per round trip from the server-side cursor
+LEDGER_FETCH_SIZE = 2000
+
+_cursor_sequence = itertools.count()
+
+
+class AccountLedgerReportMixin(models.AbstractModel):
+    _name = 'account.ledger.report.mixin'
+    _description = 'Running Balance Ledger'
+
+    def _get_ledger_select(self):
+        """ Columns of the ledger lines, on top of the account, line id,
+        debit, credit and progressive balance computed by the engine.
+
+        Aliases: ``ledger`` (engine rows), ``l`` account_move_line, ``m``
+        account_move, ``j`` account_journal, ``p`` res_partner and ``c``
+        res_currency; they are NULL on the initial balance rows.
+
+        :returns: (list of SQL select expressions, list of params)
+        """
+        return [
+            'l.date AS ldate',
+            'j.code AS lcode',
+            'l.currency_id',
+            'l.amount_currency',
+            'l.ref AS lref',
+            'l.name AS lname',
+            'm.name AS move_name',
+            'c.symbol AS currency_code',
+            'p.name AS partner_name',
+        ], []
+
+    def _get_ledger_joins(self):
+        """ Extra joins for the columns of ``_get_ledger_select``. """
+        return ''
+
+    def _get_ledger_order(self, sortby):
+        """ Order of the lines within an account, also the order of the
+        progressive balance. """
+        if sortby == 'sort_journal_partner':
+            return 'j.code, p.name, l.move_id'
+        return 'l.date, l.move_id'
+
+    def _get_ledger_amount_factor(self):
+        """ Factor applied to the debit and credit of the period lines.
+
+        Aliases: ``l`` account_move_line and ``m`` account_move.
+
+        :returns: (SQL expression, extra joins)
+        """
+        return '1.0', ''
+
+    def _get_ledger_filters(self, query_context, extra_where, extra_params):
+        tables, where_clause, where_params = self.env['account.move.line'].with_context(
+            query_context)._query_get()
+        wheres = [""]
+        if where_clause.strip():
+            wheres.append(where_clause.strip())
+        if extra_where:
+            wheres.append(extra_where)
+        filters = " AND ".join(wheres)
+        filters = filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
+        return filters, list(where_params) + list(extra_params)
+
+    def _iter_ledger(self, accounts, init_balance, sortby, query_context=None,
+                     analytic_ids=None, include_unassigned=False,
+                     extra_where='', extra_params=()):
+        """ Ledger lines of ``accounts``, streamed in account and ``sortby``
+        order.
+
+        The lines are selected by ``_query_get`` with ``query_context`` (the
+        current context by default) and ``extra_where``; with
+        ``init_balance`` every account starts with one aggregated row of the
+        lines before ``date_from``.  Amounts are weighted by the share of
+        ``analytic_ids`` (see ``_analytic_weight_sql``).  The progressive
+        balance and the account totals are window functions, and rows are
+        fetched from a server-side cursor, ``LEDGER_FETCH_SIZE`` at a time.
+
+        :returns: iterator of row dicts with ``account_id``, ``lid``, the
+            columns of ``_get_ledger_select``, ``debit``, ``credit``,
+            ``balance`` and the ``account_debit``, ``account_credit`` and
+            ``account_balance`` totals
+        """
+        if not accounts:
+            return
+        MoveLine = self.env['account.move.line']
+        if query_context is None:
+            query_context = self.env.context
+        weight_join, weight_params = MoveLine._analytic_weight_sql(
+            analytic_ids, alias='l', include_unassigned=include_unassigned)
+
+        parts = []
+        params = []
+        if init_balance:
+            init_context = dict(query_context, date_to=False, initial_bal=True)
+            filters, filter_params = self._get_ledger_filters(init_context, extra_where, extra_params)
+            parts.append("""
+                SELECT l.account_id, NULL::integer AS id,
+                       COALESCE(SUM(l.debit * analytic_weight.weight), 0.0) AS debit,
+                       COALESCE(SUM(l.credit * analytic_weight.weight), 0.0) AS credit
+                FROM account_move_line l
+                JOIN account_move m ON (l.move_id = m.id)
+                %s
+                WHERE l.account_id IN %%s %s
+                GROUP BY l.account_id
+            """ % (weight_join, filters))
+            params += list(weight_params) + [tuple(accounts.ids)] + filter_params
+
+        factor, factor_joins = self._get_ledger_amount_factor()
+        filters, filter_params = self._get_ledger_filters(query_context, extra_where, extra_params)
+        parts.append("""
+            SELECT l.account_id, l.id,
+                   COALESCE(l.debit, 0) * analytic_weight.weight * %s AS debit,
+                   COALESCE(l.credit, 0) * analytic_weight.weight * %s AS credit
+            FROM account_move_line l
+            JOIN account_move m ON (l.move_id = m.id)
+            %s
+            %s
+            WHERE l.account_id IN %%s %s
+        """ % (factor, factor, factor_joins, weight_join, filters))
+        params += list(weight_params) + [tuple(accounts.ids)] + filter_params
+
+        select, select_params = self._get_ledger_select()
+        order = 'ledger.id IS NOT NULL, %s, ledger.id' % self._get_ledger_order(sortby)
+        query = """
+            WITH ledger AS (%s)
+            SELECT ledger.account_id, ledger.id AS lid, ledger.debit, ledger.credit,
+                   SUM(ledger.debit - ledger.credit) OVER (
+                       PARTITION BY ledger.account_id ORDER BY %s
+                       ROWS UNBOUNDED PRECEDING
+                   ) AS balance,
+                   SUM(ledger.debit) OVER account_ledger AS account_debit,
+                   SUM(ledger.credit) OVER account_ledger AS account_credit,
+                   SUM(ledger.debit - ledger.credit) OVER account_ledger AS account_balance,
+                   %s
+            FROM ledger
+            LEFT JOIN account_move_line l ON (l.id = ledger.id)
+            LEFT JOIN account_move m ON (m.id = l.move_id)
+            LEFT JOIN account_journal j ON (j.id = l.journal_id)
+            LEFT JOIN res_partner p ON (p.id = l.partner_id)
+            LEFT JOIN res_currency c ON (c.id = l.currency_id)
+            %s
+            WINDOW account_ledger AS (PARTITION BY ledger.account_id)
+            ORDER BY array_position(%%s::integer[], ledger.account_id), %s
+        """ % (' UNION ALL '.join(parts), order, ', '.join(select), self._get_ledger_joins(), order)
+        params += select_params + [accounts.ids]
+
+        MoveLine.flush_model()
+        for row in self._iter_query(query, params):
+            if row['lid'] is None:
+                row.update(lid=0, lname='Initial Balance', amount_currency=0.0)
+            self._prepare_ledger_row(row)
+            yield row
+
+    def _prepare_ledger_row(self, row):
+        """ Hook to complete a ledger row before it is used. """
+        return row
+
+    def _iter_query(self, query, params, fetch_size=LEDGER_FETCH_SIZE):
+        """ Rows of ``query`` as dicts, fetched through a server-side cursor
+        so that only ``fetch_size`` rows are held at once. """
+        cr = self.env.cr
+        cursor_name = 'ledger_cursor_%s' % next(_cursor_sequence)
+        cr.execute('DECLARE %s NO SCROLL CURSOR FOR %s' % (cursor_name, query), params)
+        try:
+            while True:
+                cr.execute('FETCH FORWARD %s FROM %s' % (int(fetch_size), cursor_name))
+                rows = cr.dictfetchall()
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cr.execute('CLOSE %s' % cursor_name)
+
+    def _iter_ledger_accounts(self, accounts, rows, display_account):
+        """ Group the rows of ``_iter_ledger`` per account, lazily.
+
+        :returns: iterator of (account, totals, lines) where totals holds the
+            account's debit, credit and balance and lines iterates over its
+            rows; lines must be consumed before moving to the next account
+        """
+        accounts = accounts.union()
+        empty = iter(())
+        position = 0
+        for account_id, lines in itertools.groupby(rows, key=itemgetter('account_id')):
+            first = next(lines)
+            while accounts[position].id != account_id:
+                if display_account == 'all':
+                    yield accounts[position], dict.fromkeys(('debit', 'credit', 'balance'), 0.0), empty
+                position += 1
+            account = accounts[position]
+            position += 1
+            totals = {
+                'debit': first['account_debit'],
+                'credit': first['account_credit'],
+                'balance': first['account_balance'],
+            }
+            currency = account.currency_id or self.env.company.currency_id
+            if display_account == 'not_zero' and currency.is_zero(totals['balance']):
+                continue
+            yield account, totals, map(self._strip_ledger_row, itertools.chain([first], lines))
+        if display_account == 'all':
+            for account in accounts[position:]:
+                yield account, dict.fromkeys(('debit', 'credit', 'balance'), 0.0), empty
+
+    def _strip_ledger_row(self, row):
+        for key in ('account_id', 'account_debit', 'account_credit', 'account_balance'):
+            row.pop(key, None)
+        return row
+
+    def _get_ledger_accounts(self, accounts, rows, display_account):
+        """ Accounts of ``_iter_ledger_accounts`` in the structure of the
+        report templates. """
+        return [
+            dict(totals, code=account.code, name=account.name, move_lines=list(lines))
+            for account, totals, lines in self._iter_ledger_accounts(accounts, rows, display_account)
+        ]
+
+    def _get_ledger_xlsx_columns(self):
+        """ (header, row key, kind) of the spreadsheet columns; kind is
+        'text', 'date' or 'amount'. """
+        return [
+            (_('Date'), 'ldate', 'date'),
+            (_('JRNL'), 'lcode', 'text'),
+            (_('Partner'), 'partner_name', 'text'),
+            (_('Ref'), 'lref', 'text'),
+            (_('Move'), 'move_name', 'text'),
+            (_('Entry Label'), 'lname', 'text'),
+            (_('Debit'), 'debit', 'amount'),
+            (_('Credit'), 'credit', 'amount'),
+            (_('Balance'), 'balance', 'amount'),
+            (_('Currency'), 'currency_code', 'text'),
+        ]
+
+    def _get_ledger_xlsx(self, title, accounts, rows, display_account, wizard):
+        """ Spreadsheet action of a ledger.
+
+        Rows are written as they are fetched, in constant memory mode, so
+        memory does not grow with the number of lines.
+
+        :param rows: iterator of ``_iter_ledger``
+        :param wizard: transient record printing the report; the file is
+            attached to it and deleted with it
+        :returns: ir.actions.act_url downloading the file
+        """
+        columns = self._get_ledger_xlsx_columns()
+        with tempfile.NamedTemporaryFile(suffix='.xlsx') as output:
+            workbook = xlsxwriter.Workbook(output.name, {'constant_memory': True})
+            sheet = workbook.add_worksheet(title[:31])
+            bold = workbook.add_format({'bold': True})
+            header = workbook.add_format({'bold': True, 'bg_color': '#D3D3D3', 'border': 1})
+            date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+            amount_format = workbook.add_format({'num_format': '#,##0.00'})
+            total_format = workbook.add_format({'bold': True, 'num_format': '#,##0.00'})
+            sheet.set_column(0, len(columns) - 1, 16)
+
+            sheet.write(0, 0, title, workbook.add_format({'bold': True, 'font_size': 14}))
+            for col, (label, key, kind) in enumerate(columns):
+                sheet.write(2, col, label, header)
+            row_index = 3
+            for account, totals, lines in self._iter_ledger_accounts(accounts, rows, display_account):
+                sheet.write(row_index, 0, '%s %s' % (account.code, account.name), bold)
+                for col, (label, key, kind) in enumerate(columns):
+                    if key in totals:
+                        sheet.write_number(row_index, col, totals[key], total_format)
+                row_index += 1
+                for line in lines:
+                    for col, (label, key, kind) in enumerate(columns):
+                        value = line.get(key)
+                        if value in (None, False, ''):
+                            continue
+                        if kind == 'date':
+                            sheet.write_datetime(row_index, col, value, date_format)
+                        elif kind == 'amount':
+                            sheet.write_number(row_index, col, value, amount_format)
+                        else:
+                            sheet.write_string(row_index, col, str(value))
+                    row_index += 1
+            workbook.close()
+            output.seek(0)
+            attachment = self.env['ir.attachment'].create({
+                'name': '%s.xlsx' % title,
+                'type': 'binary',
+                'raw': output.read(),
+                'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                'res_model': wizard._name,
+                'res_id': wizard.id,
+            })
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % attachment.id,
+            'target': 'self',
+        }
@@ -131,69 +131,156 @@ class ReportPartnerLedger(models.AbstractModel):
     _name = 'report.accounting_pdf_reports.report_partnerledger'
     _description = 'Partner Ledger Report'
 
-    def _lines(self, data, partner):
-        full_account = []
-        currency = self.env['res.currency']
-        query_get_data = self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
-        # FIX: Use .get() with default value instead of direct access
-        reconcile_clause = "" if data['form'].get('reconciled',
-                                                  False) else ' AND "account_move_line".full_reconcile_id IS NULL '
-        params = [partner.id, tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'])] + \
-                 query_get_data[2]
+    def _get_partner_ledger_select(self):
+        """ Columns of the ledger lines, on top of the partner, line id, date,
+        debit, credit and progressive balance computed by the engine.
+
+        Aliases: ``ledger`` (engine rows), ``l`` account_move_line, ``m``
+        account_move, ``j`` account_journal, ``acc`` account_account and
+        ``c`` res_currency.
+
+        :returns: (list of SQL select expressions, list of params)
+        """
+        lang = self.env.context.get('lang') or 'en_US'
+        return [
+            'j.code',
+            "COALESCE(acc.name->>%s, acc.name->>'en_US') AS a_name",
+            'acc.account_type',
+            'l.ref',
+            'm.name AS move_name',
+            'l.name',
+            'l.amount_currency',
+            'l.currency_id',
+            'c.symbol AS currency_code',
+        ], [lang]
+
+    def _get_partner_ledger_joins(self):
+        """ Extra joins for the columns of ``_get_partner_ledger_select``. """
+        return ''
+
+    def _get_partner_ledger(self, data, partner_ids=None, initial_balance=False):
+        """ Ledger lines of many partners in one ordered, windowed query.
+
+        The lines are selected by ``_query_get`` with the form's
+        ``used_context`` and by ``data['computed']`` (``move_state``,
+        ``account_ids``); unreconciled lines only unless
+        ``data['form']['reconciled']``.  With ``initial_balance``, every
+        partner starts with one aggregated row of the lines before
+        ``date_from``.  The progressive balance is computed in SQL.
+
+        :param partner_ids: partner ids, or None for every partner
+        :returns: {partner_id: {'lines': [row dicts ordered by date],
+                                'debit': ..., 'credit': ..., 'debit - credit': ...}}
+        """
+        MoveLine = self.env['account.move.line']
+        used_context = data['form'].get('used_context', {})
+        reconcile_clause = "" if data['form'].get('reconciled', False) else \
+            ' AND "account_move_line".full_reconcile_id IS NULL '
+        partner_clause = ' AND "account_move_line".partner_id IS NOT NULL '
+        filter_params = [list(data['computed']['move_state']), list(data['computed']['account_ids'])]
+        if partner_ids is not None:
+            partner_clause = ' AND "account_move_line".partner_id = ANY(%s) '
+            filter_params.append(list(partner_ids))
+
+        def ledger_part(context, select, groupby=''):
+            tables, where_clause, where_params = MoveLine.with_context(context)._query_get()
+            query = """
+                SELECT %s
+                FROM %s
+                JOIN account_move m ON (m.id = "account_move_line".move_id)
+                WHERE %s
+                    AND m.state = ANY(%%s)
+                    AND "account_move_line".account_id = ANY(%%s)
+                    %s %s
+                %s
+            """ % (select, tables or '"account_move_line"', where_clause.strip() or 'TRUE',
+                   partner_clause, reconcile_clause, groupby)
+            return query, list(where_params) + filter_params
+
+        parts = []
+        params = []
+        if initial_balance and used_context.get('date_from'):
+            init_context = dict(used_context, date_to=False, strict_range=True, initial_bal=True)
+            query, query_params = ledger_part(init_context, """
+                "account_move_line".partner_id, NULL::integer AS id, NULL::date AS date,
+                SUM("account_move_line".debit) AS debit, SUM("account_move_line".credit) AS credit
+            """, 'GROUP BY "account_move_line".partner_id')
+            parts.append(query)
+            params += query_params
+        query, query_params = ledger_part(used_context, """
+            "account_move_line".partner_id, "account_move_line".id, "account_move_line".date,
+            "account_move_line".debit, "account_move_line".credit
+        """)
+        parts.append(query)
+        params += query_params
+
+        select, select_params = self._get_partner_ledger_select()
         query = """
-            SELECT "account_move_line".id, "account_move_line".date, j.code, acc.name->>'en_US' as a_name, "account_move_line".ref, m.name as move_name, "account_move_line".name, "account_move_line".debit, "account_move_line".credit, "account_move_line".amount_currency,"account_move_line".currency_id, c.symbol AS currency_code
-            FROM """ + query_get_data[0] + """
-            LEFT JOIN account_journal j ON ("account_move_line".journal_id = j.id)
-            LEFT JOIN account_account acc ON ("account_move_line".account_id = acc.id)
-            LEFT JOIN res_currency c ON ("account_move_line".currency_id=c.id)
-            LEFT JOIN account_move m ON (m.id="account_move_line".move_id)
-            WHERE "account_move_line".partner_id = %s
-                AND m.state IN %s
-                AND "account_move_line".account_id IN %s AND """ + query_get_data[1] + reconcile_clause + """
-                ORDER BY "account_move_line".date"""
-        self.env.cr.execute(query, tuple(params))
-        res = self.env.cr.dictfetchall()
-        sum = 0.0
-        lang_code = self.env.context.get('lang') or 'en_US'
-        lang = self.env['res.lang']
-        lang_id = lang._lang_get(lang_code)
-        date_format = lang_id.date_format
-        for r in res:
-            r['date'] = r['date']
+            WITH ledger AS (%s)
+            SELECT ledger.partner_id, ledger.id, ledger.date, ledger.debit, ledger.credit,
+                   ledger.id IS NULL AS is_initial_balance,
+                   SUM(ledger.debit - ledger.credit) OVER (
+                       PARTITION BY ledger.partner_id
+                       ORDER BY ledger.date NULLS FIRST, ledger.id NULLS FIRST
+                       ROWS UNBOUNDED PRECEDING
+                   ) AS progress,
+                   %s
+            FROM ledger
+            LEFT JOIN account_move_line l ON (l.id = ledger.id)
+            LEFT JOIN account_move m ON (m.id = l.move_id)
+            LEFT JOIN account_journal j ON (l.journal_id = j.id)
+            LEFT JOIN account_account acc ON (l.account_id = acc.id)
+            LEFT JOIN res_currency c ON (l.currency_id = c.id)
+            %s
+            ORDER BY ledger.partner_id, ledger.date NULLS FIRST, ledger.id NULLS FIRST
+        """ % (' UNION ALL '.join(parts), ', '.join(select), self._get_partner_ledger_joins())
+        self.env.cr.execute(query, params + select_params)
+
+        ledger = {}
+        for row in self.env.cr.dictfetchall():
+            entry = ledger.setdefault(row['partner_id'], {
+                'lines': [], 'debit': 0.0, 'credit': 0.0, 'debit - credit': 0.0})
+            if row['is_initial_balance']:
+                row['name'] = _('Initial Balance')
+            entry['lines'].append(row)
+            entry['debit'] += row['debit']
+            entry['credit'] += row['credit']
+            entry['debit - credit'] += row['debit'] - row['credit']
+        return ledger
+
+    def _prepare_partner_ledger_lines(self, data, lines):
+        """ Format the engine rows of one partner for the report template. """
+        currency = self.env['res.currency']
+        for r in lines:
             r['displayed_name'] = '-'.join(
                 r[field_name] for field_name in ('move_name', 'ref', 'name')
                 if r[field_name] not in (None, '', '/')
             )
-            sum += r['debit'] - r['credit']
-            r['progress'] = sum
             r['currency_id'] = currency.browse(r.get('currency_id'))
-            full_account.append(r)
-        return full_account
+        return lines
+
+    def _get_partner_ledger_entry(self, data, partner):
+        """ Ledger of ``partner``, from the one prefetched by
+        ``_get_report_values`` when available. """
+        ledger = data['computed'].setdefault('partner_ledger', {})
+        if partner.id not in ledger:
+            entry = self._get_partner_ledger(data, [partner.id]).get(partner.id)
+            ledger[partner.id] = self._prepare_partner_ledger_entry(data, entry)
+        return ledger[partner.id]
+
+    def _prepare_partner_ledger_entry(self, data, entry):
+        if not entry:
+            return {'lines': [], 'debit': 0.0, 'credit': 0.0, 'debit - credit': 0.0}
+        self._prepare_partner_ledger_lines(data, entry['lines'])
+        return entry
+
+    def _lines(self, data, partner):
+        return self._get_partner_ledger_entry(data, partner)['lines']
 
     def _sum_partner(self, data, partner, field):
         if field not in ['debit', 'credit', 'debit - credit']:
             return
-        result = 0.0
-        query_get_data = self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
-        # FIX: Use .get() with default value instead of direct access
-        reconcile_clause = "" if data['form'].get('reconciled',
-                                                  False) else ' AND "account_move_line".full_reconcile_id IS NULL '
-
-        params = [partner.id, tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'])] + \
-                 query_get_data[2]
-        query = """SELECT sum(""" + field + """)
-                FROM """ + query_get_data[0] + """, account_move AS m
-                WHERE "account_move_line".partner_id = %s
-                    AND m.id = "account_move_line".move_id
-                    AND m.state IN %s
-                    AND account_id IN %s
-                    AND """ + query_get_data[1] + reconcile_clause
-        self.env.cr.execute(query, tuple(params))
-
-        contemp = self.env.cr.fetchone()
-        if contemp is not None:
-            result = contemp[0] or 0.0
-        return result
+        return self._get_partner_ledger_entry(data, partner)[field]
 
     @api.model
     def _get_report_values(self, docids, data=None):
@@ -207,7 +294,6 @@ class ReportPartnerLedger(models.AbstractModel):
         data['computed'] = {}
 
         obj_partner = self.env['res.partner']
-        query_get_data = self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
         data['computed']['move_state'] = ['draft', 'posted']
         if data['form'].get('target_move', 'all') == 'posted':
             data['computed']['move_state'] = ['posted']
@@ -225,26 +311,19 @@ class ReportPartnerLedger(models.AbstractModel):
             WHERE a.account_type IN %s
             AND a.active""", (tuple(data['computed']['ACCOUNT_TYPE']),))
         data['computed']['account_ids'] = [a for (a,) in self.env.cr.fetchall()]
-        params = [tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'])] + query_get_data[2]
-        # FIX: Use .get() with default value instead of direct access
-        reconcile_clause = "" if data['form'].get('reconciled',
-                                                  False) else ' AND "account_move_line".full_reconcile_id IS NULL '
-        query = """
-            SELECT DISTINCT "account_move_line".partner_id
-            FROM """ + query_get_data[0] + """, account_account AS account, account_move AS am
-            WHERE "account_move_line".partner_id IS NOT NULL
-                AND "account_move_line".account_id = account.id
-                AND am.id = "account_move_line".move_id
-                AND am.state IN %s
-                AND "account_move_line".account_id IN %s
-                AND account.active
-                AND """ + query_get_data[1] + reconcile_clause
-        self.env.cr.execute(query, tuple(params))
+
+        # All the lines of all the partners at once; the template reads them
+        # back through lines() / sum_partner()
         if data['form']['partner_ids']:
             partner_ids = data['form']['partner_ids']
+            ledger = self._get_partner_ledger(data, partner_ids)
         else:
-            partner_ids = [res['partner_id'] for res in
-                           self.env.cr.dictfetchall()]
+            ledger = self._get_partner_ledger(data)
+            partner_ids = list(ledger)
+        data['computed']['partner_ledger'] = {
+            partner_id: self._prepare_partner_ledger_entry(data, ledger.get(partner_id))
+            for partner_id in partner_ids
+        }
         partners = obj_partner.browse(partner_ids)
         partners = sorted(partners, key=lambda x: (x.ref or '', x.name or ''))
 
@@ -256,4 +335,4 @@ class ReportPartnerLedger(models.AbstractModel):
             'time': time,
             'lines': self._lines,
             'sum_partner': self._sum_partner,
-        }
\ No newline at end of file
+        }
@@ -129,32 +129,11 @@ class ReportTrialBalance(models.AbstractModel):
         """
         account_result = {}
 
-        # Prepare SQL query based on selected parameters from wizard
-        tables, where_clause, where_params = self.env['account.move.line']._query_get()
-        tables = tables.replace('"', '') or 'account_move_line'
-
-        wheres = []
-        if where_clause.strip():
-            wheres.append(where_clause.strip())
-        filters = " AND ".join(wheres)
-
-        # Compute debit, credit, and balance for provided accounts
-        request = (
-            "SELECT account_id AS id, "
-            "SUM(debit) AS debit, "
-            "SUM(credit) AS credit, "
-            "(SUM(debit) - SUM(credit)) AS balance "
-            f"FROM {tables} "
-            "WHERE account_id IN %s "
-            + (f"AND {filters}" if filters else "")
-            + " GROUP BY account_id"
-        )
-
-        params = (tuple(accounts.ids),) + tuple(where_params)
-        self.env.cr.execute(request, params)
-
-        for row in self.env.cr.dictfetchall():
-            account_result[row.pop('id')] = row
+        # Per account, weighted by the analytic accounts of the context
+        rows = self.env['account.move.line']._read_analytic_balances(
+            domain=[('account_id', 'in', accounts.ids)])
+        for row in rows:
+            account_result[row.pop('account_id')] = row
 
         account_res = []
         for account in accounts:
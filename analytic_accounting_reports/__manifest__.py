@@ -11,7 +11,7 @@
     """,
     'author': 'Your Company',
     # OM / EE-like report module usually needs account as well
-    'depends': ['accounting_pdf_reports', 'analytic', 'account'],
+    'depends': ['accounting_pdf_reports', 'analytic', 'account', 'report_staging'],
     'data': [
         'security/ir.model.access.csv',
         'wizard/account_report_views.xml',
@@ -1,5 +1,4 @@
 # -*- coding: utf-8 -*-
-from datetime import timedelta
 from odoo import api, fields, models
 import logging
 
@@ -9,6 +8,7 @@ _logger = logging.getLogger(__name__)
 class AccountFinancialReportLine(models.Model):
     """Temporary model for displaying financial report lines (used in Balance Sheet / P&L)."""
     _name = 'account.financial.report.line'
+    _inherit = ['report.staging.mixin']
     _description = 'Financial Report Line'
     _order = 'sequence, code'
 
@@ -107,13 +107,7 @@ class AccountFinancialReportLine(models.Model):
         # ------------------------------------------------------------------
         if self.analytic_account_ids:
             _logger.info("Analytic filter: %s", self.analytic_account_ids.mapped('name'))
-            filtered_line_ids = []
-            for line in all_lines:
-                if line.analytic_distribution:
-                    for analytic_id in self.analytic_account_ids.ids:
-                        if str(analytic_id) in line.analytic_distribution:
-                            filtered_line_ids.append(line.id)
-                            break
+            filtered_line_ids = list(all_lines._get_analytic_weights(self.analytic_account_ids))
             _logger.info("Move lines after analytic filter: %d", len(filtered_line_ids))
             matching_lines = MoveLine.browse(filtered_line_ids)
         else:
@@ -217,21 +211,3 @@ class AccountFinancialReportLine(models.Model):
                 'sequence': 9999,
             }))
         return result
-
-    # -------------------------------------------------------------------------
-    # Maintenance (optional cron)
-    # -------------------------------------------------------------------------
-    @api.model
-    def cleanup_old_lines(self):
-        """Automatically delete temporary report lines older than 1 day."""
-        try:
-            old_date = fields.Datetime.now() - timedelta(days=1)
-            old_lines = self.search([('create_date', '<', old_date)])
-            if old_lines:
-                _logger.info("🧹 Cleaning up %d old financial report lines...", len(old_lines))
-                old_lines.unlink()
-            else:
-                _logger.info("✅ No old financial report lines found to clean up.")
-        except Exception as e:
-            _logger.exception("Error during cleanup_old_lines: %s", e)
-
@@ -8,7 +8,8 @@ class ReportFinancial(models.AbstractModel):
     _inherit = 'report.accounting_pdf_reports.report_financial'
 
     def _compute_account_balance(self, accounts):
-        """Override to add analytic distribution filtering"""
+        """Log the analytic filter; the balances are weighted by the analytic
+        accounts of the context in account.move.line._read_analytic_balances"""
 
         # Get analytic filter from context
         analytic_account_ids = self.env.context.get('analytic_account_ids', [])
@@ -22,108 +23,7 @@ class ReportFinancial(models.AbstractModel):
             _logger.info("Sample accounts: %s", [(a.code, a.name) for a in accounts[:3]])
         _logger.info("=" * 80)
 
-        mapping = {
-            'balance': "COALESCE(SUM(debit),0) - COALESCE(SUM(credit), 0) as balance",
-            'debit': "COALESCE(SUM(debit), 0) as debit",
-            'credit': "COALESCE(SUM(credit), 0) as credit",
-        }
-
-        res = {}
-        for account in accounts:
-            res[account.id] = {k: 0.0 for k in mapping.keys()}
-
-        if not accounts:
-            return res
-
-        # Build base query parts
-        tables, where_clause, where_params = self.env['account.move.line']._query_get()
-        tables = (tables or "account_move_line").replace('"', '')
-        where_clause = where_clause.strip() if where_clause else ''
-        where_params = list(where_params) if where_params else []
-
-        _logger.info("Base tables: %s", tables)
-        _logger.info("Base where_clause: %s", where_clause)
-
-        # Build WHERE conditions
-        wheres = ["account_id IN %s"]
-        params = [tuple(accounts.ids)]
-
-        if where_clause:
-            wheres.append("(%s)" % where_clause)
-            params.extend(where_params)
-
-        # Add analytic filter ONLY if analytic_account_ids are provided
-        if analytic_account_ids:
-            _logger.info("🏢 APPLYING analytic filter for IDs: %s", analytic_account_ids)
-
-            # First, let's check what data exists
-            test_query = f"SELECT DISTINCT analytic_distribution FROM {tables} WHERE account_id IN %s LIMIT 10"
-            self.env.cr.execute(test_query, (tuple(accounts.ids),))
-            sample_distributions = [r[0] for r in self.env.cr.fetchall() if r[0]]
-            _logger.info("📊 Sample analytic_distributions in database: %s", sample_distributions)
-
-            analytic_conditions = []
-            for analytic_id in analytic_account_ids:
-                # Try both string and integer keys
-                analytic_conditions.append(
-                    f"(account_move_line.analytic_distribution ? '{str(analytic_id)}')"
-                )
-
-            if analytic_conditions:
-                analytic_filter = "(" + " OR ".join(analytic_conditions) + ")"
-                wheres.append(analytic_filter)
-                _logger.info("✅ Analytic filter SQL: %s", analytic_filter)
-        else:
-            _logger.info("ℹ️  NO analytic filter - showing ALL data")
-
-        where_str = " AND ".join(wheres)
-        request = (
-                "SELECT account_id as id, " + ', '.join(mapping.values()) +
-                " FROM " + tables +
-                " WHERE " + where_str +
-                " GROUP BY account_id"
-        )
-
-        _logger.info("=" * 80)
-        _logger.info("📊 FINAL SQL:")
-        _logger.info(request)
-        _logger.info("Params: %s", params)
-        _logger.info("=" * 80)
-
-        try:
-            self.env.cr.execute(request, tuple(params))
-
-            result_count = 0
-            for row in self.env.cr.dictfetchall():
-                res[row['id']] = {
-                    'balance': row.get('balance', 0.0),
-                    'debit': row.get('debit', 0.0),
-                    'credit': row.get('credit', 0.0),
-                }
-                result_count += 1
-
-            _logger.info("✅ Query returned %d accounts with data", result_count)
-
-            if result_count > 0:
-                # Show first 3 results
-                for i, (acc_id, values) in enumerate(list(res.items())[:3]):
-                    if values['balance'] != 0 or values['debit'] != 0 or values['credit'] != 0:
-                        account = self.env['account.account'].browse(acc_id)
-                        _logger.info("  %s (%s): Bal=%.2f, Dr=%.2f, Cr=%.2f",
-                                     account.code, account.name,
-                                     values['balance'], values['debit'], values['credit'])
-            else:
-                _logger.warning("⚠️  ZERO results returned!")
-                _logger.warning("   Either no data exists OR filter is too restrictive")
-
-        except Exception as e:
-            _logger.error("❌ SQL Error: %s", str(e))
-            _logger.error("Query: %s", request)
-            _logger.error("Params: %s", params)
-            raise
-
-        _logger.info("=" * 80)
-        return res
+        return super()._compute_account_balance(accounts)
 
     @api.model
     def _get_report_values(self, docids, data=None):
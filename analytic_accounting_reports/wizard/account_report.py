@@ -195,9 +195,6 @@ class AccountingReport(models.TransientModel):
         if self.account_report_id and 'loss' in self.account_report_id.name.lower():
             report_type = 'profit_loss'
 
-        # Clear old temporary lines
-        self.env['account.financial.report.line'].search([]).unlink()
-
         ctx = self._build_contexts({'form': self.read()[0]})
         analytic_ids = ctx.get('analytic_account_ids', [])
         date_from = ctx.get('date_from')
@@ -238,33 +235,39 @@ class AccountingReport(models.TransientModel):
                 ]),
             ])
 
-        ReportLine = self.env['account.financial.report.line']
         FinancialReport = self.env['report.accounting_pdf_reports.report_financial']
 
+        income_types = ['income', 'other_income']
+        expense_types = ['expense', 'other_expense', 'depreciation',
+                         'expense_direct_cost', 'expense_cost_of_revenue']
+
+        # Balances of every account involved, read with one grouped query
+        all_types = set(income_types + expense_types)
+        for account_types in group_mapping.values():
+            all_types.update(account_types)
+        all_accounts = self.env['account.account'].search([('account_type', 'in', list(all_types))])
+        balances = FinancialReport.with_context(ctx)._compute_account_balance(all_accounts)
+
+        line_vals = []
         sequence = 1
         group_totals = {}
         equity_last_account_seq = None
 
         # Build sections and account lines
         for group_name, account_types in group_mapping.items():
-            accounts = self.env['account.account'].search([('account_type', 'in', account_types)])
+            accounts = all_accounts.filtered(lambda acc: acc.account_type in account_types)
             if not accounts:
                 continue
 
-            balances = FinancialReport.with_context(ctx)._compute_account_balance(accounts)
             total_balance = total_debit = total_credit = 0.0
 
-            # Create section header
-            section = ReportLine.create({
+            # Section header, totals are set once its accounts are known
+            section = {
                 'name': f"<b>{group_name}</b>",
                 'is_section': True,
                 'sequence': sequence,
-                'report_type': report_type,
-                'date_from': date_from,
-                'date_to': date_to,
-                'target_move': target_move,
-                'analytic_account_ids': [(6, 0, analytic_ids)],
-            })
+            }
+            line_vals.append(section)
             sequence += 1
 
             # Create account lines
@@ -284,19 +287,14 @@ class AccountingReport(models.TransientModel):
                 total_debit += debit
                 total_credit += credit
 
-                ReportLine.create({
+                line_vals.append({
                     'name': acc.name,
                     'code': acc.code,
                     'account_id': acc.id,
                     'debit': debit,
                     'credit': credit,
                     'balance': balance,
-                    'report_type': report_type,
                     'sequence': sequence,
-                    'date_from': date_from,
-                    'date_to': date_to,
-                    'target_move': target_move,
-                    'analytic_account_ids': [(6, 0, analytic_ids)],
                 })
 
                 if group_name == 'EQUITY':
@@ -304,7 +302,7 @@ class AccountingReport(models.TransientModel):
 
                 sequence += 1
 
-            section.write({
+            section.update({
                 'debit': total_debit,
                 'credit': total_credit,
                 'balance': total_balance,
@@ -319,18 +317,10 @@ class AccountingReport(models.TransientModel):
             expense_total = group_totals.get('EXPENSES', 0.0)
             net = income_total - expense_total
         else:
-            income_accounts = self.env['account.account'].search([
-                ('account_type', 'in', ['income', 'other_income'])
-            ])
-            expense_accounts = self.env['account.account'].search([
-                ('account_type', 'in', ['expense', 'other_expense', 'depreciation',
-                                        'expense_direct_cost', 'expense_cost_of_revenue'])
-            ])
-
-            inc_bal = sum(v.get('balance', 0.0) for v in
-                          FinancialReport.with_context(ctx)._compute_account_balance(income_accounts).values())
-            exp_bal = sum(v.get('balance', 0.0) for v in
-                          FinancialReport.with_context(ctx)._compute_account_balance(expense_accounts).values())
+            inc_bal = sum(balances[acc.id].get('balance', 0.0) for acc in all_accounts
+                          if acc.account_type in income_types)
+            exp_bal = sum(balances[acc.id].get('balance', 0.0) for acc in all_accounts
+                          if acc.account_type in expense_types)
 
             net = abs(inc_bal) - abs(exp_bal)
 
@@ -342,27 +332,25 @@ class AccountingReport(models.TransientModel):
         else:
             insert_sequence = sequence + 1
 
-        ReportLine.create({
+        line_vals.append({
             'name': label,
             'is_total': True,
-            'report_type': report_type,
             'balance': display_value,
             'sequence': insert_sequence,
+        })
+
+        # Lines of this run only, created in one batch
+        filter_vals = {
+            'report_type': report_type,
             'date_from': date_from,
             'date_to': date_to,
             'target_move': target_move,
             'analytic_account_ids': [(6, 0, analytic_ids)],
-        })
-
-        return {
-            'type': 'ir.actions.act_window',
-            'name': f'{self.account_report_id.name} Details',
-            'res_model': 'account.financial.report.line',
-            'view_mode': 'list',
-            'target': 'current',
-            'domain': [('report_type', '=', report_type)],
-            'context': ctx,
         }
+        run, __ = self.env['account.financial.report.line']._stage_rows(
+            [dict(vals, **filter_vals) for vals in line_vals],
+            name=f'{self.account_report_id.name} Details')
+        return run._get_action(context=ctx)
 
 
 
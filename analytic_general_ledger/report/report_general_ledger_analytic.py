@@ -45,21 +45,17 @@ class ReportGeneralLedgerAnalytic(models.AbstractModel):
         filters = " AND " + where_clause if where_clause else ""
         filters = filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
 
-        # Add analytic filter if specified
-        analytic_filter = ""
-        if analytic_account_ids:
-            analytic_conditions = []
-            for analytic_id in analytic_account_ids:
-                analytic_conditions.append(f"l.analytic_distribution LIKE '%%\"{analytic_id}\"%%'")
-            if analytic_conditions:
-                analytic_filter = " AND (" + " OR ".join(analytic_conditions) + ")"
+        # _query_get keeps the lines of the analytic accounts, weight them by
+        # the share of those accounts
+        weight_join, weight_params = MoveLine._analytic_weight_sql(analytic_account_ids, alias='l')
 
         sql = ('''SELECT l.id AS lid, l.account_id AS account_id,
             l.date AS ldate, j.code AS lcode, l.currency_id,
             l.amount_currency, l.analytic_distribution,
-            l.ref AS lref, l.name AS lname, COALESCE(l.debit,0) AS debit,
-            COALESCE(l.credit,0) AS credit,
-            (l.debit - l.credit) AS balance,
+            l.ref AS lref, l.name AS lname,
+            COALESCE(l.debit,0) * analytic_weight.weight AS debit,
+            COALESCE(l.credit,0) * analytic_weight.weight AS credit,
+            (l.debit - l.credit) * analytic_weight.weight AS balance,
             m.name AS move_name, c.symbol AS currency_code,
             p.name AS partner_name,
             COALESCE(pay.manual_currency_exchange_rate, 0.0) AS manual_currency_exchange_rate,
@@ -73,10 +69,11 @@ class ReportGeneralLedgerAnalytic(models.AbstractModel):
             JOIN account_account acc ON (l.account_id = acc.id)
             LEFT JOIN account_payment pay ON (pay.move_id = m.id)
             LEFT JOIN res_company comp ON (m.company_id = comp.id)
-            WHERE l.account_id IN %s ''' + filters + analytic_filter + '''
+            ''' + weight_join + '''
+            WHERE l.account_id IN %s ''' + filters + '''
             ORDER BY ''' + sql_sort)
 
-        params = (tuple(accounts.ids),) + tuple(where_params)
+        params = tuple(weight_params) + (tuple(accounts.ids),) + tuple(where_params)
         cr.execute(sql, params)
 
         for row in cr.dictfetchall():
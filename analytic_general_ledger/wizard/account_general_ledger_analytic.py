@@ -72,20 +72,11 @@ class AccountReportGeneralLedgerAnalytic(models.TransientModel):
 
         all_lines = self.env['account.move.line'].search(domain, order='account_id, date, id')
 
-        # Analytic filter (Python-side, safe)
+        # Share of each line attributed to the selected analytic accounts
+        weights = {}
         if self.analytic_account_ids:
-            selected_ids = set(self.analytic_account_ids.ids)
-            filtered = []
-            for line in all_lines:
-                if line.analytic_distribution:
-                    try:
-                        dist = line.analytic_distribution if isinstance(line.analytic_distribution, dict) \
-                            else json.loads(line.analytic_distribution)
-                        if selected_ids & set(int(k) for k in dist.keys()):
-                            filtered.append(line)
-                    except Exception:
-                        pass
-            all_lines = self.env['account.move.line'].browse([l.id for l in filtered])
+            weights = all_lines._get_analytic_weights(self.analytic_account_ids)
+            all_lines = all_lines.filtered(lambda l: l.id in weights)
 
         if not all_lines:
             return []
@@ -119,7 +110,7 @@ class AccountReportGeneralLedgerAnalytic(models.TransientModel):
         # Build result rows using ORM field access (no raw column name issues)
         rows = []
         for line in all_lines:
-            rate = rate_map.get(line.move_id.id, 1.0)
+            rate = rate_map.get(line.move_id.id, 1.0) * weights.get(line.id, 1.0)
             debit = line.debit * rate
             credit = line.credit * rate
             balance = debit - credit
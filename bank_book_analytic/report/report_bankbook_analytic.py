@@ -8,13 +8,42 @@ class ReportBankBookAnalytic(models.AbstractModel):
     _description = 'Bank Book with Analytic Accounts'
     _inherit = 'report.om_account_daily_reports.report_bankbook'
 
-    def _get_account_move_entry(self, accounts, init_balance, sortby, display_account):
-        cr = self.env.cr
+    def _get_ledger_select(self):
+        select, params = super()._get_ledger_select()
+        return select + [
+            'l.analytic_distribution',
+            'm.id AS move_id',
+            "COALESCE(pay.memo_new, '') AS memo",
+        ], params
+
+    def _get_ledger_joins(self):
+        return super()._get_ledger_joins() + ' LEFT JOIN account_payment pay ON (pay.move_id = m.id)'
+
+    def _get_ledger_order(self, sortby):
+        # Always sort by date, partner for bank book
+        return 'l.date, p.name, l.move_id'
+
+    def _get_ledger_amount_factor(self):
+        # Apply manual currency exchange rate if payment currency differs from company currency
+        return """
+            CASE WHEN rate_pay.manual_currency_exchange_rate > 0
+                      AND rate_pay.currency_id != rate_comp.currency_id
+                 THEN rate_pay.manual_currency_exchange_rate ELSE 1.0 END
+        """, """
+            LEFT JOIN account_payment rate_pay ON (rate_pay.move_id = m.id)
+            LEFT JOIN res_company rate_comp ON (m.company_id = rate_comp.id)
+        """
+
+    def _prepare_ledger_row(self, row):
+        row = super()._prepare_ledger_row(row)
+        analytic_info = self._get_analytic_info(row.get('analytic_distribution'))
+        row['analytic_account_ids'] = analytic_info['ids']
+        row['analytic_account_names'] = analytic_info['names']
+        return row
+
+    def _iter_account_move_entry(self, accounts, init_balance, sortby):
         MoveLine = self.env['account.move.line']
-        move_lines = {x: [] for x in accounts.ids}
-
         analytic_ids = self.env.context.get('analytic_account_ids', [])
-        report_type = self.env.context.get('report_type', 'combined')
         show_without_analytic = self.env.context.get('show_without_analytic', True)
 
         # Get partner_ids - can be recordset, list, or string (from serialized context)
@@ -44,164 +73,31 @@ class ReportBankBookAnalytic(models.AbstractModel):
 
         # Create a modified context with partner_ids as recordset for accounting_pdf_reports module
         modified_context = dict(self.env.context)
-        if partner_ids_list:
-            modified_context['partner_ids'] = self.env['res.partner'].browse(partner_ids_list)
-        else:
-            # Empty recordset if no partners selected
-            modified_context['partner_ids'] = self.env['res.partner']
-
-        # Initial balance
-        if init_balance:
-            init_tables, init_where_clause, init_where_params = MoveLine.with_context(
-                modified_context,
-                date_from=self.env.context.get('date_from'),
-                date_to=False,
-                initial_bal=True
-            )._query_get()
-
-            init_wheres = [""]
-            if init_where_clause.strip():
-                init_wheres.append(init_where_clause.strip())
-
-            if analytic_ids:
-                if show_without_analytic:
-                    init_wheres.append(
-                        "(l.analytic_distribution::text LIKE ANY(ARRAY[%s]) OR l.analytic_distribution IS NULL)")
-                    init_where_params += ([f'%"{aid}%' for aid in analytic_ids],)
-                else:
-                    init_wheres.append("l.analytic_distribution::text LIKE ANY(ARRAY[%s])")
-                    init_where_params += ([f'%"{aid}%' for aid in analytic_ids],)
-
-            init_filters = " AND ".join(init_wheres)
-            filters = init_filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
-
-            sql = ("""
-                SELECT 0 AS lid,
-                       l.account_id AS account_id,
-                       '' AS ldate, '' AS lcode, 0.0 AS amount_currency,
-                       '' AS lref, 'Initial Balance' AS lname,
-                       COALESCE(SUM(l.credit), 0.0) AS credit,
-                       COALESCE(SUM(l.debit), 0.0) AS debit,
-                       COALESCE(SUM(l.debit), 0) - COALESCE(SUM(l.credit), 0) AS balance,
-                       '' AS lpartner_id, '' AS move_name, '' AS currency_code,
-                       NULL AS currency_id, '' AS partner_name,
-                       '' AS analytic_account_id, '' AS analytic_account_name,
-                       '' AS memo
-                FROM account_move_line l
-                LEFT JOIN account_move m ON (l.move_id = m.id)
-                LEFT JOIN res_currency c ON (l.currency_id = c.id)
-                LEFT JOIN res_partner p ON (l.partner_id = p.id)
-                JOIN account_journal j ON (l.journal_id = j.id)
-                JOIN account_account acc ON (l.account_id = acc.id)
-                WHERE l.account_id IN %s """ + filters + ' GROUP BY l.account_id'
-                   )
-
-            params = (tuple(accounts.ids),) + tuple(init_where_params)
-            cr.execute(sql, params)
-            for row in cr.dictfetchall():
-                move_lines[row.pop('account_id')].append(row)
-
-        # Always sort by date, partner for bank book
-        sql_sort = 'l.date, p.name, l.move_id'
-
-        # Main query
-        tables, where_clause, where_params = MoveLine.with_context(modified_context)._query_get()
-        wheres = [""]
-        if where_clause.strip():
-            wheres.append(where_clause.strip())
+        # The analytic filter is added below, with the lines without
+        # distribution when show_without_analytic is set
+        modified_context.pop('analytic_account_ids', None)
+        modified_context['partner_ids'] = self.env['res.partner'].browse(partner_ids_list)
 
+        analytic_where, analytic_params = '', []
         if analytic_ids:
-            if show_without_analytic:
-                wheres.append("(l.analytic_distribution::text LIKE ANY(ARRAY[%s]) OR l.analytic_distribution IS NULL)")
-                where_params += ([f'%"{aid}%' for aid in analytic_ids],)
-            else:
-                wheres.append("l.analytic_distribution::text LIKE ANY(ARRAY[%s])")
-                where_params += ([f'%"{aid}%' for aid in analytic_ids],)
-
-        filters = " AND ".join(wheres).replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
-
-        if not accounts:
-            journals = self.env['account.journal'].search([('type', '=', 'bank')])
-            accounts = self.env['account.account']
-            for journal in journals:
-                for acc_out in journal.outbound_payment_method_line_ids:
-                    if acc_out.payment_account_id:
-                        accounts += acc_out.payment_account_id
-                for acc_in in journal.inbound_payment_method_line_ids:
-                    if acc_in.payment_account_id:
-                        accounts += acc_in.payment_account_id
-
-        # Join account.payment to fetch memo_new and manual_currency_exchange_rate
-        sql = ('''
-                    SELECT l.id AS lid, l.account_id AS account_id, l.date AS ldate, j.code AS lcode,
-                           l.currency_id, l.amount_currency, l.ref AS lref, l.name AS lname,
-                           COALESCE(l.debit, 0) AS debit, COALESCE(l.credit, 0) AS credit,
-                           COALESCE(SUM(l.debit), 0) - COALESCE(SUM(l.credit), 0) AS balance,
-                           m.name AS move_name, c.symbol AS currency_code, p.name AS partner_name,
-                           l.analytic_distribution, m.id AS move_id,
-                           COALESCE(pay.memo_new, '') AS memo,
-                           COALESCE(pay.manual_currency_exchange_rate, 0.0) AS manual_currency_exchange_rate,
-                           pay.currency_id AS payment_currency_id,
-                           comp.currency_id AS company_currency_id
-                    FROM account_move_line l
-                    JOIN account_move m ON (l.move_id = m.id)
-                    LEFT JOIN res_currency c ON (l.currency_id = c.id)
-                    LEFT JOIN res_partner p ON (l.partner_id = p.id)
-                    JOIN account_journal j ON (l.journal_id = j.id)
-                    JOIN account_account acc ON (l.account_id = acc.id)
-                    LEFT JOIN account_payment pay ON (pay.move_id = m.id)
-                    LEFT JOIN res_company comp ON (m.company_id = comp.id)
-                    WHERE l.account_id IN %s ''' + filters + '''
-                    GROUP BY l.id, l.account_id, l.date, j.code, l.currency_id, l.amount_currency,
-                             l.ref, l.name, m.name, c.symbol, p.name, l.analytic_distribution, m.id,
-                             pay.memo_new, pay.manual_currency_exchange_rate,
-                             pay.currency_id, comp.currency_id
-                    ORDER BY ''' + sql_sort
-               )
-
-        params = (tuple(accounts.ids),) + tuple(where_params)
-        cr.execute(sql, params)
-
-        for row in cr.dictfetchall():
-            # Apply manual currency exchange rate if payment currency differs from company currency
-            rate = row.get('manual_currency_exchange_rate', 0.0)
-            pay_currency = row.get('payment_currency_id')
-            comp_currency = row.get('company_currency_id')
-            if rate and rate > 0.0 and pay_currency and comp_currency and pay_currency != comp_currency:
-                row['debit'] = row['debit'] * rate
-                row['credit'] = row['credit'] * rate
-                row['balance'] = row['balance'] * rate
-
-            balance = 0
-            for line in move_lines.get(row['account_id']):
-                balance += line['debit'] - line['credit']
-            row['balance'] += balance
-
-            analytic_info = self._get_analytic_info(row.get('analytic_distribution'))
-            row['analytic_account_ids'] = analytic_info['ids']
-            row['analytic_account_names'] = analytic_info['names']
-
-            move_lines[row.pop('account_id')].append(row)
-
-        account_res = []
-        for account in accounts:
-            currency = account.currency_id or self.env.company.currency_id
-            res = {fn: 0.0 for fn in ['credit', 'debit', 'balance']}
-            res.update({'code': account.code, 'name': account.name, 'move_lines': move_lines[account.id]})
-
-            for line in res.get('move_lines'):
-                res['debit'] += line['debit']
-                res['credit'] += line['credit']
-                res['balance'] = line['balance']
-
-            if display_account == 'all':
-                account_res.append(res)
-            elif display_account == 'movement' and res.get('move_lines'):
-                account_res.append(res)
-            elif display_account == 'not_zero' and not currency.is_zero(res['balance']):
-                account_res.append(res)
-
-        return account_res
+            analytic_where, analytic_params = MoveLine._analytic_filter_sql(
+                analytic_ids, alias='l', include_unassigned=show_without_analytic)
+
+        return self._iter_ledger(
+            accounts, init_balance, sortby,
+            query_context=modified_context,
+            analytic_ids=analytic_ids,
+            include_unassigned=show_without_analytic,
+            extra_where=analytic_where,
+            extra_params=analytic_params,
+        )
+
+    def _get_ledger_xlsx_columns(self):
+        columns = super()._get_ledger_xlsx_columns()
+        return columns[:6] + [
+            (_('Analytic Accounts'), 'analytic_account_names', 'text'),
+            (_('Memo'), 'memo', 'text'),
+        ] + columns[6:]
 
     def _get_analytic_info(self, analytic_distribution):
         result = {'ids': [], 'names': ''}
@@ -316,17 +212,7 @@ class ReportBankBookAnalytic(models.AbstractModel):
         if data['form'].get('journal_ids', False):
             codes = [journal.code for journal in self.env['account.journal'].browse(data['form']['journal_ids'])]
 
-        accounts = self.env['account.account'].browse(data['form']['account_ids'])
-        if not accounts:
-            journals = self.env['account.journal'].search([('type', '=', 'bank')])
-            accounts = self.env['account.account']
-            for journal in journals:
-                for acc_out in journal.outbound_payment_method_line_ids:
-                    if acc_out.payment_account_id:
-                        accounts += acc_out.payment_account_id
-                for acc_in in journal.inbound_payment_method_line_ids:
-                    if acc_in.payment_account_id:
-                        accounts += acc_in.payment_account_id
+        accounts = self._get_book_accounts(self.env['account.account'].browse(data['form']['account_ids']))
 
         record = self.with_context(data['form'].get('comparison_context', {}))._get_account_move_entry(
             accounts, init_balance, sortby, display_account
@@ -52,21 +52,21 @@ class AccountBankBookReportAnalytic(models.TransientModel):
 
         return result
 
-    def check_report(self):
-        data = {}
-        data['form'] = self.read([
+    def _get_report_fields(self):
+        return [
             'target_move', 'date_from', 'date_to', 'journal_ids',
             'account_ids', 'initial_balance', 'display_account',
             'analytic_account_ids', 'report_type', 'show_without_analytic',
             'partner_ids'
-        ])[0]
+        ]
 
-        comparison_context = self._build_comparison_context(data)
-        data['form']['comparison_context'] = comparison_context
+    def _get_ledger_report(self):
+        return self.env['report.bank_book_analytic.report_bankbook_analytic']
 
+    def check_report(self):
         return self.env.ref(
             'bank_book_analytic.action_report_bankbook_analytic'
-        ).report_action(self, data=data)
+        ).report_action(self, data=self._get_report_data())
 
     def _get_memo_for_move(self, move_id):
         """Fetch memo_new from account.payment linked to the given account.move id."""
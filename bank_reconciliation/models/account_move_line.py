@@ -1,4 +1,5 @@
 from odoo import api, fields, models, _
+from odoo.exceptions import UserError
 
 
 class AccountMoveLine(models.Model):
@@ -10,6 +11,15 @@ class AccountMoveLine(models.Model):
         copy=False,
         index=True
     )
+    bank_statement_ids = fields.Many2many(
+        'bank.statement',
+        'bank_statement_line_rel',
+        'line_id',
+        'statement_id',
+        string='Bank Reconciliations',
+        copy=False,
+        readonly=True
+    )
     statement_date = fields.Date(
         string='Bank Statement Date',
         copy=False,
@@ -48,14 +58,29 @@ class AccountMoveLine(models.Model):
 
         # Handle reconciliation status changes
         if 'statement_date' in vals:
-            for record in self:
-                if vals.get('statement_date'):
-                    # Mark as reconciled when statement date is set
-                    if record.payment_id and record.payment_id.state == 'posted':
-                        record.payment_id.write({'state': 'reconciled'})
-                else:
-                    # Unmark reconciliation when statement date is removed
-                    if record.payment_id and record.payment_id.state == 'reconciled':
-                        record.payment_id.write({'state': 'posted'})
-
-        return res
\ No newline at end of file
+            self._sync_payment_reconciliation_state(bool(vals.get('statement_date')))
+
+        return res
+
+    def _sync_payment_reconciliation_state(self, cleared):
+        """Mark the payments of the lines as reconciled when their statement
+        date is set, back to posted when it is removed"""
+        payments = self.payment_id
+        if cleared:
+            payments.filtered(lambda p: p.state == 'posted').write({'state': 'reconciled'})
+        else:
+            payments.filtered(lambda p: p.state == 'reconciled').write({'state': 'posted'})
+
+    def _get_bank_statement_from_context(self):
+        statement = self.env['bank.statement'].browse(self.env.context.get('bank_statement_id'))
+        if not statement.exists():
+            raise UserError(_('Open the lines from a bank reconciliation statement.'))
+        return statement
+
+    def action_bank_statement_clear(self):
+        """Clear the selected lines on the statement of the context"""
+        self._get_bank_statement_from_context().action_clear_lines(self.ids)
+
+    def action_bank_statement_unclear(self):
+        """Unclear the selected lines on the statement of the context"""
+        self._get_bank_statement_from_context().action_unclear_lines(self.ids)
\ No newline at end of file
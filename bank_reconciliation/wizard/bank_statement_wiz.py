@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from odoo.tools import SQL
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -35,6 +38,23 @@ class BankStatement(models.Model):
         string='Statement Lines'
     )
 
+    # Balances of the bank GL history, computed once per journal / date_to
+    # so that ticking a statement line only sums the lines of the statement
+    cached_gl_balance = fields.Monetary(
+        string='Cached Balance as per Company Books',
+        compute='_compute_cached_balances',
+        store=True,
+        readonly=True,
+        help="Posted balance of the reconcile accounts up to Date To. "
+             "Refreshed when the lines are reloaded and by the daily cron."
+    )
+    cached_cleared_balance = fields.Monetary(
+        string='Cached Previously Cleared Balance',
+        compute='_compute_cached_balances',
+        store=True,
+        readonly=True,
+        help="Balance of the lines cleared up to Date To outside of this statement."
+    )
     gl_balance = fields.Monetary(
         string='Balance as per Company Books',
         readonly=True,
@@ -170,109 +190,191 @@ class BankStatement(models.Model):
                 }
             }
 
-        # Build domain to include all relevant accounts
-        domain = [
-            ('account_id', 'in', reconcile_accounts),
-            ('statement_date', '=', False),
-            ('move_id.state', '=', 'posted'),
-            ('date', '>=', self.date_from),
-            ('date', '<=', self.date_to),
-        ]
+        # Big periods are loaded server side once the statement is saved:
+        # the whole set would otherwise round-trip through the onchange
+        domain = self._get_candidate_lines_domain(reconcile_accounts)
+        line_limit = int(self.env['ir.config_parameter'].sudo().get_param(
+            'bank_reconciliation.onchange_line_limit', 1000))
+        count = self.env['account.move.line'].search_count(domain)
+        if count > line_limit:
+            self.line_ids = [(5, 0, 0)]
+            self._compute_cached_balances()
+            return {
+                'warning': {
+                    'title': _('Too Many Transactions'),
+                    'message': _('%(count)d transactions match this period. Save the statement, '
+                                 'then use Reload Lines and Candidate Lines to reconcile them.',
+                                 count=count),
+                }
+            }
 
         lines = self.env['account.move.line'].search(domain)
 
         if lines:
             self.line_ids = [(6, 0, lines.ids)]
             _logger.info(f"Loaded {len(lines)} unreconciled transactions for {self.journal_id.name}")
-            _logger.info(f"Account breakdown: {lines.mapped('account_id.name')}")
         else:
             self.line_ids = [(5, 0, 0)]
             _logger.warning(f"No unreconciled transactions found for {self.journal_id.name} "
                             f"between {self.date_from} and {self.date_to}")
 
-    @api.depends('line_ids.statement_date', 'account_id', 'date_to', 'journal_id')
-    def _compute_amount(self):
-        """Calculate GL balance, bank balance, and difference"""
+        # Refresh the cached balances for the new set of lines
+        self._compute_cached_balances()
+
+    def _get_candidate_lines_domain(self, reconcile_accounts=None):
+        """Uncleared posted lines of the reconcile accounts in the period"""
+        self.ensure_one()
+        if reconcile_accounts is None:
+            reconcile_accounts = self._get_reconcile_accounts()
+        return [
+            ('account_id', 'in', reconcile_accounts),
+            ('statement_date', '=', False),
+            ('move_id.state', '=', 'posted'),
+            ('date', '>=', self.date_from),
+            ('date', '<=', self.date_to),
+        ]
+
+    def _load_candidate_lines(self):
+        """Replace the lines of saved statements by their candidate lines,
+        with one INSERT ... SELECT per statement instead of an x2many
+        command carrying every id."""
+        MoveLine = self.env['account.move.line']
+        MoveLine.flush_model(['account_id', 'statement_date', 'parent_state', 'date'])
+        self.flush_recordset(['line_ids'])
         for record in self:
-            if not record.account_id:
-                record.gl_balance = 0.0
-                record.bank_balance = 0.0
-                record.balance_difference = 0.0
+            self.env.cr.execute(
+                "DELETE FROM bank_statement_line_rel WHERE statement_id = %s", (record.id,))
+            reconcile_accounts = record._get_reconcile_accounts() if record.account_id else []
+            if not (reconcile_accounts and record.date_from and record.date_to):
                 continue
+            query = MoveLine._search(record._get_candidate_lines_domain(reconcile_accounts))
+            self.env.cr.execute(SQL(
+                "INSERT INTO bank_statement_line_rel (statement_id, line_id) %s",
+                query.select(SQL("%s", record.id), SQL.identifier(MoveLine._table, 'id')),
+            ))
+            _logger.info(f"Loaded {self.env.cr.rowcount} unreconciled transactions for {record.journal_id.name}")
+        self.invalidate_recordset(['line_ids'])
+        self._compute_cached_balances()
+
+    def _get_lines_cleared_balance(self, origin=False):
+        """Balance of the statement lines cleared up to date_to, per
+        statement. Saved statements are summed in SQL, statements being
+        edited from their lines in memory (stored values with ``origin``).
+
+        :returns: {statement: balance}
+        """
+        result = {}
+        saved = self.filtered('id')
+        if saved:
+            self.env['account.move.line'].flush_model(['balance', 'parent_state', 'statement_date'])
+            saved.flush_recordset(['line_ids', 'date_to'])
+            self.env.cr.execute("""
+                SELECT rel.statement_id, SUM(aml.balance)
+                FROM bank_statement_line_rel rel
+                JOIN bank_statement st ON st.id = rel.statement_id
+                JOIN account_move_line aml ON aml.id = rel.line_id
+                WHERE rel.statement_id = ANY(%s)
+                  AND aml.parent_state = 'posted'
+                  AND aml.statement_date <= COALESCE(st.date_to, CURRENT_DATE)
+                GROUP BY rel.statement_id
+            """, (saved.ids,))
+            amounts = dict(self.env.cr.fetchall())
+            for record in saved:
+                result[record] = amounts.get(record.id, 0.0)
+        for record in self - saved:
+            date_to = record.date_to or fields.Date.today()
+            lines = record.line_ids._origin if origin else record.line_ids
+            result[record] = sum(
+                line.debit - line.credit
+                for line in lines
+                if line.parent_state == 'posted'
+                and line.statement_date and line.statement_date <= date_to
+            )
+        return result
 
-            # Get all accounts to consider
-            reconcile_accounts = record._get_reconcile_accounts()
+    @api.model
+    def _get_reconciliation_balances(self, account_ids, date_to):
+        """Posted balance up to ``date_to`` and balance cleared up to
+        ``date_to`` of ``account_ids``, in one aggregate over the GL.
+
+        :returns: (gl_balance, cleared_balance)
+        """
+        self.env['account.move.line'].flush_model(
+            ['account_id', 'balance', 'date', 'parent_state', 'statement_date'])
+        self.env.cr.execute("""
+            SELECT COALESCE(SUM(balance) FILTER (
+                       WHERE %(date_to)s::date IS NULL OR date <= %(date_to)s), 0),
+                   COALESCE(SUM(balance) FILTER (
+                       WHERE statement_date IS NOT NULL
+                         AND (%(date_to)s::date IS NULL OR statement_date <= %(date_to)s)), 0)
+            FROM account_move_line
+            WHERE account_id = ANY(%(account_ids)s)
+              AND parent_state = 'posted'
+              AND (%(date_to)s::date IS NULL OR date <= %(date_to)s OR statement_date <= %(date_to)s)
+        """, {'account_ids': list(account_ids), 'date_to': date_to})
+        return self.env.cr.fetchone()
+
+    @api.depends('account_id', 'date_to', 'journal_id')
+    def _compute_cached_balances(self):
+        """Run the GL aggregate once per set of reconcile accounts and
+        date_to, then take the lines of each statement out of the cleared
+        balance: they are summed with their current statement date by
+        _compute_amount."""
+        groups = defaultdict(list)
+        for record in self:
+            accounts = record._get_reconcile_accounts() if record.account_id else []
+            if not accounts:
+                record.cached_gl_balance = 0.0
+                record.cached_cleared_balance = 0.0
+                continue
+            groups[(tuple(sorted(accounts)), record.date_to)].append(record)
 
-            if not reconcile_accounts:
+        for (accounts, date_to), records in groups.items():
+            gl_balance, cleared_balance = self._get_reconciliation_balances(accounts, date_to)
+            own_cleared = self.concat(*records)._get_lines_cleared_balance(origin=True)
+            for record in records:
+                record.cached_gl_balance = gl_balance
+                record.cached_cleared_balance = cleared_balance - own_cleared[record]
+
+    @api.depends('line_ids.statement_date', 'date_to', 'cached_gl_balance', 'cached_cleared_balance')
+    def _compute_amount(self):
+        """Calculate GL balance, bank balance, and difference. Only the
+        lines of the statement are summed, in SQL once it is saved, the
+        rest comes from the cached balances."""
+        current_balances = self._get_lines_cleared_balance()
+        for record in self:
+            if not record.account_id:
                 record.gl_balance = 0.0
                 record.bank_balance = 0.0
                 record.balance_difference = 0.0
                 continue
 
-            # Calculate GL balance (all posted entries up to date_to)
-            domain_gl = [
-                ('account_id', 'in', reconcile_accounts),
-                ('move_id.state', '=', 'posted')
-            ]
-            if record.date_to:
-                domain_gl.append(('date', '<=', record.date_to))
-
-            gl_lines = self.env['account.move.line'].search(domain_gl)
-            gl_balance = sum(line.debit - line.credit for line in gl_lines)
-
-            # Calculate bank balance = Previously reconciled + Currently reconciled
-
-            # 1. Get previously reconciled entries (NOT in current statement)
-            domain_prev_reconciled = [
-                ('account_id', 'in', reconcile_accounts),
-                ('id', 'not in', record.line_ids.ids),
-                ('statement_date', '!=', False),
-                ('move_id.state', '=', 'posted')
-            ]
-            if record.date_to:
-                domain_prev_reconciled.append(('statement_date', '<=', record.date_to))
-
-            prev_reconciled_lines = self.env['account.move.line'].search(domain_prev_reconciled)
-            prev_reconciled_balance = sum(line.debit - line.credit for line in prev_reconciled_lines)
-
-            # 2. Get currently reconciled entries (IN current statement WITH statement_date)
-            current_reconciled_balance = sum(
-                line.debit - line.credit
-                for line in record.line_ids
-                if line.statement_date and line.statement_date <= (record.date_to or fields.Date.today())
-            )
-
-            # Total bank balance = previously reconciled + currently reconciled
-            bank_balance = prev_reconciled_balance + current_reconciled_balance
+            current_reconciled_balance = current_balances[record]
 
-            # Difference = Company Books - Bank Balance
-            balance_difference = gl_balance - bank_balance
+            # Bank balance = cleared outside this statement + cleared in it
+            bank_balance = record.cached_cleared_balance + current_reconciled_balance
 
-            # Set computed values
-            record.gl_balance = gl_balance
+            record.gl_balance = record.cached_gl_balance
             record.bank_balance = bank_balance
-            record.balance_difference = balance_difference
-
-            # Debug logging
-            _logger.info("=" * 80)
-            _logger.info(f"Bank Reconciliation Calculation - {record.name}")
-            _logger.info(
-                f"Accounts included: {[self.env['account.account'].browse(acc_id).name for acc_id in reconcile_accounts]}")
-            _logger.info(f"GL Balance (all posted): {gl_balance}")
-            _logger.info(f"Previously Reconciled: {prev_reconciled_balance}")
-            _logger.info(f"Currently Reconciled: {current_reconciled_balance}")
-            _logger.info(f"Bank Balance (total reconciled): {bank_balance}")
-            _logger.info(f"Difference (outstanding): {balance_difference}")
-            _logger.info("=" * 80)
+            record.balance_difference = record.cached_gl_balance - bank_balance
 
     def action_save_reconciliation(self):
         """Save the reconciliation and mark as done"""
         self.ensure_one()
 
-        # Link lines to this statement
-        for line in self.line_ids:
-            if line.statement_date:
-                line.bank_statement_id = self.id
+        # Link the cleared lines to this statement, in one write
+        self.env['account.move.line'].flush_model(['statement_date'])
+        self.flush_recordset(['line_ids'])
+        self.env.cr.execute("""
+            SELECT aml.id
+            FROM bank_statement_line_rel rel
+            JOIN account_move_line aml ON aml.id = rel.line_id
+            WHERE rel.statement_id = %s
+              AND aml.statement_date IS NOT NULL
+              AND aml.bank_statement_id IS DISTINCT FROM %s
+        """, (self.id, self.id))
+        cleared_lines = self.env['account.move.line'].browse([r[0] for r in self.env.cr.fetchall()])
+        cleared_lines.write({'bank_statement_id': self.id})
 
         self.write({'state': 'done'})
 
@@ -290,7 +392,7 @@ class BankStatement(models.Model):
     def action_load_lines(self):
         """Manual action to reload lines"""
         self.ensure_one()
-        self._onchange_load_lines()
+        self._load_candidate_lines()
 
         return {
             'type': 'ir.actions.client',
@@ -302,6 +404,66 @@ class BankStatement(models.Model):
             }
         }
 
+    def action_open_candidate_lines(self):
+        """Statement lines in a paged list, filtered and sorted server side,
+        with bulk clear / unclear buttons"""
+        self.ensure_one()
+        return {
+            'name': _('Candidate Lines - %s', self.name),
+            'type': 'ir.actions.act_window',
+            'res_model': 'account.move.line',
+            'view_mode': 'list',
+            'views': [(self.env.ref('bank_reconciliation.view_move_line_tree_bank_statement_candidates').id, 'list')],
+            'search_view_id': self.env.ref('bank_reconciliation.view_move_line_search_bank_statement').id,
+            'domain': [('bank_statement_ids', 'in', self.id)],
+            'context': {
+                'bank_statement_id': self.id,
+                'search_default_uncleared': 1,
+            },
+            'target': 'current',
+        }
+
+    def action_clear_lines(self, line_ids, statement_date=False):
+        """Clear the given statement lines at ``statement_date`` (Date To by
+        default). Meant to be called for a whole selection at once."""
+        self.ensure_one()
+        lines = self.env['account.move.line'].browse(line_ids)
+        self._set_lines_statement_date(lines, statement_date or self.date_to)
+        return True
+
+    def action_unclear_lines(self, line_ids):
+        """Remove the statement date of the given statement lines"""
+        self.ensure_one()
+        lines = self.env['account.move.line'].browse(line_ids)
+        self._set_lines_statement_date(lines, False)
+        return True
+
+    def _set_lines_statement_date(self, lines, statement_date):
+        """Write statement_date and bank_statement_id of ``lines`` in one
+        ORM write, restricted to the lines of this statement, and refresh
+        the cached balances of the other open statements holding them."""
+        self.ensure_one()
+        if self.state == 'done':
+            raise UserError(_('Reopen the statement to change its lines.'))
+        if not lines:
+            return
+        lines = self.env['account.move.line'].search([
+            ('id', 'in', lines.ids),
+            ('bank_statement_ids', 'in', self.id),
+        ])
+        if not lines:
+            return
+        lines.check_access('write')
+        lines.write({
+            'statement_date': statement_date or False,
+            'bank_statement_id': self.id if statement_date else False,
+        })
+        others = lines.bank_statement_ids.filtered(lambda st: st != self and st.state != 'done')
+        if others:
+            for fname in ('cached_gl_balance', 'cached_cleared_balance'):
+                self.env.add_to_compute(self._fields[fname], others)
+        self.invalidate_recordset(['gl_balance', 'bank_balance', 'balance_difference'])
+
     def action_set_pending(self):
         """Set status to pending"""
         self.write({'state': 'pending'})
@@ -339,8 +501,11 @@ class BankStatement(models.Model):
 
     @api.model
     def cron_check_overdue_reconciliations(self):
-        """Cron job to automatically mark overdue reconciliations"""
+        """Cron job to automatically mark overdue reconciliations and refresh
+        the cached balances of the open statements, one aggregate per
+        journal and date"""
         statements = self.search([('state', 'in', ['draft', 'pending'])])
+        statements._compute_cached_balances()
         statements.action_check_overdue()
         return True
 
@@ -19,19 +19,9 @@ class AccountCashBookReportAnalytic(models.TransientModel):
         result['analytic_account_ids'] = data['form'].get('analytic_account_ids', False)
         return result
 
-    def check_report(self):
+    def _get_report_fields(self):
         """Override to include analytic account data"""
-        data = {}
-        data['form'] = self.read([
-            'target_move', 'date_from', 'date_to', 'journal_ids',
-            'account_ids', 'sortby', 'initial_balance',
-            'display_account', 'analytic_account_ids'
-        ])[0]
-        comparison_context = self._build_comparison_context(data)
-        data['form']['comparison_context'] = comparison_context
-        return self.env.ref(
-            'om_account_daily_reports.action_report_cash_book'
-        ).report_action(self, data=data)
+        return super()._get_report_fields() + ['analytic_account_ids']
 
     def action_show_details(self):
         """Show detailed move lines with proper analytic account filtering"""
@@ -19,6 +19,7 @@
         'base',
         'account',
         'accounting_pdf_reports',  # Odoo Mates module
+        'report_staging',
     ],
     'data': [
         'security/ir.model.access.csv',
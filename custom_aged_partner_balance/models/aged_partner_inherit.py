@@ -1,5 +1,4 @@
 from odoo import api, fields, models, _
-from dateutil.relativedelta import relativedelta
 
 
 class AccountAgedTrialBalance(models.TransientModel):
@@ -14,12 +13,7 @@ class AccountAgedTrialBalance(models.TransientModel):
         # Get the report parser to calculate aging
         report_lines = self._get_aging_data()
 
-        # Clear existing detail lines
-        self.env['account.aged.detail.line'].search([]).unlink()
-
-        # Create detail lines
-        DetailLine = self.env['account.aged.detail.line']
-        detail_ids = []
+        detail_vals = []
         partners_with_overdue = 0
 
         for line_data in report_lines:
@@ -35,8 +29,7 @@ class AccountAgedTrialBalance(models.TransientModel):
                 'total': line_data.get('total', 0.0),
                 'wizard_id': self.id,
             }
-            detail_line = DetailLine.create(vals)
-            detail_ids.append(detail_line.id)
+            detail_vals.append(vals)
 
             # Count partners with overdue amounts
             if any([vals['period_0'], vals['period_1'], vals['period_2'],
@@ -64,175 +57,55 @@ class AccountAgedTrialBalance(models.TransientModel):
         target_move_label = 'All Posted Entries' if self.target_move == 'posted' else 'All Entries'
 
         # Build detailed action name with key info
-        action_title = f"{action_name} - {self.date_from} ({self.period_length} days) - {len(detail_ids)} {partner_label}"
-
-        return {
-            'name': action_title,
-            'type': 'ir.actions.act_window',
-            'res_model': 'account.aged.detail.line',
-            'view_mode': 'list,form',
-            'domain': [('id', 'in', detail_ids)],
-            'target': 'current',
-            'context': {
+        action_title = f"{action_name} - {self.date_from} ({self.period_length} days) - {len(detail_vals)} {partner_label}"
+
+        # Detail lines of this run only, created in one batch
+        run, __ = self.env['account.aged.detail.line']._stage_rows(detail_vals, name=action_name)
+        return run._get_action(
+            action_title,
+            view_mode='list,form',
+            context={
                 'create': False,
                 'edit': False,
                 'default_wizard_id': self.id,
             },
-        }
+        )
 
     def _get_aging_data(self):
         """
         Calculate aging breakdown for each partner.
+
+        Amounts come from the aged partner balance query of the report
+        (residual as of the report date, in company currency); payables are
+        shown as positive amounts. Period 0 is the most recent overdue period.
         """
         self.ensure_one()
-
-        # Calculate period dates
-        periods = self._calculate_periods()
-
-        # Build domain for move lines
-        domain = [
-            ('account_id.account_type', 'in', self._get_account_types()),
-            ('reconciled', '=', False),
-            ('date', '<=', self.date_from),
-        ]
-
-        if self.journal_ids:
-            domain.append(('journal_id', 'in', self.journal_ids.ids))
-
-        if self.partner_ids:
-            domain.append(('partner_id', 'in', self.partner_ids.ids))
-
-        if self.target_move == 'posted':
-            domain.append(('parent_state', '=', 'posted'))
-
-        # Get all move lines
-        move_lines = self.env['account.move.line'].search(domain)
-
-        # Group by partner and calculate aging
-        partner_data = {}
-        for line in move_lines:
-            partner_id = line.partner_id.id
-            if not partner_id:
+        report = self.env['report.accounting_pdf_reports.report_agedpartnerbalance']
+        rows = report.with_context(company_ids=self.env.companies.ids)._get_aged_partner_balance(
+            self._get_account_types(),
+            self.partner_ids.ids,
+            self.date_from,
+            self.target_move,
+            self.period_length,
+            journal_ids=self.journal_ids.ids,
+            payable_sign=-1,
+        )
+
+        # The report numbers its periods from the oldest ('0') to the most recent ('4')
+        result = []
+        for row in rows:
+            if not row['partner_id'] or not row['open_items']:
                 continue
-
-            if partner_id not in partner_data:
-                partner_data[partner_id] = {
-                    'partner_id': partner_id,
-                    'partner_name': line.partner_id.name,
-                    'not_due': 0.0,
-                    'period_0': 0.0,
-                    'period_1': 0.0,
-                    'period_2': 0.0,
-                    'period_3': 0.0,
-                    'period_4': 0.0,
-                    'total': 0.0,
-                }
-
-            # Calculate amount based on account type
-            account_type = line.account_id.account_type
-
-            if account_type == 'asset_receivable':
-                # For receivables: positive = amount owed TO us
-                amount = line.debit - line.credit
-            elif account_type == 'liability_payable':
-                # For payables: positive = amount we owe TO them
-                amount = line.credit - line.debit
-            else:
-                amount = 0.0
-
-            # Skip if amount is zero
-            if amount == 0.0:
-                continue
-
-            # Determine which aging bucket using date_maturity (or date as fallback)
-            date_due = line.date_maturity or line.date
-
-            # CRITICAL FIX: Include invoices due ON or AFTER the report date as "not_due"
-            # An invoice due today hasn't passed its due date yet
-            if date_due >= self.date_from:
-                period_key = 'not_due'
-            else:
-                period_key = self._get_period_key(date_due, periods)
-
-            partner_data[partner_id][period_key] += amount
-            partner_data[partner_id]['total'] += amount
-
-        return list(partner_data.values())
-
-    def _calculate_periods(self):
-        """
-        Calculate aging period dates - CORRECTED VERSION.
-        Period 0 = 0-30 days overdue (most recent overdue)
-        Period 4 = 120+ days overdue (oldest)
-        Not due = future dates (not yet due)
-        """
-        periods = {}
-        current_date = self.date_from
-
-        # Not due: Future dates (after the report date)
-        periods['not_due'] = {
-            'start': current_date + relativedelta(days=1),
-            'end': fields.Date.today() + relativedelta(years=10),
-        }
-
-        # Period 0: 0-30 days overdue (due dates from current_date back to 30 days)
-        periods['period_0'] = {
-            'start': current_date - relativedelta(days=self.period_length),
-            'end': current_date,
-        }
-
-        # Period 1: 31-60 days overdue
-        periods['period_1'] = {
-            'start': current_date - relativedelta(days=self.period_length * 2),
-            'end': current_date - relativedelta(days=self.period_length + 1),
-        }
-
-        # Period 2: 61-90 days overdue
-        periods['period_2'] = {
-            'start': current_date - relativedelta(days=self.period_length * 3),
-            'end': current_date - relativedelta(days=self.period_length * 2 + 1),
-        }
-
-        # Period 3: 91-120 days overdue
-        periods['period_3'] = {
-            'start': current_date - relativedelta(days=self.period_length * 4),
-            'end': current_date - relativedelta(days=self.period_length * 3 + 1),
-        }
-
-        # Period 4: 120+ days overdue (oldest)
-        periods['period_4'] = {
-            'start': fields.Date.from_string('1900-01-01'),
-            'end': current_date - relativedelta(days=self.period_length * 4 + 1),
-        }
-
-        return periods
-
-    def _get_period_key(self, date_due, periods):
-        """
-        Determine which period a date falls into.
-        Note: Invoices due ON or AFTER report date should be filtered out before calling this.
-        """
-        # This method should only be called for overdue invoices (date_due < self.date_from)
-
-        # Check each period from newest to oldest
-        # Period 0: 0-30 days overdue
-        if periods['period_0']['start'] < date_due < self.date_from:
-            return 'period_0'
-
-        # Period 1: 31-60 days overdue
-        if periods['period_1']['start'] < date_due <= periods['period_1']['end']:
-            return 'period_1'
-
-        # Period 2: 61-90 days overdue
-        if periods['period_2']['start'] < date_due <= periods['period_2']['end']:
-            return 'period_2'
-
-        # Period 3: 91-120 days overdue
-        if periods['period_3']['start'] < date_due <= periods['period_3']['end']:
-            return 'period_3'
-
-        # Period 4: 120+ days overdue (default for very old dates)
-        return 'period_4'
+            values = {
+                'partner_id': row['partner_id'],
+                'partner_name': row['name'],
+                'not_due': row['direction'],
+            }
+            for i in range(5):
+                values['period_%s' % i] = row[str(4 - i)]
+            values['total'] = sum(row[key] for key in ('direction', '0', '1', '2', '3', '4'))
+            result.append(values)
+        return result
 
     def _get_account_types(self):
         """
@@ -248,6 +121,7 @@ class AccountAgedTrialBalance(models.TransientModel):
 
 class AccountAgedDetailLine(models.TransientModel):
     _name = 'account.aged.detail.line'
+    _inherit = ['report.staging.mixin']
     _description = 'Aged Balance Detail Line'
     _order = 'total desc, partner_name'
 
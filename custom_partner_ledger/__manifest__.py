@@ -14,6 +14,7 @@
     'depends': [
         'account',
         'accounting_pdf_reports',  # Odoo Mates module
+        'report_staging',
     ],
     'data': [
         'reports/report_partner_ledger_template.xml',
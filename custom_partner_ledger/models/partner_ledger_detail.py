@@ -4,6 +4,7 @@ from odoo import api, fields, models, _
 
 class PartnerLedgerDetail(models.TransientModel):
     _name = 'partner.ledger.detail'
+    _inherit = ['report.staging.mixin']
     _description = 'Partner Ledger Detail View'
     _order = 'partner_id, date, id'
 
@@ -93,8 +94,10 @@ class PartnerLedgerDetail(models.TransientModel):
 
     @api.model
     def get_partner_ledger_details(self, wizard_data):
-        self.search([]).unlink()
+        """ Stage the detail lines of the wizard options as a new report run.
 
+        :returns: report.staging.run
+        """
         date_from = wizard_data.get('date_from')
         date_to = wizard_data.get('date_to')
         partner_ids = wizard_data.get('partner_ids', [])
@@ -115,42 +118,45 @@ class PartnerLedgerDetail(models.TransientModel):
         account_ids = accounts.ids
         move_state = ['posted'] if target_move == 'posted' else ['draft', 'posted']
 
-        domain = [
-            ('account_id', 'in', account_ids),
-            ('move_id.state', 'in', move_state),
-        ]
-        if partner_ids:
-            domain.append(('partner_id', 'in', partner_ids))
-        else:
-            domain.append(('partner_id', '!=', False))
-        if date_from:
-            domain.append(('date', '>=', date_from))
-        if date_to:
-            domain.append(('date', '<=', date_to))
-        if journal_ids:
-            domain.append(('journal_id', 'in', journal_ids))
-        if not reconciled:
-            domain.append(('full_reconcile_id', '=', False))
-
-        move_lines = self.env['account.move.line'].search(domain, order='partner_id, date, id')
+        # Same engine as the printed partner ledger: all partners, their
+        # opening balances and lines in one query
+        ledger = self.env['report.accounting_pdf_reports.report_partnerledger']._get_partner_ledger({
+            'form': {
+                'used_context': {
+                    'date_from': date_from,
+                    'date_to': date_to,
+                    'strict_range': True,
+                    'journal_ids': journal_ids,
+                    'allowed_company_ids': self.env.companies.ids,
+                },
+                'reconciled': reconciled,
+            },
+            'computed': {
+                'move_state': move_state,
+                'account_ids': account_ids,
+            },
+        }, partner_ids or None, initial_balance=bool(date_from))
+
+        line_ids = [row['id'] for entry in ledger.values() for row in entry['lines'] if row['id']]
+        lines_by_id = {line.id: line for line in self.env['account.move.line'].browse(line_ids)}
         company_currency = self.env.company.currency_id
         detail_records = []
 
-        for partner in move_lines.mapped('partner_id'):
-            partner_lines = move_lines.filtered(lambda l: l.partner_id == partner)
+        for partner_id, entry in ledger.items():
+            rows = entry['lines']
+            # Partners are listed for their lines within the period only
+            if not any(row['id'] for row in rows):
+                continue
 
             opening_balance = 0
-            if date_from:
-                opening_balance = self._calculate_opening_balance(
-                    partner, date_from, account_ids, move_state, reconciled, journal_ids
-                )
+            if rows[0]['is_initial_balance']:
+                opening_balance = rows[0]['debit'] - rows[0]['credit']
                 if opening_balance != 0:
                     detail_records.append({
-                        'partner_id': partner.id,
+                        'partner_id': partner_id,
                         'date': date_from,
                         'name': 'Opening Balance',
                         'balance': opening_balance,
-                        # Opening balance is always in company currency
                         'debit': opening_balance if opening_balance > 0 else 0,
                         'credit': abs(opening_balance) if opening_balance < 0 else 0,
                         'company_currency_id': company_currency.id,
@@ -161,10 +167,11 @@ class PartnerLedgerDetail(models.TransientModel):
                         'manual_currency_exchange_rate': 1.0,
                     })
 
-            # FIX: running balance tracks in the line's own currency (foreign or company)
             running_balance = opening_balance
-            for line in partner_lines:
-                # Detect foreign currency
+            for row in rows:
+                if row['is_initial_balance']:
+                    continue
+                line = lines_by_id[row['id']]
                 is_foreign = (
                     line.currency_id
                     and line.currency_id != company_currency
@@ -172,22 +179,19 @@ class PartnerLedgerDetail(models.TransientModel):
                 )
 
                 if is_foreign:
-                    # Use the raw foreign currency amount for debit/credit display
                     raw = abs(line.amount_currency)
                     debit_val = raw if line.amount_currency > 0 else 0.0
                     credit_val = raw if line.amount_currency < 0 else 0.0
                     display_currency = line.currency_id
-                    # FIX: running balance in foreign currency
                     running_balance += line.amount_currency
                 else:
                     debit_val = line.debit
                     credit_val = line.credit
                     display_currency = company_currency
-                    # Running balance in company currency
                     running_balance += line.debit - line.credit
 
                 vals = {
-                    'partner_id': partner.id,
+                    'partner_id': partner_id,
                     'date': line.date,
                     'move_id': line.move_id.id,
                     'journal_id': line.journal_id.id,
@@ -215,21 +219,5 @@ class PartnerLedgerDetail(models.TransientModel):
 
                 detail_records.append(vals)
 
-        if detail_records:
-            self.create(detail_records)
-        return True
-
-    def _calculate_opening_balance(self, partner, date_from, account_ids, move_state, reconciled, journal_ids):
-        domain = [
-            ('partner_id', '=', partner.id),
-            ('account_id', 'in', account_ids),
-            ('date', '<', date_from),
-            ('move_id.state', 'in', move_state),
-        ]
-        if journal_ids:
-            domain.append(('journal_id', 'in', journal_ids))
-        if not reconciled:
-            domain.append(('full_reconcile_id', '=', False))
-        lines = self.env['account.move.line'].search(domain)
-        return sum(lines.mapped('debit')) - sum(lines.mapped('credit'))
-
+        run, __ = self._stage_rows(detail_records, name=_('Partner Ledger Details'))
+        return run
@@ -39,21 +39,17 @@ class AccountPartnerLedgerCustom(models.TransientModel):
 
         # Generate detail records
         detail_model = self.env['partner.ledger.detail']
-        detail_model.get_partner_ledger_details(wizard_data)
-
-        # Return action to open detail view
-        return {
-            'name': _('Partner Ledger Details'),
-            'type': 'ir.actions.act_window',
-            'res_model': 'partner.ledger.detail',
-            'view_mode': 'list',
-            'views': [(self.env.ref('custom_partner_ledger.view_partner_ledger_detail_tree').id, 'list')],
-            'search_view_id': [self.env.ref('custom_partner_ledger.view_partner_ledger_detail_search').id],
-            'context': {
+        run = detail_model.get_partner_ledger_details(wizard_data)
+
+        # Return action to open detail view, on this run's records only
+        return run._get_action(
+            _('Partner Ledger Details'),
+            views=[(self.env.ref('custom_partner_ledger.view_partner_ledger_detail_tree').id, 'list')],
+            search_view_id=[self.env.ref('custom_partner_ledger.view_partner_ledger_detail_search').id],
+            context={
                 'search_default_group_by_partner': 1,
             },
-            'target': 'current',
-        }
+        )
 
 
 
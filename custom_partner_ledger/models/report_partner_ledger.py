@@ -11,53 +11,33 @@ class ReportPartnerLedgerCustom(models.AbstractModel):
     _inherit = 'report.accounting_pdf_reports.report_partnerledger'
     _description = 'Custom Partner Ledger Report'
 
-    def _lines(self, data, partner):
-        full_account = []
-        company_currency = self.env.company.currency_id
-
-        query_get_data = self.env['account.move.line'].with_context(
-            data['form'].get('used_context', {})
-        )._query_get()
-
-        reconcile_clause = "" if data['form']['reconciled'] else \
-            ' AND "account_move_line".full_reconcile_id IS NULL '
-
-        params = [partner.id, tuple(data['computed']['move_state']),
-                  tuple(data['computed']['account_ids'])] + query_get_data[2]
-
-        lang = self.env.context.get('lang') or 'en_US'
-
-        query = """
-            SELECT "account_move_line".id, "account_move_line".date, j.code,
-                   COALESCE(acc.name->>%s, acc.name->>'en_US', acc.name::text) as a_name,
-                   "account_move_line".ref, m.name as move_name,
-                   "account_move_line".name, "account_move_line".debit,
-                   "account_move_line".credit, "account_move_line".amount_currency,
-                   "account_move_line".currency_id, c.symbol AS currency_code,
-                   m.invoice_date_due, m.client_order_ref as po_number,
-                   p.manual_currency_exchange_rate,
-                   lc.name as line_currency_name
-            FROM """ + query_get_data[0] + """
-            LEFT JOIN account_journal j ON ("account_move_line".journal_id = j.id)
-            LEFT JOIN account_account acc ON ("account_move_line".account_id = acc.id)
-            LEFT JOIN res_currency c ON ("account_move_line".currency_id = c.id)
-            LEFT JOIN res_currency lc ON ("account_move_line".currency_id = lc.id)
-            LEFT JOIN account_move m ON (m.id = "account_move_line".move_id)
+    def _get_partner_ledger_select(self):
+        select, params = super()._get_partner_ledger_select()
+        select += [
+            'm.invoice_date_due',
+            'm.client_order_ref as po_number',
+            'p.manual_currency_exchange_rate',
+            'c.name as line_currency_name',
+        ]
+        return select, params
+
+    def _get_partner_ledger_joins(self):
+        return super()._get_partner_ledger_joins() + """
             LEFT JOIN account_payment p ON (p.move_id = m.id)
-            WHERE "account_move_line".partner_id = %s
-                AND m.state IN %s
-                AND "account_move_line".account_id IN %s AND """ + query_get_data[1] + reconcile_clause + """
-            ORDER BY "account_move_line".date
         """
 
-        params_with_lang = [lang] + params
-        self.env.cr.execute(query, tuple(params_with_lang))
-        res = self.env.cr.dictfetchall()
+    def _prepare_partner_ledger_lines(self, data, lines):
+        """
+        Lines in foreign currency show their amount_currency as debit/credit,
+        and the progressive balance follows the displayed amounts.
+        """
+        lines = super()._prepare_partner_ledger_lines(data, lines)
+        company_currency = self.env.company.currency_id
 
         sum_debit = 0.0
         sum_credit = 0.0
 
-        for r in res:
+        for r in lines:
             amt_currency = r.get('amount_currency') or 0.0
             has_foreign = (
                 r.get('currency_id')
@@ -66,14 +46,12 @@ class ReportPartnerLedgerCustom(models.AbstractModel):
             )
 
             if has_foreign:
-                # Show the raw foreign currency amount instead of converting to company currency.
                 raw = abs(amt_currency)
                 r['debit'] = raw if amt_currency > 0 else 0.0
                 r['credit'] = raw if amt_currency < 0 else 0.0
                 sum_debit += r['debit']
                 sum_credit += r['credit']
                 r['progress'] = sum_debit - sum_credit
-                # Mark that this line uses a foreign currency for the template
                 r['is_foreign_currency'] = True
                 r['display_currency_symbol'] = r.get('currency_code') or ''
             else:
@@ -94,12 +72,7 @@ class ReportPartnerLedgerCustom(models.AbstractModel):
             r['invoice_date_due'] = r['invoice_date_due'] if r['invoice_date_due'] else ''
             r['po_number'] = r['po_number'] if r['po_number'] else ''
 
-            if data['form']['amount_currency'] and r['currency_id']:
-                r['currency_id'] = self.env['res.currency'].browse(r['currency_id'])
-
-            full_account.append(r)
-
-        return full_account
+        return lines
 
     def _get_partner_summary(self, data, partner):
         """
@@ -187,6 +160,12 @@ class ReportPartnerLedgerCustom(models.AbstractModel):
         account_ids = data.get('computed', {}).get('account_ids', [])
         if not account_ids:
             return 'Partner'
+        # the printed lines already carry their account type
+        for line in self._lines(data, partner):
+            if line['account_type'] == 'asset_receivable':
+                return 'Customer'
+            elif line['account_type'] == 'liability_payable':
+                return 'Vendor'
         move_lines = self.env['account.move.line'].search([
             ('partner_id', '=', partner.id),
             ('account_id', 'in', account_ids)
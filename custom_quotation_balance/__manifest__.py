@@ -25,6 +25,7 @@
         'purchase',
         'om_account_accountant',
         'stock',
+        'account_partner_balance',
     ],
     'data': [
         'views/sale_order_views.xml',
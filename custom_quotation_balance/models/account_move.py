@@ -1,5 +1,7 @@
 
 
+from collections import defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import UserError
 import logging
@@ -56,9 +58,9 @@ class AccountMove(models.Model):
 
     @api.depends('partner_id', 'move_type', 'state')
     def _compute_partner_balance(self):
-        """Calculate partner financial summary using accounting terminology"""
+        """Calculate partner financial summary from the partner balance ledger"""
+        groups = defaultdict(lambda: self.browse())
         for move in self:
-            # Reset all fields first
             move.customer_total_invoiced = 0.0
             move.customer_total_credits = 0.0
             move.customer_balance_due = 0.0
@@ -66,84 +68,27 @@ class AccountMove(models.Model):
             move.vendor_total_credits = 0.0
             move.vendor_balance_due = 0.0
 
-            if not move.partner_id or move.move_type not in ['out_invoice', 'out_refund', 'in_invoice', 'in_refund']:
+            if not move.partner_id:
                 continue
-
-            try:
-                # Customer invoices
-                if move.move_type in ['out_invoice', 'out_refund']:
-                    invoices = self.env['account.move'].search([
-                        ('partner_id', 'child_of', move.partner_id.commercial_partner_id.id),
-                        ('move_type', 'in', ['out_invoice', 'out_refund']),
-                        ('state', '=', 'posted')
-                    ])
-
-                    # Separate invoices and credit notes
-                    out_invoices = invoices.filtered(lambda inv: inv.move_type == 'out_invoice')
-                    out_refunds = invoices.filtered(lambda inv: inv.move_type == 'out_refund')
-
-                    # Total Debits = All invoices
-                    total_debits = sum(out_invoices.mapped('amount_total'))
-                    move.customer_total_invoiced = total_debits
-
-                    # Get all customer payments
-                    payments = self.env['account.payment'].search([
-                        ('partner_id', 'child_of', move.partner_id.commercial_partner_id.id),
-                        ('partner_type', '=', 'customer'),
-                        ('payment_type', '=', 'inbound'),
-                        ('state', 'in', ['posted', 'paid'])
-                    ])
-
-                    total_payments = sum(payments.mapped('amount'))
-                    total_credit_notes = sum(out_refunds.mapped('amount_total'))
-
-                    # Total Credits = Payments + Credit Notes
-                    move.customer_total_credits = total_payments + total_credit_notes
-
-                    # Due Amount = Debits - Credits
-                    move.customer_balance_due = total_debits - (total_payments + total_credit_notes)
-
-                # Vendor bills
-                elif move.move_type in ['in_invoice', 'in_refund']:
-                    bills = self.env['account.move'].search([
-                        ('partner_id', 'child_of', move.partner_id.commercial_partner_id.id),
-                        ('move_type', 'in', ['in_invoice', 'in_refund']),
-                        ('state', '=', 'posted')
-                    ])
-
-                    # Separate bills and credit notes
-                    in_invoices = bills.filtered(lambda bill: bill.move_type == 'in_invoice')
-                    in_refunds = bills.filtered(lambda bill: bill.move_type == 'in_refund')
-
-                    # Total Debits = All bills
-                    total_debits = sum(in_invoices.mapped('amount_total'))
-                    move.vendor_total_billed = total_debits
-
-                    # Get all vendor payments
-                    payments = self.env['account.payment'].search([
-                        ('partner_id', 'child_of', move.partner_id.commercial_partner_id.id),
-                        ('partner_type', '=', 'supplier'),
-                        ('payment_type', '=', 'outbound'),
-                        ('state', 'in', ['posted', 'paid'])
-                    ])
-
-                    total_payments = sum(payments.mapped('amount'))
-                    total_credit_notes = sum(in_refunds.mapped('amount_total'))
-
-                    # Total Credits = Payments + Credit Notes
-                    move.vendor_total_credits = total_payments + total_credit_notes
-
-                    # Due Amount = Debits - Credits
-                    move.vendor_balance_due = total_debits - (total_payments + total_credit_notes)
-
-            except Exception as e:
-                _logger.error(f"ERROR computing partner balance for {move.partner_id.name}: {str(e)}", exc_info=True)
-                move.customer_total_invoiced = 0.0
-                move.customer_total_credits = 0.0
-                move.customer_balance_due = 0.0
-                move.vendor_total_billed = 0.0
-                move.vendor_total_credits = 0.0
-                move.vendor_balance_due = 0.0
+            if move.move_type in ['out_invoice', 'out_refund']:
+                groups['customer', move.currency_id] |= move
+            elif move.move_type in ['in_invoice', 'in_refund']:
+                groups['supplier', move.currency_id] |= move
+
+        for (partner_type, currency), moves in groups.items():
+            balances = self.env['account.partner.balance'].get_balances(
+                moves.partner_id, partner_type, currency=currency)
+            for move in moves:
+                balance = balances[move.partner_id.commercial_partner_id.id]
+                total_credits = balance['credited'] + balance['paid']
+                if partner_type == 'customer':
+                    move.customer_total_invoiced = balance['invoiced']
+                    move.customer_total_credits = total_credits
+                    move.customer_balance_due = balance['due']
+                else:
+                    move.vendor_total_billed = balance['invoiced']
+                    move.vendor_total_credits = total_credits
+                    move.vendor_balance_due = balance['due']
 
     def action_view_customer_invoices(self):
         """Open all customer invoices"""
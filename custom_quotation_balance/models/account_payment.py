@@ -1,5 +1,7 @@
 
 
+from collections import defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import UserError
 import logging
@@ -34,89 +36,28 @@ class AccountPayment(models.Model):
 
     @api.depends('partner_id', 'payment_type', 'partner_type', 'state', 'amount')
     def _compute_partner_balance(self):
-        """Calculate partner financial summary using accounting terminology"""
+        """Calculate partner financial summary from the partner balance ledger"""
+        groups = defaultdict(lambda: self.browse())
         for payment in self:
-            # Reset all fields
             payment.partner_total_invoiced = 0.0
             payment.partner_total_credits = 0.0
             payment.partner_balance_due = 0.0
 
             if not payment.partner_id:
                 continue
-
-            try:
-                # Customer payments (inbound)
-                if payment.partner_type == 'customer' and payment.payment_type == 'inbound':
-
-                    # Get invoices
-                    invoices = self.env['account.move'].search([
-                        ('partner_id', 'child_of', payment.partner_id.commercial_partner_id.id),
-                        ('move_type', 'in', ['out_invoice', 'out_refund']),
-                        ('state', '=', 'posted')
-                    ])
-
-                    out_invoices = invoices.filtered(lambda inv: inv.move_type == 'out_invoice')
-                    out_refunds = invoices.filtered(lambda inv: inv.move_type == 'out_refund')
-
-                    # Total Debits = All invoices
-                    total_debits = sum(out_invoices.mapped('amount_total'))
-                    payment.partner_total_invoiced = total_debits
-
-                    # Get all customer payments
-                    payments = self.env['account.payment'].search([
-                        ('partner_id', 'child_of', payment.partner_id.commercial_partner_id.id),
-                        ('partner_type', '=', 'customer'),
-                        ('payment_type', '=', 'inbound'),
-                        ('state', 'in', ['posted', 'paid'])
-                    ])
-
-                    total_payments = sum(payments.mapped('amount'))
-                    total_credit_notes = sum(out_refunds.mapped('amount_total'))
-
-                    # Total Credits = Payments + Credit Notes
-                    payment.partner_total_credits = total_payments + total_credit_notes
-
-                    # Due Amount = Debits - Credits
-                    payment.partner_balance_due = total_debits - (total_payments + total_credit_notes)
-
-                # Vendor payments (outbound)
-                elif payment.partner_type == 'supplier' and payment.payment_type == 'outbound':
-
-                    bills = self.env['account.move'].search([
-                        ('partner_id', 'child_of', payment.partner_id.commercial_partner_id.id),
-                        ('move_type', 'in', ['in_invoice', 'in_refund']),
-                        ('state', '=', 'posted')
-                    ])
-
-                    in_invoices = bills.filtered(lambda bill: bill.move_type == 'in_invoice')
-                    in_refunds = bills.filtered(lambda bill: bill.move_type == 'in_refund')
-
-                    # Total Debits = All bills
-                    total_debits = sum(in_invoices.mapped('amount_total'))
-                    payment.partner_total_invoiced = total_debits
-
-                    # Get all vendor payments
-                    payments = self.env['account.payment'].search([
-                        ('partner_id', 'child_of', payment.partner_id.commercial_partner_id.id),
-                        ('partner_type', '=', 'supplier'),
-                        ('payment_type', '=', 'outbound'),
-                        ('state', 'in', ['posted', 'paid'])
-                    ])
-
-                    total_payments = sum(payments.mapped('amount'))
-                    total_credit_notes = sum(in_refunds.mapped('amount_total'))
-
-                    # Total Credits = Payments + Credit Notes
-                    payment.partner_total_credits = total_payments + total_credit_notes
-
-                    # Due Amount = Debits - Credits
-                    payment.partner_balance_due = total_debits - (total_payments + total_credit_notes)
-
-            except Exception as e:
-                _logger.error(f"ERROR computing partner balance for {payment.partner_id.name}: {str(e)}", exc_info=True)
-                payment.partner_total_invoiced = 0.0
-                payment.partner_total_credits = 0.0
-                payment.partner_balance_due = 0.0
+            if payment.partner_type == 'customer' and payment.payment_type == 'inbound':
+                groups['customer', payment.currency_id] |= payment
+            elif payment.partner_type == 'supplier' and payment.payment_type == 'outbound':
+                groups['supplier', payment.currency_id] |= payment
+
+        for (partner_type, currency), payments in groups.items():
+            balances = self.env['account.partner.balance'].get_balances(
+                payments.partner_id, partner_type, currency=currency)
+            for payment in payments:
+                balance = balances[payment.partner_id.commercial_partner_id.id]
+                payment.partner_total_invoiced = balance['invoiced']
+                payment.partner_total_credits = balance['credited'] + balance['paid']
+                payment.partner_balance_due = balance['due']
 
     def action_view_invoices(self):
         """Open invoices/bills for the partner"""
@@ -1,4 +1,6 @@
 
+from collections import defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import UserError
 
@@ -28,58 +30,25 @@ class PurchaseOrder(models.Model):
         help='Outstanding balance (Debits - Credits)'
     )
 
-    @api.depends('partner_id')
+    @api.depends('partner_id', 'currency_id')
     def _compute_vendor_balance(self):
-        """Calculate vendor financial summary using accounting terminology"""
+        """Calculate vendor financial summary from the partner balance ledger"""
+        groups = defaultdict(lambda: self.browse())
         for order in self:
+            order.vendor_total_billed = 0.0
+            order.vendor_total_credits = 0.0
+            order.vendor_balance_due = 0.0
             if order.partner_id:
-                try:
-                    if 'account.move' not in self.env:
-                        order.vendor_total_billed = 0.0
-                        order.vendor_total_credits = 0.0
-                        order.vendor_balance_due = 0.0
-                        continue
-
-                    # Get all vendor bills and credit notes
-                    bills = self.env['account.move'].search([
-                        ('partner_id', 'child_of', order.partner_id.commercial_partner_id.id),
-                        ('move_type', 'in', ['in_invoice', 'in_refund']),
-                        ('state', '=', 'posted')
-                    ])
-
-                    # Separate bills and credit notes
-                    in_invoices = bills.filtered(lambda bill: bill.move_type == 'in_invoice')
-                    in_refunds = bills.filtered(lambda bill: bill.move_type == 'in_refund')
-
-                    # Total Debits = All bills
-                    total_debits = sum(in_invoices.mapped('amount_total'))
-                    order.vendor_total_billed = total_debits
-
-                    # Get all vendor payments
-                    payments = self.env['account.payment'].search([
-                        ('partner_id', 'child_of', order.partner_id.commercial_partner_id.id),
-                        ('partner_type', '=', 'supplier'),
-                        ('payment_type', '=', 'outbound'),
-                        ('state', 'in', ['posted', 'paid'])
-                    ])
-
-                    total_payments = sum(payments.mapped('amount'))
-                    total_credit_notes = sum(in_refunds.mapped('amount_total'))
-
-                    # Total Credits = Payments + Credit Notes
-                    order.vendor_total_credits = total_payments + total_credit_notes
-
-                    # Due Amount = Debits - Credits
-                    order.vendor_balance_due = total_debits - (total_payments + total_credit_notes)
-
-                except Exception as e:
-                    order.vendor_total_billed = 0.0
-                    order.vendor_total_credits = 0.0
-                    order.vendor_balance_due = 0.0
-            else:
-                order.vendor_total_billed = 0.0
-                order.vendor_total_credits = 0.0
-                order.vendor_balance_due = 0.0
+                groups[order.currency_id] |= order
+
+        for currency, orders in groups.items():
+            balances = self.env['account.partner.balance'].get_balances(
+                orders.partner_id, 'supplier', currency=currency)
+            for order in orders:
+                balance = balances[order.partner_id.commercial_partner_id.id]
+                order.vendor_total_billed = balance['invoiced']
+                order.vendor_total_credits = balance['credited'] + balance['paid']
+                order.vendor_balance_due = balance['due']
 
     def action_view_vendor_bills(self):
         """Open filtered list of vendor bills"""
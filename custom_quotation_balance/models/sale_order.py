@@ -1,4 +1,6 @@
 
+from collections import defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import UserError
 
@@ -28,58 +30,25 @@ class SaleOrder(models.Model):
         help='Outstanding balance (Debits - Credits)'
     )
 
-    @api.depends('partner_id')
+    @api.depends('partner_id', 'currency_id')
     def _compute_customer_balance(self):
-        """Calculate customer financial summary using accounting terminology"""
+        """Calculate customer financial summary from the partner balance ledger"""
+        groups = defaultdict(lambda: self.browse())
         for order in self:
+            order.customer_total_invoiced = 0.0
+            order.customer_total_credits = 0.0
+            order.customer_balance_due = 0.0
             if order.partner_id:
-                try:
-                    if 'account.move' not in self.env:
-                        order.customer_total_invoiced = 0.0
-                        order.customer_total_credits = 0.0
-                        order.customer_balance_due = 0.0
-                        continue
-
-                    # Get all customer invoices and credit notes
-                    invoices = self.env['account.move'].search([
-                        ('partner_id', 'child_of', order.partner_id.commercial_partner_id.id),
-                        ('move_type', 'in', ['out_invoice', 'out_refund']),
-                        ('state', '=', 'posted')
-                    ])
-
-                    # Separate invoices and credit notes
-                    out_invoices = invoices.filtered(lambda inv: inv.move_type == 'out_invoice')
-                    out_refunds = invoices.filtered(lambda inv: inv.move_type == 'out_refund')
-
-                    # Total Debits = All invoices
-                    total_debits = sum(out_invoices.mapped('amount_total'))
-                    order.customer_total_invoiced = total_debits
-
-                    # Get all customer payments
-                    payments = self.env['account.payment'].search([
-                        ('partner_id', 'child_of', order.partner_id.commercial_partner_id.id),
-                        ('partner_type', '=', 'customer'),
-                        ('payment_type', '=', 'inbound'),
-                        ('state', 'in', ['posted', 'paid'])
-                    ])
-
-                    total_payments = sum(payments.mapped('amount'))
-                    total_credit_notes = sum(out_refunds.mapped('amount_total'))
-
-                    # Total Credits = Payments + Credit Notes
-                    order.customer_total_credits = total_payments + total_credit_notes
-
-                    # Due Amount = Debits - Credits
-                    order.customer_balance_due = total_debits - (total_payments + total_credit_notes)
-
-                except Exception as e:
-                    order.customer_total_invoiced = 0.0
-                    order.customer_total_credits = 0.0
-                    order.customer_balance_due = 0.0
-            else:
-                order.customer_total_invoiced = 0.0
-                order.customer_total_credits = 0.0
-                order.customer_balance_due = 0.0
+                groups[order.currency_id] |= order
+
+        for currency, orders in groups.items():
+            balances = self.env['account.partner.balance'].get_balances(
+                orders.partner_id, 'customer', currency=currency)
+            for order in orders:
+                balance = balances[order.partner_id.commercial_partner_id.id]
+                order.customer_total_invoiced = balance['invoiced']
+                order.customer_total_credits = balance['credited'] + balance['paid']
+                order.customer_balance_due = balance['due']
 
     def action_view_customer_invoices(self):
         """Open filtered list of customer invoices"""
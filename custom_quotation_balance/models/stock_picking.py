@@ -1,5 +1,7 @@
 
 
+from collections import defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import UserError
 
@@ -47,89 +49,28 @@ class StockPicking(models.Model):
 
     @api.depends('partner_id', 'picking_type_id', 'picking_type_id.code')
     def _compute_partner_balance(self):
-        """Calculate partner financial summary using accounting terminology"""
+        """Calculate partner financial summary from the partner balance ledger"""
+        groups = defaultdict(lambda: self.browse())
         for picking in self:
-            # Reset values
             picking.partner_total_invoiced = 0.0
             picking.partner_total_credits = 0.0
             picking.partner_balance_due = 0.0
 
-            # Need at least a partner
             if not picking.partner_id:
                 continue
-
-            try:
-                # If picking_type_id is set, use it to determine customer/vendor
-                if picking.picking_type_id and picking.picking_type_id.code:
-
-                    # Delivery orders (customer)
-                    if picking.picking_type_id.code == 'outgoing':
-                        invoices = self.env['account.move'].search([
-                            ('partner_id', 'child_of', picking.partner_id.commercial_partner_id.id),
-                            ('move_type', 'in', ['out_invoice', 'out_refund']),
-                            ('state', '=', 'posted')
-                        ])
-
-                        out_invoices = invoices.filtered(lambda inv: inv.move_type == 'out_invoice')
-                        out_refunds = invoices.filtered(lambda inv: inv.move_type == 'out_refund')
-
-                        # Total Debits = All invoices
-                        total_debits = sum(out_invoices.mapped('amount_total'))
-                        picking.partner_total_invoiced = total_debits
-
-                        # Get all customer payments
-                        payments = self.env['account.payment'].search([
-                            ('partner_id', 'child_of', picking.partner_id.commercial_partner_id.id),
-                            ('partner_type', '=', 'customer'),
-                            ('payment_type', '=', 'inbound'),
-                            ('state', 'in', ['posted', 'paid'])
-                        ])
-
-                        total_payments = sum(payments.mapped('amount'))
-                        total_credit_notes = sum(out_refunds.mapped('amount_total'))
-
-                        # Total Credits = Payments + Credit Notes
-                        picking.partner_total_credits = total_payments + total_credit_notes
-
-                        # Due Amount = Debits - Credits
-                        picking.partner_balance_due = total_debits - (total_payments + total_credit_notes)
-
-                    # Receipts (vendor)
-                    elif picking.picking_type_id.code == 'incoming':
-                        bills = self.env['account.move'].search([
-                            ('partner_id', 'child_of', picking.partner_id.commercial_partner_id.id),
-                            ('move_type', 'in', ['in_invoice', 'in_refund']),
-                            ('state', '=', 'posted')
-                        ])
-
-                        in_invoices = bills.filtered(lambda bill: bill.move_type == 'in_invoice')
-                        in_refunds = bills.filtered(lambda bill: bill.move_type == 'in_refund')
-
-                        # Total Debits = All bills
-                        total_debits = sum(in_invoices.mapped('amount_total'))
-                        picking.partner_total_invoiced = total_debits
-
-                        # Get all vendor payments
-                        payments = self.env['account.payment'].search([
-                            ('partner_id', 'child_of', picking.partner_id.commercial_partner_id.id),
-                            ('partner_type', '=', 'supplier'),
-                            ('payment_type', '=', 'outbound'),
-                            ('state', 'in', ['posted', 'paid'])
-                        ])
-
-                        total_payments = sum(payments.mapped('amount'))
-                        total_credit_notes = sum(in_refunds.mapped('amount_total'))
-
-                        # Total Credits = Payments + Credit Notes
-                        picking.partner_total_credits = total_payments + total_credit_notes
-
-                        # Due Amount = Debits - Credits
-                        picking.partner_balance_due = total_debits - (total_payments + total_credit_notes)
-
-            except Exception:
-                picking.partner_total_invoiced = 0.0
-                picking.partner_total_credits = 0.0
-                picking.partner_balance_due = 0.0
+            if picking.picking_type_id.code == 'outgoing':
+                groups['customer', picking.currency_id] |= picking
+            elif picking.picking_type_id.code == 'incoming':
+                groups['supplier', picking.currency_id] |= picking
+
+        for (partner_type, currency), pickings in groups.items():
+            balances = self.env['account.partner.balance'].get_balances(
+                pickings.partner_id, partner_type, currency=currency)
+            for picking in pickings:
+                balance = balances[picking.partner_id.commercial_partner_id.id]
+                picking.partner_total_invoiced = balance['invoiced']
+                picking.partner_total_credits = balance['credited'] + balance['paid']
+                picking.partner_balance_due = balance['due']
 
     def action_view_partner_invoices(self):
         """Open partner invoices/bills based on picking type"""
@@ -1,178 +1,3 @@
-#
-#
-# from odoo import models
-# import logging
-#
-# _logger = logging.getLogger(__name__)
-#
-#
-# class AccountBalanceReportInherit(models.TransientModel):
-#     _inherit = 'account.balance.report'
-#
-#     def _filter_lines_by_analytic(self, move_lines, analytic_ids):
-#         """
-#         Filter and calculate proportional amounts based on analytic_distribution.
-#
-#         Args:
-#             move_lines: recordset of account.move.line
-#             analytic_ids: list of analytic account IDs to filter by
-#
-#         Returns:
-#             dict: {debit: float, credit: float}
-#         """
-#         if not analytic_ids:
-#             # No filter - return full amounts
-#             return {
-#                 'debit': sum(move_lines.mapped('debit')),
-#                 'credit': sum(move_lines.mapped('credit'))
-#             }
-#
-#         total_debit = 0.0
-#         total_credit = 0.0
-#
-#         for line in move_lines:
-#             analytic_dist = line.analytic_distribution
-#
-#             if not analytic_dist:
-#                 continue
-#
-#             # Calculate percentage for our analytic accounts
-#             percentage = 0.0
-#             for analytic_id in analytic_ids:
-#                 analytic_id_str = str(analytic_id)
-#                 if analytic_id_str in analytic_dist:
-#                     percentage += float(analytic_dist[analytic_id_str])
-#
-#             if percentage == 0:
-#                 continue
-#
-#             # Calculate proportional amounts
-#             total_debit += line.debit * (percentage / 100.0)
-#             total_credit += line.credit * (percentage / 100.0)
-#
-#         return {
-#             'debit': total_debit,
-#             'credit': total_credit
-#         }
-#
-#     def open_trial_balance(self):
-#         self.ensure_one()
-#
-#         # Clear previous TB lines
-#         self.env['trial.balance.line'].search([('wizard_id', '=', self.id)]).unlink()
-#
-#         # Get analytic filter from the wizard
-#         analytic_ids = self.analytic_account_ids.ids if self.analytic_account_ids else []
-#
-#         if analytic_ids:
-#             analytic_names = ', '.join(self.analytic_account_ids.mapped('name'))
-#             _logger.info(f"TB Lines: Filtering by analytic accounts {analytic_ids} - {analytic_names}")
-#             window_title = f'Trial Balance - {analytic_names}'
-#         else:
-#             _logger.info("TB Lines: No analytic filter - showing all warehouses (combined)")
-#             window_title = 'Trial Balance - All Warehouses (Combined)'
-#
-#         accounts = self.env['account.account'].search([('code', '!=', 'TOTAL')])
-#
-#         for account in accounts:
-#             # Get all posted move lines for this account
-#             move_lines = self.env['account.move.line'].search([
-#                 ('account_id', '=', account.id),
-#                 ('move_id.state', '=', 'posted'),
-#             ])
-#
-#             # Opening balance: sum of (debit - credit) before date_from
-#             if self.date_from:
-#                 opening_lines = move_lines.filtered(lambda l: l.date < self.date_from)
-#             else:
-#                 opening_lines = move_lines.browse([])
-#
-#             # Calculate opening balance with analytic filter
-#             opening_data = self._filter_lines_by_analytic(opening_lines, analytic_ids)
-#             opening = opening_data['debit'] - opening_data['credit']
-#
-#             # Lines within the period
-#             if self.date_from and self.date_to:
-#                 period_lines = move_lines.filtered(lambda l: self.date_from <= l.date <= self.date_to)
-#             else:
-#                 period_lines = move_lines
-#
-#             # Calculate period amounts with analytic filter
-#             period_data = self._filter_lines_by_analytic(period_lines, analytic_ids)
-#             debit = period_data['debit']
-#             credit = period_data['credit']
-#
-#             ending = opening + debit - credit
-#
-#             # Only create line if there's any activity
-#             # Remove these 2 lines if you want to show all accounts even with zero balances
-#             if opening == 0 and debit == 0 and credit == 0 and ending == 0:
-#                 continue
-#
-#             # Create TB line
-#             self.env['trial.balance.line'].create({
-#                 'wizard_id': self.id,
-#                 'account_id': account.id,
-#                 'opening_balance': opening,
-#                 'debit': debit,
-#                 'credit': credit,
-#                 'ending_balance': ending,
-#                 'is_total': False,
-#             })
-#
-#         # Calculate and create totals row
-#         totals = self.env['trial.balance.line'].calculate_totals(self.id)
-#
-#         # Get or create a dummy account for the total row display
-#         total_account = self.env['account.account'].search([('code', '=', 'TOTAL')], limit=1)
-#         if not total_account:
-#             # Create a display-only account for totals
-#             total_account = self.env['account.account'].create({
-#                 'code': 'TOTAL',
-#                 'name': 'TOTAL',
-#                 'account_type': 'asset_current',
-#                 'reconcile': False,
-#             })
-#
-#         # Create a total row
-#         self.env['trial.balance.line'].create({
-#             'wizard_id': self.id,
-#             'account_id': total_account.id,
-#             'opening_balance': totals['opening_debit'] - totals['opening_credit'],
-#             'debit': totals['debit'],
-#             'credit': totals['credit'],
-#             'ending_balance': totals['ending_debit'] - totals['ending_credit'],
-#             'is_total': True,
-#         })
-#
-#         return {
-#             'name': window_title,
-#             'type': 'ir.actions.act_window',
-#             'res_model': 'trial.balance.line',
-#             'views': [
-#                 (self.env.ref('custom_tb_report.view_trial_balance_line_list').id, 'list'),
-#                 (self.env.ref('custom_tb_report.view_trial_balance_line_form').id, 'form'),
-#             ],
-#             'target': 'current',
-#             'domain': [('wizard_id', '=', self.id)],
-#         }
-#
-#     def print_detailed_trial_balance(self):
-#         """
-#         Print detailed trial balance report with all transactions.
-#         First ensures trial balance lines are created, then prints the report.
-#         """
-#         self.ensure_one()
-#
-#         # First, ensure trial balance lines exist
-#         existing_lines = self.env['trial.balance.line'].search([('wizard_id', '=', self.id)])
-#         if not existing_lines:
-#             # Generate trial balance lines
-#             self.open_trial_balance()
-#
-#         # Return report action
-#         return self.env.ref('custom_tb_report.action_report_trial_balance_detailed').report_action(self)
-
 from odoo import models
 import logging
 import base64
@@ -190,51 +15,64 @@ except ImportError:
 class AccountBalanceReportInherit(models.TransientModel):
     _inherit = 'account.balance.report'
 
-    def _filter_lines_by_analytic(self, move_lines, analytic_ids):
+    def _get_trial_balance_amounts(self, analytic_ids):
         """
-        Filter and calculate proportional amounts based on analytic_distribution.
+        Opening balance, debit and credit per account of the posted journal
+        items, in one grouped query. With analytic accounts, every line is
+        weighted by the share of those accounts in its analytic_distribution
+        (see account.move.line._analytic_weight_sql).
 
         Args:
-            move_lines: recordset of account.move.line
             analytic_ids: list of analytic account IDs to filter by
 
         Returns:
-            dict: {debit: float, credit: float}
+            list of tuples (account_id, opening, debit, credit)
         """
-        if not analytic_ids:
-            # No filter - return full amounts
-            return {
-                'debit': sum(move_lines.mapped('debit')),
-                'credit': sum(move_lines.mapped('credit'))
-            }
-
-        total_debit = 0.0
-        total_credit = 0.0
-
-        for line in move_lines:
-            analytic_dist = line.analytic_distribution
-
-            if not analytic_dist:
-                continue
+        self.env['account.move.line'].flush_model([
+            'account_id', 'move_id', 'date', 'debit', 'credit',
+            'analytic_distribution', 'company_id',
+        ])
+        self.env['account.move'].flush_model(['state'])
 
-            # Calculate percentage for our analytic accounts
-            percentage = 0.0
-            for analytic_id in analytic_ids:
-                analytic_id_str = str(analytic_id)
-                if analytic_id_str in analytic_dist:
-                    percentage += float(analytic_dist[analytic_id_str])
+        total_accounts = self.env['account.account'].search([('code', '=', 'TOTAL')])
 
-            if percentage == 0:
-                continue
-
-            # Calculate proportional amounts
-            total_debit += line.debit * (percentage / 100.0)
-            total_credit += line.credit * (percentage / 100.0)
+        if self.date_from:
+            opening_condition, opening_params = "aml.date < %s", [self.date_from]
+        else:
+            opening_condition, opening_params = "FALSE", []
+        if self.date_from and self.date_to:
+            period_condition = "aml.date BETWEEN %s AND %s"
+            period_params = [self.date_from, self.date_to]
+        else:
+            period_condition, period_params = "TRUE", []
 
-        return {
-            'debit': total_debit,
-            'credit': total_credit
-        }
+        MoveLine = self.env['account.move.line']
+        weight_join, weight_params = MoveLine._analytic_weight_sql(analytic_ids, alias='aml')
+        if analytic_ids:
+            analytic_where, analytic_params = MoveLine._analytic_filter_sql(analytic_ids, alias='aml')
+            analytic_condition = "AND " + analytic_where
+        else:
+            analytic_condition, analytic_params = "", []
+
+        self.env.cr.execute(f"""
+            SELECT aml.account_id,
+                   SUM(CASE WHEN {opening_condition}
+                            THEN (aml.debit - aml.credit) * analytic_weight.weight ELSE 0 END),
+                   SUM(CASE WHEN {period_condition}
+                            THEN aml.debit * analytic_weight.weight ELSE 0 END),
+                   SUM(CASE WHEN {period_condition}
+                            THEN aml.credit * analytic_weight.weight ELSE 0 END)
+            FROM account_move_line aml
+            JOIN account_move move ON move.id = aml.move_id
+            {weight_join}
+            WHERE move.state = 'posted'
+              AND aml.company_id = ANY(%s)
+              AND NOT aml.account_id = ANY(%s)
+              {analytic_condition}
+            GROUP BY aml.account_id
+        """, opening_params + period_params * 2 + weight_params
+            + [self.env.companies.ids, total_accounts.ids] + analytic_params)
+        return self.env.cr.fetchall()
 
     def open_trial_balance(self):
         self.ensure_one()
@@ -253,53 +91,28 @@ class AccountBalanceReportInherit(models.TransientModel):
             _logger.info("TB Lines: No analytic filter - showing all warehouses (combined)")
             window_title = 'Trial Balance - All Warehouses (Combined)'
 
-        accounts = self.env['account.account'].search([('code', '!=', 'TOTAL')])
+        # Only accounts with activity; drop the filter to show all accounts
+        amounts = {
+            account_id: (float(opening), float(debit), float(credit))
+            for account_id, opening, debit, credit in self._get_trial_balance_amounts(analytic_ids)
+            if opening or debit or credit
+        }
+        # Account order, as the lines used to be created account by account
+        accounts = self.env['account.account'].search([('id', 'in', list(amounts))])
 
+        vals_list = []
         for account in accounts:
-            # Get all posted move lines for this account
-            move_lines = self.env['account.move.line'].search([
-                ('account_id', '=', account.id),
-                ('move_id.state', '=', 'posted'),
-            ])
-
-            # Opening balance: sum of (debit - credit) before date_from
-            if self.date_from:
-                opening_lines = move_lines.filtered(lambda l: l.date < self.date_from)
-            else:
-                opening_lines = move_lines.browse([])
-
-            # Calculate opening balance with analytic filter
-            opening_data = self._filter_lines_by_analytic(opening_lines, analytic_ids)
-            opening = opening_data['debit'] - opening_data['credit']
-
-            # Lines within the period
-            if self.date_from and self.date_to:
-                period_lines = move_lines.filtered(lambda l: self.date_from <= l.date <= self.date_to)
-            else:
-                period_lines = move_lines
-
-            # Calculate period amounts with analytic filter
-            period_data = self._filter_lines_by_analytic(period_lines, analytic_ids)
-            debit = period_data['debit']
-            credit = period_data['credit']
-
-            ending = opening + debit - credit
-
-            # Only create line if there's any activity
-            # Remove these 2 lines if you want to show all accounts even with zero balances
-            if opening == 0 and debit == 0 and credit == 0 and ending == 0:
-                continue
-
-            # Create TB line
-            self.env['trial.balance.line'].create({
+            opening, debit, credit = amounts[account.id]
+            vals_list.append({
                 'wizard_id': self.id,
                 'account_id': account.id,
                 'opening_balance': opening,
                 'debit': debit,
                 'credit': credit,
-                'ending_balance': ending,
+                'ending_balance': opening + debit - credit,
                 'is_total': False,
             })
+        self.env['trial.balance.line'].create(vals_list)
 
         # Calculate and create totals row
         totals = self.env['trial.balance.line'].calculate_totals(self.id)
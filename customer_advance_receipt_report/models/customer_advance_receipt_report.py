@@ -5,6 +5,7 @@ from odoo import models, fields, api
 
 class CustomerAdvanceReceiptReport(models.TransientModel):
     _name = 'customer.advance.receipt.report'
+    _inherit = ['report.staging.mixin']
     _description = 'Customer Advance Receipt Report'
     _order = 'date desc, receipt_number desc'
 
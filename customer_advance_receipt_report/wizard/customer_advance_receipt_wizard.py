@@ -68,9 +68,6 @@ class CustomerAdvanceReceiptWizard(models.TransientModel):
         if self.date_from > self.date_to:
             raise UserError('Date From cannot be greater than Date To.')
 
-        # Clear previous report data
-        self.env['customer.advance.receipt.report'].search([]).unlink()
-
         company_currency = self.env.company.currency_id
 
         # Build domain - fetch advance customer receipts only
@@ -132,16 +129,10 @@ class CustomerAdvanceReceiptWizard(models.TransientModel):
                 'payment_id': receipt.id,
             })
 
-        if report_lines:
-            self.env['customer.advance.receipt.report'].create(report_lines)
-
-        return {
-            'name': 'Customer Advance Receipt Report',
-            'type': 'ir.actions.act_window',
-            'res_model': 'customer.advance.receipt.report',
-            'view_mode': 'list',
-            'target': 'current',
-        }
+        # Report lines of this run only, created in one batch
+        run, __ = self.env['customer.advance.receipt.report']._stage_rows(
+            report_lines, name='Customer Advance Receipt Report')
+        return run._get_action()
 
     def action_exit(self):
         return {'type': 'ir.actions.act_window_close'}
@@ -1,6 +1,6 @@
 {
     'name': 'Invoice Stock Automation (Sales & Purchase)',
-    'version': '19.0.2.0.0',
+    'version': '19.0.2.1.0',
     'category': 'Accounting/Accounting',
     'summary': 'Auto-create deliveries from customer invoices and receipts from vendor bills with warehouse selection',
     'description': """
@@ -20,6 +20,7 @@
         - Track stock from different warehouses in one invoice/bill
         - Support both invoices/bills created directly and those from orders
         - Configurable auto-validation and stock checking
+        - Large posting batches create their stock operations in a scheduled action
     """,
     'author': 'Your Company',
     'website': 'https://www.yourcompany.com',
@@ -31,6 +32,7 @@
     ],
     'data': [
         'Security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/account_move_views.xml',
         'views/res_config_settings_views.xml',
     ],
@@ -507,40 +507,87 @@ class AccountMoveLine(models.Model):
 
     @api.depends('product_id', 'move_id.move_type')
     def _compute_warehouse_id(self):
-        """Auto-select warehouse with available stock for new lines"""
-        for line in self:
-            # Skip if already set or not an invoice/bill
-            if line.warehouse_id or line.move_id.move_type not in ('out_invoice', 'out_refund', 'in_invoice',
-                                                                   'in_refund'):
-                continue
-
-            # Skip non-stockable products
-            if not line.product_id or line.product_id.type not in ('product', 'consu'):
-                line.warehouse_id = False
-                continue
-
-            # Get company's warehouses
-            try:
-                warehouses = self.env['stock.warehouse'].search([
-                    ('company_id', '=', line.company_id.id or self.env.company.id)
-                ])
-
-                # For outgoing (customer invoices), find warehouse with stock
-                if line.move_id.move_type in ('out_invoice', 'out_refund'):
-                    for warehouse in warehouses:
-                        stock = line.product_id.with_context(
-                            warehouse=warehouse.id
-                        ).qty_available
-                        if stock > 0:
-                            line.warehouse_id = warehouse.id
-                            break
-
-                # If no stock found (or incoming bill), use default warehouse
-                if not line.warehouse_id and warehouses:
-                    line.warehouse_id = warehouses[0]
-            except Exception as e:
-                _logger.warning(f"Could not compute warehouse for line: {str(e)}")
-                line.warehouse_id = False
+        """Auto-select a warehouse for new stock lines, using the company strategy"""
+        lines = self.filtered(lambda l: not l.warehouse_id and l.move_id.move_type in (
+            'out_invoice', 'out_refund', 'in_invoice', 'in_refund'))
+        stock_lines = lines.filtered(lambda l: l.product_id.is_storable)
+        # Skip non-stockable products
+        for line in lines - stock_lines:
+            line.warehouse_id = False
+        if not stock_lines:
+            return
+
+        companies = stock_lines.company_id | self.env.company
+        warehouses = self.env['stock.warehouse'].search([('company_id', 'in', companies.ids)])
+        warehouses_by_company = defaultdict(lambda: self.env['stock.warehouse'])
+        for warehouse in warehouses:
+            warehouses_by_company[warehouse.company_id.id] |= warehouse
+
+        # one availability read for every outgoing line of the batch
+        outgoing = stock_lines.filtered(lambda l: l.move_id.move_type in ('out_invoice', 'out_refund'))
+        available = self._get_warehouse_availability(outgoing.product_id, warehouses)
+
+        for line in stock_lines:
+            company = line.company_id or self.env.company
+            line.warehouse_id = line._select_warehouse(
+                warehouses_by_company[company.id],
+                available if line in outgoing else None,
+                company.invoice_warehouse_strategy,
+            )
+
+    def _select_warehouse(self, warehouses, available, strategy):
+        """
+        Pick the warehouse of a line among ``warehouses`` (in priority order).
+
+        Args:
+            warehouses: stock.warehouse records of the line company
+            available: {(product_id, warehouse_id): qty} for outgoing lines,
+                None when stock does not matter (vendor bills)
+            strategy: 'user_default', 'most_stock' or 'priority'
+        """
+        self.ensure_one()
+        if not warehouses:
+            return warehouses
+        user_warehouse = self.env.user.property_warehouse_id
+        if available is None:
+            if strategy == 'user_default' and user_warehouse in warehouses:
+                return user_warehouse
+            return warehouses[0]
+
+        in_stock = warehouses.filtered(
+            lambda wh: available.get((self.product_id.id, wh.id), 0.0) > 0)
+        if not in_stock:
+            return warehouses[0]
+        if strategy == 'user_default' and user_warehouse in in_stock:
+            return user_warehouse
+        if strategy == 'most_stock':
+            return max(in_stock, key=lambda wh: available[self.product_id.id, wh.id])
+        return in_stock[0]
+
+    @api.model
+    def _get_warehouse_availability(self, products, warehouses):
+        """
+        On-hand quantity of ``products`` in each of ``warehouses`` (same scope
+        as ``qty_available`` with a ``warehouse`` context), from one grouped
+        quant read.
+
+        Returns:
+            {(product_id, warehouse_id): qty}
+        """
+        result = defaultdict(float)
+        if not products or not warehouses:
+            return result
+        groups = self.env['stock.quant'].sudo()._read_group(
+            [('product_id', 'in', products.ids),
+             ('location_id', 'child_of', warehouses.view_location_id.ids)],
+            ['product_id', 'location_id'], ['quantity:sum'])
+        view_paths = [(wh.id, wh.view_location_id.parent_path) for wh in warehouses]
+        for product, location, quantity in groups:
+            for warehouse_id, parent_path in view_paths:
+                if location.parent_path.startswith(parent_path):
+                    result[product.id, warehouse_id] += quantity
+                    break
+        return result
 
 
 class AccountMove(models.Model):
@@ -578,6 +625,13 @@ class AccountMove(models.Model):
         help='True when the invoice/bill is created directly (not from a sale/purchase order)',
     )
 
+    stock_operation_pending = fields.Boolean(
+        string='Stock Operations Pending',
+        readonly=True,
+        copy=False,
+        help='Posted in a large batch; the deliveries/receipts are created by a scheduled action',
+    )
+
     @api.depends('invoice_line_ids.sale_line_ids', 'invoice_line_ids.purchase_line_id')
     def _compute_is_direct_invoice(self):
         """Check if the invoice/bill was created directly (not from sale/purchase order)"""
@@ -658,144 +712,132 @@ class AccountMove(models.Model):
         """Override to create stock pickings for direct invoices/bills"""
         result = super(AccountMove, self).action_post()
 
-        for move in self:
-            _logger.info(
-                f"[DEBUG] action_post: invoice={move.name} "
-                f"move_type={move.move_type} "
-                f"has_sale_lines={bool(move.invoice_line_ids.mapped('sale_line_ids'))} "
-                f"has_purchase_lines={bool(move.invoice_line_ids.mapped('purchase_line_id'))} "
-                f"auto_create={move.auto_create_delivery}"
-            )
-
-            # Customer Invoice - Create Deliveries
-            if (move.move_type == 'out_invoice'
-                    and not move.invoice_line_ids.mapped('sale_line_ids')
-                    and move.auto_create_delivery):
-                try:
-                    move._create_delivery_from_invoice()
-                except Exception as e:
-                    _logger.error(
-                        f"[DEBUG] action_post DELIVERY EXCEPTION for {move.name}: {str(e)}\n"
-                        f"{traceback.format_exc()}"
-                    )
-                    try:
-                        move.message_post(
-                            body=_("Could not automatically create delivery: %s") % str(e),
-                            message_type='notification',
-                        )
-                    except Exception:
-                        pass
-
-            # Vendor Bill - Create Receipts
-            elif (move.move_type == 'in_invoice'
-                  and not move.invoice_line_ids.mapped('purchase_line_id')
-                  and move.auto_create_delivery):
-                try:
-                    move._create_receipt_from_bill()
-                except Exception as e:
-                    _logger.error(
-                        f"[DEBUG] action_post RECEIPT EXCEPTION for {move.name}: {str(e)}\n"
-                        f"{traceback.format_exc()}"
-                    )
-                    try:
-                        move.message_post(
-                            body=_("Could not automatically create receipt: %s") % str(e),
-                            message_type='notification',
-                        )
-                    except Exception:
-                        pass
+        moves = self._get_stock_operation_moves()
+        if not moves:
+            return result
+
+        # Large selections (month-end posting) are handed over to the cron
+        threshold = int(self.env['ir.config_parameter'].sudo().get_param(
+            'invoice_delivery_auto.post_batch_threshold', 50))
+        if threshold and len(moves) > threshold:
+            moves.stock_operation_pending = True
+            self.env.ref('invoice_delivery_auto.ir_cron_create_stock_operations')._trigger()
+            _logger.info("Deferred stock operations of %s invoices/bills to the cron", len(moves))
+        else:
+            moves._create_stock_operations()
 
         return result
 
-    def _create_delivery_from_invoice(self):
-        """Create delivery orders based on customer invoice lines grouped by warehouse"""
-        self.ensure_one()
-        _logger.info(
-            f"[DEBUG] _create_delivery_from_invoice: START invoice={self.name} "
-            f"line_count={len(self.invoice_line_ids)}"
-        )
+    def _get_stock_operation_moves(self):
+        """Direct customer invoices and vendor bills that need a delivery/receipt"""
+        return self.filtered(lambda m: m.state == 'posted' and m.auto_create_delivery and (
+            (m.move_type == 'out_invoice' and not m.invoice_line_ids.sale_line_ids)
+            or (m.move_type == 'in_invoice' and not m.invoice_line_ids.purchase_line_id)
+        ))
 
-        if not self.invoice_line_ids:
-            _logger.info(f"[DEBUG] _create_delivery_from_invoice: NO invoice_line_ids, returning")
+    @api.model
+    def _cron_create_stock_operations(self, batch_size=200):
+        """Create the stock operations of invoices/bills posted in a large batch"""
+        moves = self.search([('stock_operation_pending', '=', True)], limit=batch_size)
+        if not moves:
             return
+        moves._create_stock_operations()
+        if self.search_count([('stock_operation_pending', '=', True)], limit=1):
+            self.env.ref('invoice_delivery_auto.ir_cron_create_stock_operations')._trigger()
 
-        lines_by_warehouse = defaultdict(list)
-
-        for line in self.invoice_line_ids:
-            _logger.info(
-                f"[DEBUG] scanning line: product={line.product_id.display_name if line.product_id else None} "
-                f"type={line.product_id.type if line.product_id else None} "
-                f"quantity={line.quantity} warehouse={line.warehouse_id.name if line.warehouse_id else None}"
-            )
-
-            if line.product_id and line.product_id.type in ('product', 'consu') and line.quantity > 0:
-                warehouse = line.warehouse_id or self._get_default_warehouse()
-                if warehouse:
-                    lines_by_warehouse[warehouse].append(line)
-
-        _logger.info(
-            f"[DEBUG] lines_by_warehouse: {[(wh.name, len(lines)) for wh, lines in lines_by_warehouse.items()]}"
-        )
+    def _create_stock_operations(self):
+        """
+        Create the deliveries/receipts of a batch of invoices/bills.
 
-        if not lines_by_warehouse:
-            return
+        The whole batch is processed at once; if it fails, every invoice/bill
+        is retried on its own so that a faulty one only gets a chatter message.
+        """
+        self.stock_operation_pending = False
+        try:
+            with self.env.cr.savepoint():
+                return self._create_stock_operations_batch()
+        except Exception:
+            if len(self) == 1:
+                self._notify_stock_operation_error(traceback.format_exc())
+                return self.env['stock.picking']
+            _logger.warning("Batch stock operation creation failed, retrying invoice by invoice",
+                            exc_info=True)
 
         pickings = self.env['stock.picking']
+        for move in self:
+            try:
+                with self.env.cr.savepoint():
+                    pickings |= move._create_stock_operations_batch()
+            except Exception:
+                move._notify_stock_operation_error(traceback.format_exc())
+        return pickings
 
-        for warehouse, lines in lines_by_warehouse.items():
-            _logger.info(f"[DEBUG] Creating DELIVERY for warehouse={warehouse.name}")
-            picking = self._create_picking_for_warehouse(warehouse, lines, 'outgoing')
-            if picking:
-                pickings |= picking
+    def _notify_stock_operation_error(self, error):
+        self.ensure_one()
+        operation = _("delivery") if self.move_type == 'out_invoice' else _("receipt")
+        _logger.error("Could not create %s for %s:\n%s", operation, self.name, error)
+        try:
+            self.message_post(
+                body=_("Could not automatically create %s: %s") % (operation, error.strip().splitlines()[-1]),
+                message_type='notification',
+            )
+        except Exception:
+            pass
 
-        self._finalize_pickings(pickings, 'Delivery')
+    def _create_delivery_from_invoice(self):
+        """Create delivery orders based on customer invoice lines grouped by warehouse"""
+        self.ensure_one()
+        return self._create_stock_operations_batch()
 
     def _create_receipt_from_bill(self):
         """Create receipt orders based on vendor bill lines grouped by warehouse"""
         self.ensure_one()
-        _logger.info(
-            f"[DEBUG] _create_receipt_from_bill: START bill={self.name} "
-            f"line_count={len(self.invoice_line_ids)}"
-        )
-
-        if not self.invoice_line_ids:
-            _logger.info(f"[DEBUG] _create_receipt_from_bill: NO invoice_line_ids, returning")
-            return
-
-        lines_by_warehouse = defaultdict(list)
+        return self._create_stock_operations_batch()
 
-        for line in self.invoice_line_ids:
-            _logger.info(
-                f"[DEBUG] scanning line: product={line.product_id.display_name if line.product_id else None} "
-                f"type={line.product_id.type if line.product_id else None} "
-                f"quantity={line.quantity} warehouse={line.warehouse_id.name if line.warehouse_id else None}"
+    def _create_stock_operations_batch(self):
+        """
+        One picking per invoice/bill and warehouse (deliveries for customer
+        invoices, receipts for vendor bills).  All pickings and their moves are
+        created with a single create, confirmed together and, when the company
+        validates automatically, assigned and validated as one set.
+        """
+        default_warehouses = {}
+        picking_vals_list = []
+        for move in self:
+            direction = 'outgoing' if move.move_type == 'out_invoice' else 'incoming'
+            lines_by_warehouse = defaultdict(lambda: self.env['account.move.line'])
+            for line in move.invoice_line_ids:
+                if line.product_id.is_storable and line.quantity > 0:
+                    warehouse = line.warehouse_id
+                    if not warehouse:
+                        if move.company_id not in default_warehouses:
+                            default_warehouses[move.company_id] = move._get_default_warehouse()
+                        warehouse = default_warehouses[move.company_id]
+                    if warehouse:
+                        lines_by_warehouse[warehouse] |= line
+            for warehouse, lines in lines_by_warehouse.items():
+                picking_vals_list.append(move._prepare_picking_vals_for_warehouse(warehouse, lines, direction))
+
+        if not picking_vals_list:
+            return self.env['stock.picking']
+
+        pickings = self.env['stock.picking'].create(picking_vals_list)
+        pickings.action_confirm()
+        pickings.filtered(lambda p: p.company_id.invoice_auto_validate_delivery)._auto_validate_pickings()
+
+        _logger.info("Created %s stock operations for %s invoices/bills", len(pickings), len(self))
+
+        for move, move_pickings in pickings.grouped('invoice_id').items():
+            picking_type_name = _("Delivery") if move.move_type == 'out_invoice' else _("Receipt")
+            move.message_post(
+                body=_("%s orders created: %s") % (picking_type_name, ', '.join(move_pickings.mapped('name'))),
+                message_type='notification',
             )
+        return pickings
 
-            if line.product_id and line.product_id.type in ('product', 'consu') and line.quantity > 0:
-                warehouse = line.warehouse_id or self._get_default_warehouse()
-                if warehouse:
-                    lines_by_warehouse[warehouse].append(line)
-
-        _logger.info(
-            f"[DEBUG] lines_by_warehouse: {[(wh.name, len(lines)) for wh, lines in lines_by_warehouse.items()]}"
-        )
-
-        if not lines_by_warehouse:
-            return
-
-        pickings = self.env['stock.picking']
-
-        for warehouse, lines in lines_by_warehouse.items():
-            _logger.info(f"[DEBUG] Creating RECEIPT for warehouse={warehouse.name}")
-            picking = self._create_picking_for_warehouse(warehouse, lines, 'incoming')
-            if picking:
-                pickings |= picking
-
-        self._finalize_pickings(pickings, 'Receipt')
-
-    def _create_picking_for_warehouse(self, warehouse, lines, direction='outgoing'):
+    def _prepare_picking_vals_for_warehouse(self, warehouse, lines, direction='outgoing'):
         """
-        Create a single picking for a warehouse with given invoice lines.
+        Values of a single picking for a warehouse with given invoice lines.
 
         Args:
             warehouse: stock.warehouse record
@@ -826,38 +868,21 @@ class AccountMove(models.Model):
                 (warehouse.name, direction)
             )
 
-        _logger.info(
-            f"[DEBUG] _create_picking_for_warehouse: warehouse={warehouse.name} direction={direction} "
-            f"picking_type={picking_type.name} "
-            f"source={source_location.complete_name} dest={dest_location.complete_name}"
-        )
-
-        # Build move commands
-        move_commands = []
-        for line in lines:
-            if line.product_id and line.product_id.type in ('product', 'consu') and line.quantity > 0:
-                cmd = {
-                    'product_id': line.product_id.id,
-                    'product_uom_qty': line.quantity,
-                    'product_uom': line.product_uom_id.id,
-                    'location_id': source_location.id,
-                    'location_dest_id': dest_location.id,
-                    'company_id': self.company_id.id,
-                    'picking_type_id': picking_type.id,
-                    'warehouse_id': warehouse.id,
-                }
-                move_commands.append((0, 0, cmd))
-                _logger.info(
-                    f"[DEBUG]   move_command: product={line.product_id.display_name} qty={line.quantity}"
-                )
-
-        if not move_commands:
-            _logger.warning(f"[DEBUG] No move_commands, returning None")
-            return None
-
-        _logger.info(f"[DEBUG] Creating picking with {len(move_commands)} moves")
-
-        picking_vals = {
+        move_commands = [
+            (0, 0, {
+                'product_id': line.product_id.id,
+                'product_uom_qty': line.quantity,
+                'product_uom': line.product_uom_id.id,
+                'location_id': source_location.id,
+                'location_dest_id': dest_location.id,
+                'company_id': self.company_id.id,
+                'picking_type_id': picking_type.id,
+                'warehouse_id': warehouse.id,
+            })
+            for line in lines
+        ]
+
+        return {
             'picking_type_id': picking_type.id,
             'partner_id': self.partner_id.id,
             'origin': self.name,
@@ -870,50 +895,6 @@ class AccountMove(models.Model):
             'move_ids': move_commands,
         }
 
-        picking = self.env['stock.picking'].create(picking_vals)
-
-        _logger.info(
-            f"[DEBUG] Picking created: id={picking.id} name={picking.name} "
-            f"state={picking.state} move_count={len(picking.move_ids)}"
-        )
-
-        # Confirm
-        picking.action_confirm()
-
-        _logger.info(
-            f"[DEBUG] Picking confirmed: state={picking.state} move_count={len(picking.move_ids)}"
-        )
-
-        return picking
-
-    def _finalize_pickings(self, pickings, picking_type_name):
-        """Auto-validate pickings if configured and post message"""
-        if self.env.company.invoice_auto_validate_delivery and pickings:
-            for picking in pickings:
-                try:
-                    picking.action_assign()
-                    for move in picking.move_ids:
-                        for move_line in move.move_line_ids:
-                            move_line.quantity = move_line.product_uom_qty
-                    picking.button_validate()
-                    _logger.info(f"[DEBUG] Auto-validated: {picking.name}")
-                except Exception as e:
-                    _logger.warning(f"Could not auto-validate {picking.name}: {str(e)}")
-                    picking.message_post(
-                        body=_("Could not auto-validate: %s. Please validate manually.") % str(e),
-                        message_type='notification',
-                    )
-
-        _logger.info(
-            f"[DEBUG] _finalize_pickings: total={len(pickings)} names={pickings.mapped('name')}"
-        )
-
-        if pickings:
-            self.message_post(
-                body=_("%s orders created: %s") % (picking_type_name, ', '.join(pickings.mapped('name'))),
-                message_type='notification',
-            )
-
     def _get_default_warehouse(self):
         """Get default warehouse for the company"""
         warehouse = self.env['stock.warehouse'].search([
@@ -945,27 +926,30 @@ class AccountMove(models.Model):
         if not self.env.company.invoice_check_stock_availability:
             return
 
-        for move in self:
-            # Only check stock for outgoing (customer invoices)
-            if move.move_type != 'out_invoice' or move.state != 'draft':
-                continue
+        # Only check stock for outgoing (customer invoices)
+        lines = self.filtered(
+            lambda m: m.move_type == 'out_invoice' and m.state == 'draft'
+        ).invoice_line_ids.filtered(lambda l: l.product_id.is_storable and l.warehouse_id)
+        if not lines:
+            return
 
-            for line in move.invoice_line_ids:
-                if line.product_id and line.product_id.type == 'product' and line.warehouse_id:
-                    available = line.product_id.with_context(
-                        warehouse=line.warehouse_id.id
-                    ).qty_available
-
-                    if available < line.quantity:
-                        raise ValidationError(_(
-                            "Insufficient stock for product '%s' in warehouse '%s'.\n"
-                            "Required: %s, Available: %s"
-                        ) % (
-                                                  line.product_id.display_name,
-                                                  line.warehouse_id.name,
-                                                  line.quantity,
-                                                  available
-                                              ))
+        required = defaultdict(float)
+        for line in lines:
+            required[line.product_id, line.warehouse_id] += line.product_uom_id._compute_quantity(
+                line.quantity, line.product_id.uom_id)
+        available = self.env['account.move.line']._get_warehouse_availability(
+            lines.product_id, lines.warehouse_id)
+
+        shortages = []
+        for (product, warehouse), quantity in required.items():
+            on_hand = available.get((product.id, warehouse.id), 0.0)
+            if on_hand < quantity:
+                shortages.append(_(
+                    "Insufficient stock for product '%s' in warehouse '%s'.\n"
+                    "Required: %s, Available: %s"
+                ) % (product.display_name, warehouse.name, quantity, on_hand))
+        if shortages:
+            raise ValidationError("\n\n".join(shortages))
 
 
 class StockPicking(models.Model):
@@ -977,4 +961,33 @@ class StockPicking(models.Model):
         help='Invoice or Bill that created this stock operation',
         readonly=True,
         copy=False,
-    )
\ No newline at end of file
+    )
+
+    def _auto_validate_pickings(self):
+        """Assign and validate invoice-driven pickings as one set"""
+        if not self:
+            return
+        try:
+            with self.env.cr.savepoint():
+                self._auto_validate_pickings_batch()
+            return
+        except Exception:
+            if len(self) > 1:
+                _logger.warning("Batch validation failed, validating picking by picking", exc_info=True)
+        # one picking at a time so that a blocked one does not hold back the others
+        for picking in self:
+            try:
+                with self.env.cr.savepoint():
+                    picking._auto_validate_pickings_batch()
+            except Exception as e:
+                _logger.warning(f"Could not auto-validate {picking.name}: {str(e)}")
+                picking.message_post(
+                    body=_("Could not auto-validate: %s. Please validate manually.") % str(e),
+                    message_type='notification',
+                )
+
+    def _auto_validate_pickings_batch(self):
+        self.action_assign()
+        for move_line in self.move_ids.move_line_ids:
+            move_line.quantity = move_line.product_uom_qty
+        self.button_validate()
@@ -23,6 +23,20 @@ class ResCompany(models.Model):
         help='Prevent posting invoice if insufficient stock is available',
     )
 
+    invoice_warehouse_strategy = fields.Selection(
+        [
+            ('user_default', "User's Default Warehouse First"),
+            ('most_stock', 'Most Stock'),
+            ('priority', 'Warehouse Order'),
+        ],
+        string='Invoice Line Warehouse',
+        default='priority',
+        help='How the warehouse of a new invoice/bill line is chosen:\n'
+             "- User's Default Warehouse First: the user's default warehouse when it has stock\n"
+             '- Most Stock: the warehouse holding the most stock of the product\n'
+             '- Warehouse Order: the first warehouse (by sequence) holding stock',
+    )
+
 
 class ResConfigSettings(models.TransientModel):
     _inherit = 'res.config.settings'
@@ -43,4 +57,10 @@ class ResConfigSettings(models.TransientModel):
         related='company_id.invoice_check_stock_availability',
         readonly=False,
         string='Check Stock Availability',
-    )
\ No newline at end of file
+    )
+
+    invoice_warehouse_strategy = fields.Selection(
+        related='company_id.invoice_warehouse_strategy',
+        readonly=False,
+        string='Invoice Line Warehouse',
+    )
@@ -16,7 +16,7 @@
     """,
     'author': 'Custom Development',
     'website': 'https://www.example.com',
-    'depends': ['account'],
+    'depends': ['account', 'account_partner_balance'],
     'data': [
         'security/ir.model.access.csv',
         'wizard/multi_payment_wizard_views.xml',
@@ -98,6 +98,8 @@ class MultiPaymentWizard(models.TransientModel):
 
     @api.depends('partner_id', 'currency_id')
     def _compute_customer_summary(self):
+        """Read the customer totals from the partner balance ledger, in the
+        customer's currency. Credit notes count as amounts received."""
         for rec in self:
             if not rec.partner_id:
                 rec.total_invoiced_amount = 0.0
@@ -105,56 +107,14 @@ class MultiPaymentWizard(models.TransientModel):
                 rec.total_balance_due = 0.0
                 continue
 
-            company_currency = rec.env.company.currency_id
             customer_currency = rec._get_customer_currency(rec.partner_id)
-            today = fields.Date.context_today(rec)
+            balance = rec.env['account.partner.balance'].get_balances(
+                rec.partner_id, 'customer', currency=customer_currency,
+            )[rec.partner_id.commercial_partner_id.id]
 
-            invoices = rec.env['account.move'].search([
-                ('partner_id', '=', rec.partner_id.id),
-                ('move_type', '=', 'out_invoice'),
-                ('state', '=', 'posted'),
-            ])
-
-            total_invoiced = 0.0
-            for inv in invoices:
-                amt = inv.amount_total
-                if inv.currency_id and inv.currency_id != customer_currency:
-                    amt = inv.currency_id._convert(
-                        amt, customer_currency, rec.env.company, today)
-                total_invoiced += amt
-
-            receivable_accounts = rec.env['account.account'].search([
-                ('account_type', '=', 'asset_receivable'),
-                ('company_ids', 'in', rec.env.company.id),
-            ])
-
-            total_received = 0.0
-            if receivable_accounts:
-                move_lines = rec.env['account.move.line'].search([
-                    ('partner_id', '=', rec.partner_id.id),
-                    ('account_id', 'in', receivable_accounts.ids),
-                    ('move_id.state', '=', 'posted'),
-                ])
-                for ml in move_lines:
-                    amt = ml.credit
-                    ml_currency = ml.currency_id or company_currency
-                    if ml_currency != customer_currency:
-                        amt = ml_currency._convert(
-                            amt, customer_currency, rec.env.company, today)
-                    total_received += amt
-            else:
-                total_residual = sum(
-                    inv.currency_id._convert(
-                        inv.amount_residual, customer_currency, rec.env.company, today)
-                    if inv.currency_id != customer_currency
-                    else inv.amount_residual
-                    for inv in invoices
-                )
-                total_received = total_invoiced - total_residual
-
-            rec.total_invoiced_amount = total_invoiced
-            rec.total_amount_received = total_received
-            rec.total_balance_due = total_invoiced - total_received
+            rec.total_invoiced_amount = balance['invoiced']
+            rec.total_amount_received = balance['credited'] + balance['paid']
+            rec.total_balance_due = balance['due']
 
     @api.depends('invoice_line_ids.amount_to_pay', 'invoice_line_ids.selected')
     def _compute_total_allocated(self):
@@ -1,2 +1,3 @@
 from . import account_budget
 from . import account_analytic_account
+from . import account_move_line
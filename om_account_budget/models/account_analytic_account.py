@@ -12,6 +12,26 @@ class AccountAnalyticAccount(models.Model):
 class AccountAnalyticLine(models.Model):
     _inherit = 'account.analytic.line'
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env['crossovered.budget']._invalidate_practical_snapshot(lines.mapped('date'))
+        return lines
+
+    def write(self, vals):
+        if not {'account_id', 'general_account_id', 'date', 'amount'} & set(vals):
+            return super().write(vals)
+        dates = self.mapped('date')
+        res = super().write(vals)
+        self.env['crossovered.budget']._invalidate_practical_snapshot(dates + self.mapped('date'))
+        return res
+
+    def unlink(self):
+        dates = self.mapped('date')
+        res = super().unlink()
+        self.env['crossovered.budget']._invalidate_practical_snapshot(dates)
+        return res
+
     @api.model
     def _where_calc(self, domain, active_test=True):
         """Computes the WHERE clause needed to implement an OpenERP domain.
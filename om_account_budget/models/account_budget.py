@@ -32,7 +32,11 @@ class AccountBudgetPost(models.Model):
 
     def write(self, vals):
         self._check_account_ids(vals)
-        return super(AccountBudgetPost, self).write(vals)
+        res = super(AccountBudgetPost, self).write(vals)
+        if 'account_ids' in vals:
+            budget_lines = self.env['crossovered.budget.lines'].search([('general_budget_id', 'in', self.ids)])
+            budget_lines._mark_practical_snapshot_stale()
+        return res
 
 
 class CrossoveredBudget(models.Model):
@@ -56,6 +60,55 @@ class CrossoveredBudget(models.Model):
         'Budget Lines', copy=True
     )
     company_id = fields.Many2one('res.company', 'Company', required=True, default=lambda self: self.env.company)
+    practical_snapshot = fields.Boolean(
+        'Cache Practical Amounts',
+        help="Keep the practical amounts of the budget lines stored. When journal or analytic "
+             "items of the budget period change, they are computed live until a scheduled "
+             "action stores them again.")
+    snapshot_stale = fields.Boolean(default=True, copy=False, readonly=True)
+
+    def write(self, vals):
+        if {'practical_snapshot', 'date_from', 'date_to', 'company_id'} & set(vals):
+            vals = dict(vals, snapshot_stale=True)
+        return super().write(vals)
+
+    @api.model
+    def _invalidate_practical_snapshot(self, dates):
+        """Mark stale the snapshots of the budgets whose period overlaps ``dates``."""
+        dates = [date for date in dates if date]
+        if not dates:
+            return
+        self.flush_model(['practical_snapshot', 'snapshot_stale', 'date_from', 'date_to'])
+        self.env.cr.execute("""
+            UPDATE crossovered_budget SET snapshot_stale = TRUE
+            WHERE practical_snapshot AND NOT snapshot_stale
+              AND date_from <= %s AND date_to >= %s
+            RETURNING id
+        """, (max(dates), min(dates)))
+        budget_ids = [row[0] for row in self.env.cr.fetchall()]
+        if budget_ids:
+            self.browse(budget_ids).invalidate_recordset(['snapshot_stale'])
+
+    def _refresh_practical_snapshot(self):
+        """Store the practical amounts of the lines of the budgets of ``self``
+        and mark them fresh.  They are computed as superuser on the company of
+        the budget, so the snapshot does not depend on who refreshes it."""
+        lines = self.sudo().crossovered_budget_line
+        lines._store_practical_snapshot(lines._get_practical_amounts())
+
+    @api.model
+    def _cron_refresh_practical_snapshots(self):
+        # the budgets are locked first: a transaction changing their items
+        # marks them stale again once this refresh is committed
+        self.env.cr.execute("""
+            SELECT id FROM crossovered_budget
+            WHERE practical_snapshot AND snapshot_stale
+            ORDER BY id
+            FOR UPDATE SKIP LOCKED
+        """)
+        budgets = self.browse([row[0] for row in self.env.cr.fetchall()])
+        budgets.invalidate_recordset(['snapshot_stale'])
+        budgets._refresh_practical_snapshot()
 
     def action_budget_confirm(self):
         self.write({'state': 'confirm'})
@@ -101,45 +154,61 @@ class CrossoveredBudgetLines(models.Model):
         string='Company', store=True, readonly=True)
     is_above_budget = fields.Boolean(compute='_is_above_budget')
     crossovered_budget_state = fields.Selection(related='crossovered_budget_id.state', string='Budget State', store=True, readonly=True)
+    practical_amount_snapshot = fields.Monetary('Practical Amount Snapshot', readonly=True, copy=False)
 
     @api.model
     def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
         # overrides the default read_group in order to compute the computed fields manually for the group
         fields_list = {'practical_amount', 'theoritical_amount', 'percentage'}
         fields = {field.split(':', 1)[0] if field.split(':', 1)[0] in fields_list else field for field in fields}
-        result = super(CrossoveredBudgetLines, self).read_group(domain, fields, groupby, offset=offset, limit=limit,
-                                                                orderby=orderby, lazy=lazy)
-        if any(x in fields for x in fields_list):
-            for group_line in result:
-
-                # initialise fields to compute to 0 if they are requested
-                if 'practical_amount' in fields:
-                    group_line['practical_amount'] = 0
-                if 'theoritical_amount' in fields:
-                    group_line['theoritical_amount'] = 0
-                if 'percentage' in fields:
-                    group_line['percentage'] = 0
-                    group_line['practical_amount'] = 0
-                    group_line['theoritical_amount'] = 0
-
-                if group_line.get('__domain'):
-                    all_budget_lines_that_compose_group = self.search(group_line['__domain'])
-                else:
-                    all_budget_lines_that_compose_group = self.search([])
-                for budget_line_of_group in all_budget_lines_that_compose_group:
-                    if 'practical_amount' in fields or 'percentage' in fields:
-                        group_line['practical_amount'] += budget_line_of_group.practical_amount
+        if not any(x in fields for x in fields_list):
+            return super(CrossoveredBudgetLines, self).read_group(domain, list(fields), groupby, offset=offset,
+                                                                  limit=limit, orderby=orderby, lazy=lazy)
+        # let the grouped query collect the ids of each group, then compute
+        # the amounts of all the lines of all the groups in one batch
+        group_fields = (fields - fields_list) | {'__budget_line_ids:array_agg(id)'}
+        result = super(CrossoveredBudgetLines, self).read_group(domain, list(group_fields), groupby, offset=offset,
+                                                                limit=limit, orderby=orderby, lazy=lazy)
+        lines = self.browse({line_id for group_line in result for line_id in group_line['__budget_line_ids'] or []})
+        practical = {}
+        theoritical = {}
+        if 'practical_amount' in fields or 'percentage' in fields:
+            practical = {line.id: line.practical_amount for line in lines}
+        if 'theoritical_amount' in fields or 'percentage' in fields:
+            theoritical = {line.id: line.theoritical_amount for line in lines}
+
+        for group_line in result:
+            line_ids = group_line.pop('__budget_line_ids') or []
+            if 'practical_amount' in fields or 'percentage' in fields:
+                group_line['practical_amount'] = sum(practical[line_id] for line_id in line_ids)
+            if 'theoritical_amount' in fields or 'percentage' in fields:
+                group_line['theoritical_amount'] = sum(theoritical[line_id] for line_id in line_ids)
+            if 'percentage' in fields:
+                group_line['percentage'] = 0
+                if group_line['theoritical_amount']:
+                    # use a weighted average
+                    group_line['percentage'] = float(
+                        (group_line['practical_amount'] or 0.0) / group_line['theoritical_amount']) * 100
+
+        return result
 
-                    if 'theoritical_amount' in fields or 'percentage' in fields:
-                        group_line['theoritical_amount'] += budget_line_of_group.theoritical_amount
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._mark_practical_snapshot_stale()
+        return lines
 
-                    if 'percentage' in fields:
-                        if group_line['theoritical_amount']:
-                            # use a weighted average
-                            group_line['percentage'] = float(
-                                (group_line['practical_amount'] or 0.0) / group_line['theoritical_amount']) * 100
+    def write(self, vals):
+        res = super().write(vals)
+        if {'analytic_account_id', 'general_budget_id', 'date_from', 'date_to'} & set(vals):
+            self._mark_practical_snapshot_stale()
+        return res
 
-        return result
+    def _mark_practical_snapshot_stale(self):
+        budgets = self.crossovered_budget_id.filtered(lambda budget: budget.practical_snapshot
+                                                      and not budget.snapshot_stale)
+        if budgets:
+            budgets.snapshot_stale = True
 
     def _is_above_budget(self):
         for line in self:
@@ -159,44 +228,112 @@ class CrossoveredBudgetLines(models.Model):
             line.name = computed_name
 
     def _compute_practical_amount(self):
-        for line in self:
-            acc_ids = line.general_budget_id.account_ids.ids
-            date_to = line.date_to
-            date_from = line.date_from
-            if line.analytic_account_id.id:
-                analytic_line_obj = self.env['account.analytic.line']
-                domain = [('account_id', '=', line.analytic_account_id.id),
-                          ('date', '>=', date_from),
-                          ('date', '<=', date_to),
-                          ]
-                if acc_ids:
-                    domain += [('general_account_id', 'in', acc_ids)]
-
-                where_query = analytic_line_obj._where_calc(domain)
-                analytic_line_obj._apply_ir_rules(where_query, 'read')
-                from_string, from_params = where_query.from_clause
-                where_string, where_params = where_query.where_clause
-                from_clause, where_clause, where_clause_params = from_string, where_string, from_params + where_params
-
-                select = "SELECT SUM(amount) from " + from_clause + " where " + where_clause
+        # stale snapshots are computed live until the cron refreshes them
+        fresh_lines = self.filtered(
+            lambda line: line.id and line.crossovered_budget_id.practical_snapshot
+            and not line.crossovered_budget_id.snapshot_stale)
+        for line in fresh_lines:
+            line.practical_amount = line.practical_amount_snapshot
+
+        amounts = (self - fresh_lines)._get_practical_amounts()
+        for line in self - fresh_lines:
+            line.practical_amount = amounts.get(line, 0.0)
+
+    def _practical_amount_key(self):
+        self.ensure_one()
+        if not self.date_from or not self.date_to:
+            return None
+        if not self.analytic_account_id and not self.general_budget_id:
+            return None
+        return (
+            self.analytic_account_id.id or None,
+            tuple(sorted(self.general_budget_id.account_ids.ids)),
+            self.date_from,
+            self.date_to,
+            self.company_id.id,
+        )
+
+    def _get_practical_amounts(self):
+        """
+        Practical amounts of the lines of ``self``, with one query on the
+        analytic items and one on the journal items for all the distinct
+        (analytic account, budgetary position accounts, date range, company)
+        keys.
+
+        :returns: {budget line: amount}
+        """
+        keys = {line: line._practical_amount_key() for line in self}
+        analytic_keys = {key for key in keys.values() if key and key[0]}
+        move_keys = {key for key in keys.values() if key and not key[0]}
+        totals = {}
+        totals.update(self._read_practical_totals(
+            self.env['account.analytic.line'], analytic_keys,
+            'SUM(amount)',
+            '''account_analytic_line.account_id = k.analytic_id
+               AND (cardinality(k.account_ids) = 0
+                    OR account_analytic_line.general_account_id = ANY(k.account_ids))''',
+        ))
+        totals.update(self._read_practical_totals(
+            self.env['account.move.line'], move_keys,
+            'SUM(credit) - SUM(debit)',
+            'account_move_line.account_id = ANY(k.account_ids)',
+        ))
+        return {line: totals.get(key) or 0.0 for line, key in keys.items()}
 
-            else:
-                aml_obj = self.env['account.move.line']
-                domain = [('account_id', 'in',
-                           line.general_budget_id.account_ids.ids),
-                          ('date', '>=', date_from),
-                          ('date', '<=', date_to)
-                          ]
-                where_query = aml_obj._where_calc(domain)
-                aml_obj._apply_ir_rules(where_query, 'read')
-                from_string, from_params = where_query.from_clause
-                where_string, where_params = where_query.where_clause
-                from_clause, where_clause, where_clause_params = from_string, where_string, from_params + where_params
-
-                select = "SELECT sum(credit)-sum(debit) from " + from_clause + " where " + where_clause
-
-            self.env.cr.execute(select, where_clause_params)
-            line.practical_amount = self.env.cr.fetchone()[0] or 0.0
+    @api.model
+    def _read_practical_totals(self, model, keys, amount, condition):
+        """
+        Sum ``amount`` over the records of ``model`` readable by the user for
+        every key of ``keys``, in a single query.
+
+        :param condition: SQL matching a record with the key columns
+            ``k.analytic_id`` and ``k.account_ids``; the date range and the
+            company are added here
+        :returns: {key: amount}
+        """
+        if not keys:
+            return {}
+        keys = list(keys)
+        where_query = model._where_calc([])
+        model._apply_ir_rules(where_query, 'read')
+        from_string, from_params = where_query.from_clause
+        where_string, where_params = where_query.where_clause
+        values = ", ".join(["(%s, %s, %s::int[], %s::date, %s::date, %s)"] * len(keys))
+        values_params = [
+            param
+            for idx, (analytic_id, account_ids, date_from, date_to, company_id) in enumerate(keys)
+            for param in (idx, analytic_id, list(account_ids), date_from, date_to, company_id)
+        ]
+        select = f"""
+            SELECT k.idx, (
+                SELECT {amount} FROM {from_string}
+                WHERE {where_string or 'TRUE'} AND {condition}
+                  AND {model._table}.date BETWEEN k.date_from AND k.date_to
+                  AND {model._table}.company_id = k.company_id
+            )
+            FROM (VALUES {values}) AS k(idx, analytic_id, account_ids, date_from, date_to, company_id)
+        """
+        self.env.cr.execute(select, list(from_params) + list(where_params) + values_params)
+        return {keys[idx]: total or 0.0 for idx, total in self.env.cr.fetchall()}
+
+    def _store_practical_snapshot(self, amounts):
+        """Store ``amounts`` as the snapshot of the lines of ``self`` and mark
+        their budgets fresh."""
+        lines = self.filtered('id')
+        if not lines:
+            return
+        lines.flush_recordset(['practical_amount_snapshot'])
+        lines.crossovered_budget_id.flush_recordset(['snapshot_stale'])
+        self.env.cr.execute(f"""
+            UPDATE crossovered_budget_lines AS line SET practical_amount_snapshot = v.amount
+            FROM (VALUES {", ".join(["(%s, %s::numeric)"] * len(lines))}) AS v(id, amount)
+            WHERE line.id = v.id
+        """, [param for line in lines for param in (line.id, amounts.get(line, 0.0))])
+        self.env.cr.execute(
+            "UPDATE crossovered_budget SET snapshot_stale = FALSE WHERE id = ANY(%s)",
+            (lines.crossovered_budget_id.ids,))
+        lines.invalidate_recordset(['practical_amount_snapshot'])
+        lines.crossovered_budget_id.invalidate_recordset(['snapshot_stale'])
 
     def _compute_theoritical_amount(self):
         # beware: 'today' variable is mocked in the python tests and thus, its implementation matter
@@ -0,0 +1,27 @@
+from odoo import api, models
+
+BUDGET_FIELDS = {'account_id', 'date', 'debit', 'credit', 'balance'}
+
+
+class AccountMoveLine(models.Model):
+    _inherit = 'account.move.line'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env['crossovered.budget']._invalidate_practical_snapshot(lines.mapped('date'))
+        return lines
+
+    def write(self, vals):
+        if not BUDGET_FIELDS & set(vals):
+            return super().write(vals)
+        dates = self.mapped('date')
+        res = super().write(vals)
+        self.env['crossovered.budget']._invalidate_practical_snapshot(dates + self.mapped('date'))
+        return res
+
+    def unlink(self):
+        dates = self.mapped('date')
+        res = super().unlink()
+        self.env['crossovered.budget']._invalidate_practical_snapshot(dates)
+        return res
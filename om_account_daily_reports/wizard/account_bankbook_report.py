@@ -54,13 +54,24 @@ class AccountBankBookReport(models.TransientModel):
         result['strict_range'] = True if result['date_from'] else False
         return result
 
-    def check_report(self):
+    def _get_report_fields(self):
+        return ['target_move', 'date_from', 'date_to', 'journal_ids', 'account_ids',
+                'sortby', 'initial_balance', 'display_account']
+
+    def _get_report_data(self):
         data = {}
-        data['form'] = self.read(['target_move', 'date_from', 'date_to', 'journal_ids', 'account_ids',
-                                  'sortby', 'initial_balance', 'display_account'])[0]
+        data['form'] = self.read(self._get_report_fields())[0]
         comparison_context = self._build_comparison_context(data)
         data['form']['comparison_context'] = comparison_context
+        return data
+
+    def _get_ledger_report(self):
+        return self.env['report.om_account_daily_reports.report_bankbook']
+
+    def check_report(self):
         return self.env.ref(
-            'om_account_daily_reports.action_report_bank_book').report_action(self,
-                                                                     data=data)
+            'om_account_daily_reports.action_report_bank_book').report_action(self, data=self._get_report_data())
+
+    def check_report_xlsx(self):
+        return self._get_ledger_report()._get_report_xlsx(self._get_report_data(), self)
 
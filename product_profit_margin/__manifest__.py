@@ -21,7 +21,7 @@
     """,
     'author': 'Your Company',
     'website': 'https://www.yourcompany.com',
-    'depends': ['base', 'stock', 'account', 'product'],  # Added 'account' dependency
+    'depends': ['base', 'stock', 'account', 'product', 'report_staging'],  # Added 'account' dependency
     'data': [
         'security/ir.model.access.csv',
         'wizard/product_profit_margin_wizard_view.xml',
@@ -5,6 +5,7 @@ from odoo import models, fields
 
 class ProductProfitMarginReport(models.Model):
     _name = 'product.profit.margin.report'
+    _inherit = ['report.staging.mixin']
     _description = 'Product Profit Margin Report'
     _order = 'date desc, product_name'
     _rec_name = 'product_name'
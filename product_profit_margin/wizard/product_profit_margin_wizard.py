@@ -38,10 +38,6 @@ class ProductProfitMarginWizard(models.TransientModel):
 
         _logger.info(f"Searching for invoices between {self.date_from} and {self.date_to}")
 
-        # Clear old report data
-        old_reports = self.env['product.profit.margin.report'].search([])
-        old_reports.unlink()
-
         # Build domain for filtering INVOICE LINES
         domain = [
             ('move_id.invoice_date', '>=', self.date_from),
@@ -72,7 +68,6 @@ class ProductProfitMarginWizard(models.TransientModel):
             )
 
         # Prepare report data
-        report_data = []
         product_data = {}
 
         for line in invoice_lines:
@@ -123,21 +118,15 @@ class ProductProfitMarginWizard(models.TransientModel):
             else:
                 product_data[key]['profit_margin'] = 0.0
 
-        # Create report records
-        for data in product_data.values():
-            report_line = self.env['product.profit.margin.report'].create(data)
-            report_data.append(report_line.id)
-
-        _logger.info(f"Created {len(report_data)} report records")
-
-        return {
-            'name': f'Sales Product Profit Report ({len(report_data)} products)',
-            'type': 'ir.actions.act_window',
-            'res_model': 'product.profit.margin.report',
-            'view_mode': 'list',
-            'domain': [('id', 'in', report_data)],
-            'target': 'current',
-            'context': {
+        # Create the report records of this run, in one batch
+        run, report_lines = self.env['product.profit.margin.report']._stage_rows(
+            list(product_data.values()), name='Sales Product Profit Report')
+
+        _logger.info(f"Created {len(report_lines)} report records")
+
+        return run._get_action(
+            f'Sales Product Profit Report ({len(report_lines)} products)',
+            context={
                 'report_title': f'Sales Product Profit Report - {self.date_from} to {self.date_to}'
-            }
-        }
\ No newline at end of file
+            },
+        )
\ No newline at end of file
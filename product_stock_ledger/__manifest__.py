@@ -1,11 +1,12 @@
 {
     'name': 'Product Stock Ledger',
-    'version': '19.0.2.0.0',
+    'version': '19.0.3.0.0',
     'category': 'Inventory',
     'summary': 'Stock Ledger with built-in filter bar',
-    'depends': ['stock', 'purchase', 'sale_management', 'web'],
+    'depends': ['stock', 'purchase', 'sale_management', 'web', 'stock_location_warehouse'],
     'data': [
         'security/ir.model.access.csv',
+        'data/product_stock_ledger_data.xml',
         'views/product_stock_ledger_views.xml',
         'views/product_stock_ledger_menus.xml',
     ],
@@ -1 +1,4 @@
 from . import product_stock_ledger
+from . import stock_move
+from . import account_move
+from . import product_stock_ledger_snapshot
@@ -0,0 +1,25 @@
+from odoo import models
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def _ledger_mark_invoice_products(self):
+        """
+        Ledger rates come from posted vendor bills / customer invoices, so
+        posting or resetting one changes the rows of its products.
+        """
+        invoices = self.filtered(lambda m: m.move_type in ('in_invoice', 'out_invoice'))
+        if invoices:
+            self.env['product.stock.ledger']._mark_products_dirty(
+                invoices.invoice_line_ids.product_id.ids)
+
+    def _post(self, soft=True):
+        posted = super()._post(soft=soft)
+        posted._ledger_mark_invoice_products()
+        return posted
+
+    def button_draft(self):
+        res = super().button_draft()
+        self._ledger_mark_invoice_products()
+        return res
@@ -1,12 +1,29 @@
-from odoo import models, fields, tools, _
+import logging
+
+from odoo import api, models, fields, tools, _
 from odoo.exceptions import UserError, AccessError
+from odoo.tools import SQL, split_every
+
+_logger = logging.getLogger(__name__)
 
 
 class ProductStockLedger(models.Model):
     """
-    SQL-backed read-only model (PostgreSQL VIEW).
+    SQL-backed read-only model, materialized into a plain table keyed on
+    stock_move_line id.  Rows are computed by the ``product_stock_ledger_source``
+    VIEW and copied into the table per product, together with the running
+    ``balance`` / ``avg_rate`` per product and ``wh_balance`` / ``wh_avg_rate``
+    per warehouse, so reading one product is an index range scan.
     Compatible with Odoo 19 CE. Handles jsonb translated fields.
 
+    Refresh:
+      * products touched by done moves, posted/reset invoices and the delete
+        wizard are queued in ``product_stock_ledger_queue`` and refreshed
+        once, right before the transaction commits; setting
+        ``product_stock_ledger.deferred_refresh`` to True leaves them to the
+        cron instead, outside the posting transaction
+      * ``action_rebuild_ledger`` rebuilds the whole table
+
     Rate source priority (CE-safe):
       1. account_move_line.price_unit  (posted vendor bill / customer invoice)
       2. stock_valuation_layer         (if available)
@@ -18,6 +35,11 @@ class ProductStockLedger(models.Model):
     _auto = False
     _order = 'date desc, id desc'
 
+    _source_view = 'product_stock_ledger_source'
+    _queue_table = 'product_stock_ledger_queue'
+    _wh_table = 'product_stock_ledger_wh'
+    _refresh_batch_size = 500
+
     product_id      = fields.Many2one('product.product', string='Product',          readonly=True)
     warehouse_id    = fields.Many2one('stock.warehouse',  string='Warehouse',        readonly=True)
     date            = fields.Datetime(string='_Date_Raw',  readonly=True)
@@ -35,6 +57,26 @@ class ProductStockLedger(models.Model):
     invoice_status  = fields.Char(string='Invoice Status', readonly=True)
     move_id         = fields.Many2one('stock.move',        string='Stock Move',      readonly=True)
     company_id      = fields.Many2one('res.company',       string='Company',         readonly=True)
+    avg_rate        = fields.Float(string='Avg. Rate',     readonly=True, digits=(16, 4))
+    wh_balance      = fields.Float(string='WH Balance',    readonly=True, digits=(16, 4))
+    wh_avg_rate     = fields.Float(string='WH Avg. Rate',  readonly=True, digits=(16, 4))
+    refreshed_at    = fields.Datetime(string='Refreshed At', readonly=True)
+    # Rows with a leg in the warehouse: transfers are listed in both warehouses
+    leg_warehouse_id = fields.Many2one(
+        'stock.warehouse', string='Leg Warehouse', readonly=True,
+        compute='_compute_leg_warehouse_id', search='_search_leg_warehouse_id')
+
+    def _compute_leg_warehouse_id(self):
+        for line in self:
+            line.leg_warehouse_id = line.warehouse_id
+
+    def _search_leg_warehouse_id(self, operator, value):
+        if operator not in ('=', 'in') or not value:
+            return [('warehouse_id', operator, value)]
+        warehouse_ids = [value] if operator == '=' else list(value)
+        return [('id', 'in', SQL(
+            "SELECT line_id FROM %s WHERE warehouse_id = ANY(%s)",
+            SQL.identifier(self._wh_table), warehouse_ids))]
 
     # ── Schema helpers ─────────────────────────────────────────────────────────
 
@@ -78,7 +120,18 @@ class ProductStockLedger(models.Model):
     # ── View init ──────────────────────────────────────────────────────────────
 
     def init(self):
-        tools.drop_view_if_exists(self.env.cr, self._table)
+        self._create_source_view()
+        if self._ensure_ledger_tables():
+            self.action_rebuild_ledger()
+
+    def _create_source_view(self):
+        """
+        (Re)create ``product_stock_ledger_source``: one row per done
+        stock_move_line with rates and references resolved, but without the
+        running balance.  The materialized ``product_stock_ledger`` table is
+        filled from this view, product by product, by ``_refresh_products``.
+        """
+        tools.drop_view_if_exists(self.env.cr, self._source_view)
 
         # ── Feature detection ──────────────────────────────────────────────
         has_svl     = self._table_exists('stock_valuation_layer')
@@ -113,38 +166,6 @@ class ProductStockLedger(models.Model):
         # We assemble them at the end — this avoids any trailing-comma issues.
         cte_list = []   # list of "name AS ( ... )" strings, NO trailing commas
 
-        # loc_warehouse — always present
-        cte_list.append(f"""loc_warehouse AS (
-    -- Map every internal stock location to its warehouse
-    -- Uses recursive parent traversal to handle deeply nested locations
-    WITH RECURSIVE loc_tree AS (
-        -- Anchor: the lot_stock_id location of each warehouse
-        SELECT
-            sw.id  AS warehouse_id,
-            sl.id  AS location_id,
-            sl.id  AS root_id
-        FROM stock_warehouse sw
-        JOIN stock_location sl ON sl.id = sw.lot_stock_id
-
-        UNION ALL
-
-        -- Recurse into child locations
-        SELECT
-            lt.warehouse_id,
-            child.id AS location_id,
-            lt.root_id
-        FROM stock_location child
-        JOIN loc_tree lt ON child.location_id = lt.location_id
-        WHERE child.usage = 'internal'
-          AND child.active = true
-    )
-    SELECT DISTINCT ON (location_id)
-        location_id,
-        warehouse_id
-    FROM loc_tree
-    ORDER BY location_id, warehouse_id
-)""")
-
         # svl_cost — stock valuation layer (Enterprise / CE with costing)
         if has_svl:
             cte_list.append("""svl_cost AS (
@@ -428,7 +449,7 @@ class ProductStockLedger(models.Model):
 
         # ── Assemble final SQL ─────────────────────────────────────────────
         sql = (
-            "CREATE OR REPLACE VIEW product_stock_ledger AS\n"
+            f"CREATE OR REPLACE VIEW {self._source_view} AS\n"
             "WITH\n"
             + ctes_sql +
             f""",
@@ -437,6 +458,9 @@ ledger AS (
         sml.id                                               AS id,
         sml.product_id                                       AS product_id,
         COALESCE(wh_src.warehouse_id, wh_dest.warehouse_id) AS warehouse_id,
+        wh_src.warehouse_id                                  AS src_warehouse_id,
+        wh_dest.warehouse_id                                 AS dest_warehouse_id,
+        sml.quantity                                         AS quantity,
         sm.date                                              AS date,
         TO_CHAR(sm.date AT TIME ZONE 'UTC', 'DD/MM/YY')     AS date_str,
 
@@ -498,25 +522,6 @@ ledger AS (
             ELSE 0
         END                                                  AS issue_rate,
 
-        -- Balance = cumulative stock level after this transaction
-        -- Partitioned by product only (warehouse filter applied by user via filter bar)
-        -- ORDER BY date ASC, id ASC so oldest rows accumulate first → correct running total
-        SUM(
-            CASE
-                WHEN dest_loc.usage = 'internal' AND src_loc.usage != 'internal'
-                    THEN  sml.quantity
-                WHEN src_loc.usage = 'customer'
-                    THEN  sml.quantity
-                WHEN src_loc.usage = 'internal' AND dest_loc.usage != 'internal'
-                    THEN -sml.quantity
-                ELSE 0
-            END
-        ) OVER (
-            PARTITION BY sml.product_id
-            ORDER BY sm.date ASC, sml.id ASC
-            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
-        )                                                    AS balance,
-
         -- Net Qty per row = rec_qty - issue_qty (used for footer sum = closing stock)
         CASE
             WHEN dest_loc.usage = 'internal' AND src_loc.usage != 'internal'
@@ -552,10 +557,11 @@ ledger AS (
        AND sm.state = 'done'
     JOIN stock_location src_loc  ON src_loc.id  = sml.location_id
     JOIN stock_location dest_loc ON dest_loc.id = sml.location_dest_id
-    LEFT JOIN loc_warehouse wh_src
+    -- Internal locations resolved through the shared location → warehouse map
+    LEFT JOIN stock_location_warehouse wh_src
         ON wh_src.location_id = sml.location_id
        AND src_loc.usage = 'internal'
-    LEFT JOIN loc_warehouse wh_dest
+    LEFT JOIN stock_location_warehouse wh_dest
         ON wh_dest.location_id = sml.location_dest_id
        AND dest_loc.usage = 'internal'
     LEFT JOIN uom_uom     uom_u ON uom_u.id = sml.product_uom_id
@@ -579,6 +585,400 @@ SELECT * FROM ledger
 
         self.env.cr.execute(sql)
 
+    # ── Materialized table ─────────────────────────────────────────────────────
+
+    # Columns copied from the source view, in table order.  ``balance`` and
+    # ``refreshed_at`` are computed while copying.
+    _ledger_columns = (
+        'id', 'product_id', 'warehouse_id', 'date', 'date_str', 'voucher',
+        'particulars', 'move_type', 'rec_qty', 'rec_rate', 'issue_qty',
+        'issue_rate', 'net_qty', 'uom', 'invoice_status', 'move_id', 'company_id',
+    )
+
+    def _ensure_ledger_tables(self):
+        """
+        Create the ledger table, its indexes and the refresh queue.
+        Older versions of this module shipped ``product_stock_ledger`` as a
+        VIEW; it is dropped and replaced by the table.
+        Returns True when the table content has to be rebuilt (new table, or
+        columns added by an upgrade).
+        """
+        cr = self.env.cr
+        cr.execute("""
+            SELECT table_type FROM information_schema.tables
+            WHERE table_schema = 'public' AND table_name = %s
+        """, (self._table,))
+        row = cr.fetchone()
+        if row and row[0] == 'VIEW':
+            tools.drop_view_if_exists(cr, self._table)
+            row = None
+        needs_rebuild = not row
+        if needs_rebuild:
+            cr.execute(f"""
+                CREATE TABLE {self._table} (
+                    id              integer PRIMARY KEY,
+                    product_id      integer,
+                    warehouse_id    integer,
+                    date            timestamp,
+                    date_str        varchar,
+                    voucher         varchar,
+                    particulars     varchar,
+                    move_type       varchar,
+                    rec_qty         numeric,
+                    rec_rate        numeric,
+                    issue_qty       numeric,
+                    issue_rate      numeric,
+                    balance         numeric,
+                    net_qty         numeric,
+                    uom             varchar,
+                    invoice_status  varchar,
+                    move_id         integer,
+                    company_id      integer,
+                    refreshed_at    timestamp
+                )
+            """)
+        if not self._col_exists(self._table, 'wh_balance'):
+            cr.execute(f"""
+                ALTER TABLE {self._table}
+                    ADD COLUMN avg_rate     numeric,
+                    ADD COLUMN wh_balance   numeric,
+                    ADD COLUMN wh_avg_rate  numeric
+            """)
+            needs_rebuild = True
+        cr.execute(f"""
+            CREATE INDEX IF NOT EXISTS {self._table}_product_date_idx
+                ON {self._table} (product_id, date, id);
+            CREATE INDEX IF NOT EXISTS {self._table}_date_idx
+                ON {self._table} (date);
+            CREATE INDEX IF NOT EXISTS {self._table}_warehouse_idx
+                ON {self._table} (warehouse_id);
+            CREATE INDEX IF NOT EXISTS {self._table}_move_idx
+                ON {self._table} (move_id);
+            CREATE TABLE IF NOT EXISTS {self._queue_table} (
+                product_id  integer PRIMARY KEY,
+                queued_at   timestamp NOT NULL DEFAULT (now() AT TIME ZONE 'UTC')
+            );
+            ALTER TABLE {self._queue_table}
+                ADD COLUMN IF NOT EXISTS snapshot_from timestamp;
+            CREATE TABLE IF NOT EXISTS {self._wh_table} (
+                line_id       integer NOT NULL,
+                product_id    integer,
+                warehouse_id  integer,
+                company_id    integer,
+                date          timestamp,
+                qty           numeric,
+                balance       numeric,
+                avg_rate      numeric
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS {self._wh_table}_line_wh_uniq
+                ON {self._wh_table} (line_id, COALESCE(warehouse_id, 0));
+            CREATE INDEX IF NOT EXISTS {self._wh_table}_product_wh_date_idx
+                ON {self._wh_table} (product_id, warehouse_id, date, line_id);
+        """)
+        return needs_rebuild
+
+    def _copy_from_source(self, product_ids=None):
+        """
+        Insert source rows (all, or for ``product_ids``) into the ledger table
+        and their warehouse legs into ``product_stock_ledger_wh``, in a single
+        statement so the source view is evaluated once.
+
+        A move line is one leg in the warehouse of the row, except transfers
+        between two warehouses, which are an issue leg in the source warehouse
+        and a receipt leg in the destination one.  The legs of a line always
+        sum to its ``net_qty``.  Running balances and weighted-average receipt
+        rates are computed per product and per (product, warehouse) here, once,
+        and stored; the row's ``wh_balance`` is the one of its own warehouse.
+        """
+        cols = ', '.join(self._ledger_columns)
+        src_cols = ', '.join(f'src.{col}' for col in self._ledger_columns)
+        where = "WHERE product_id = ANY(%s)" if product_ids is not None else ""
+        self.env.cr.execute(f"""
+            WITH src AS MATERIALIZED (
+                SELECT *,
+                       (src_warehouse_id IS NOT NULL
+                        AND dest_warehouse_id IS NOT NULL
+                        AND src_warehouse_id <> dest_warehouse_id) AS inter_wh
+                FROM {self._source_view}
+                {where}
+            ),
+            legs AS (
+                SELECT id AS line_id, product_id, warehouse_id, company_id, date,
+                       net_qty AS qty, rec_qty AS in_qty, rec_rate AS in_rate
+                FROM src WHERE NOT inter_wh
+                UNION ALL
+                SELECT id, product_id, src_warehouse_id, company_id, date,
+                       -quantity, 0, 0
+                FROM src WHERE inter_wh
+                UNION ALL
+                SELECT id, product_id, dest_warehouse_id, company_id, date,
+                       quantity, 0, 0
+                FROM src WHERE inter_wh
+            ),
+            run AS (
+                SELECT line_id, product_id, warehouse_id, company_id, date, qty,
+                       SUM(qty) OVER w AS balance,
+                       COALESCE(SUM(in_qty * in_rate) OVER w
+                                / NULLIF(SUM(in_qty) OVER w, 0), 0) AS avg_rate
+                FROM legs
+                WINDOW w AS (
+                    PARTITION BY product_id, warehouse_id
+                    ORDER BY date ASC, line_id ASC
+                    ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                )
+            ),
+            ins_wh AS (
+                INSERT INTO {self._wh_table}
+                    (line_id, product_id, warehouse_id, company_id, date, qty, balance, avg_rate)
+                SELECT line_id, product_id, warehouse_id, company_id, date, qty, balance, avg_rate
+                FROM run
+            )
+            INSERT INTO {self._table}
+                ({cols}, balance, avg_rate, wh_balance, wh_avg_rate, refreshed_at)
+            SELECT {src_cols},
+                   SUM(src.net_qty) OVER p,
+                   COALESCE(SUM(src.rec_qty * src.rec_rate) OVER p
+                            / NULLIF(SUM(src.rec_qty) OVER p, 0), 0),
+                   run.balance,
+                   run.avg_rate,
+                   now() AT TIME ZONE 'UTC'
+            FROM src
+            LEFT JOIN run
+                ON run.line_id = src.id
+               AND run.warehouse_id IS NOT DISTINCT FROM src.warehouse_id
+            WINDOW p AS (
+                PARTITION BY src.product_id
+                ORDER BY src.date ASC, src.id ASC
+                ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+            )
+        """, (product_ids,) if product_ids is not None else None)
+
+    def _refresh_products(self, product_ids):
+        """
+        Recompute the ledger rows of ``product_ids`` from the source view and
+        drop them from the refresh queue.  The balance window is per product,
+        so a product is the smallest unit that can be refreshed consistently.
+
+        The queue rows of the products are locked first, so two transactions
+        refreshing the same product run one after the other instead of
+        inserting the same ledger rows.
+        """
+        product_ids = sorted(set(product_ids))
+        if not product_ids:
+            return
+        cr = self.env.cr
+        snapshots = self.env['product.stock.ledger.snapshot']
+        for batch in split_every(self._refresh_batch_size, product_ids, list):
+            cr.execute(f"""
+                INSERT INTO {self._queue_table} (product_id)
+                SELECT unnest(%s::int[])
+                ON CONFLICT (product_id) DO NOTHING
+            """, (batch,))
+            cr.execute(f"""
+                SELECT product_id, snapshot_from FROM {self._queue_table}
+                WHERE product_id = ANY(%s)
+                ORDER BY product_id
+                FOR UPDATE
+            """, (batch,))
+            back_dated = {product_id: snapshot_from
+                          for product_id, snapshot_from in cr.fetchall() if snapshot_from}
+            cr.execute(f"DELETE FROM {self._table} WHERE product_id = ANY(%s)", (batch,))
+            cr.execute(f"DELETE FROM {self._wh_table} WHERE product_id = ANY(%s)", (batch,))
+            self._copy_from_source(batch)
+            if back_dated:
+                snapshots._rebuild_products(back_dated)
+            cr.execute(f"DELETE FROM {self._queue_table} WHERE product_id = ANY(%s)", (batch,))
+        self.invalidate_model()
+
+    @api.model
+    def _mark_products_dirty(self, product_ids, changed_dates=None):
+        """
+        Queue ``product_ids`` for refresh.  The queued products are refreshed
+        once, right before the current transaction commits, so a picking
+        validating many moves of the same product pays for a single refresh.
+        When refresh is deferred (``product_stock_ledger.deferred_refresh``
+        set to True), they are left to the cron.
+
+        :param changed_dates: optional {product_id: datetime} of the earliest
+            quantity change; snapshots of closed periods from that date on are
+            rebuilt with the refresh.
+        """
+        changed_dates = changed_dates or {}
+        product_ids = [pid for pid in set(product_ids) | set(changed_dates) if pid]
+        if not product_ids:
+            return
+        cr = self.env.cr
+        cr.execute(f"""
+            INSERT INTO {self._queue_table} (product_id, snapshot_from)
+            SELECT * FROM unnest(%s::int[], %s::timestamp[])
+            ON CONFLICT (product_id) DO UPDATE
+                SET snapshot_from = LEAST({self._queue_table}.snapshot_from, EXCLUDED.snapshot_from)
+        """, (product_ids, [changed_dates.get(pid) for pid in product_ids]))
+        if self._is_refresh_deferred():
+            return
+        pending = cr.precommit.data.get('product_stock_ledger.pending')
+        if pending is None:
+            pending = cr.precommit.data['product_stock_ledger.pending'] = set()
+            cr.precommit.add(self._flush_pending)
+        pending.update(product_ids)
+
+    def _flush_pending(self):
+        pending = self.env.cr.precommit.data.pop('product_stock_ledger.pending', set())
+        self.sudo()._refresh_products(pending)
+
+    def _is_refresh_deferred(self):
+        return tools.str2bool(
+            self.env['ir.config_parameter'].sudo().get_param(
+                'product_stock_ledger.deferred_refresh', 'False'))
+
+    @api.model
+    def _cron_refresh_queue(self, limit=5000):
+        """ Refresh products left in the queue (deferred mode or failures). """
+        self.env.cr.execute(f"""
+            SELECT product_id FROM {self._queue_table}
+            ORDER BY queued_at LIMIT %s
+        """, (limit,))
+        product_ids = [r[0] for r in self.env.cr.fetchall()]
+        self._refresh_products(product_ids)
+        _logger.info("Product Stock Ledger: refreshed %d queued product(s)", len(product_ids))
+
+    @api.model
+    def action_rebuild_ledger(self):
+        """ Full rebuild of the materialized ledger from the source view. """
+        if not self._can_refresh_ledger():
+            raise AccessError(_('Only Inventory Managers can rebuild the stock ledger.'))
+        cr = self.env.cr
+        cr.execute(f"TRUNCATE {self._table}, {self._wh_table}")
+        self._copy_from_source()
+        cr.execute(f"TRUNCATE {self._queue_table}")
+        self.invalidate_model()
+        self.env['product.stock.ledger.snapshot']._rebuild_all()
+        cr.execute(f"SELECT COUNT(*) FROM {self._table}")
+        _logger.info("Product Stock Ledger: rebuilt %d row(s)", cr.fetchone()[0])
+        return True
+
+    @api.model
+    def get_ledger_status(self):
+        """
+        Staleness indicator for the filter bar: number of products waiting
+        for a refresh, the oldest queued timestamp and the last refresh time.
+        """
+        cr = self.env.cr
+        cr.execute(f"SELECT COUNT(*), MIN(queued_at) FROM {self._queue_table}")
+        pending, oldest = cr.fetchone()
+        cr.execute(f"SELECT MAX(refreshed_at) FROM {self._table}")
+        last_refresh = cr.fetchone()[0]
+        return {
+            'pending': pending,
+            'oldest_pending': fields.Datetime.to_string(oldest) if oldest else False,
+            'last_refresh': fields.Datetime.to_string(last_refresh) if last_refresh else False,
+            'stale': bool(pending),
+            'can_refresh': self._can_refresh_ledger(),
+        }
+
+    @api.model
+    def get_opening_balance(self, product_id, date_from, warehouse_id=False):
+        company_ids = self.env.companies.ids
+        return self.env['product.stock.ledger.snapshot']._get_opening_balances(
+            [product_id], date_from, warehouse_id=warehouse_id, company_ids=company_ids,
+        ).get(product_id, 0.0)
+
+    @api.model
+    def get_ledger_lines(self, product_id, date_from=False, date_to=False, warehouse_id=False,
+                         filters=None):
+        """
+        Date-bounded ledger for one product, as shown by the filter bar: an
+        "Opening Balance" row followed by the in-range rows only.  The running
+        balance starts from the snapshot-based opening instead of a window
+        over all history.  With ``warehouse_id`` the rows are that
+        warehouse's legs, so transfers into it are listed and the balance is
+        the warehouse's own.
+
+        :param filters: optional {'voucher', 'move_type', 'invoice_status'};
+            they hide rows after the running balance is computed, so the
+            balance of the remaining rows is unchanged
+        """
+        filters = filters or {}
+        opening = self.get_opening_balance(product_id, date_from, warehouse_id) if date_from else 0.0
+        params = {
+            'product_id': product_id,
+            'date_from': date_from,
+            'date_to': date_to,
+            'warehouse_id': warehouse_id,
+            'company_ids': self.env.companies.ids,
+            'opening': opening,
+            'voucher': '%%%s%%' % filters['voucher'] if filters.get('voucher') else None,
+            'move_type': filters.get('move_type') or None,
+            'invoice_status': filters.get('invoice_status') or None,
+        }
+        if warehouse_id:
+            # Filter on the warehouse legs (src), display the ledger row (l)
+            from_sql = f"{self._wh_table} src JOIN {self._table} l ON l.id = src.line_id"
+            qty_sql = "src.qty"
+            wh_sql = "src.warehouse_id"
+            wh_filter = "AND src.warehouse_id = %(warehouse_id)s"
+        else:
+            from_sql = f"{self._table} l"
+            qty_sql = "l.net_qty"
+            wh_sql = "l.warehouse_id"
+            wh_filter = ""
+        src = 'src' if warehouse_id else 'l'
+        date_from_filter = f"AND {src}.date >= %(date_from)s" if date_from else ""
+        date_to_filter = f"AND {src}.date <= %(date_to)s" if date_to else ""
+        self.env.cr.execute(f"""
+            SELECT ledger.* FROM (
+                SELECT l.id, l.date, l.date_str, l.voucher, l.particulars, l.move_type,
+                       l.rec_qty, l.rec_rate, l.issue_qty, l.issue_rate, l.uom,
+                       l.invoice_status, {wh_sql} AS warehouse_id, w.name AS warehouse_name,
+                       {qty_sql} AS net_qty,
+                       %(opening)s + SUM({qty_sql}) OVER (
+                           ORDER BY l.date ASC, l.id ASC
+                           ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                       ) AS balance
+                FROM {from_sql}
+                LEFT JOIN stock_warehouse w ON w.id = {wh_sql}
+                WHERE {src}.product_id = %(product_id)s
+                  {date_from_filter}
+                  {date_to_filter}
+                  {wh_filter}
+                  AND {src}.company_id = ANY(%(company_ids)s)
+            ) ledger
+            WHERE (%(voucher)s::varchar IS NULL OR ledger.voucher ILIKE %(voucher)s)
+              AND (%(move_type)s::varchar IS NULL OR ledger.move_type = %(move_type)s)
+              AND (%(invoice_status)s::varchar IS NULL OR ledger.invoice_status = %(invoice_status)s)
+            ORDER BY ledger.date ASC, ledger.id ASC
+        """, params)
+        rows = self.env.cr.dictfetchall()
+        for row in rows:
+            row['date'] = fields.Datetime.to_string(row['date'])
+        opening_row = {
+            'id': False,
+            'date': False,
+            'date_str': '',
+            'voucher': '',
+            'particulars': _('Opening Balance'),
+            'move_type': '',
+            'rec_qty': 0.0, 'rec_rate': 0.0, 'issue_qty': 0.0, 'issue_rate': 0.0,
+            'net_qty': opening,
+            'uom': '',
+            'invoice_status': '',
+            'warehouse_id': warehouse_id,
+            'warehouse_name': '',
+            'balance': opening,
+        }
+        return [opening_row] + rows
+
+    def _can_refresh_ledger(self):
+        return self.env.su or self.env.user.has_group('stock.group_stock_manager')
+
+    @api.model
+    def action_refresh_pending(self):
+        """ Refresh the queued products now, from the filter bar. """
+        if not self._can_refresh_ledger():
+            raise AccessError(_('Only Inventory Managers can refresh the stock ledger.'))
+        self._cron_refresh_queue()
+        return self.get_ledger_status()
+
     # ── Guard methods ──────────────────────────────────────────────────────────
 
     def action_open_delete_wizard(self):
@@ -660,6 +1060,12 @@ class ProductStockLedgerDeleteWizard(models.TransientModel):
         move_ids = self.move_ids.ids
         if not move_ids:
             raise UserError(_('No stock moves to delete.'))
+        product_ids = self.move_ids.product_id.ids
+        changed_dates = {}
+        for move in self.move_ids:
+            pid = move.product_id.id
+            if move.date and (pid not in changed_dates or move.date < changed_dates[pid]):
+                changed_dates[pid] = move.date
         cr = self.env.cr
         if self._table_exists('stock_valuation_layer'):
             cr.execute("DELETE FROM stock_valuation_layer WHERE stock_move_id = ANY(%s)", (move_ids,))
@@ -668,6 +1074,14 @@ class ProductStockLedgerDeleteWizard(models.TransientModel):
         cr.execute("DELETE FROM stock_move_line WHERE move_id = ANY(%s)", (move_ids,))
         cr.execute("DELETE FROM stock_move WHERE id = ANY(%s)", (move_ids,))
         cr.execute("DELETE FROM stock_quant WHERE quantity = 0 AND reserved_quantity = 0")
+        # Drop the rows right away; later balances of the same products shift.
+        ledger = self.env['product.stock.ledger']
+        cr.execute(f"""
+            DELETE FROM {ledger._wh_table}
+            WHERE line_id IN (SELECT id FROM {ledger._table} WHERE move_id = ANY(%s))
+        """, (move_ids,))
+        cr.execute(f"DELETE FROM {ledger._table} WHERE move_id = ANY(%s)", (move_ids,))
+        ledger._mark_products_dirty(product_ids, changed_dates)
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
@@ -0,0 +1,183 @@
+import logging
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, models, fields
+
+_logger = logging.getLogger(__name__)
+
+
+class ProductStockLedgerSnapshot(models.Model):
+    """
+    Monthly closing quantity per product / warehouse / company, built from the
+    warehouse legs of the materialized ledger (``product_stock_ledger_wh``), so
+    transfers between warehouses move quantity from one key to the other.
+
+    Snapshots are sparse: a row exists only for months in which the key had
+    movement.  The opening balance at any date is the latest snapshot before
+    that date plus the ledger rows between the snapshot and the date, so a
+    missing snapshot only makes that tail longer, never wrong.  A snapshot is
+    stale when a move is added or deleted in its period or before it; those
+    are deleted and rebuilt by ``_rebuild_products``.
+    """
+    _name = 'product.stock.ledger.snapshot'
+    _description = 'Product Stock Ledger Opening Balance Snapshot'
+    _log_access = False
+    _order = 'period_end desc, product_id'
+
+    product_id   = fields.Many2one('product.product', string='Product',   readonly=True, index=True)
+    warehouse_id = fields.Many2one('stock.warehouse', string='Warehouse', readonly=True)
+    company_id   = fields.Many2one('res.company',     string='Company',   readonly=True)
+    period_end   = fields.Date(string='Period End', readonly=True)
+    qty          = fields.Float(string='Closing Qty', readonly=True, digits=(16, 4))
+
+    def init(self):
+        self.env.cr.execute(f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS {self._table}_key_uniq
+                ON {self._table} (product_id, COALESCE(warehouse_id, 0), company_id, period_end)
+        """)
+
+    # ── Build ──────────────────────────────────────────────────────────────────
+
+    def _last_closed_period(self):
+        self.env.cr.execute(f"SELECT MAX(period_end) FROM {self._table}")
+        return self.env.cr.fetchone()[0]
+
+    def _insert_periods(self, period_from, period_to, product_ids=None):
+        """
+        Insert snapshots for month-ends in [period_from, period_to].  The
+        running quantity is accumulated over the whole history of each key,
+        only the requested periods are written.
+        """
+        ledger = self.env['product.stock.ledger']
+        product_filter = "AND product_id = ANY(%(product_ids)s)" if product_ids is not None else ""
+        self.env.cr.execute(f"""
+            WITH monthly AS (
+                SELECT product_id, warehouse_id, company_id,
+                       (date_trunc('month', date) + INTERVAL '1 month - 1 day')::date AS period_end,
+                       SUM(qty) AS qty
+                FROM {ledger._wh_table}
+                WHERE date < (%(period_to)s::date + 1)
+                  {product_filter}
+                GROUP BY 1, 2, 3, 4
+            ),
+            running AS (
+                SELECT product_id, warehouse_id, company_id, period_end,
+                       SUM(qty) OVER (
+                           PARTITION BY product_id, warehouse_id, company_id
+                           ORDER BY period_end
+                       ) AS qty
+                FROM monthly
+            )
+            INSERT INTO {self._table} (product_id, warehouse_id, company_id, period_end, qty)
+            SELECT product_id, warehouse_id, company_id, period_end, qty
+            FROM running
+            WHERE period_end >= %(period_from)s
+        """, {
+            'period_from': period_from,
+            'period_to': period_to,
+            'product_ids': product_ids,
+        })
+        return self.env.cr.rowcount
+
+    @api.model
+    def _cron_close_periods(self):
+        """ Snapshot every month that ended since the last closed period. """
+        today = fields.Date.context_today(self)
+        period_to = today.replace(day=1) - relativedelta(days=1)
+        last = self._last_closed_period()
+        if last and last >= period_to:
+            return
+        period_from = (last + relativedelta(days=1)) if last else fields.Date.to_date('1900-01-01')
+        count = self._insert_periods(period_from, period_to)
+        self.invalidate_model()
+        _logger.info("Product Stock Ledger: %d snapshot(s) closed up to %s", count, period_to)
+
+    @api.model
+    def _rebuild_all(self):
+        last = self._last_closed_period()
+        self.env.cr.execute(f"TRUNCATE {self._table}")
+        if last:
+            self._insert_periods(fields.Date.to_date('1900-01-01'), last)
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild_products(self, product_dates):
+        """
+        Invalidate and rebuild the snapshots of a product from the period
+        containing a back-dated change onward.
+
+        :param product_dates: {product_id: earliest changed datetime}
+        """
+        last = self._last_closed_period()
+        if not last:
+            return
+        by_start = {}
+        for product_id, changed in product_dates.items():
+            period_from = fields.Date.to_date(changed).replace(day=1)
+            if period_from <= last:
+                by_start.setdefault(period_from, []).append(product_id)
+        cr = self.env.cr
+        for period_from, product_ids in by_start.items():
+            cr.execute(f"""
+                DELETE FROM {self._table}
+                WHERE product_id = ANY(%s) AND period_end >= %s
+            """, (product_ids, period_from))
+            self._insert_periods(period_from, last, product_ids)
+        if by_start:
+            self.invalidate_model()
+
+    # ── Read ───────────────────────────────────────────────────────────────────
+
+    @api.model
+    def _get_opening_balances(self, product_ids, date_from, warehouse_id=None, company_ids=None):
+        """
+        Quantity on hand per product strictly before ``date_from``: latest
+        snapshot before it plus the ledger tail between the two.
+
+        :returns: {product_id: qty}
+        """
+        if not product_ids:
+            return {}
+        ledger = self.env['product.stock.ledger']
+        wh_filter = "AND {alias}.warehouse_id = %(warehouse_id)s" if warehouse_id else ""
+        co_filter = "AND {alias}.company_id = ANY(%(company_ids)s)" if company_ids else ""
+        self.env.cr.execute(f"""
+            WITH snap AS (
+                SELECT DISTINCT ON (s.product_id, s.warehouse_id, s.company_id)
+                       s.product_id, s.warehouse_id, s.company_id, s.period_end, s.qty
+                FROM {self._table} s
+                WHERE s.product_id = ANY(%(product_ids)s)
+                  AND s.period_end < %(date_from)s::date
+                  {wh_filter.format(alias='s')}
+                  {co_filter.format(alias='s')}
+                ORDER BY s.product_id, s.warehouse_id, s.company_id, s.period_end DESC
+            ),
+            tail AS (
+                SELECT l.product_id, SUM(l.qty) AS qty
+                FROM {ledger._wh_table} l
+                LEFT JOIN snap
+                    ON snap.product_id = l.product_id
+                   AND snap.warehouse_id IS NOT DISTINCT FROM l.warehouse_id
+                   AND snap.company_id IS NOT DISTINCT FROM l.company_id
+                WHERE l.product_id = ANY(%(product_ids)s)
+                  AND l.date < %(date_from)s
+                  AND (snap.period_end IS NULL OR l.date >= snap.period_end + 1)
+                  {wh_filter.format(alias='l')}
+                  {co_filter.format(alias='l')}
+                GROUP BY l.product_id
+            ),
+            snap_total AS (
+                SELECT product_id, SUM(qty) AS qty FROM snap GROUP BY product_id
+            )
+            SELECT p.product_id, COALESCE(st.qty, 0) + COALESCE(t.qty, 0)
+            FROM unnest(%(product_ids)s::int[]) AS p(product_id)
+            LEFT JOIN snap_total st ON st.product_id = p.product_id
+            LEFT JOIN tail t        ON t.product_id  = p.product_id
+        """, {
+            'product_ids': list(product_ids),
+            'date_from': date_from,
+            'warehouse_id': warehouse_id,
+            'company_ids': company_ids,
+        })
+        return dict(self.env.cr.fetchall())
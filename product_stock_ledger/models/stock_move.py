@@ -0,0 +1,16 @@
+from odoo import models
+
+
+class StockMove(models.Model):
+    _inherit = 'stock.move'
+
+    def _action_done(self, cancel_backorder=False):
+        moves = super()._action_done(cancel_backorder=cancel_backorder)
+        # Earliest date per product, so back-dated moves re-open closed snapshots
+        changed_dates = {}
+        for move in moves:
+            pid = move.product_id.id
+            if pid not in changed_dates or move.date < changed_dates[pid]:
+                changed_dates[pid] = move.date
+        self.env['product.stock.ledger']._mark_products_dirty(moves.product_id.ids, changed_dates)
+        return moves
@@ -1,6 +1,6 @@
 /** @odoo-module **/
 
-import { Component, useState, onMounted, onWillUnmount } from "@odoo/owl";
+import { Component, useState, useEffect, onMounted, onWillUnmount } from "@odoo/owl";
 import { useService } from "@web/core/utils/hooks";
 import { patch } from "@web/core/utils/patch";
 import { ListRenderer } from "@web/views/list/list_renderer";
@@ -34,7 +34,10 @@ function isoToDisplay(iso) {
 // ── Filter Bar Component ──────────────────────────────────────────────────────
 class StockLedgerFilterBar extends Component {
     static template = "product_stock_ledger.FilterBar";
-    static props = { model: Object };
+    static props = {
+        model: Object,
+        onBoundedChange: { type: Function, optional: true },
+    };
 
     setup() {
         this.orm = useService("orm");
@@ -52,12 +55,23 @@ class StockLedgerFilterBar extends Component {
             warehouses: [],
             acResults: [],
             acVisible: false,
+            ledgerStatus: null,
+            openingBalance: null,
+            // Rows of get_ledger_lines when the view is bounded (product + date
+            // from or warehouse)
+            boundedLines: null,
         });
         this._acTimer = null;
         this._boundKey = this._onKey.bind(this);
+        // The bounded rows replace the list: tell the list renderer to hide it
+        useEffect(
+            (bounded) => this.props.onBoundedChange?.(bounded),
+            () => [Boolean(this.state.boundedLines)]
+        );
         onMounted(() => {
             document.addEventListener("keydown", this._boundKey);
             this._loadWarehouses();
+            this._loadLedgerStatus();
         });
         onWillUnmount(() => {
             document.removeEventListener("keydown", this._boundKey);
@@ -73,6 +87,24 @@ class StockLedgerFilterBar extends Component {
         } catch (_) {}
     }
 
+    // ── Materialized ledger staleness ────────────────────────────────────────
+    async _loadLedgerStatus() {
+        try {
+            this.state.ledgerStatus = await this.orm.call(
+                "product.stock.ledger", "get_ledger_status", []
+            );
+        } catch (_) {}
+    }
+
+    async refreshPending() {
+        try {
+            this.state.ledgerStatus = await this.orm.call(
+                "product.stock.ledger", "action_refresh_pending", []
+            );
+            await this.apply();
+        } catch (e) { console.warn("[SLFilter] refresh failed:", e); }
+    }
+
     // ── Date text input (manual typing) ──────────────────────────────────────
     onDateFromInput(ev) {
         const fmt = autoFormat(ev.target.value);
@@ -169,7 +201,8 @@ class StockLedgerFilterBar extends Component {
         const d = [];
         if (s.productId)     d.push(["product_id", "=", s.productId]);
         else if (s.product)  d.push(["product_id.display_name", "ilike", s.product]);
-        if (s.warehouseId)   d.push(["warehouse_id", "=", parseInt(s.warehouseId)]);
+        // Warehouse legs: transfers into the warehouse are listed too
+        if (s.warehouseId)   d.push(["leg_warehouse_id", "=", parseInt(s.warehouseId)]);
         if (s.dateFrom)      d.push(["date", ">=", s.dateFrom + " 00:00:00"]);
         if (s.dateTo)        d.push(["date", "<=", s.dateTo   + " 23:59:59"]);
         if (s.voucher)       d.push(["voucher", "ilike", s.voucher]);
@@ -181,7 +214,49 @@ class StockLedgerFilterBar extends Component {
         return d;
     }
 
+    // ── Bounded ledger: opening balance row + in-range rows only ─────────────
+    // With a warehouse, the rows are the warehouse's legs and the balance is
+    // the warehouse's own running balance.
+    _isBounded() {
+        const s = this.state;
+        return Boolean(s.productId && (s.dateFrom || s.warehouseId));
+    }
+
+    async _loadBoundedLines() {
+        const s = this.state;
+        const lines = await this.orm.call(
+            "product.stock.ledger", "get_ledger_lines",
+            [
+                s.productId,
+                s.dateFrom ? s.dateFrom + " 00:00:00" : false,
+                s.dateTo ? s.dateTo + " 23:59:59" : false,
+                s.warehouseId ? parseInt(s.warehouseId) : false,
+            ],
+            {
+                filters: {
+                    voucher: s.voucher,
+                    move_type: s.moveType,
+                    invoice_status: s.invoiceStatus,
+                },
+            }
+        );
+        s.boundedLines = lines;
+        s.openingBalance = lines.length ? lines[0].balance : null;
+    }
+
+    formatQty(value) {
+        return value ? value.toFixed(4) : "";
+    }
+
     async apply() {
+        this.state.boundedLines = null;
+        this.state.openingBalance = null;
+        if (this._isBounded()) {
+            try {
+                await this._loadBoundedLines();
+            } catch (e) { console.warn("[SLFilter] ledger lines failed:", e); }
+            return;
+        }
         const domain = this._buildDomain();
         try {
             await this.props.model.load({ domain });
@@ -201,6 +276,8 @@ class StockLedgerFilterBar extends Component {
             dateFrom: "", dateTo: "", voucher: "",
             moveType: "", invoiceStatus: "",
             acVisible: false, acResults: [],
+            openingBalance: null,
+            boundedLines: null,
         });
         try {
             await this.props.model.load({ domain: [] });
@@ -235,6 +312,22 @@ patch(ListRenderer, {
     },
 });
 
+// ── Hide the list itself while the filter bar shows bounded rows ──────────────
+patch(ListRenderer.prototype, {
+    setup() {
+        super.setup(...arguments);
+        this.stockLedgerView = useState({ bounded: false });
+        useEffect(
+            (bounded) => this.rootRef.el?.classList.toggle("o_sl_list_hidden", bounded),
+            () => [this.stockLedgerView.bounded]
+        );
+    },
+
+    onStockLedgerBounded(bounded) {
+        this.stockLedgerView.bounded = bounded;
+    },
+});
+
 
 
 
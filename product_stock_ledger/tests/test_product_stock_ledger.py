@@ -0,0 +1,142 @@
+from datetime import date, datetime
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestProductStockLedger(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Ledger = cls.env['product.stock.ledger']
+        cls.warehouse = cls.env['stock.warehouse'].search(
+            [('company_id', '=', cls.env.company.id)], limit=1)
+        cls.stock_location = cls.warehouse.lot_stock_id
+        cls.supplier_location = cls.env.ref('stock.stock_location_suppliers')
+        cls.customer_location = cls.env.ref('stock.stock_location_customers')
+        cls.product = cls.env['product.product'].create({
+            'name': 'Ledger Test Product',
+            'is_storable': True,
+        })
+
+    def _move(self, source, destination, qty, date, product=None):
+        product = product or self.product
+        move = self.env['stock.move'].create({
+            'product_id': product.id,
+            'product_uom_qty': qty,
+            'product_uom': product.uom_id.id,
+            'location_id': source.id,
+            'location_dest_id': destination.id,
+        })
+        move._action_confirm()
+        move._action_assign()
+        move.quantity = qty
+        move.picked = True
+        move._action_done()
+        move.write({'date': date})
+        move.move_line_ids.write({'date': date})
+        return move
+
+    def _full_history_balances(self):
+        """ Running balance of the materialized rows, over all history. """
+        rows = self.Ledger.search([('product_id', '=', self.product.id)], order='date asc, id asc')
+        return [(row.date, row.balance) for row in rows]
+
+    def test_bounded_ledger_matches_full_history(self):
+        self._move(self.supplier_location, self.stock_location, 10, '2025-01-05 10:00:00')
+        self._move(self.stock_location, self.customer_location, 3, '2025-01-20 10:00:00')
+        self._move(self.supplier_location, self.stock_location, 5, '2025-02-10 10:00:00')
+        self._move(self.stock_location, self.customer_location, 4, '2025-02-15 10:00:00')
+        self._move(self.supplier_location, self.stock_location, 7, '2025-03-01 10:00:00')
+        self.Ledger.action_rebuild_ledger()
+
+        date_from = '2025-02-01 00:00:00'
+        lines = self.Ledger.get_ledger_lines(self.product.id, date_from)
+        history = self._full_history_balances()
+
+        opening, in_range = lines[0], lines[1:]
+        self.assertFalse(opening['id'])
+        before = [balance for date, balance in history if str(date) < date_from]
+        self.assertAlmostEqual(opening['balance'], before[-1])
+        self.assertEqual(len(in_range), len(history) - len(before))
+        expected = [balance for date, balance in history if str(date) >= date_from]
+        self.assertEqual(len(in_range), 3)
+        for line, balance in zip(in_range, expected):
+            self.assertAlmostEqual(line['balance'], balance)
+        self.assertAlmostEqual(in_range[-1]['balance'], 15.0)
+
+    def test_bounded_ledger_date_to_and_filters(self):
+        self._move(self.supplier_location, self.stock_location, 10, '2025-01-05 10:00:00')
+        self._move(self.supplier_location, self.stock_location, 5, '2025-02-10 10:00:00')
+        self._move(self.stock_location, self.customer_location, 4, '2025-02-15 10:00:00')
+        self._move(self.supplier_location, self.stock_location, 7, '2025-03-01 10:00:00')
+        self.Ledger.action_rebuild_ledger()
+
+        lines = self.Ledger.get_ledger_lines(
+            self.product.id, '2025-02-01 00:00:00', '2025-02-28 23:59:59')
+        self.assertEqual([line['balance'] for line in lines], [10.0, 15.0, 11.0])
+
+        # Filters hide rows but keep the running balance of the others
+        lines = self.Ledger.get_ledger_lines(
+            self.product.id, '2025-02-01 00:00:00', '2025-02-28 23:59:59',
+            filters={'move_type': 'OUT'})
+        self.assertEqual([line['balance'] for line in lines], [10.0, 11.0])
+
+    def test_warehouse_ledger_lists_transfers_in(self):
+        other = self.env['stock.warehouse'].create({'name': 'Ledger Test WH', 'code': 'LTWH'})
+        self._move(self.supplier_location, self.stock_location, 10, '2025-01-05 10:00:00')
+        self._move(self.stock_location, other.lot_stock_id, 4, '2025-01-10 10:00:00')
+        self._move(other.lot_stock_id, self.customer_location, 1, '2025-01-15 10:00:00')
+        self.Ledger.action_rebuild_ledger()
+
+        lines = self.Ledger.get_ledger_lines(self.product.id, warehouse_id=other.id)
+        self.assertEqual([line['net_qty'] for line in lines[1:]], [4.0, -1.0])
+        self.assertEqual([line['balance'] for line in lines[1:]], [4.0, 3.0])
+
+        lines = self.Ledger.get_ledger_lines(self.product.id, warehouse_id=self.warehouse.id)
+        self.assertEqual([line['balance'] for line in lines[1:]], [10.0, 6.0])
+
+        # The list filter matches the transfer in both warehouses
+        rows = self.Ledger.search([
+            ('product_id', '=', self.product.id),
+            ('leg_warehouse_id', '=', other.id),
+        ])
+        self.assertEqual(len(rows), 2)
+
+    def test_back_dated_move_rebuilds_snapshots(self):
+        Snapshot = self.env['product.stock.ledger.snapshot']
+        self._move(self.supplier_location, self.stock_location, 10, '2025-01-05 10:00:00')
+        self._move(self.stock_location, self.customer_location, 3, '2025-02-10 10:00:00')
+        self._move(self.supplier_location, self.stock_location, 7, '2025-03-05 10:00:00')
+        self.Ledger.action_rebuild_ledger()
+        Snapshot._insert_periods(date(2025, 1, 1), date(2025, 3, 31), [self.product.id])
+        Snapshot.invalidate_model()
+
+        def closing_quantities():
+            snapshots = Snapshot.search([
+                ('product_id', '=', self.product.id),
+                ('warehouse_id', '=', self.warehouse.id),
+                ('period_end', '<=', '2025-03-31'),
+            ], order='period_end')
+            return [(str(snap.period_end), snap.qty) for snap in snapshots]
+
+        def opening(date_from):
+            return Snapshot._get_opening_balances(
+                [self.product.id], date_from, warehouse_id=self.warehouse.id)[self.product.id]
+
+        self.assertEqual(closing_quantities(), [
+            ('2025-01-31', 10.0), ('2025-02-28', 7.0), ('2025-03-31', 14.0)])
+        self.assertAlmostEqual(opening('2025-03-01'), 7.0)
+
+        # A move back-dated into January re-opens the closed periods from January on
+        self._move(self.supplier_location, self.stock_location, 4, '2025-01-20 10:00:00')
+        self.Ledger._mark_products_dirty(
+            [self.product.id], {self.product.id: datetime(2025, 1, 20, 10)})
+        self.Ledger._refresh_products([self.product.id])
+
+        self.assertEqual(closing_quantities(), [
+            ('2025-01-31', 14.0), ('2025-02-28', 11.0), ('2025-03-31', 18.0)])
+        self.assertAlmostEqual(opening('2025-03-01'), 11.0)
+        self.assertAlmostEqual(opening('2025-04-01'), 18.0)
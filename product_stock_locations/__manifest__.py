@@ -19,6 +19,7 @@
         'account',
         'stock',
         'web',
+        'stock_location_warehouse',
     ],
     'data': [
         'security/ir.model.access.csv',
@@ -12,44 +12,49 @@ class AccountMoveLine(models.Model):
         """
         if not product_id:
             return []
+        return self.get_product_stock_locations_batch([product_id]).get(product_id, [])
 
-        # Search stock quants for this product in internal locations
-        quants = self.env['stock.quant'].search([
-            ('product_id', '=', product_id),
-            ('location_id.usage', '=', 'internal'),
-        ])
+    @api.model
+    def get_product_stock_locations_batch(self, product_ids):
+        """
+        Stock location rows of many products at once, so that the widget can
+        prefetch the products of all the lines of an invoice in one call.
+
+        :returns: {product_id: rows of get_product_stock_locations}
+        """
+        snapshots = self.env['product.product'].get_stock_snapshot(product_ids)
+        return {
+            product_id: self._get_stock_location_rows(snapshot)
+            for product_id, snapshot in snapshots.items()
+        }
 
+    @api.model
+    def _get_stock_location_rows(self, snapshot):
         result = []
         total_onhand = 0.0
         total_reserved = 0.0
 
-        for quant in quants:
-            on_hand = quant.quantity
-            reserved = quant.reserved_quantity
-            available = on_hand - reserved
-
+        # Rows are sorted by location name in the snapshot
+        for row in snapshot['locations']:
             # Skip locations with zero or negative stock
-            if on_hand <= 0:
+            if row['on_hand'] <= 0:
                 continue
 
-            total_onhand += on_hand
-            total_reserved += reserved
+            total_onhand += row['on_hand']
+            total_reserved += row['reserved']
 
             result.append({
-                'id': quant.id,
-                'location_id': quant.location_id.id,
-                'location_name': quant.location_id.complete_name or quant.location_id.name,
-                'on_hand': on_hand,
-                'reserved': reserved,
-                'available': available,
-                'uom': quant.product_uom_id.name if quant.product_uom_id else '',
-                'lot_name': quant.lot_id.name if quant.lot_id else '',
-                'package_name': quant.package_id.name if quant.package_id else '',
+                'id': len(result) + 1,
+                'location_id': row['location_id'],
+                'location_name': row['location_name'],
+                'on_hand': row['on_hand'],
+                'reserved': row['reserved'],
+                'available': row['available'],
+                'uom': snapshot['uom'],
+                'lot_name': row['lot_name'],
+                'package_name': row['package_name'],
             })
 
-        # Sort by location name
-        result.sort(key=lambda x: x['location_name'])
-
         # Add totals row at the end
         if result:
             result.append({
@@ -59,9 +64,9 @@ class AccountMoveLine(models.Model):
                 'on_hand': total_onhand,
                 'reserved': total_reserved,
                 'available': total_onhand - total_reserved,
-                'uom': result[0]['uom'] if result else '',
+                'uom': snapshot['uom'],
                 'lot_name': '',
                 'package_name': '',
             })
 
-        return result
\ No newline at end of file
+        return result
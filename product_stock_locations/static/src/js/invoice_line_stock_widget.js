@@ -2,6 +2,7 @@
 
 import { registry } from "@web/core/registry";
 import { StockLocationDialog } from "./stock_location_dialog";
+import { makeStockRowsFetcher } from "@stock_location_warehouse/js/stock_snapshot_prefetch";
 
 export const stockLocationService = {
     dependencies: ["orm", "dialog", "notification"],
@@ -9,6 +10,12 @@ export const stockLocationService = {
     start(env, { orm, dialog, notification }) {
         console.log("Stock Location Service Started");
 
+        const fetchStockRows = makeStockRowsFetcher(
+            orm,
+            'account.move.line',
+            'get_product_stock_locations_batch'
+        );
+
         const keydownHandler = async (ev) => {
             // Check for Ctrl+F9
             if (ev.ctrlKey && ev.key === 'F9') {
@@ -125,11 +132,7 @@ export const stockLocationService = {
                     // Fetch stock locations
                     let stockLocations;
                     try {
-                        stockLocations = await orm.call(
-                            'account.move.line',
-                            'get_product_stock_locations',
-                            [productId]
-                        );
+                        stockLocations = await fetchStockRows(productId);
                         console.log("✓ Stock locations call successful");
                         console.log("  Records returned:", stockLocations ? stockLocations.length : 0);
                     } catch (stockError) {
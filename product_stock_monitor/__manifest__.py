@@ -20,6 +20,7 @@
         'stock',
         'product',
         'web',
+        'stock_location_warehouse',
     ],
     'data': [
         'security/ir.model.access.csv',
@@ -12,38 +12,34 @@ class ProductProduct(models.Model):
         """
         if not product_id:
             return []
+        return self.get_product_stock_monitor_batch([product_id]).get(product_id, [])
 
-        product = self.env['product.product'].browse(product_id)
-        if not product.exists():
-            return []
-
-        # Get all warehouses
-        warehouses = self.env['stock.warehouse'].search([])
-
-        stock_data = []
-        for warehouse in warehouses:
-            # Get stock quantity for this warehouse location
-            stock_quant = self.env['stock.quant'].search([
-                ('product_id', '=', product_id),
-                ('location_id', 'child_of', warehouse.lot_stock_id.id),
-            ])
+    @api.model
+    def get_product_stock_monitor_batch(self, product_ids):
+        """
+        Stock monitor rows of many products at once, so that the widget can
+        prefetch the products of all the lines of a document in one call.
 
-            # Sum up quantities
-            total_qty = sum(stock_quant.mapped('quantity'))
+        :returns: {product_id: rows of get_product_stock_monitor}
+        """
+        products = self.env['product.product'].browse(product_ids).exists()
+        # Per-warehouse quantities come from the shared (cached) stock snapshot
+        snapshots = self.get_stock_snapshot(products.ids)
 
+        result = {}
+        for product in products:
             # Get purchase rate (standard price / cost price)
             purchase_rate = product.standard_price or 0.0
 
             # Get sales rate (list price)
             sales_rate = product.list_price or 0.0
 
-            stock_data.append({
-                'id': warehouse.id,
-                'warehouse_name': warehouse.name,
-                'location_stock': warehouse.lot_stock_id.complete_name or '',
-                'qty': total_qty,
+            result[product.id] = [{
+                'id': row['id'],
+                'warehouse_name': row['warehouse_name'],
+                'location_stock': row['location_stock'],
+                'qty': row['on_hand'],
                 'purchase_rate': purchase_rate,
                 'sales_rate': sales_rate,
-            })
-
-        return stock_data
\ No newline at end of file
+            } for row in snapshots[product.id]['warehouses']]
+        return result
@@ -2,6 +2,7 @@
 
 import { registry } from "@web/core/registry";
 import { StockMonitorDialog } from "./stock_monitor_dialog";
+import { makeStockRowsFetcher } from "@stock_location_warehouse/js/stock_snapshot_prefetch";
 
 export const stockMonitorService = {
     dependencies: ["orm", "dialog", "notification"],
@@ -9,6 +10,12 @@ export const stockMonitorService = {
     start(env, { orm, dialog, notification }) {
         console.log("Stock Monitor Service Started");
 
+        const fetchStockRows = makeStockRowsFetcher(
+            orm,
+            'product.product',
+            'get_product_stock_monitor_batch'
+        );
+
         const keydownHandler = async (ev) => {
             // Check for Ctrl+F7
             if (ev.ctrlKey && ev.key === 'F7') {
@@ -130,11 +137,7 @@ export const stockMonitorService = {
                     // Fetch stock data
                     let stockData;
                     try {
-                        stockData = await orm.call(
-                            'product.product',
-                            'get_product_stock_monitor',
-                            [productId]
-                        );
+                        stockData = await fetchStockRows(productId);
                         console.log("✓ Stock monitor call successful");
                         console.log("  Warehouses returned:", stockData ? stockData.length : 0);
                         console.log("  Data:", stockData);
@@ -15,6 +15,8 @@
         - Logs a chatter message on the product for traceability
         - Skips products with no valid unit price
         - Works with multi-currency (converts to company currency)
+        - Posting many bills at once updates each product a single time,
+          with the quantity-weighted average of its bill prices
     """,
     'author': 'Custom Development',
     'depends': ['account', 'purchase', 'stock'],
@@ -26,8 +26,7 @@ class AccountMove(models.Model):
                 'purchase_bill_update_cost.auto_update_cost', default='True'
             )
             if update_cost_enabled == 'True':
-                for bill in vendor_bills:
-                    bill._update_product_cost_from_bill()
+                vendor_bills._update_product_cost_from_bill()
 
         return res
 
@@ -37,52 +36,91 @@ class AccountMove(models.Model):
         the unit price in vendor bill lines.
         Uses manual_currency_rate from purchase_bill_form_modified if set,
         otherwise falls back to Odoo system rate.
-        """
-        self.ensure_one()
-
-        company_currency = self.company_id.currency_id
-        invoice_currency = self.currency_id
-        rate_date = self.invoice_date or fields.Date.today()
-
-        # Determine conversion rate once for all lines on this bill:
-        # Priority 1 — manual_currency_rate from purchase_bill_form_modified
-        # Priority 2 — Odoo system rate
-        manual_rate = getattr(self, 'manual_currency_rate', 0.0)
-        is_foreign = invoice_currency and invoice_currency != company_currency
-
-        for line in self.invoice_line_ids:
-            product = line.product_id
-
-            # Skip lines without a product or with zero/negative price
-            if not product or line.price_unit <= 0:
-                continue
-
-            # Only update for storable products and consumables (not services)
-            if product.type not in ('consu', 'product'):
-                continue
 
-            # Convert unit price to company currency
-            unit_price_in_company_currency = self._cost_convert_to_company_currency(
-                amount=line.price_unit,
-                from_currency=invoice_currency,
-                company=self.company_id,
-                date=rate_date,
-                manual_rate=manual_rate if is_foreign else 0.0,
-            )
+        Works on a batch of bills: the lines of every bill are aggregated per
+        company and product template, and each template gets a single update
+        to the quantity-weighted average of its converted unit prices.
+        """
+        # {(company, template): {'qty', 'value', 'lines': [(bill, line, converted price)]}}
+        totals = {}
+        for bill in self:
+            company_currency = bill.company_id.currency_id
+            invoice_currency = bill.currency_id
+            rate_date = bill.invoice_date or fields.Date.today()
+
+            # Determine conversion rate once for all lines on this bill:
+            # Priority 1 — manual_currency_rate from purchase_bill_form_modified
+            # Priority 2 — Odoo system rate
+            manual_rate = getattr(bill, 'manual_currency_rate', 0.0)
+            is_foreign = invoice_currency and invoice_currency != company_currency
+
+            for line in bill.invoice_line_ids:
+                product = line.product_id
+
+                # Skip lines without a product or with zero/negative price
+                if not product or line.price_unit <= 0:
+                    continue
+
+                # Only update for storable products and consumables (not services)
+                if product.type not in ('consu', 'product'):
+                    continue
+
+                # Convert unit price to company currency
+                unit_price_in_company_currency = bill._cost_convert_to_company_currency(
+                    amount=line.price_unit,
+                    from_currency=invoice_currency,
+                    company=bill.company_id,
+                    date=rate_date,
+                    manual_rate=manual_rate if is_foreign else 0.0,
+                )
 
-            # Get the product template (cost is on product.template)
-            product_tmpl = product.product_tmpl_id
+                # Cost is on product.template
+                total = totals.setdefault(
+                    (bill.company_id, product.product_tmpl_id), {'qty': 0.0, 'value': 0.0, 'lines': []})
+                qty = line.quantity if line.quantity > 0 else 0.0
+                total['qty'] += qty
+                total['value'] += qty * unit_price_in_company_currency
+                total['lines'].append((bill, line, unit_price_in_company_currency))
+
+        for (company, product_tmpl), total in totals.items():
+            lines = total['lines']
+            if total['qty'] > 0:
+                new_cost = total['value'] / total['qty']
+            else:
+                new_cost = lines[-1][2]
+            product_tmpl = product_tmpl.with_company(company)
             old_cost = product_tmpl.standard_price
 
             # Only update if price has actually changed
-            if float_compare(old_cost, unit_price_in_company_currency, precision_digits=6) == 0:
+            if float_compare(old_cost, new_cost, precision_digits=6) == 0:
                 continue
 
             # Update the standard price
             product_tmpl.sudo().write({
-                'standard_price': unit_price_in_company_currency,
+                'standard_price': new_cost,
             })
 
+            product_tmpl.sudo().message_post(
+                body="<br/>".join(
+                    self._cost_update_message_parts(lines, old_cost, new_cost, company.currency_id)),
+            )
+
+            _logger.info(
+                "Product cost updated | Product: %s | Bills: %s | "
+                "Old Cost: %s | New Cost: %s %s",
+                product_tmpl.name, ', '.join(dict.fromkeys(bill.name for bill, __, __ in lines)),
+                old_cost, new_cost, company.currency_id.name,
+            )
+
+    @api.model
+    def _cost_update_message_parts(self, lines, old_cost, new_cost, company_currency):
+        """Chatter lines of a product cost update, with currency info per bill line"""
+        body_parts = []
+        for bill, line, unit_price_in_company_currency in lines:
+            invoice_currency = bill.currency_id
+            manual_rate = getattr(bill, 'manual_currency_rate', 0.0)
+            is_foreign = invoice_currency and invoice_currency != company_currency
+
             # Build chatter log with currency info
             if is_foreign and manual_rate:
                 rate_info = "Rate: 1 %s = %s %s" % (
@@ -92,37 +130,29 @@ class AccountMove(models.Model):
                 )
                 original_price = "%s %s" % (line.price_unit, invoice_currency.name)
             elif is_foreign:
-                rate_info = "Rate: system rate on %s" % rate_date
+                rate_info = "Rate: system rate on %s" % (bill.invoice_date or fields.Date.today())
                 original_price = "%s %s" % (line.price_unit, invoice_currency.name)
             else:
                 rate_info = ""
                 original_price = ""
 
-            body_parts = [
+            body_parts.append(
                 "Cost price updated from vendor bill <b>%s</b> (Vendor: %s)." % (
-                    self.name, self.partner_id.name),
-            ]
+                    bill.name, bill.partner_id.name),
+            )
             if original_price:
                 body_parts.append("Unit price on bill: <b>%s</b> → %s" % (
                     original_price, rate_info))
-            body_parts.append(
-                "Previous cost: <b>%s %s</b> → New cost: <b>%s %s</b>" % (
-                    old_cost, company_currency.name,
-                    unit_price_in_company_currency, company_currency.name,
-                )
-            )
-
-            product_tmpl.sudo().message_post(
-                body="<br/>".join(body_parts),
-            )
-
-            _logger.info(
-                "Product cost updated | Product: %s | Bill: %s | "
-                "Old Cost: %s | New Cost: %s %s | Manual Rate: %s",
-                product.name, self.name,
-                old_cost, unit_price_in_company_currency, company_currency.name,
-                manual_rate or 'system',
+            elif len(lines) > 1:
+                body_parts.append("Unit price on bill: <b>%s %s</b> (qty %s)" % (
+                    unit_price_in_company_currency, company_currency.name, line.quantity))
+        body_parts.append(
+            "Previous cost: <b>%s %s</b> → New cost: <b>%s %s</b>" % (
+                old_cost, company_currency.name,
+                new_cost, company_currency.name,
             )
+        )
+        return body_parts
 
     def _cost_convert_to_company_currency(self, amount, from_currency, company, date, manual_rate=0.0):
         """
@@ -1,5 +1,6 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+from collections import defaultdict
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -49,33 +50,35 @@ class AccountMove(models.Model):
     def action_post(self):
         """Override to create SVL when posting direct bills."""
         res = super().action_post()
-        for move in self:
-            if (move.move_type == 'in_invoice'
-                    and move.is_direct_bill
-                    and move.auto_create_svl
-                    and not move.svl_created):
-                try:
-                    move._create_svl_for_direct_bill()
-                except UserError:
-                    # Re-raise UserError as-is (our diagnostic messages)
-                    raise
-                except Exception as e:
-                    _logger.error(
-                        'SVL creation failed for bill %s: %s',
-                        move.name, str(e), exc_info=True
-                    )
-                    raise UserError(
-                        _('SVL Creation Error: %s\n\n'
-                          'The stock.valuation.layer model could not be instantiated.\n\n'
-                          'NEXT STEP:\n'
-                          '1. Run: python manage.py shell\n'
-                          '2. Then: exec(open("diagnostic_shell.py").read())\n'
-                          '3. Share the output so the correct model name can be identified.\n\n'
-                          'Technical: %s') % (
-                            str(e)[:200],
-                            str(e)[-100:]
-                        )
+        bills = self.filtered(
+            lambda move: move.move_type == 'in_invoice'
+            and move.is_direct_bill
+            and move.auto_create_svl
+            and not move.svl_created
+        )
+        if bills:
+            try:
+                bills._create_svl_for_direct_bill()
+            except UserError:
+                # Re-raise UserError as-is (our diagnostic messages)
+                raise
+            except Exception as e:
+                _logger.error(
+                    'SVL creation failed for bills %s: %s',
+                    ', '.join(bills.mapped('name')), str(e), exc_info=True
+                )
+                raise UserError(
+                    _('SVL Creation Error: %s\n\n'
+                      'The stock.valuation.layer model could not be instantiated.\n\n'
+                      'NEXT STEP:\n'
+                      '1. Run: python manage.py shell\n'
+                      '2. Then: exec(open("diagnostic_shell.py").read())\n'
+                      '3. Share the output so the correct model name can be identified.\n\n'
+                      'Technical: %s') % (
+                        str(e)[:200],
+                        str(e)[-100:]
                     )
+                )
         return res
 
     def _is_storable_product(self, product):
@@ -222,13 +225,17 @@ class AccountMove(models.Model):
         Create Stock Valuation Layers and Stock Moves
         for direct vendor bills without PO.
         Compatible with Odoo 19 CE (Goods + Track Inventory).
+
+        Works on a batch of bills: the stock moves, move lines and valuation
+        layers of all the bills are created with one create call each, and
+        the cost of each product is updated once for the whole batch.
         """
         _logger.info(
-            'Starting SVL creation for direct bill: %s', self.name
+            'Starting SVL creation for direct bills: %s',
+            ', '.join(self.mapped('name'))
         )
 
         svl_model = self._get_svl_model()
-        stock_move_model = self.env['stock.move']
 
         # Get supplier location
         supplier_location = self.env.ref(
@@ -248,169 +255,159 @@ class AccountMove(models.Model):
                 'Create a location with Usage = "Supplier"'
             ))
 
-        svl_created_count = 0
-        diag_products = []
-
-        for line in self.invoice_line_ids:
-            product = line.product_id
-
-            if not product:
-                continue
-
-            # Diagnostic tracking
-            product_diag = {
-                'name': product.name,
-                'type': product.type,
-                'tracking': getattr(product, 'tracking', 'N/A'),
-                'is_storable': getattr(product, 'is_storable', 'N/A'),
-            }
-            diag_products.append(product_diag)
-
-            if not self._is_storable_product(product):
-                _logger.info(
-                    'Skipping %s - not storable '
-                    '(type=%s, tracking=%s, is_storable=%s)',
-                    product.name, product.type,
-                    getattr(product, 'tracking', 'N/A'),
-                    getattr(product, 'is_storable', 'N/A'),
-                )
-                continue
-
-            if not self._is_auto_valuation(product):
-                _logger.info(
-                    'Skipping %s - not real_time valuation '
-                    '(property_valuation=%s)',
-                    product.name,
-                    getattr(product.categ_id, 'property_valuation', 'N/A'),
-                )
-                continue
-
-            if line.purchase_line_id:
-                _logger.info(
-                    'Skipping %s - linked to PO', product.name)
-                continue
-
-            dest_location = self._get_incoming_location(line)
-            unit_cost = line.price_unit
-            quantity = line.quantity
-
-            if quantity <= 0:
-                continue
-
-            _logger.info(
-                'Creating SVL for %s: qty=%s, cost=%s',
-                product.name, quantity, unit_cost
-            )
-
-            # --- Create Stock Move ---
-            stock_move = stock_move_model.sudo().create({
-                'name': _('Direct Bill: %s') % self.name,
-                'product_id': product.id,
-                'product_uom_qty': quantity,
-                'product_uom': (
-                    line.product_uom_id.id
-                    if line.product_uom_id else product.uom_id.id
-                ),
+        valued_lines = self.env['account.move.line']
+        dest_locations = {}
+        for bill in self:
+            bill_lines = bill.invoice_line_ids.filtered(bill._is_svl_line)
+            if not bill_lines:
+                bill._raise_no_svl_created()
+            if bill.company_id not in dest_locations:
+                dest_locations[bill.company_id] = bill._get_incoming_location(bill_lines[0])
+            valued_lines |= bill_lines
+
+        # --- Create Stock Moves ---
+        stock_moves = self.env['stock.move'].sudo().create([
+            {
+                'name': _('Direct Bill: %s') % line.move_id.name,
+                'product_id': line.product_id.id,
+                'product_uom_qty': line.quantity,
+                'product_uom': (line.product_uom_id or line.product_id.uom_id).id,
                 'location_id': supplier_location.id,
-                'location_dest_id': dest_location.id,
+                'location_dest_id': dest_locations[line.company_id].id,
                 'state': 'done',
-                'origin': self.name,
-                'company_id': self.company_id.id,
-                'price_unit': unit_cost,
-            })
+                'origin': line.move_id.name,
+                'company_id': line.company_id.id,
+                'price_unit': line.price_unit,
+            }
+            for line in valued_lines
+        ])
 
-            # --- Create Stock Move Line ---
-            self.env['stock.move.line'].sudo().create({
+        # --- Create Stock Move Lines ---
+        self.env['stock.move.line'].sudo().create([
+            {
                 'move_id': stock_move.id,
-                'product_id': product.id,
-                'product_uom_id': (
-                    line.product_uom_id.id
-                    if line.product_uom_id else product.uom_id.id
-                ),
-                'qty_done': quantity,
+                'product_id': line.product_id.id,
+                'product_uom_id': (line.product_uom_id or line.product_id.uom_id).id,
+                'quantity': line.quantity,
                 'location_id': supplier_location.id,
-                'location_dest_id': dest_location.id,
-                'company_id': self.company_id.id,
-            })
+                'location_dest_id': dest_locations[line.company_id].id,
+                'company_id': line.company_id.id,
+            }
+            for line, stock_move in zip(valued_lines, stock_moves)
+        ])
 
-            # --- Create Stock Valuation Layer ---
-            total_value = unit_cost * quantity
+        # --- Create Stock Valuation Layers ---
+        with_account_move = 'account_move_id' in svl_model._fields
+        svl_vals_list = []
+        for line, stock_move in zip(valued_lines, stock_moves):
+            total_value = line.price_unit * line.quantity
             svl_vals = {
-                'product_id': product.id,
-                'quantity': quantity,
-                'unit_cost': unit_cost,
+                'product_id': line.product_id.id,
+                'quantity': line.quantity,
+                'unit_cost': line.price_unit,
                 'value': total_value,
-                'remaining_qty': quantity,
+                'remaining_qty': line.quantity,
                 'remaining_value': total_value,
                 'stock_move_id': stock_move.id,
-                'company_id': self.company_id.id,
+                'company_id': line.company_id.id,
                 'description': _(
-                    'Direct Bill %s - %s') % (self.name, product.name),
+                    'Direct Bill %s - %s') % (line.move_id.name, line.product_id.name),
             }
-
             # Only add account_move_id if the field exists
-            if 'account_move_id' in svl_model._fields:
-                svl_vals['account_move_id'] = self.id
+            if with_account_move:
+                svl_vals['account_move_id'] = line.move_id.id
+            svl_vals_list.append(svl_vals)
+        svl_model.sudo().create(svl_vals_list)
 
-            svl = svl_model.sudo().create(svl_vals)
-            _logger.info(
-                'SVL created: id=%s, product=%s, value=%s',
-                svl.id, product.name, total_value
-            )
+        # --- Update product cost price, once per product ---
+        self._update_cost_from_svl_lines(valued_lines)
+
+        # --- Mark SVL as created ---
+        self.sudo().write({'svl_created': True})
+        _logger.info(
+            'Created %s SVL(s) for %s bill(s)',
+            len(svl_vals_list), len(self)
+        )
 
-            # --- Update product cost price ---
-            costing_method = getattr(
-                product.categ_id, 'property_cost_method', False)
+    def _is_svl_line(self, line):
+        """Whether a bill line gets a stock move and a valuation layer."""
+        product = line.product_id
+        if not product or line.quantity <= 0 or line.purchase_line_id:
+            return False
+        return self._is_storable_product(product) and self._is_auto_valuation(product)
+
+    def _update_cost_from_svl_lines(self, lines):
+        """
+        Apply the bill lines to the product costs: the last unit cost for
+        standard-priced products, one weighted average of the batch quantity
+        and value for average-costed ones.
+        """
+        totals = {}
+        for line in lines:
+            key = (line.company_id, line.product_id)
+            qty, value, __ = totals.get(key, (0.0, 0.0, 0.0))
+            totals[key] = (qty + line.quantity, value + line.price_unit * line.quantity, line.price_unit)
+
+        new_costs = defaultdict(dict)
+        for (company, product), (qty, value, last_unit_cost) in totals.items():
+            product = product.with_company(company)
+            costing_method = getattr(product.categ_id, 'property_cost_method', False)
             if costing_method == 'standard':
-                product.sudo().write({'standard_price': unit_cost})
+                new_costs[company][product.id] = last_unit_cost
             elif costing_method == 'average':
-                existing_qty = product.qty_available - quantity
+                existing_qty = product.qty_available - qty
                 existing_value = existing_qty * product.standard_price
-                new_avg = (
-                    (existing_value + total_value) / (existing_qty + quantity)
-                    if (existing_qty + quantity) > 0 else unit_cost
+                new_costs[company][product.id] = (
+                    (existing_value + value) / (existing_qty + qty)
+                    if (existing_qty + qty) > 0 else last_unit_cost
                 )
-                product.sudo().write({'standard_price': new_avg})
 
-            svl_created_count += 1
-
-        # --- Mark SVL as created or raise helpful error ---
-        if svl_created_count > 0:
-            self.sudo().write({'svl_created': True})
+        for company, costs in new_costs.items():
+            products_by_cost = defaultdict(list)
+            for product_id, cost in costs.items():
+                products_by_cost[cost].append(product_id)
+            for cost, product_ids in products_by_cost.items():
+                self.env['product.product'].with_company(company).sudo().browse(
+                    product_ids).write({'standard_price': cost})
+
+    def _raise_no_svl_created(self):
+        """Raise the configuration help for a bill without any valued line."""
+        diag = []
+        for product in self.invoice_line_ids.product_id:
+            diag.append(
+                '• %s: type=%s | tracking=%s | is_storable=%s' % (
+                    product.name,
+                    product.type,
+                    getattr(product, 'tracking', 'N/A'),
+                    getattr(product, 'is_storable', 'N/A'),
+                )
+            )
             _logger.info(
-                'Created %s SVL(s) for bill %s',
-                svl_created_count, self.name
+                'No SVL for %s on %s '
+                '(type=%s, tracking=%s, is_storable=%s, property_valuation=%s)',
+                product.name, self.name, product.type,
+                getattr(product, 'tracking', 'N/A'),
+                getattr(product, 'is_storable', 'N/A'),
+                getattr(product.categ_id, 'property_valuation', 'N/A'),
             )
-        else:
-            # Build diagnostic info for the error message
-            diag = []
-            for p_diag in diag_products:
-                diag.append(
-                    '• %s: type=%s | tracking=%s | is_storable=%s' % (
-                        p_diag['name'],
-                        p_diag['type'],
-                        p_diag['tracking'],
-                        p_diag['is_storable'],
-                    )
-                )
 
-            raise UserError(_(
-                'No Stock Valuation Layers were created!\n\n'
-                'This usually means:\n\n'
-                '1. PRODUCT CONFIGURATION:\n'
-                '   Products must have:\n'
-                '     ✓ Type = "Goods"\n'
-                '     ✓ Track Inventory = Checked\n'
-                '   Current products:\n%s\n\n'
-                '2. CATEGORY COSTING METHOD:\n'
-                '   Go to: Inventory → Configuration → Product Categories\n'
-                '   Edit each category used by your products:\n'
-                '     ✓ Costing Method = "Average Cost" or "Standard"\n'
-                '     ✓ Inventory Valuation = "Automated (Perpetual)"\n\n'
-                '3. IF STILL FAILING:\n'
-                '   Run the diagnostic script (see error message from SVL model lookup)\n'
-                '   to identify which model name is being used.'
-            ) % '\n'.join(diag))
+        raise UserError(_(
+            'No Stock Valuation Layers were created for %s!\n\n'
+            'This usually means:\n\n'
+            '1. PRODUCT CONFIGURATION:\n'
+            '   Products must have:\n'
+            '     ✓ Type = "Goods"\n'
+            '     ✓ Track Inventory = Checked\n'
+            '   Current products:\n%s\n\n'
+            '2. CATEGORY COSTING METHOD:\n'
+            '   Go to: Inventory → Configuration → Product Categories\n'
+            '   Edit each category used by your products:\n'
+            '     ✓ Costing Method = "Average Cost" or "Standard"\n'
+            '     ✓ Inventory Valuation = "Automated (Perpetual)"\n\n'
+            '3. IF STILL FAILING:\n'
+            '   Run the diagnostic script (see error message from SVL model lookup)\n'
+            '   to identify which model name is being used.'
+        ) % (self.name, '\n'.join(diag)))
 
     def _get_incoming_location(self, line):
         """Get the correct incoming stock location."""
@@ -11,7 +11,7 @@
     """,
     'author': 'Your Company',
     'website': 'https://www.yourcompany.com',
-    'depends': ['purchase', 'account', 'stock', 'analytic'],
+    'depends': ['purchase', 'account', 'stock', 'analytic', 'report_staging'],
     'data': [
         'security/ir.model.access.csv',
         'views/purchase_vendor_report_wizard_view.xml',
@@ -3,6 +3,7 @@ from odoo import models, fields, api
 
 class PurchaseVendorReport(models.TransientModel):
     _name = 'purchase.vendor.report'
+    _inherit = ['report.staging.mixin']
     _description = 'Purchase Vendor Report'
     _order = 'invoice_date desc, invoice_number'
 
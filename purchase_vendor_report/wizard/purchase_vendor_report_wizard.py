@@ -77,11 +77,6 @@ class PurchaseVendorReportWizard(models.TransientModel):
         if not self.all_vendors and not self.vendor_ids:
             raise ValidationError('Please select vendors or check "All Vendors"')
 
-        report_obj = self.env['purchase.vendor.report']
-
-        # Clear existing report data
-        report_obj.search([]).unlink()
-
         # Build domain
         domain = [
             ('move_type', '=', 'in_invoice'),
@@ -101,6 +96,7 @@ class PurchaseVendorReportWizard(models.TransientModel):
 
         # Cache rate per invoice
         rate_cache = {}
+        report_lines = []
 
         for invoice in invoices:
             if invoice.id not in rate_cache:
@@ -142,7 +138,7 @@ class PurchaseVendorReportWizard(models.TransientModel):
                 tax_value_cc     = (line.price_total - line.price_subtotal) * rate
                 net_amount_cc    = line.price_total * rate
 
-                report_obj.create({
+                report_lines.append({
                     'invoice_date': invoice.invoice_date,
                     'invoice_number': invoice.name,
                     'analytic_account_id': analytic_account_id,
@@ -159,15 +155,12 @@ class PurchaseVendorReportWizard(models.TransientModel):
                     'net_amount': net_amount_cc,
                 })
 
-        return {
-            'name': 'Purchase Vendor Report',
-            'type': 'ir.actions.act_window',
-            'res_model': 'purchase.vendor.report',
-            'view_mode': 'list',
-            'view_id': self.env.ref('purchase_vendor_report.view_purchase_vendor_report_list').id,
-            'target': 'current',
-            'domain': [],
-        }
+        # Report lines of this run only, created in one batch
+        run, __ = self.env['purchase.vendor.report']._stage_rows(
+            report_lines, name='Purchase Vendor Report')
+        return run._get_action(
+            view_id=self.env.ref('purchase_vendor_report.view_purchase_vendor_report_list').id,
+        )
 
 
 
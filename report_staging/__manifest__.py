@@ -0,0 +1,25 @@
+{
+    'name': 'Report Staging',
+    'version': '19.0.1.0.0',
+    'summary': 'Per-run staging rows shared by the report wizards',
+    'description': """
+        Report wizards that materialise their results into helper models
+        store them under a report run instead of wiping the whole table:
+        concurrent runs do not see or delete each other's rows, the rows of
+        a run are created in one batch, and the list views open on a single
+        run.
+
+        Runs older than report_staging.run_max_age hours (24 by default) are
+        deleted, with their rows, by a cron.
+    """,
+    'author': 'Custom',
+    'category': 'Hidden',
+    'depends': ['base'],
+    'data': [
+        'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
+    ],
+    'installable': True,
+    'auto_install': False,
+    'license': 'LGPL-3',
+}
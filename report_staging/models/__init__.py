@@ -0,0 +1,2 @@
+from . import report_staging_run
+from . import report_staging_mixin
@@ -0,0 +1,33 @@
+from odoo import api, fields, models
+
+
+class ReportStagingMixin(models.AbstractModel):
+    """
+    Helper rows of a report, keyed by report run.
+
+    Wizards build the rows of a run with ``_stage_rows()`` and open them
+    with ``run._get_action()``, instead of deleting every row of the table
+    and creating theirs one at a time.
+    """
+    _name = 'report.staging.mixin'
+    _description = 'Report Staging Rows'
+
+    run_id = fields.Many2one(
+        'report.staging.run', string='Report Run', readonly=True,
+        index=True, ondelete='cascade')
+
+    @api.model
+    def _stage_rows(self, vals_list, name=None):
+        """
+        Create the rows of a new report run, in one batch.
+
+        :param vals_list: list of create values
+        :param name: report name, the model description by default
+        :returns: (report.staging.run, created rows)
+        """
+        run = self.env['report.staging.run'].create({
+            'name': name or self._description,
+            'res_model': self._name,
+        })
+        rows = self.create([dict(vals, run_id=run.id) for vals in vals_list])
+        return run, rows
@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+# rows of the runs older than this many hours are deleted by the cron
+DEFAULT_RUN_MAX_AGE = 24
+
+
+class ReportStagingRun(models.Model):
+    """
+    One execution of a report wizard.
+
+    The helper rows of the report (models inheriting report.staging.mixin)
+    point to their run and are deleted with it, by database cascade.
+    """
+    _name = 'report.staging.run'
+    _description = 'Report Run'
+    _order = 'id desc'
+
+    name = fields.Char(string='Report', readonly=True)
+    res_model = fields.Char(string='Rows Model', required=True, readonly=True, index=True)
+    user_id = fields.Many2one(
+        'res.users', string='User', readonly=True, ondelete='cascade',
+        default=lambda self: self.env.user)
+
+    def _get_action(self, name=None, **values):
+        """
+        Window action on the rows of the run.
+
+        :param values: extra action values (views, context, ...); a
+            ``domain`` is combined with the run filter
+        """
+        self.ensure_one()
+        domain = [('run_id', '=', self.id)] + list(values.pop('domain', []))
+        action = {
+            'name': name or self.name,
+            'type': 'ir.actions.act_window',
+            'res_model': self.res_model,
+            'view_mode': 'list',
+            'target': 'current',
+            'domain': domain,
+        }
+        action.update(values)
+        return action
+
+    @api.model
+    def _cron_gc_runs(self):
+        max_age = int(self.env['ir.config_parameter'].sudo().get_param(
+            'report_staging.run_max_age', DEFAULT_RUN_MAX_AGE))
+        limit = fields.Datetime.now() - timedelta(hours=max_age)
+        self.sudo().search([('create_date', '<', limit)]).unlink()
@@ -0,0 +1,30 @@
+{
+    'name': 'Stock Location Warehouse Map',
+    'version': '19.0.1.0.0',
+    'summary': 'Stored location → warehouse table shared by the stock reports',
+    'description': """
+        Keeps one row per stock location with the warehouse it belongs to,
+        maintained on location / warehouse create, write and archive.
+        Reports join the table (or call warehouse_of()) instead of walking
+        parent locations or parsing warehouse codes out of location names.
+
+        Also serves product.product.get_stock_snapshot(): per-warehouse and
+        per-location on-hand / reserved / available quantities of many
+        products in one call, with a short-lived cache dropped on quant
+        changes.
+    """,
+    'author': 'Custom',
+    'category': 'Inventory',
+    'depends': ['stock'],
+    'data': [
+        'security/ir.model.access.csv',
+    ],
+    'assets': {
+        'web.assets_backend': [
+            'stock_location_warehouse/static/src/js/stock_snapshot_prefetch.js',
+        ],
+    },
+    'installable': True,
+    'auto_install': False,
+    'license': 'LGPL-3',
+}
@@ -0,0 +1,4 @@
+from . import stock_location_warehouse
+from . import stock_location
+from . import product_product
+from . import stock_quant
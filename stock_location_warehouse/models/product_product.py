@@ -0,0 +1,125 @@
+import time
+
+from odoo import api, models
+from odoo.tools.lru import LRU
+
+# {(dbname, product_id): {(uid, company_ids): (expiry, snapshot)}}, per
+# worker and bounded; entries live for ``snapshot_ttl`` seconds and are
+# dropped when a quant of the product changes
+_snapshot_cache = LRU(4096)
+
+
+def invalidate_stock_snapshot(dbname, product_ids):
+    for product_id in product_ids:
+        try:
+            del _snapshot_cache[dbname, product_id]
+        except KeyError:
+            pass
+
+
+def clear_stock_snapshots():
+    _snapshot_cache.clear()
+
+
+class ProductProduct(models.Model):
+    _inherit = 'product.product'
+
+    @api.model
+    def get_stock_snapshot(self, product_ids):
+        """
+        Stock panel of many products at once, for the invoice line widgets.
+
+        On-hand, reserved and available quantities of the internal locations
+        come from one grouped quant query; locations are rolled up into
+        warehouses through the location → warehouse map.  Snapshots are
+        cached per product, user and allowed companies for
+        ``stock_location_warehouse.snapshot_ttl`` seconds (30 by default)
+        and dropped as soon as a quant of the product changes.
+
+        :param product_ids: list of product.product ids
+        :returns: {product_id: {
+                'uom': product uom name,
+                'warehouses': [{'id', 'warehouse_name', 'location_stock',
+                                'on_hand', 'reserved', 'available'}],
+                'locations': [{'location_id', 'location_name', 'warehouse_id',
+                               'lot_name', 'package_name',
+                               'on_hand', 'reserved', 'available'}],
+            }}
+        """
+        self.env['stock.quant'].check_access('read')
+        product_ids = list({product_id for product_id in product_ids if product_id})
+        ttl = int(self.env['ir.config_parameter'].sudo().get_param(
+            'stock_location_warehouse.snapshot_ttl', 30))
+        dbname = self.env.cr.dbname
+        user_key = (self.env.uid, tuple(sorted(self.env.companies.ids)))
+        now = time.monotonic()
+
+        result = {}
+        missing = []
+        for product_id in product_ids:
+            expiry, snapshot = _snapshot_cache.get((dbname, product_id), {}).get(user_key, (0, None))
+            if expiry > now:
+                result[product_id] = snapshot
+            else:
+                missing.append(product_id)
+        if missing:
+            fresh = self._compute_stock_snapshot(missing)
+            for product_id, snapshot in fresh.items():
+                if ttl > 0:
+                    entries = _snapshot_cache.get((dbname, product_id)) or {}
+                    entries[user_key] = (now + ttl, snapshot)
+                    _snapshot_cache[dbname, product_id] = entries
+                result[product_id] = snapshot
+        return result
+
+    @api.model
+    def _compute_stock_snapshot(self, product_ids):
+        products = self.browse(product_ids).exists()
+        warehouses = self.env['stock.warehouse'].search([])
+        groups = self.env['stock.quant']._read_group(
+            [('product_id', 'in', products.ids), ('location_id.usage', '=', 'internal')],
+            ['product_id', 'location_id', 'lot_id', 'package_id'],
+            ['quantity:sum', 'reserved_quantity:sum'],
+        )
+        wh_of = self.env['stock.location.warehouse'].sudo().warehouse_of(
+            location.id for __, location, __, __, __, __ in groups)
+
+        snapshots = {}
+        for product in products:
+            snapshots[product.id] = {
+                'uom': product.uom_id.name or '',
+                'warehouses': {
+                    warehouse.id: {
+                        'id': warehouse.id,
+                        'warehouse_name': warehouse.name,
+                        'location_stock': warehouse.lot_stock_id.complete_name or '',
+                        'on_hand': 0.0,
+                        'reserved': 0.0,
+                        'available': 0.0,
+                    }
+                    for warehouse in warehouses
+                },
+                'locations': [],
+            }
+        for product, location, lot, package, on_hand, reserved in groups:
+            snapshot = snapshots[product.id]
+            warehouse_id = wh_of.get(location.id) or False
+            snapshot['locations'].append({
+                'location_id': location.id,
+                'location_name': location.complete_name or location.name,
+                'warehouse_id': warehouse_id,
+                'lot_name': lot.name or '',
+                'package_name': package.name or '',
+                'on_hand': on_hand,
+                'reserved': reserved,
+                'available': on_hand - reserved,
+            })
+            totals = snapshot['warehouses'].get(warehouse_id)
+            if totals:
+                totals['on_hand'] += on_hand
+                totals['reserved'] += reserved
+                totals['available'] += on_hand - reserved
+        for snapshot in snapshots.values():
+            snapshot['warehouses'] = list(snapshot['warehouses'].values())
+            snapshot['locations'].sort(key=lambda row: row['location_name'])
+        return snapshots
@@ -0,0 +1,33 @@
+from odoo import api, models
+
+
+class StockLocation(models.Model):
+    _inherit = 'stock.location'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        locations = super().create(vals_list)
+        self.env['stock.location.warehouse']._sync(locations.ids)
+        return locations
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'location_id', 'name', 'usage', 'active'} & set(vals):
+            self.env['stock.location.warehouse']._sync(self.ids)
+        return res
+
+
+class StockWarehouse(models.Model):
+    _inherit = 'stock.warehouse'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        warehouses = super().create(vals_list)
+        self.env['stock.location.warehouse']._sync()
+        return warehouses
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'view_location_id', 'code', 'active'} & set(vals):
+            self.env['stock.location.warehouse']._sync()
+        return res
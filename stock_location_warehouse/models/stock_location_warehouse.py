@@ -0,0 +1,104 @@
+from odoo import api, models, fields
+
+from .product_product import clear_stock_snapshots
+
+
+class StockLocationWarehouse(models.Model):
+    """
+    Stored location → warehouse map, one row per stock location.
+
+    A location belongs to the warehouse whose view location is its closest
+    ancestor (or itself), whatever its usage.  Transit locations outside every
+    warehouse follow the site naming convention ("FYH/Inter-warehouse
+    transit/...") and belong to the warehouse whose code is the first segment
+    of their complete name.
+
+    Kept in sync by stock.location / stock.warehouse create and write; SQL
+    reports join ``stock_location_warehouse`` and Python code calls
+    ``warehouse_of()``.
+    """
+    _name = 'stock.location.warehouse'
+    _description = 'Stock Location Warehouse Map'
+    _log_access = False
+    _rec_name = 'location_id'
+
+    location_id = fields.Many2one(
+        'stock.location', string='Location', required=True, readonly=True,
+        index=True, ondelete='cascade')
+    warehouse_id = fields.Many2one(
+        'stock.warehouse', string='Warehouse', readonly=True, index=True, ondelete='set null')
+    usage = fields.Char(string='Location Type', readonly=True)
+
+    _location_uniq = models.Constraint('UNIQUE(location_id)', 'A location is mapped only once.')
+
+    def init(self):
+        self._sync()
+
+    @api.model
+    def _sync(self, location_ids=None):
+        """
+        Recompute the map for ``location_ids`` and all their descendants, or
+        for every location when ``location_ids`` is None.
+        """
+        self.env['stock.location'].flush_model(['location_id', 'parent_path', 'complete_name', 'usage'])
+        self.env['stock.warehouse'].flush_model(['view_location_id', 'code'])
+        cr = self.env.cr
+        if location_ids is None:
+            cr.execute(f"DELETE FROM {self._table}")
+            where, params = "", {}
+        else:
+            cr.execute("""
+                SELECT child.id
+                FROM stock_location loc
+                JOIN stock_location child ON child.parent_path LIKE loc.parent_path || '%%'
+                WHERE loc.id = ANY(%s)
+            """, (list(location_ids),))
+            ids = [r[0] for r in cr.fetchall()]
+            if not ids:
+                return
+            cr.execute(f"DELETE FROM {self._table} WHERE location_id = ANY(%s)", (ids,))
+            where, params = "WHERE sl.id = ANY(%(ids)s)", {'ids': ids}
+        cr.execute(f"""
+            INSERT INTO {self._table} (location_id, warehouse_id, usage)
+            SELECT sl.id, COALESCE(wh.id, tr.id), sl.usage
+            FROM stock_location sl
+            LEFT JOIN LATERAL (
+                SELECT sw.id
+                FROM stock_warehouse sw
+                JOIN stock_location vl ON vl.id = sw.view_location_id
+                WHERE sl.parent_path LIKE vl.parent_path || '%%'
+                ORDER BY length(vl.parent_path) DESC
+                LIMIT 1
+            ) wh ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT sw.id
+                FROM stock_warehouse sw
+                WHERE sl.usage = 'transit'
+                  AND UPPER(sw.code) = UPPER(TRIM(split_part(sl.complete_name, '/', 1)))
+                ORDER BY sw.id
+                LIMIT 1
+            ) tr ON wh.id IS NULL
+            {where}
+        """, params)
+        self.invalidate_model()
+        # the stock snapshots roll locations up through the map
+        clear_stock_snapshots()
+        self.env.cr.postcommit.add(clear_stock_snapshots)
+
+    @api.model
+    def warehouse_of(self, location_ids):
+        """
+        Bulk lookup.
+
+        :param location_ids: iterable of stock.location ids
+        :returns: {location_id: warehouse_id or False}
+        """
+        location_ids = list(set(location_ids))
+        if not location_ids:
+            return {}
+        self.env.cr.execute(f"""
+            SELECT location_id, warehouse_id FROM {self._table}
+            WHERE location_id = ANY(%s)
+        """, (location_ids,))
+        found = dict(self.env.cr.fetchall())
+        return {loc_id: found.get(loc_id) or False for loc_id in location_ids}
@@ -0,0 +1,41 @@
+from odoo import api, models
+
+from .product_product import invalidate_stock_snapshot
+
+# quant fields the stock snapshots are computed from
+SNAPSHOT_FIELDS = ('product_id', 'location_id', 'lot_id', 'package_id',
+                   'quantity', 'reserved_quantity')
+
+
+class StockQuant(models.Model):
+    _inherit = 'stock.quant'
+
+    def _invalidate_stock_snapshot(self):
+        cr = self.env.cr
+        invalidate_stock_snapshot(cr.dbname, self.product_id.ids)
+        # snapshots read by this worker before the commit are stale too
+        product_ids = cr.postcommit.data.get('stock_snapshot_product_ids')
+        if product_ids is None:
+            product_ids = cr.postcommit.data['stock_snapshot_product_ids'] = set()
+            dbname = cr.dbname
+            cr.postcommit.add(lambda: invalidate_stock_snapshot(dbname, product_ids))
+        product_ids.update(self.product_id.ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        quants = super().create(vals_list)
+        quants._invalidate_stock_snapshot()
+        return quants
+
+    def write(self, vals):
+        if not any(field in vals for field in SNAPSHOT_FIELDS):
+            return super().write(vals)
+        self._invalidate_stock_snapshot()
+        res = super().write(vals)
+        if 'product_id' in vals:
+            self._invalidate_stock_snapshot()
+        return res
+
+    def unlink(self):
+        self._invalidate_stock_snapshot()
+        return super().unlink()
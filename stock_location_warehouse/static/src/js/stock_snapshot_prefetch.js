@@ -0,0 +1,65 @@
+/** @odoo-module **/
+
+import { onWillDestroy } from "@odoo/owl";
+import { patch } from "@web/core/utils/patch";
+import { ListRenderer } from "@web/views/list/list_renderer";
+
+// List renderers currently showing a product_id column (invoice lines, ...)
+const productListRenderers = new Set();
+
+patch(ListRenderer.prototype, {
+    setup() {
+        super.setup(...arguments);
+        if (this.props.list.fields?.product_id) {
+            productListRenderers.add(this);
+            onWillDestroy(() => productListRenderers.delete(this));
+        }
+    },
+});
+
+/**
+ * Ids of the products of the lines of the lists on screen, read from the
+ * records of the lists.
+ */
+export function getListProductIds() {
+    const productIds = new Set();
+    for (const renderer of productListRenderers) {
+        for (const record of renderer.props.list.records || []) {
+            const product = record.data.product_id;
+            const productId = Array.isArray(product) ? product[0] : product?.id;
+            if (productId) {
+                productIds.add(productId);
+            }
+        }
+    }
+    return productIds;
+}
+
+/**
+ * Fetcher of the stock rows of a product that fetches, in the same call,
+ * the rows of every product on screen and reuses them for ``ttl``
+ * milliseconds, so that going through the lines does not cost one call per
+ * product.
+ *
+ * @param {Object} orm orm service
+ * @param {string} model model of ``method``
+ * @param {string} method batch method, {product_id: rows} of a list of ids
+ * @returns {Function} async (productId) => rows
+ */
+export function makeStockRowsFetcher(orm, model, method, ttl = 30000) {
+    const prefetched = new Map();
+    return async (productId) => {
+        const now = Date.now();
+        const isFresh = (id) => prefetched.has(id) && now - prefetched.get(id).time < ttl;
+        if (!isFresh(productId)) {
+            const productIds = getListProductIds();
+            productIds.add(productId);
+            const missing = [...productIds].filter((id) => !isFresh(id));
+            const rowsByProduct = await orm.call(model, method, [missing]);
+            for (const id of missing) {
+                prefetched.set(id, { rows: rowsByProduct[id] || [], time: now });
+            }
+        }
+        return prefetched.get(productId).rows;
+    };
+}
@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 from odoo import models, api, fields
 
 
@@ -16,17 +18,33 @@ class StockWarehouseOrderpoint(models.Model):
 
     @api.depends('product_id', 'location_id')
     def _compute_onhand_qty(self):
-        quant = self.env['stock.quant']
+        onhand = self._read_onhand_qty()
         for op in self:
-            if not op.location_id or not op.product_id:
-                op.onhand_qty = 0.0
-                continue
-            # stock.quant._get_available_quantity returns quantity at a location
-            try:
-                op.onhand_qty = quant._get_available_quantity(op.product_id, op.location_id.id)
-            except Exception:
-                # fallback: use product qty_available globally if quant helper not present
-                op.onhand_qty = op.product_id.with_context(location=op.location_id.id).qty_available
+            op.onhand_qty = onhand[op.id]
+
+    def _read_onhand_qty(self):
+        """Return dict {orderpoint_id: on-hand qty at its location, children included}.
+
+        All the orderpoints are served by one grouped quant read; each group
+        is then attributed to the orderpoints whose location is an ancestor.
+        """
+        results = dict.fromkeys(self.ids, 0.0)
+        orderpoints = self.filtered(lambda op: op.product_id and op.location_id)
+        if not orderpoints:
+            return results
+        groups = self.env['stock.quant']._read_group(
+            [('product_id', 'in', orderpoints.product_id.ids),
+             ('location_id', 'child_of', orderpoints.location_id.ids)],
+            ['product_id', 'location_id'], ['quantity:sum'])
+        by_product = defaultdict(list)
+        for product, location, quantity in groups:
+            by_product[product.id].append((location.parent_path, quantity))
+        for op in orderpoints:
+            parent_path = op.location_id.parent_path
+            results[op.id] = sum(
+                quantity for path, quantity in by_product[op.product_id.id]
+                if path.startswith(parent_path))
+        return results
 
     # If the orderpoint uses a compute function we can override it.
     # Many Odoo versions use a compute method named _compute_qty_to_order or similar;
@@ -35,20 +53,12 @@ class StockWarehouseOrderpoint(models.Model):
     @api.model
     def _compute_qty_to_order_onhand(self, orderpoints):
         """Return dict {orderpoint_id: qty_to_order} based on on-hand qty per location."""
-        quant = self.env['stock.quant']
+        onhand_by_op = orderpoints._read_onhand_qty()
         results = {}
         for op in orderpoints:
-            # use on-hand at the orderpoint's location
-            if not op.location_id or not op.product_id:
-                results[op.id] = 0.0
-                continue
-            try:
-                onhand = quant._get_available_quantity(op.product_id, op.location_id.id)
-            except Exception:
-                onhand = op.product_id.with_context(location=op.location_id.id).qty_available
-
+            onhand = onhand_by_op[op.id]
             # if below minimum, order up to max (same formula Odoo uses for virtual)
-            if onhand < (op.product_min_qty or 0.0):
+            if op.product_id and op.location_id and onhand < (op.product_min_qty or 0.0):
                 qty_to_order = max((op.product_max_qty or 0.0) - onhand, 0.0)
             else:
                 qty_to_order = 0.0
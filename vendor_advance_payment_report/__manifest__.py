@@ -14,7 +14,7 @@
     """,
     'author': 'Your Company',
     'website': 'https://www.yourcompany.com',
-    'depends': ['account'],
+    'depends': ['account', 'report_staging'],
     'data': [
         'security/ir.model.access.csv',
         'wizard/advance_payment_report_wizard_view.xml',
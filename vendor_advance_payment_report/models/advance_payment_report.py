@@ -5,6 +5,7 @@ from odoo import models, fields, api
 
 class AdvancePaymentReport(models.TransientModel):
     _name = 'advance.payment.report'
+    _inherit = ['report.staging.mixin']
     _description = 'Advance Payment Report'
     _order = 'date desc, receipt_number desc'
 
@@ -68,9 +68,6 @@ class AdvancePaymentReportWizard(models.TransientModel):
         if self.date_from > self.date_to:
             raise UserError('Date From cannot be greater than Date To.')
 
-        # Clear previous report data
-        self.env['advance.payment.report'].search([]).unlink()
-
         company_currency = self.env.company.currency_id
 
         # Build domain - fetch advance vendor payments only
@@ -134,16 +131,10 @@ class AdvancePaymentReportWizard(models.TransientModel):
                 'payment_id': payment.id,
             })
 
-        if report_lines:
-            self.env['advance.payment.report'].create(report_lines)
-
-        return {
-            'name': 'Advance Payment Report',
-            'type': 'ir.actions.act_window',
-            'res_model': 'advance.payment.report',
-            'view_mode': 'list',
-            'target': 'current',
-        }
+        # Report lines of this run only, created in one batch
+        run, __ = self.env['advance.payment.report']._stage_rows(
+            report_lines, name='Advance Payment Report')
+        return run._get_action()
 
     def action_exit(self):
         return {'type': 'ir.actions.act_window_close'}
@@ -10,7 +10,7 @@
     """,
     'author': 'Your Company',
     'website': 'https://www.yourcompany.com',
-    'depends': ['stock', 'mail', 'purchase'],
+    'depends': ['stock', 'mail', 'purchase', 'stock_orderpoint_onhand'],
     'data': [
         'security/stock_warehouse_orderpoint_security.xml',
         'security/ir.model.access.csv',
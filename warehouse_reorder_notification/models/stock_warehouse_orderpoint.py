@@ -1,6 +1,14 @@
-from odoo import models, fields, api, _
+import logging
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta
 
+from odoo import models, fields, api, _
+
+_logger = logging.getLogger(__name__)
+
+REORDER_ACTIVITY_TYPE = 'warehouse_reorder_notification.mail_activity_type_reorder_notification'
+
 
 class StockWarehouseOrderpoint(models.Model):
     _inherit = 'stock.warehouse.orderpoint'
@@ -32,40 +40,72 @@ class StockWarehouseOrderpoint(models.Model):
     @api.depends('product_id', 'location_id')
     def _compute_has_active_notification(self):
         """Check if orderpoint has active notifications"""
+        activities = self._get_open_reorder_activities()
         for rec in self:
-            activity_type = self.env.ref(
-                'warehouse_reorder_notification.mail_activity_type_reorder_notification',
-                raise_if_not_found=False
-            )
-
-            if activity_type:
-                active_count = self.env['mail.activity'].sudo().search_count([
-                    ('res_id', '=', rec.id),
-                    ('res_model', '=', 'stock.warehouse.orderpoint'),
-                    ('activity_type_id', '=', activity_type.id),
-                ])
-                rec.has_active_notification = active_count > 0
-            else:
-                rec.has_active_notification = False
+            rec.has_active_notification = bool(activities.get(rec.id))
 
     @api.depends('product_id', 'location_id', 'product_min_qty', 'product_max_qty')
     def _compute_stock_status(self):
         """Compute current stock status"""
+        onhand = self._read_onhand_qty()
         for rec in self:
             if not rec.product_id or not rec.location_id:
                 rec.stock_status = 'ok'
                 continue
+            rec.stock_status = rec._get_stock_status(onhand[rec.id])
 
-            qty_available = rec.product_id.with_context(
-                location=rec.location_id.id
-            ).qty_available
+    def _get_stock_status(self, qty_available):
+        self.ensure_one()
+        if qty_available < self.product_min_qty:
+            return 'below_min'
+        if qty_available > self.product_max_qty:
+            return 'above_max'
+        return 'ok'
 
-            if qty_available < rec.product_min_qty:
-                rec.stock_status = 'below_min'
-            elif qty_available > rec.product_max_qty:
-                rec.stock_status = 'above_max'
-            else:
-                rec.stock_status = 'ok'
+    def _get_open_reorder_activities(self):
+        """
+        Open reorder notification activities of the orderpoints of ``self``,
+        in one query.
+
+        :returns: {orderpoint id: mail.activity recordset}
+        """
+        activity_type = self.env.ref(REORDER_ACTIVITY_TYPE, raise_if_not_found=False)
+        result = defaultdict(lambda: self.env['mail.activity'].sudo())
+        orderpoint_ids = self.filtered('id').ids
+        if not activity_type or not orderpoint_ids:
+            return result
+        activities = self.env['mail.activity'].sudo().search([
+            ('res_model', '=', 'stock.warehouse.orderpoint'),
+            ('res_id', 'in', orderpoint_ids),
+            ('activity_type_id', '=', activity_type.id),
+        ])
+        for activity in activities:
+            result[activity.res_id] |= activity
+        return result
+
+    def _prepare_notification_data(self, qty_available, notification_type):
+        self.ensure_one()
+        product = self.product_id
+        if notification_type == 'below_min':
+            shortage = self.product_min_qty - qty_available
+            message = f"⚠️ URGENT: Stock below minimum! Shortage: {shortage:.2f} {product.uom_id.name}"
+        else:
+            excess = qty_available - self.product_max_qty
+            message = f"⚠️ WARNING: Stock above maximum! Excess: {excess:.2f} {product.uom_id.name}"
+        return {
+            'product_id': product.id,
+            'product_name': product.name,
+            'product_code': product.default_code or '',
+            'warehouse_id': self.warehouse_id.id,
+            'warehouse_name': self.warehouse_id.name,
+            'location_name': self.location_id.complete_name,
+            'qty_available': qty_available,
+            'product_min_qty': self.product_min_qty,
+            'product_max_qty': self.product_max_qty,
+            'product_uom': product.uom_id.name,
+            'notification_type': notification_type,
+            'message': message,
+        }
 
     def _send_system_notification(self, notification_data):
         """Send notification to Odoo notification center (bell icon)"""
@@ -248,108 +288,111 @@ class StockWarehouseOrderpoint(models.Model):
     @api.model
     def check_and_send_reorder_notifications(self):
         """Check all reordering rules and send notifications (Called by cron)"""
-        # Get all warehouses with notifications enabled
-        warehouses = self.env['stock.warehouse'].sudo().search([
-            ('enable_reorder_notifications', '=', True)
+        orderpoints = self.sudo().search([
+            ('warehouse_id.enable_reorder_notifications', '=', True)
         ])
+        return orderpoints._evaluate_reorder_notifications()
 
-        notifications_sent = 0
-        notifications_closed = 0
-
-        # Process each warehouse separately
-        for warehouse in warehouses:
-            # Get users for THIS specific warehouse
-            warehouse_users = warehouse.sudo()._get_notification_users()
+    def _evaluate_reorder_notifications(self):
+        """
+        Evaluate the orderpoints of ``self`` in one pass: on-hand quantities
+        and open reorder activities are read in bulk, activities of the
+        orderpoints back in range are closed and the others are created or
+        refreshed with batched writes.
 
-            if not warehouse_users:
+        :returns: dict with the counts per status, the notifications sent and
+            closed, and the duration of the pass
+        """
+        start = time.time()
+        stats = {'evaluated': 0, 'ok': 0, 'below_min': 0, 'above_max': 0,
+                 'sent': 0, 'closed': 0, 'skipped': 0}
+
+        activity_type = self.env.ref(REORDER_ACTIVITY_TYPE, raise_if_not_found=False) \
+            or self.env.ref('mail.mail_activity_data_todo', raise_if_not_found=False)
+        users_by_warehouse = {
+            warehouse: warehouse.sudo()._get_notification_users()
+            for warehouse in self.warehouse_id
+        }
+        orderpoints = self.filtered(lambda op: users_by_warehouse.get(op.warehouse_id))
+        onhand = orderpoints._read_onhand_qty()
+        open_activities = orderpoints._get_open_reorder_activities()
+
+        now = fields.Datetime.now()
+        today = fields.Date.today()
+        res_model_id = self.env['ir.model']._get_id('stock.warehouse.orderpoint')
+        to_close = self.env['mail.activity'].sudo()
+        replenished = []
+        activity_vals_list = []
+        notified = self.browse()
+
+        for orderpoint in orderpoints:
+            qty_available = onhand[orderpoint.id]
+            status = orderpoint._get_stock_status(qty_available)
+            stats['evaluated'] += 1
+            stats[status] += 1
+
+            if status == 'ok':
+                if open_activities[orderpoint.id]:
+                    to_close |= open_activities[orderpoint.id]
+                    replenished.append((orderpoint, qty_available))
                 continue
 
-            # Get orderpoints ONLY for this warehouse
-            orderpoints = self.sudo().search([
-                ('warehouse_id', '=', warehouse.id),
-                ('warehouse_id.enable_reorder_notifications', '=', True)
-            ])
-
-            for orderpoint in orderpoints:
-                try:
-                    product = orderpoint.product_id
-                    location = orderpoint.location_id
-
-                    # Get on-hand quantity
-                    qty_available = product.with_context(location=location.id).qty_available
-
-                    # Auto-close notifications if stock is OK
-                    if orderpoint.product_min_qty <= qty_available <= orderpoint.product_max_qty:
-                        # Check if there are open notifications before closing
-                        activity_type = self.env.ref(
-                            'warehouse_reorder_notification.mail_activity_type_reorder_notification',
-                            raise_if_not_found=False
-                        )
-
-                        if activity_type:
-                            open_count = self.env['mail.activity'].sudo().search_count([
-                                ('res_id', '=', orderpoint.id),
-                                ('res_model', '=', 'stock.warehouse.orderpoint'),
-                                ('activity_type_id', '=', activity_type.id),
-                            ])
-
-                            if open_count > 0:
-                                orderpoint._auto_close_notifications_if_stock_ok()
-                                notifications_closed += 1
-
-                        continue
-
-                    # Skip if notification was sent in last 4 hours
-                    if orderpoint.last_notification_date:
-                        time_diff = datetime.now() - orderpoint.last_notification_date
-                        if time_diff < timedelta(hours=4):
-                            continue
-
-                    notification_type = False
-                    message = ""
-
-                    # Check if below minimum
-                    if qty_available < orderpoint.product_min_qty:
-                        notification_type = 'below_min'
-                        shortage = orderpoint.product_min_qty - qty_available
-                        message = f"⚠️ URGENT: Stock below minimum! Shortage: {shortage:.2f} {product.uom_id.name}"
-                    # Check if above maximum
-                    elif qty_available > orderpoint.product_max_qty:
-                        notification_type = 'above_max'
-                        excess = qty_available - orderpoint.product_max_qty
-                        message = f"⚠️ WARNING: Stock above maximum! Excess: {excess:.2f} {product.uom_id.name}"
-
-                    # Send notification if needed
-                    if notification_type:
-                        notification_data = {
-                            'product_id': product.id,
-                            'product_name': product.name,
-                            'product_code': product.default_code or '',
-                            'warehouse_id': warehouse.id,
-                            'warehouse_name': warehouse.name,
-                            'location_name': location.complete_name,
-                            'qty_available': qty_available,
-                            'product_min_qty': orderpoint.product_min_qty,
-                            'product_max_qty': orderpoint.product_max_qty,
-                            'product_uom': product.uom_id.name,
-                            'notification_type': notification_type,
-                            'message': message,
-                        }
-
-                        if orderpoint._send_system_notification(notification_data):
-                            orderpoint.write({
-                                'last_notification_date': fields.Datetime.now(),
-                                'notification_count': orderpoint.notification_count + 1,
-                            })
-                            notifications_sent += 1
+            if orderpoint.last_notification_date and \
+                    now - orderpoint.last_notification_date < timedelta(hours=4):
+                stats['skipped'] += 1
+                continue
+            if not activity_type:
+                continue
 
-                except Exception as e:
-                    continue
+            data = orderpoint._prepare_notification_data(qty_available, status)
+            notification_icon = '🔴' if status == 'below_min' else '🟡'
+            vals = {
+                'summary': f"{notification_icon} [{data['warehouse_name']}] {data['product_name']}",
+                'note': orderpoint._format_notification_message_simple(data),
+                'date_deadline': today,
+            }
+            existing = open_activities[orderpoint.id].filtered(
+                lambda activity: activity.activity_type_id == activity_type)
+            if existing:
+                existing.write(vals)
+            for user in users_by_warehouse[orderpoint.warehouse_id] - existing.user_id:
+                activity_vals_list.append(dict(
+                    vals,
+                    activity_type_id=activity_type.id,
+                    res_id=orderpoint.id,
+                    res_model_id=res_model_id,
+                    user_id=user.id,
+                ))
+            notified |= orderpoint
+
+        if activity_vals_list:
+            self.env['mail.activity'].sudo().create(activity_vals_list)
+        if notified:
+            notified.flush_recordset(['notification_count'])
+            self.env.cr.execute("""
+                UPDATE stock_warehouse_orderpoint
+                SET last_notification_date = %s,
+                    notification_count = COALESCE(notification_count, 0) + 1
+                WHERE id = ANY(%s)
+            """, (now, notified.ids))
+            notified.invalidate_recordset(['last_notification_date', 'notification_count'])
+        if to_close:
+            to_close.unlink()
+            for orderpoint, qty_available in replenished:
+                orderpoint.message_post(
+                    body=f"✅ Stock replenished to {qty_available:.2f} {orderpoint.product_id.uom_id.name}. "
+                         f"Reorder notifications automatically closed.",
+                    subject="Stock Replenished"
+                )
 
-        return {
-            'sent': notifications_sent,
-            'closed': notifications_closed
-        }
+        stats['sent'] = len(notified)
+        stats['closed'] = len(replenished)
+        stats['duration'] = time.time() - start
+        _logger.info(
+            "Reorder notifications: %(evaluated)s orderpoints evaluated (%(below_min)s below min, "
+            "%(above_max)s above max, %(ok)s ok), %(sent)s sent, %(closed)s closed, "
+            "%(skipped)s throttled in %(duration).2fs", stats)
+        return stats
 
     def action_send_notification_now(self):
         """Manual button to send notification immediately"""
@@ -380,37 +423,12 @@ class StockWarehouseOrderpoint(models.Model):
                     }
                 }
 
-            product = self.product_id
-            location = self.location_id
-            qty_available = product.with_context(location=location.id).qty_available
-
-            notification_type = False
-            message = ""
-
-            if qty_available < self.product_min_qty:
-                notification_type = 'below_min'
-                shortage = self.product_min_qty - qty_available
-                message = f"⚠️ URGENT: Stock below minimum! Shortage: {shortage:.2f} {product.uom_id.name}"
-            elif qty_available > self.product_max_qty:
-                notification_type = 'above_max'
-                excess = qty_available - self.product_max_qty
-                message = f"⚠️ WARNING: Stock above maximum! Excess: {excess:.2f} {product.uom_id.name}"
-
-            if notification_type:
-                notification_data = {
-                    'product_id': product.id,
-                    'product_name': product.name,
-                    'product_code': product.default_code or '',
-                    'warehouse_id': self.warehouse_id.id,
-                    'warehouse_name': self.warehouse_id.name,
-                    'location_name': location.complete_name,
-                    'qty_available': qty_available,
-                    'product_min_qty': self.product_min_qty,
-                    'product_max_qty': self.product_max_qty,
-                    'product_uom': product.uom_id.name,
-                    'notification_type': notification_type,
-                    'message': message,
-                }
+            qty_available = self._read_onhand_qty()[self.id]
+
+            notification_type = self._get_stock_status(qty_available)
+
+            if notification_type != 'ok':
+                notification_data = self._prepare_notification_data(qty_available, notification_type)
 
                 if self._send_system_notification(notification_data):
                     self.write({
@@ -448,7 +466,7 @@ class StockWarehouseOrderpoint(models.Model):
                     'params': {
                         'title': _('No Alert Needed'),
                         'message': _('Current quantity (%.2f %s) is within min/max range.') % (qty_available,
-                                                                                               product.uom_id.name),
+                                                                                               self.product_id.uom_id.name),
                         'type': 'info',
                         'sticky': False,
                     }
@@ -620,11 +638,11 @@ class StockWarehouseOrderpoint(models.Model):
 
         orderpoints_data = []
         default_vendor = False
+        onhand = self._read_onhand_qty()
 
         for orderpoint in self:
             product = orderpoint.product_id
-            location = orderpoint.location_id
-            qty_available = product.with_context(location=location.id).qty_available
+            qty_available = onhand[orderpoint.id]
 
             if qty_available < orderpoint.product_min_qty:
                 qty_to_order = orderpoint.product_max_qty - qty_available
@@ -673,22 +691,15 @@ class StockWarehouseOrderpoint(models.Model):
 
         purchase_order = self.env['purchase.order'].sudo().create(po_vals)
 
-        for op_data in orderpoints_data:
-            product = op_data['product']
-            qty = op_data['qty_to_order']
-            price = op_data['price']
-
-            line_vals = {
-                'order_id': purchase_order.id,
-                'product_id': product.id,
-                'product_qty': qty,
-                'product_uom_id': product.uom_id.id,
-                'price_unit': price,
-                'date_planned': fields.Datetime.now(),
-                'name': product.display_name,
-            }
-
-            self.env['purchase.order.line'].sudo().create(line_vals)
+        self.env['purchase.order.line'].sudo().create([{
+            'order_id': purchase_order.id,
+            'product_id': op_data['product'].id,
+            'product_qty': op_data['qty_to_order'],
+            'product_uom_id': op_data['product'].uom_id.id,
+            'price_unit': op_data['price'],
+            'date_planned': fields.Datetime.now(),
+            'name': op_data['product'].display_name,
+        } for op_data in orderpoints_data])
 
         return {
             'type': 'ir.actions.act_window',
@@ -1,12 +1,16 @@
 {
     'name': 'Product Location Column',
-    'version': '19.0.2.0.0',
+    'version': '19.0.3.0.0',
     'category': 'Inventory',
-    'summary': 'Add warehouse location columns to product list',
-    'depends': ['stock'],
+    'summary': 'Per-warehouse stock pivot and product list columns',
+    'depends': ['stock', 'stock_location_warehouse'],
     'data': [
+        'security/ir.model.access.csv',
         'views/product_template.xml',
+        'views/product_warehouse_quantity.xml',
     ],
+    'post_init_hook': 'post_init_hook',
+    'uninstall_hook': 'uninstall_hook',
     'installable': True,
     'application': False,
     'license': 'LGPL-3',
@@ -0,0 +1,12 @@
+from .models.stock_warehouse import STOCK_COLUMN_PREFIX
+
+
+def post_init_hook(env):
+    env['stock.warehouse']._sync_stock_columns()
+
+
+def uninstall_hook(env):
+    env['ir.model.fields'].search([
+        ('model', '=', 'product.template'),
+        ('name', '=like', STOCK_COLUMN_PREFIX.replace('_', '\\_') + '%'),
+    ]).unlink()
@@ -1 +1,4 @@
-from . import product_template
\ No newline at end of file
+from . import product_template
+from . import product_warehouse_quantity
+from . import stock_quant
+from . import stock_warehouse
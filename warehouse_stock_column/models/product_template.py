@@ -1,4 +1,9 @@
+from lxml import etree
+
 from odoo import models, fields, api
+from odoo.tools import SQL
+
+from .stock_warehouse import STOCK_COLUMN_PREFIX
 
 
 class ProductTemplate(models.Model):
@@ -18,30 +23,10 @@ class ProductTemplate(models.Model):
         store=True,
     )
 
-    qty_fyh_stock = fields.Float(
-        string='FYH/Stock',
-        compute='_compute_warehouse_quantities',
-        digits='Product Unit of Measure',
-        store=True,
-    )
-    qty_bld_stock = fields.Float(
-        string='BLD/Stock',
-        compute='_compute_warehouse_quantities',
-        digits='Product Unit of Measure',
-        store=True,
-    )
-    qty_dmm_stock = fields.Float(
-        string='DMM-1/Stock',
-        compute='_compute_warehouse_quantities',
-        digits='Product Unit of Measure',
-        store=True,
-    )
-
     total_sales_price = fields.Float(
         string='Total Sales Price',
         compute='_compute_total_prices',
         digits='Product Price',
-        store=True,
         help='Sales Price x On Hand Quantity'
     )
 
@@ -49,7 +34,6 @@ class ProductTemplate(models.Model):
         string='Total Cost Price',
         compute='_compute_total_prices',
         digits='Product Price',
-        store=True,
         help='Cost x On Hand Quantity'
     )
 
@@ -69,34 +53,51 @@ class ProductTemplate(models.Model):
                 vals['x_created_date'] = today
         return super().create(vals_list)
 
-    @api.depends('product_variant_ids', 'product_variant_ids.stock_quant_ids',
-                 'product_variant_ids.stock_quant_ids.quantity', 'product_variant_ids.stock_quant_ids.location_id')
-    def _compute_warehouse_quantities(self):
+    def _compute_warehouse_stock_column(self, field_name):
+        """ Compute of the per-warehouse columns (see stock.warehouse
+        ``_sync_stock_columns``): on hand quantity of the warehouse, read
+        from product.warehouse.quantity. """
+        warehouse_id = int(field_name[len(STOCK_COLUMN_PREFIX):])
+        groups = self.env['product.warehouse.quantity'].sudo()._read_group(
+            [('product_tmpl_id', 'in', self._origin.ids), ('warehouse_id', '=', warehouse_id)],
+            ['product_tmpl_id'], ['quantity:sum'])
+        quantities = {template.id: quantity for template, quantity in groups}
         for product in self:
-            qty_fyh = 0.0
-            qty_bld = 0.0
-            qty_dmm = 0.0
-
-            if product.product_variant_ids:
-                quants = self.env['stock.quant'].sudo().search([
-                    ('product_id', 'in', product.product_variant_ids.ids),
-                    ('location_id.usage', '=', 'internal'),
-                ])
-
-                for quant in quants:
-                    loc_name = quant.location_id.complete_name or ''
-                    loc_name_upper = loc_name.upper()
-
-                    if 'FYH/' in loc_name_upper or loc_name_upper.startswith('FYH'):
-                        qty_fyh += quant.quantity
-                    elif 'BLD/' in loc_name_upper or loc_name_upper.startswith('BLD'):
-                        qty_bld += quant.quantity
-                    elif 'DMM-1/' in loc_name_upper or loc_name_upper.startswith('DMM-1'):
-                        qty_dmm += quant.quantity
-
-            product.qty_fyh_stock = qty_fyh
-            product.qty_bld_stock = qty_bld
-            product.qty_dmm_stock = qty_dmm
+            product[field_name] = quantities.get(product._origin.id, 0.0)
+
+    @api.model
+    def _order_field_to_sql(self, alias, field_name, direction, nulls, query):
+        # the per-warehouse columns are not stored, sort on the quantity table
+        if field_name.startswith(STOCK_COLUMN_PREFIX) and field_name in self._fields:
+            warehouse_id = int(field_name[len(STOCK_COLUMN_PREFIX):])
+            return SQL(
+                "(SELECT COALESCE(SUM(pwq.quantity), 0) FROM product_warehouse_quantity pwq"
+                " WHERE pwq.product_tmpl_id = %s AND pwq.warehouse_id = %s) %s %s",
+                SQL.identifier(alias, 'id'), warehouse_id, direction, nulls)
+        return super()._order_field_to_sql(alias, field_name, direction, nulls, query)
+
+    @api.model
+    def _get_view(self, view_id=None, view_type='form', **options):
+        arch, view = super()._get_view(view_id, view_type, **options)
+        if view_type == 'list':
+            anchor = arch.find(".//field[@name='default_code']")
+            if anchor is not None:
+                # one column per warehouse of the report, after Internal Reference
+                for field_name in reversed(self._get_stock_column_fields()):
+                    anchor.addnext(etree.Element('field', {
+                        'name': field_name,
+                        'optional': 'show',
+                        'sum': self._fields[field_name].string,
+                        'width': '100px',
+                    }))
+        return arch, view
+
+    @api.model
+    def _get_stock_column_fields(self):
+        """ Names of the per-warehouse column fields, in warehouse order. """
+        warehouses = self.env['stock.warehouse'].sudo().search([('show_stock_column', '=', True)])
+        field_names = [f'{STOCK_COLUMN_PREFIX}{warehouse.id}' for warehouse in warehouses]
+        return [field_name for field_name in field_names if field_name in self._fields]
 
     @api.depends('list_price', 'standard_price', 'qty_available')
     def _compute_total_prices(self):
@@ -108,30 +109,10 @@ class ProductTemplate(models.Model):
 class ProductProduct(models.Model):
     _inherit = 'product.product'
 
-    qty_fyh_stock = fields.Float(
-        string='FYH/Stock',
-        compute='_compute_warehouse_quantities_variant',
-        digits='Product Unit of Measure',
-        store=True,
-    )
-    qty_bld_stock = fields.Float(
-        string='BLD/Stock',
-        compute='_compute_warehouse_quantities_variant',
-        digits='Product Unit of Measure',
-        store=True,
-    )
-    qty_dmm_stock = fields.Float(
-        string='DMM-1/Stock',
-        compute='_compute_warehouse_quantities_variant',
-        digits='Product Unit of Measure',
-        store=True,
-    )
-
     total_sales_price = fields.Float(
         string='Total Sales Price',
         compute='_compute_total_prices_variant',
         digits='Product Price',
-        store=True,
         help='Sales Price x On Hand Quantity'
     )
 
@@ -139,39 +120,11 @@ class ProductProduct(models.Model):
         string='Total Cost Price',
         compute='_compute_total_prices_variant',
         digits='Product Price',
-        store=True,
         help='Cost x On Hand Quantity'
     )
 
-    @api.depends('stock_quant_ids', 'stock_quant_ids.quantity', 'stock_quant_ids.location_id')
-    def _compute_warehouse_quantities_variant(self):
-        for product in self:
-            qty_fyh = 0.0
-            qty_bld = 0.0
-            qty_dmm = 0.0
-
-            quants = self.env['stock.quant'].sudo().search([
-                ('product_id', '=', product.id),
-                ('location_id.usage', '=', 'internal'),
-            ])
-
-            for quant in quants:
-                loc_name = quant.location_id.complete_name or ''
-                loc_name_upper = loc_name.upper()
-
-                if 'FYH/' in loc_name_upper or loc_name_upper.startswith('FYH'):
-                    qty_fyh += quant.quantity
-                elif 'BLD/' in loc_name_upper or loc_name_upper.startswith('BLD'):
-                    qty_bld += quant.quantity
-                elif 'DMM-1/' in loc_name_upper or loc_name_upper.startswith('DMM-1'):
-                    qty_dmm += quant.quantity
-
-            product.qty_fyh_stock = qty_fyh
-            product.qty_bld_stock = qty_bld
-            product.qty_dmm_stock = qty_dmm
-
     @api.depends('lst_price', 'standard_price', 'qty_available')
     def _compute_total_prices_variant(self):
         for product in self:
             product.total_sales_price = product.lst_price * product.qty_available
-            product.total_cost_price = product.standard_price * product.qty_available
\ No newline at end of file
+            product.total_cost_price = product.standard_price * product.qty_available
@@ -0,0 +1,121 @@
+from collections import defaultdict
+
+from odoo import api, models, fields
+from odoo.tools.sql import table_exists
+
+
+class ProductWarehouseQuantity(models.Model):
+    """
+    On-hand quantity per product and warehouse, internal locations only.
+
+    Maintained from quant deltas (stock.quant create / write / unlink add the
+    quantity moved in or out of each warehouse) instead of recomputing the
+    products; rebuilt from the quants when the location → warehouse map is
+    synced.
+    """
+    _name = 'product.warehouse.quantity'
+    _description = 'Product Quantity per Warehouse'
+    _log_access = False
+    _rec_name = 'product_id'
+    _order = 'product_id, warehouse_id'
+
+    product_id = fields.Many2one(
+        'product.product', string='Product', required=True, readonly=True,
+        index=True, ondelete='cascade')
+    product_tmpl_id = fields.Many2one(
+        'product.template', string='Product Template', readonly=True,
+        index=True, ondelete='cascade')
+    warehouse_id = fields.Many2one(
+        'stock.warehouse', string='Warehouse', required=True, readonly=True, ondelete='cascade')
+    show_stock_column = fields.Boolean(related='warehouse_id.show_stock_column')
+    quantity = fields.Float(string='On Hand', readonly=True, digits='Product Unit of Measure')
+
+    _product_warehouse_uniq = models.Constraint(
+        'UNIQUE(product_id, warehouse_id)', 'A product has a single quantity per warehouse.')
+
+    def init(self):
+        self._rebuild()
+
+    @api.model
+    def _rebuild(self):
+        self.env['stock.quant'].flush_model(['product_id', 'location_id', 'quantity'])
+        cr = self.env.cr
+        cr.execute(f"DELETE FROM {self._table}")
+        cr.execute(f"""
+            INSERT INTO {self._table} (product_id, product_tmpl_id, warehouse_id, quantity)
+            SELECT q.product_id, pp.product_tmpl_id, lw.warehouse_id, SUM(q.quantity)
+            FROM stock_quant q
+            JOIN stock_location_warehouse lw ON lw.location_id = q.location_id
+            JOIN product_product pp ON pp.id = q.product_id
+            WHERE lw.usage = 'internal' AND lw.warehouse_id IS NOT NULL
+            GROUP BY q.product_id, pp.product_tmpl_id, lw.warehouse_id
+        """)
+        self.invalidate_model()
+
+    @api.model
+    def _apply_quant_deltas(self, deltas):
+        """
+        Add quantity deltas to the table.
+
+        :param deltas: iterable of (product_id, location_id, quantity)
+        """
+        totals = defaultdict(float)
+        for product_id, location_id, quantity in deltas:
+            if product_id and location_id and quantity:
+                totals[product_id, location_id] += quantity
+        if not totals:
+            return
+        values = ", ".join(["(%s, %s, %s::numeric)"] * len(totals))
+        # rows are upserted in (product, warehouse) order, so concurrent
+        # moves lock them in the same order
+        params = [param for (product_id, location_id), quantity in sorted(totals.items())
+                  for param in (product_id, location_id, quantity)]
+        self.env.cr.execute(f"""
+            INSERT INTO {self._table} AS pwq (product_id, product_tmpl_id, warehouse_id, quantity)
+            SELECT d.product_id, pp.product_tmpl_id, lw.warehouse_id, SUM(d.quantity)
+            FROM (VALUES {values}) AS d(product_id, location_id, quantity)
+            JOIN stock_location_warehouse lw ON lw.location_id = d.location_id
+            JOIN product_product pp ON pp.id = d.product_id
+            WHERE lw.usage = 'internal' AND lw.warehouse_id IS NOT NULL
+            GROUP BY d.product_id, pp.product_tmpl_id, lw.warehouse_id
+            ORDER BY d.product_id, lw.warehouse_id
+            ON CONFLICT (product_id, warehouse_id)
+            DO UPDATE SET quantity = pwq.quantity + EXCLUDED.quantity
+        """, params)
+        self.invalidate_model(['quantity'])
+
+    @api.model
+    def get_quantities(self, product_ids, warehouse_ids=None):
+        """
+        Bulk lookup.
+
+        :returns: {product_id: {warehouse_id: quantity}}
+        """
+        result = {product_id: {} for product_id in product_ids}
+        if not product_ids:
+            return result
+        query = f"SELECT product_id, warehouse_id, quantity FROM {self._table} WHERE product_id = ANY(%s)"
+        params = [list(product_ids)]
+        if warehouse_ids is not None:
+            query += " AND warehouse_id = ANY(%s)"
+            params.append(list(warehouse_ids))
+        self.env.cr.execute(query, params)
+        for product_id, warehouse_id, quantity in self.env.cr.fetchall():
+            result[product_id][warehouse_id] = quantity
+        return result
+
+
+class StockLocationWarehouse(models.Model):
+    _inherit = 'stock.location.warehouse'
+
+    @api.model
+    def _sync(self, location_ids=None):
+        super()._sync(location_ids)
+        # the table is created after this model when the module is installed
+        if not table_exists(self.env.cr, 'product_warehouse_quantity'):
+            return
+        # locations holding stock may have moved between warehouses
+        if location_ids is not None and not self.env['stock.quant'].sudo().search_count(
+                [('location_id', 'child_of', list(location_ids))], limit=1):
+            return
+        self.env['product.warehouse.quantity']._rebuild()
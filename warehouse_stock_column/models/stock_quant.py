@@ -0,0 +1,32 @@
+from odoo import api, models
+
+QUANT_DELTA_FIELDS = ('product_id', 'location_id', 'quantity')
+
+
+class StockQuant(models.Model):
+    _inherit = 'stock.quant'
+
+    def _quant_deltas(self, sign=1):
+        return [(quant.product_id.id, quant.location_id.id, sign * quant.quantity)
+                for quant in self]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        quants = super().create(vals_list)
+        self.env['product.warehouse.quantity'].sudo()._apply_quant_deltas(quants._quant_deltas())
+        return quants
+
+    def write(self, vals):
+        if not any(field in vals for field in QUANT_DELTA_FIELDS):
+            return super().write(vals)
+        deltas = self._quant_deltas(-1)
+        res = super().write(vals)
+        deltas += self._quant_deltas()
+        self.env['product.warehouse.quantity'].sudo()._apply_quant_deltas(deltas)
+        return res
+
+    def unlink(self):
+        deltas = self._quant_deltas(-1)
+        res = super().unlink()
+        self.env['product.warehouse.quantity'].sudo()._apply_quant_deltas(deltas)
+        return res
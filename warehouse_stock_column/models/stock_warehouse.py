@@ -0,0 +1,72 @@
+from odoo import api, models, fields
+
+# per-warehouse column fields of the product list, custom (manual) fields
+# named after the warehouse id
+STOCK_COLUMN_PREFIX = 'x_wh_qty_'
+
+
+class StockWarehouse(models.Model):
+    _inherit = 'stock.warehouse'
+
+    show_stock_column = fields.Boolean(
+        string='Show in Stock per Warehouse',
+        default=True,
+        help='Show this warehouse as a column of the product list and of the '
+             'Stock per Warehouse report.',
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        warehouses = super().create(vals_list)
+        self._sync_stock_columns()
+        return warehouses
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'show_stock_column', 'code', 'active'} & set(vals):
+            self._sync_stock_columns()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self._sync_stock_columns()
+        return res
+
+    @api.model
+    def _sync_stock_columns(self):
+        """
+        One numeric product.template field per warehouse shown in the report,
+        computed from product.warehouse.quantity, so the product list can
+        show, sort and sum a column per warehouse.  Fields of warehouses no
+        longer shown are removed.
+        """
+        IrModelFields = self.env['ir.model.fields'].sudo()
+        existing = {field.name: field for field in IrModelFields.search([
+            ('model', '=', 'product.template'),
+            ('name', '=like', STOCK_COLUMN_PREFIX.replace('_', '\\_') + '%'),
+        ])}
+        model_id = self.env['ir.model']._get_id('product.template')
+        vals_list = []
+        for warehouse in self.sudo().search([('show_stock_column', '=', True)]):
+            field_name = f'{STOCK_COLUMN_PREFIX}{warehouse.id}'
+            label = f'{warehouse.code}/Stock'
+            field = existing.pop(field_name, None)
+            if field is None:
+                vals_list.append({
+                    'name': field_name,
+                    'model_id': model_id,
+                    'field_description': label,
+                    'ttype': 'float',
+                    'state': 'manual',
+                    'store': False,
+                    'readonly': True,
+                    'copied': False,
+                    'depends': 'product_variant_ids',
+                    'compute': f'self._compute_warehouse_stock_column({field_name!r})',
+                })
+            elif field.field_description != label:
+                field.field_description = label
+        if existing:
+            IrModelFields.browse([field.id for field in existing.values()]).unlink()
+        if vals_list:
+            IrModelFields.create(vals_list)
@@ -14,7 +14,7 @@
     """,
     'author': 'Your Company',
     'website': 'https://www.yourcompany.com',
-    'depends': ['stock', 'mail'],
+    'depends': ['stock', 'mail', 'stock_location_warehouse'],
     'data': [
         'security/warehouse_security_groups.xml',
         'security/ir.model.access.csv',
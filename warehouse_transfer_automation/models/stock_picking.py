@@ -38,98 +38,29 @@ class StockPicking(models.Model):
 
     @api.depends('location_id', 'location_dest_id', 'picking_type_id')
     def _compute_warehouses(self):
-        """Compute source and destination warehouses.
-        Transit locations have no warehouse_id, so resolve dest warehouse
-        from the first path segment of the transit location name (e.g. FYH/...).
+        """Compute source and destination warehouses from the shared
+        location → warehouse map.  Transit locations are mapped there to the
+        warehouse named by the first segment of their name (e.g. FYH/...).
         """
+        wh_of = self.env['stock.location.warehouse'].sudo().warehouse_of(
+            self.location_id.ids + self.location_dest_id.ids)
+        Warehouse = self.env['stock.warehouse']
         for picking in self:
-            picking_sudo = picking.sudo()
-
-            # --- Source warehouse ---
-            if picking_sudo.location_id.warehouse_id:
-                picking.source_warehouse_id = picking_sudo.location_id.warehouse_id
-            else:
-                picking.source_warehouse_id = False
-
-            # --- Destination warehouse ---
-            if picking_sudo.location_dest_id.warehouse_id:
-                picking.dest_warehouse_id = picking_sudo.location_dest_id.warehouse_id
-            elif picking_sudo.location_dest_id.usage == 'transit':
-                # Transit locations: "FYH/Inter-warehouse transit/MAIN/input"
-                # First segment = destination warehouse code
-                transit_name = (picking_sudo.location_dest_id.complete_name
-                                or picking_sudo.location_dest_id.name or '')
-                first_segment = transit_name.split('/')[0].strip()
-                dest_wh = self.env['stock.warehouse'].sudo().search(
-                    [('code', '=ilike', first_segment)], limit=1
-                )
-                if not dest_wh:
-                    dest_wh = self.env['stock.warehouse'].sudo().search(
-                        [('name', 'ilike', first_segment)], limit=1
-                    )
-                picking.dest_warehouse_id = dest_wh or False
-                _logger.info('Transit dest resolved: "%s" -> warehouse: %s',
-                             first_segment, dest_wh.name if dest_wh else 'NOT FOUND')
-            else:
-                picking.dest_warehouse_id = False
+            picking.source_warehouse_id = Warehouse.browse(wh_of.get(picking.location_id.id))
+            picking.dest_warehouse_id = Warehouse.browse(wh_of.get(picking.location_dest_id.id))
 
     @api.depends('location_id', 'location_dest_id')
     def _compute_is_inter_warehouse_transfer(self):
-        """Identify if this is an inter-warehouse transfer"""
+        """Identify if this is an inter-warehouse transfer: a move into a
+        transit location belonging to another warehouse than the source."""
+        wh_of = self.env['stock.location.warehouse'].sudo().warehouse_of(
+            self.location_id.ids + self.location_dest_id.ids)
         for picking in self:
             is_inter_wh = False
-
-            # Check if destination is transit location
             if picking.location_dest_id.usage == 'transit':
-                dest_loc_name = picking.location_dest_id.complete_name or picking.location_dest_id.name
-                source_loc_name = picking.location_id.complete_name or picking.location_id.name
-
-                _logger.info('🔍 Analyzing inter-WH transfer: %s', picking.name if picking.name else 'NEW')
-                _logger.info('   Source loc: %s', source_loc_name)
-                _logger.info('   Dest loc: %s', dest_loc_name)
-
-                # Extract warehouse keywords from location names
-                source_upper = source_loc_name.upper()
-                dest_upper = dest_loc_name.upper()
-
-                # Identify source warehouse
-                source_wh_key = None
-                # if 'MAIN' in source_upper:
-                #     source_wh_key = 'main'
-                # elif 'DAMMA' in source_upper or 'DAMMAM' in source_upper:
-                #     source_wh_key = 'damma'
-                # elif 'BALAD' in source_upper or 'BALADIYA' in source_upper:
-                #     source_wh_key = 'balad'
-                if 'FYH' in source_upper:
-                    source_wh_key = 'fyh'
-                elif 'DMM' in source_upper or 'DAMMAM' in source_upper:
-                    source_wh_key = 'dmm'
-                elif 'BLD' in source_upper or 'BALAD' in source_upper:
-                    source_wh_key = 'bld'
-
-                # Identify destination warehouse (use same keywords as source)
-                dest_wh_key = None
-                if 'FYH' in dest_upper:
-                    dest_wh_key = 'fyh'
-                elif 'DMM' in dest_upper or 'DAMMAM' in dest_upper:
-                    dest_wh_key = 'dmm'
-                elif 'BLD' in dest_upper or 'BALAD' in dest_upper:
-                    dest_wh_key = 'bld'
-
-                _logger.info('   Source key: %s, Dest key: %s', source_wh_key, dest_wh_key)
-
-                # Inter-warehouse if both have keys and they're different
-                if source_wh_key and dest_wh_key and source_wh_key != dest_wh_key:
-                    is_inter_wh = True
-                    _logger.info('   ✅ INTER-WAREHOUSE TRANSFER DETECTED')
-                else:
-                    if not source_wh_key:
-                        _logger.info('   ⚠️ Could not identify source warehouse')
-                    elif not dest_wh_key:
-                        _logger.info('   ⚠️ Could not identify dest warehouse')
-                    else:
-                        _logger.info('   ⚠️ Source and dest are same warehouse: %s == %s', source_wh_key, dest_wh_key)
-
+                source_wh = wh_of.get(picking.location_id.id)
+                dest_wh = wh_of.get(picking.location_dest_id.id)
+                is_inter_wh = bool(source_wh and dest_wh and source_wh != dest_wh)
             picking.is_inter_warehouse_transfer = is_inter_wh
 
     def button_validate(self):
@@ -147,9 +78,9 @@ class StockPicking(models.Model):
                     not picking.auto_receipt_created and
                     picking.state in ['assigned', 'confirmed']):
 
-                dest_loc_name = picking.location_dest_id.complete_name or picking.location_dest_id.name
-                # if any(wh in dest_loc_name.upper() for wh in ['DAMMA', 'BALAD', 'MAIN']):
-                if any(wh in dest_loc_name.upper() for wh in ['FYH', 'BLD', 'DMM']):
+                dest_wh = self.env['stock.location.warehouse'].sudo().warehouse_of(
+                    picking.location_dest_id.ids).get(picking.location_dest_id.id)
+                if dest_wh:
                     pickings_to_automate.append(picking)
                     _logger.info('✅ Picking %s WILL BE automated', picking.name)
                 else:
@@ -373,33 +304,16 @@ class StockPicking(models.Model):
         return new_picking
 
     def _resolve_warehouses_from_locations(self, picking):
-        """Fallback: resolve source/dest warehouses from location names when computed fields are empty."""
+        """Fallback: resolve source/dest warehouses from the location → warehouse map when computed fields are empty."""
         source_wh = picking.sudo().source_warehouse_id
         dest_wh = picking.sudo().dest_warehouse_id
 
-        if not source_wh:
-            src_name = (picking.location_id.complete_name or picking.location_id.name or '').upper()
-            for code in ['FYH', 'BLD', 'DMM']:
-                if code in src_name:
-                    source_wh = self.env['stock.warehouse'].sudo().search(
-                        [('code', '=ilike', code)], limit=1)
-                    if source_wh:
-                        break
-
-        if not dest_wh:
-            # For transit dest: first segment of location name = dest warehouse code
-            dest_name = (picking.location_dest_id.complete_name or picking.location_dest_id.name or '')
-            first_seg = dest_name.split('/')[0].strip()
-            dest_wh = self.env['stock.warehouse'].sudo().search(
-                [('code', '=ilike', first_seg)], limit=1)
-            if not dest_wh:
-                dest_upper = dest_name.upper()
-                for code in ['FYH', 'BLD', 'DMM']:
-                    if code in dest_upper:
-                        dest_wh = self.env['stock.warehouse'].sudo().search(
-                            [('code', '=ilike', code)], limit=1)
-                        if dest_wh:
-                            break
+        if not source_wh or not dest_wh:
+            wh_of = self.env['stock.location.warehouse'].sudo().warehouse_of(
+                picking.location_id.ids + picking.location_dest_id.ids)
+            Warehouse = self.env['stock.warehouse'].sudo()
+            source_wh = source_wh or Warehouse.browse(wh_of.get(picking.location_id.id))
+            dest_wh = dest_wh or Warehouse.browse(wh_of.get(picking.location_dest_id.id))
 
         _logger.info('Resolved warehouses - source: %s, dest: %s',
                      source_wh.name if source_wh else 'None',